@@ -3,3 +3,11 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
+
+    def ready(self):
+        # Compile the Annex 2.B corrosion tables once per process
+        from .calculations.corrosion_rates import corrosion_tables
+        corrosion_tables()
+
+        # Keep the dashboard HierarchyCounts and RiskRollup rows current
+        from . import counters, rollups  # noqa: F401
@@ -0,0 +1,7 @@
+"""
+Server-side API 581 calculation engines.
+
+Python counterparts of the browser calculators in
+static/dashboard/js/calculations/ and static/formula_app/. Every engine
+works on NumPy arrays so a whole facility can be evaluated in one pass.
+"""
@@ -0,0 +1,522 @@
+"""
+Batch recalculation entry points.
+
+These functions evaluate the vectorized engines for a whole queryset of
+components and write the results back with bulk_update().
+"""
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import corrosion_rates, financial, fms, inspection_planning, memo, risk, risk_matrix, thinning
+from .common import load_columns, nan_max, to_decimal
+
+
+def scoped_components(owner=None, facility=None, unit=None, system=None, equipment=None):
+    """Components filtered by any combination of hierarchy levels."""
+    from ..models import Component
+
+    queryset = Component.objects.all()
+    if owner is not None:
+        queryset = queryset.filter(owner=owner)
+    if facility is not None:
+        queryset = queryset.filter(facility=facility)
+    if unit is not None:
+        queryset = queryset.filter(equipment__system__unit=unit)
+    if system is not None:
+        queryset = queryset.filter(equipment__system=system)
+    if equipment is not None:
+        queryset = queryset.filter(equipment=equipment)
+    return queryset.order_by('pk')
+
+
+def total_damage_factors(queryset, today=None):
+    """
+    Governing damage factor for every component in `queryset`.
+
+    Returns (pks, dict of mechanism group -> DF array, total DF array).
+    """
+    pks, groups, total, _, _ = evaluate_damage_factors(queryset, today=today)
+    return pks, groups, total
+
+
+def load_damage_factor_inputs(queryset):
+    """
+    Columns of every damage factor engine ({memo.ENGINES name: columns})
+    and the thinning inspection counts, each engine loaded once.
+    """
+    columns = {
+        engine: load_columns(queryset, module.COMPONENT_FIELDS) for engine, (module, _) in memo.ENGINES.items()
+    }
+    return columns, thinning.inspection_counts_for(columns['thinning']['pk'])
+
+
+def component_input_hashes(hashes):
+    """One digest per component over its per-engine memo keys."""
+    return np.array([
+        hashlib.blake2b('|'.join(row).encode(), digest_size=16).hexdigest() for row in zip(*hashes.values())
+    ], dtype=object)
+
+
+def evaluate_damage_factors(queryset, today=None, inputs=None, hashes=None):
+    """
+    Same as total_damage_factors(), plus a dict of Component field -> array
+    for the intermediate values (corrosion rates) stored alongside the DFs
+    and a dict of memo.ENGINES name -> memo.EngineResult for the
+    DamageFactorResult table. Rows whose inputs were evaluated before are
+    served from the memo cache.
+
+    `inputs` (load_damage_factor_inputs()) and `hashes` ({engine: input
+    hashes}) skip reloading and rehashing the queryset.
+    """
+    columns, counts = inputs or load_damage_factor_inputs(queryset)
+    hashes = hashes or {}
+    engines = {
+        engine: memo.evaluate(
+            engine, cols, today, counts if engine == 'thinning' else None, hashes=hashes.get(engine),
+        )
+        for engine, cols in columns.items()
+    }
+    groups = {group: engines[group].governing_df for group in DAMAGE_FACTOR_GROUPS}
+    values = {field: column for result in engines.values() for field, column in result.values.items()}
+    return columns['thinning']['pk'], groups, nan_max(*groups.values()), values, engines
+
+
+# Mechanism groups combined into the total DF, in memo.ENGINES names
+DAMAGE_FACTOR_GROUPS = ('thinning', 'scc', 'brittle_fracture', 'htha', 'external')
+
+# Mechanism groups whose DF is also stored on its own Component column
+PERSISTED_GROUPS = {
+    'brittle_fracture': 'brittle_damage_factor',
+    'htha': 'htha_damage_factor',
+}
+
+
+def recalculate_damage_factors(queryset, today=None, batch_size=1000, force=False):
+    """
+    Recompute and persist calculated_total_damage_factor, plus the
+    per-mechanism DF columns in PERSISTED_GROUPS, the external / CUI
+    corrosion rates and the DamageFactorResult rows.
+
+    Components whose damage_factor_input_hash still matches their inputs
+    (and the table versions) are skipped unless `force` is set.
+    Returns (rows updated, rows unchanged).
+    """
+    from ..models import Component
+    from ..rollups import components_changed
+
+    columns, counts = load_damage_factor_inputs(queryset)
+    pks = columns['thinning']['pk']
+    hashes = {
+        engine: memo.input_hashes(engine, cols, today, counts if engine == 'thinning' else None)
+        for engine, cols in columns.items()
+    }
+    input_hash = component_input_hashes(hashes) if len(pks) else np.empty(0, dtype=object)
+    if force:
+        changed = np.arange(len(pks))
+    else:
+        stored = dict(queryset.values_list('pk', 'damage_factor_input_hash'))
+        changed = np.flatnonzero([stored.get(int(pk)) != digest for pk, digest in zip(pks, input_hash)])
+    if not len(changed):
+        return 0, len(pks)
+
+    columns = {engine: {f: v[changed] for f, v in cols.items()} for engine, cols in columns.items()}
+    hashes = {engine: digests[changed] for engine, digests in hashes.items()}
+    pks, groups, total, values, engines = evaluate_damage_factors(
+        queryset, today=today, inputs=(columns, counts[changed]), hashes=hashes,
+    )
+
+    fields = ['calculated_total_damage_factor', 'damage_factor_input_hash', *PERSISTED_GROUPS.values(), *values]
+    updates = []
+    for i, pk in enumerate(pks):
+        component = Component(
+            pk=int(pk),
+            calculated_total_damage_factor=to_decimal(total[i]),
+            damage_factor_input_hash=input_hash[changed[i]],
+        )
+        for group, field in PERSISTED_GROUPS.items():
+            setattr(component, field, to_decimal(groups[group][i]))
+        for field, column in values.items():
+            setattr(component, field, to_decimal(column[i], places=4))
+        updates.append(component)
+    with transaction.atomic():
+        Component.objects.bulk_update(updates, fields, batch_size=batch_size)
+        save_mechanism_results(pks, engines, batch_size=batch_size)
+        components_changed(pks)
+    return len(updates), len(input_hash) - len(updates)
+
+
+def save_mechanism_results(pks, engines, batch_size=1000):
+    """
+    Upsert one DamageFactorResult per active mechanism and component and
+    delete the rows of mechanisms that are no longer active. The mechanism
+    with the largest final DF of each component is flagged as governing.
+    Returns the number of rows written.
+    """
+    from ..models import DamageFactorResult
+
+    results = list(engines.values())
+    final = np.hstack([result.final_df for result in results])
+    active = ~np.isnan(final)
+    governing = np.where(active.any(axis=1), np.argmax(np.where(active, final, -np.inf), axis=1), -1)
+
+    computed_at = timezone.now()
+    rows = []
+    j = 0
+    for result in results:
+        for k, key in enumerate(result.keys):
+            rows += [
+                DamageFactorResult(
+                    component_id=int(pks[i]),
+                    mechanism=key,
+                    base_df=to_decimal(result.base_df[i, k]),
+                    final_df=to_decimal(result.final_df[i, k]),
+                    susceptibility=result.susceptibility[i, k],
+                    governing=bool(governing[i] == j),
+                    computed_at=computed_at,
+                    input_hash=result.input_hash[i],
+                )
+                for i in np.flatnonzero(active[:, j])
+            ]
+            inactive = [int(pk) for pk in pks[~active[:, j]]]
+            for start in range(0, len(inactive), batch_size):
+                DamageFactorResult.objects.filter(
+                    mechanism=key, component_id__in=inactive[start:start + batch_size],
+                ).delete()
+            j += 1
+    DamageFactorResult.objects.bulk_create(
+        rows,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['component', 'mechanism'],
+        update_fields=['base_df', 'final_df', 'susceptibility', 'governing', 'computed_at', 'input_hash'],
+    )
+    return len(rows)
+
+
+def refresh_damage_factors(queryset, engines, today=None, batch_size=1000):
+    """
+    Re-evaluate only the memo.ENGINES named in `engines` and rebuild the
+    total DF from their new results plus the stored DamageFactorResult
+    rows of the other engines. Components without any stored result get
+    a full recalculation. Returns the row count.
+
+    The input hash is cleared on partially refreshed components, so the
+    next recalculate_damage_factors() run evaluates them in full.
+    """
+    from ..models import Component, DamageFactorResult
+    from ..rollups import components_changed
+
+    engines = [engine for engine in memo.ENGINES if engine in engines]
+    if not engines:
+        return 0
+    if len(engines) == len(memo.ENGINES):
+        return recalculate_damage_factors(queryset, today=today, batch_size=batch_size, force=True)[0]
+
+    evaluated = set(
+        DamageFactorResult.objects.filter(component__in=queryset).values_list('component_id', flat=True).distinct()
+    )
+    all_pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+    fresh = [pk for pk in all_pks if pk not in evaluated]
+    if fresh:
+        recalculate_damage_factors(
+            Component.objects.filter(pk__in=fresh), today=today, batch_size=batch_size, force=True,
+        )
+    partial = Component.objects.filter(pk__in=[pk for pk in all_pks if pk in evaluated])
+
+    columns = {engine: load_columns(partial, memo.ENGINES[engine][0].COMPONENT_FIELDS) for engine in engines}
+    pks = columns[engines[0]]['pk']
+    if not len(pks):
+        return len(fresh)
+    counts = thinning.inspection_counts_for(pks) if 'thinning' in engines else None
+    results = {
+        engine: memo.evaluate(engine, cols, today, counts if engine == 'thinning' else None)
+        for engine, cols in columns.items()
+    }
+
+    row = {int(pk): i for i, pk in enumerate(pks)}
+    groups = {}
+    for group in DAMAGE_FACTOR_GROUPS:
+        if group in results:
+            groups[group] = results[group].governing_df
+            continue
+        groups[group] = np.full(len(pks), np.nan)
+        stored = (
+            DamageFactorResult.objects
+            .filter(component__in=partial, mechanism__in=memo.mechanism_keys(group))
+            .values('component_id').annotate(df=Max('final_df')).values_list('component_id', 'df')
+        )
+        for pk, df in stored:
+            groups[group][row[pk]] = np.nan if df is None else float(df)
+    total = nan_max(*groups.values())
+    values = {field: column for result in results.values() for field, column in result.values.items()}
+
+    persisted = {group: field for group, field in PERSISTED_GROUPS.items() if group in results}
+    fields = ['calculated_total_damage_factor', 'damage_factor_input_hash', *persisted.values(), *values]
+    updates = []
+    for i, pk in enumerate(pks):
+        component = Component(pk=int(pk), calculated_total_damage_factor=to_decimal(total[i]))
+        for group, field in persisted.items():
+            setattr(component, field, to_decimal(groups[group][i]))
+        for field, column in values.items():
+            setattr(component, field, to_decimal(column[i], places=4))
+        updates.append(component)
+    with transaction.atomic():
+        Component.objects.bulk_update(updates, fields, batch_size=batch_size)
+        save_mechanism_results(pks, results, batch_size=batch_size)
+        mark_governing(pks)
+        components_changed(pks)
+    return len(fresh) + len(updates)
+
+
+def mark_governing(pks):
+    """Flag the stored DamageFactorResult with the largest final DF of each component as governing."""
+    from ..models import DamageFactorResult
+
+    results = DamageFactorResult.objects.filter(component_id__in=[int(pk) for pk in pks])
+    governing = {}
+    for pk, component_id in results.order_by('component_id', '-final_df', 'mechanism').values_list('pk', 'component_id'):
+        governing.setdefault(component_id, pk)
+    results.exclude(pk__in=governing.values()).filter(governing=True).update(governing=False)
+    results.filter(pk__in=governing.values(), governing=False).update(governing=True)
+
+
+def recalculate_corrosion_rates(queryset, batch_size=1000):
+    """
+    Interpolate and persist the Annex 2.B corrosion rate fields. Components
+    missing the inputs for a mechanism keep their stored rate. Returns
+    {rate field: rows updated}.
+    """
+    from ..models import Component
+
+    pks, rates = corrosion_rates.evaluate_components(queryset)
+    counts = {}
+    with transaction.atomic():
+        for field, column in rates.items():
+            rows = np.flatnonzero(np.isfinite(column))
+            updates = [Component(pk=int(pks[i]), **{field: to_decimal(column[i])}) for i in rows]
+            Component.objects.bulk_update(updates, [field], batch_size=batch_size)
+            counts[field] = len(updates)
+    return counts
+
+
+def recalculate_consequences(queryset, batch_size=1000):
+    """
+    Recompute and persist calculated_consequence_area, the Step 4.12
+    financial COF (calculated_cof) and cof_category for every component.
+    The category follows the risk matrix default (financial consequence).
+
+    Returns (row count, FinancialResult); the result carries the per-unit
+    and per-facility FC totals from the same pass.
+    """
+    from ..models import Component
+    from ..rollups import components_changed
+
+    pks, areas, costs = financial.evaluate_components(queryset)
+    if not len(pks):
+        return 0, costs
+
+    categories = risk_matrix.financial_cof_category(costs.financial_cof)
+    updates = [
+        Component(
+            pk=int(pk),
+            calculated_consequence_area=to_decimal(areas.consequence_area[i], places=4, max_digits=15),
+            cof_category=categories[i],
+            calculated_cof=to_decimal(costs.financial_cof[i], places=2, max_digits=20),
+        )
+        for i, pk in enumerate(pks)
+    ]
+    with transaction.atomic():
+        Component.objects.bulk_update(
+            updates, ['calculated_consequence_area', 'cof_category', 'calculated_cof'], batch_size=batch_size,
+        )
+        components_changed(pks)
+    return len(updates), costs
+
+
+def recalculate_inspection_dates(queryset, target_df=None, target_risk=None, today=None,
+                                 horizon_years=inspection_planning.DEFAULT_HORIZON_YEARS,
+                                 chunk_size=1000, batch_size=1000):
+    """
+    Solve and persist next_inspection_due_date for every component, in
+    chunks of `chunk_size` components so the (N, T) projection stays small.
+    Returns (row count, number of components already due).
+    """
+    from ..models import Component
+
+    all_pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+    count = due_now = 0
+    for start in range(0, len(all_pks), chunk_size):
+        chunk = Component.objects.filter(pk__in=all_pks[start:start + chunk_size])
+        pks, plan = inspection_planning.plan_inspections(
+            chunk, target_df=target_df, target_risk=target_risk, today=today, horizon_years=horizon_years,
+        )
+        updates = [
+            Component(pk=int(pk), next_inspection_due_date=plan.due_dates[i]) for i, pk in enumerate(pks)
+        ]
+        with transaction.atomic():
+            Component.objects.bulk_update(updates, ['next_inspection_due_date'], batch_size=batch_size)
+        count += len(updates)
+        due_now += int((plan.years_to_target == 0).sum())
+    return count, due_now
+
+
+def recalculate_fms(queryset, batch_size=1000):
+    """
+    Apply the facility FMS audit to every component: persist fms_pscore,
+    fms_factor and final_pof. Components of facilities without an audit
+    are left unchanged. Returns the row count.
+    """
+    from ..models import Component
+    from ..rollups import components_changed
+
+    pks, result = fms.evaluate_components(queryset)
+    rows = np.flatnonzero(~np.isnan(result.fms_factor))
+    updates = [
+        Component(
+            pk=int(pks[i]),
+            fms_pscore=to_decimal(result.pscore[i], places=2, max_digits=5),
+            fms_factor=to_decimal(result.fms_factor[i], places=3, max_digits=5),
+            final_pof=to_decimal(result.final_pof[i], places=10, max_digits=15),
+        )
+        for i in rows
+    ]
+    with transaction.atomic():
+        Component.objects.bulk_update(updates, ['fms_pscore', 'fms_factor', 'final_pof'], batch_size=batch_size)
+        components_changed([component.pk for component in updates])
+    return len(updates)
+
+
+def recalculate_stored_risk(queryset, batch_size=1000):
+    """
+    Derive and persist final_pof, calculated_risk and both matrix
+    categories (risk.RISK_FIELDS) from the stored total DF, consequence
+    area, financial COF and FMS factor. Returns the row count.
+    """
+    from ..models import Component
+    from ..rollups import components_changed
+
+    pks, result = risk.evaluate_stored(queryset)
+    updates = [
+        Component(
+            pk=int(pk),
+            final_pof=to_decimal(result.final_pof[i], places=10, max_digits=15),
+            calculated_risk=to_decimal(result.risk[i], places=10, max_digits=20),
+            pof_category=int(result.pof_category[i]) or None,
+            cof_category=result.cof_category[i],
+        )
+        for i, pk in enumerate(pks)
+    ]
+    with transaction.atomic():
+        Component.objects.bulk_update(updates, list(risk.RISK_FIELDS), batch_size=batch_size)
+        components_changed(pks)
+    return len(updates)
+
+
+def component_id_chunks(queryset, chunk_size=1000):
+    """Stream the ids of `queryset` in ascending chunks, paginated on pk."""
+    ids = queryset.order_by('pk').values_list('pk', flat=True)
+    last = None
+    while True:
+        chunk = list((ids if last is None else ids.filter(pk__gt=last))[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def save_risk_results(pks, result, batch_size=1000):
+    """
+    Persist a risk.RiskResult. The DamageFactorResult rows are not
+    rewritten, so the input hash is cleared and the next
+    recalculate_damage_factors() run evaluates these components in full.
+    Returns the row count.
+    """
+    from ..models import Component
+    from ..rollups import components_changed
+
+    updates = [
+        Component(
+            pk=int(pk),
+            calculated_total_damage_factor=to_decimal(result.total_df[i]),
+            calculated_consequence_area=to_decimal(result.consequence_area[i], places=4, max_digits=15),
+            final_pof=to_decimal(result.final_pof[i], places=10, max_digits=15),
+            calculated_risk=to_decimal(result.risk[i], places=10, max_digits=20),
+            calculated_cof=to_decimal(result.financial_cof[i], places=2, max_digits=20),
+            pof_category=int(result.pof_category[i]) or None,
+            cof_category=result.cof_category[i],
+            damage_factor_input_hash=None,
+        )
+        for i, pk in enumerate(pks)
+    ]
+    with transaction.atomic():
+        Component.objects.bulk_update(
+            updates, [*risk.RESULT_FIELDS, 'damage_factor_input_hash'], batch_size=batch_size,
+        )
+        components_changed(pks)
+    return len(updates)
+
+
+def recalculate_risk(queryset, today=None, chunk_size=1000, workers=None, batch_size=1000):
+    """
+    Recompute and persist the risk results (risk.RESULT_FIELDS) for every
+    component in `queryset`.
+
+    Component ids are streamed in chunks of `chunk_size`; each chunk is
+    evaluated in a pool of `workers` processes (os.cpu_count() by default,
+    1 evaluates in this process) and written back in its own transaction
+    as soon as it completes. At most two chunks per worker are in flight.
+
+    Returns (row count, {stage: seconds}): 'ids' and 'write' are wall
+    times of this process, the risk.STAGES times are summed over workers.
+    The risk rollups of the touched units are rebuilt once, at the end.
+    """
+    from ..rollups import deferred
+
+    with deferred():
+        return _recalculate_risk(queryset, today, chunk_size, workers, batch_size)
+
+
+def _recalculate_risk(queryset, today, chunk_size, workers, batch_size):
+    timings = {}
+    count = 0
+
+    def chunks():
+        stream = component_id_chunks(queryset, chunk_size)
+        while True:
+            with risk.timed(timings, 'ids'):
+                chunk = next(stream, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def save(pks, result, stage_timings):
+        for stage, seconds in stage_timings.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        with risk.timed(timings, 'write'):
+            return save_risk_results(pks, result, batch_size=batch_size)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks():
+            count += save(*risk.evaluate_chunk(chunk, today))
+        return count, timings
+
+    # spawn: workers open their own database connections instead of sharing ours
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=risk.init_worker) as pool:
+        pending = set()
+        for chunk in chunks():
+            pending.add(pool.submit(risk.evaluate_chunk, chunk, today))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                count += sum(save(*future.result()) for future in done)
+        for future in as_completed(pending):
+            count += save(*future.result())
+    return count, timings
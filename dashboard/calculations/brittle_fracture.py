@@ -0,0 +1,216 @@
+"""
+Brittle Fracture Damage Factor (API 581 Part 2, Section 2.E)
+
+Vectorized port of the formula_app brittle fracture module
+(static/formula_app/js/modules/brittle_fracture/). The exemption curves
+(Table 2.E.3.3), the DF tables (Tables 2.E.3.4 / 2.E.3.5) and the 885 F
+and sigma phase embrittlement tables are compiled once into grids and
+interpolated for every component at once.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .common import interp2d, load_columns
+from .tables import FORMULA_APP_DATA, FORMULA_APP_MODULES, load_json
+
+BRITTLE_DATA = FORMULA_APP_MODULES / 'brittle_fracture' / 'data'
+
+# Table files read by this engine (memo cache version)
+REFERENCE_TABLES = (
+    FORMULA_APP_DATA / 'table_2_e_3_3.json',
+    FORMULA_APP_DATA / 'table_2_e_3_4.json',
+    FORMULA_APP_DATA / 'table_2_e_3_5.json',
+    BRITTLE_DATA / 'brit885_damage_factor.json',
+    BRITTLE_DATA / 'sigma_damage_factor.json',
+)
+
+EXEMPTION_CURVES = ('A', 'B', 'C', 'D')
+
+# Low-alloy steels subject to temper embrittlement (Section 2.E.4)
+TEMPER_EMBRITTLEMENT_MATERIALS = ('1Cr-0.5Mo', '1.25Cr-0.5Mo', '2.25Cr-1Mo', '3Cr-1Mo')
+
+SIGMA_AMOUNTS = ('Low', 'Medium', 'High')
+
+# Service experience adjustment F_SE (1.0 unless proven service experience)
+DEFAULT_SERVICE_EXPERIENCE_FACTOR = 1.0
+
+
+@lru_cache(maxsize=None)
+def exemption_curves():
+    """
+    Table 2.E.3.3 reference temperatures.
+
+    Returns {'carbon_steels' | 'low_alloy_steels': (yield strengths ksi,
+    Tref deg F with shape (len(yield), 4 curves A-D))}.
+    """
+    table = load_json(FORMULA_APP_DATA / 'table_2_e_3_3.json')
+    result = {}
+    for group, rows in table.items():
+        rows = sorted(rows, key=lambda r: r['min_yield_strength'])
+        result[group] = (
+            np.array([r['min_yield_strength'] for r in rows], dtype=float),
+            np.array([[r[f'curve_{c.lower()}'] for c in EXEMPTION_CURVES] for r in rows], dtype=float),
+        )
+    return result
+
+
+@lru_cache(maxsize=None)
+def damage_factor_grid(pwht):
+    """
+    Table 2.E.3.5 (PWHT) or 2.E.3.4 (as-welded) as (delta T, thickness, DF)
+    with delta T ascending so it can be interpolated directly.
+    """
+    table = load_json(FORMULA_APP_DATA / ('table_2_e_3_5.json' if pwht else 'table_2_e_3_4.json'))
+    rows = sorted(table['rows'], key=lambda r: r['delta_t'])
+    return (
+        np.array([r['delta_t'] for r in rows], dtype=float),
+        np.array(table['thicknesses'], dtype=float),
+        np.array([r['values'] for r in rows], dtype=float),
+    )
+
+
+@lru_cache(maxsize=None)
+def brit885_curve():
+    """885 F embrittlement DF vs (Tmin - Tref), ascending."""
+    rows = sorted(load_json(BRITTLE_DATA / 'brit885_damage_factor.json'), key=lambda r: r['temp_diff_f'])
+    return np.array([r['temp_diff_f'] for r in rows], dtype=float), np.array([r['df'] for r in rows], dtype=float)
+
+
+@lru_cache(maxsize=None)
+def sigma_grid():
+    """Sigma phase DF as (temperatures deg F ascending, DF with shape (T, 3 amounts))."""
+    rows = sorted(load_json(BRITTLE_DATA / 'sigma_damage_factor.json'), key=lambda r: r['temp_f'])
+    return (
+        np.array([r['temp_f'] for r in rows], dtype=float),
+        np.array([[r[f'df_{amount.lower()}'] for amount in SIGMA_AMOUNTS] for r in rows], dtype=float),
+    )
+
+
+def reference_temperature(material_type, curve, yield_strength_ksi):
+    """Tref (deg F) from the exemption curves; NaN without a curve or yield strength."""
+    curves = exemption_curves()
+    material_type = np.asarray(material_type, dtype=object)
+    curve_index = np.array([
+        EXEMPTION_CURVES.index(c) if c in EXEMPTION_CURVES else -1 for c in np.asarray(curve, dtype=object)
+    ], dtype=np.int64)
+
+    tref = np.full(len(material_type), np.nan)
+    carbon = material_type == 'Carbon Steel'
+    for group, rows in (('carbon_steels', carbon), ('low_alloy_steels', ~carbon)):
+        yield_grid, temps = curves[group]
+        for j in range(len(EXEMPTION_CURVES)):
+            mask = rows & (curve_index == j)
+            if mask.any():
+                tref[mask] = np.interp(yield_strength_ksi[mask], yield_grid, temps[:, j])
+    return np.where(np.isnan(yield_strength_ksi), np.nan, tref)
+
+
+def base_damage_factor(delta_t, thickness_in, pwht):
+    """Tables 2.E.3.4 / 2.E.3.5 interpolated in delta T and thickness."""
+    result = np.full(len(delta_t), np.nan)
+    for flag in (False, True):
+        rows = pwht == flag
+        if rows.any():
+            result[rows] = interp2d(delta_t[rows], thickness_in[rows], *damage_factor_grid(flag))
+    return result
+
+
+def brit885_damage_factor(temp_difference_f):
+    """885 F embrittlement DF; zero above the table (more than 100 F margin)."""
+    diffs, dfs = brit885_curve()
+    df = np.round(np.interp(temp_difference_f, diffs, dfs))
+    return np.where(temp_difference_f > diffs[-1], 0.0, df)
+
+
+def sigma_damage_factor(t_min_f, sigma_amount):
+    """Sigma phase embrittlement DF for 'Low' / 'Medium' / 'High' sigma content."""
+    temps, dfs = sigma_grid()
+    column = np.array([
+        SIGMA_AMOUNTS.index(a) if a in SIGMA_AMOUNTS else 0 for a in np.asarray(sigma_amount, dtype=object)
+    ], dtype=np.int64)
+    result = np.full(len(t_min_f), np.nan)
+    for j in range(len(SIGMA_AMOUNTS)):
+        rows = column == j
+        if rows.any():
+            result[rows] = np.interp(t_min_f[rows], temps, dfs[:, j])
+    return np.round(result, 2)
+
+
+def governing_damage_factor(df_brit, df_tempe=0.0, df_885=0.0, df_sigma=0.0):
+    """Equation 2.7: max(Df_brit + Df_tempe, Df_885, Df_sigma). NaN terms count as 0."""
+    brittle = np.nan_to_num(df_brit) + np.nan_to_num(df_tempe)
+    result = np.maximum(brittle, np.maximum(np.nan_to_num(df_885), np.nan_to_num(df_sigma)))
+    return np.where(np.isnan(df_brit) & np.isnan(np.asarray(df_tempe, dtype=float)), np.nan, result)
+
+
+@dataclass
+class BrittleFractureResult:
+    t_min: np.ndarray           # (N,) governing minimum temperature, deg F
+    t_ref: np.ndarray           # (N,) exemption curve reference temperature
+    df_brittle: np.ndarray      # (N,) carbon / low-alloy brittle fracture
+    df_temper: np.ndarray       # (N,) temper embrittlement (NaN if not applicable)
+    damage_factor: np.ndarray   # (N,) governing DF, NaN where inactive
+
+
+COMPONENT_FIELDS = (
+    'mechanism_brittle_fracture_active',
+    'brittle_admin_controls',
+    'brittle_min_operating_temp_f',
+    'brittle_cet_f',
+    'brittle_delta_fatt',
+    'brittle_pwht',
+    'brittle_curve',
+    'brittle_yield_strength_ksi',
+    'brittle_material_type',
+    'smys_yield_psi',
+    'nominal_thickness_in',
+)
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Run the brittle fracture evaluation for every component in `queryset`.
+
+    Tmin is the minimum operating temperature when administrative controls
+    prevent pressurization below it, otherwise the CET (Protocol A / B).
+    The yield strength falls back to the component SMYS.
+    """
+    return evaluate_columns(load_columns(queryset, COMPONENT_FIELDS))
+
+
+def evaluate_columns(cols):
+    """evaluate_components() on columns that are already loaded."""
+    admin = np.asarray(cols['brittle_admin_controls'], dtype=bool)
+    min_op = cols['brittle_min_operating_temp_f']
+    cet = cols['brittle_cet_f']
+    t_min = np.where(admin | np.isnan(cet), min_op, cet)
+
+    yield_ksi = np.where(
+        np.isnan(cols['brittle_yield_strength_ksi']),
+        cols['smys_yield_psi'] / 1000.0,
+        cols['brittle_yield_strength_ksi'],
+    )
+    material = cols['brittle_material_type']
+    t_ref = reference_temperature(material, cols['brittle_curve'], yield_ksi)
+
+    thickness = cols['nominal_thickness_in']
+    pwht = np.asarray(cols['brittle_pwht'], dtype=bool)
+    df_brittle = base_damage_factor(t_min - t_ref, thickness, pwht) * DEFAULT_SERVICE_EXPERIENCE_FACTOR
+
+    # Temper embrittlement: the same tables evaluated at the minimum
+    # pressurization temperature MPT = Tref + delta FATT.
+    delta_fatt = cols['brittle_delta_fatt']
+    tempered = np.isin(np.asarray(material, dtype=object), TEMPER_EMBRITTLEMENT_MATERIALS) & ~np.isnan(delta_fatt)
+    df_temper = np.where(
+        tempered,
+        base_damage_factor(t_min - (t_ref + np.nan_to_num(delta_fatt)), thickness, pwht) * DEFAULT_SERVICE_EXPERIENCE_FACTOR,
+        np.nan,
+    )
+
+    df = governing_damage_factor(df_brittle, df_temper)
+    df = np.where(np.asarray(cols['mechanism_brittle_fracture_active'], dtype=bool), df, np.nan)
+    return cols['pk'], BrittleFractureResult(
+        t_min=t_min, t_ref=t_ref, df_brittle=df_brittle, df_temper=df_temper, damage_factor=df,
+    )
@@ -0,0 +1,141 @@
+"""
+Shared helpers for the vectorized calculation engines.
+
+Component rows are pulled with values_list() and turned into one NumPy
+array per field, so the engines never touch model instances.
+"""
+import datetime
+import hashlib
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+DAYS_PER_YEAR = 365.25
+
+
+def load_columns(queryset, fields):
+    """
+    Fetch `fields` (plus the primary key) for every row in `queryset`,
+    ordered by primary key so separate loads line up row for row.
+
+    Returns a dict of field name -> 1-D array. Numeric and Decimal columns
+    become float arrays with NaN for NULL, booleans become bool arrays and
+    everything else (text, dates) stays as an object array. Fields kept in
+    a Component section table are joined in but keyed by their plain name.
+    """
+    field_lookup = getattr(queryset.model, 'field_lookup', str)
+    rows = list(queryset.order_by('pk').values_list('pk', *(field_lookup(field) for field in fields)))
+    columns = {'pk': np.array([row[0] for row in rows], dtype=np.int64)}
+    for index, field in enumerate(fields, start=1):
+        columns[field] = _to_array([row[index] for row in rows])
+    return columns
+
+
+def _to_array(values):
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, bool):
+        return np.array([bool(v) for v in values], dtype=bool)
+    if isinstance(sample, (int, float, Decimal)):
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+    if sample is None:
+        return np.full(len(values), np.nan)
+    return np.array(values, dtype=object)
+
+
+def age_years(dates, today=None, default=np.nan):
+    """Years elapsed since each date (object array of date/None)."""
+    today = today or datetime.date.today()
+    ages = np.full(len(dates), default, dtype=float)
+    for i, value in enumerate(dates):
+        if isinstance(value, datetime.date):
+            ages[i] = (today - value).days / DAYS_PER_YEAR
+    return ages
+
+
+def to_decimal(value, places=2, max_digits=10):
+    """
+    Round a float for a DecimalField, or None for NaN/inf.
+
+    Values that would overflow the column are clamped to its largest value.
+    """
+    if value is None or not np.isfinite(value):
+        return None
+    limit = Decimal(10) ** (max_digits - places) - Decimal(1).scaleb(-places)
+    quantum = Decimal(1).scaleb(-places)
+    result = Decimal(repr(float(value))).quantize(quantum, rounding=ROUND_HALF_UP)
+    return max(-limit, min(limit, result))
+
+
+def index_of(values, names):
+    """Position of each value in `names`, -1 where it is not listed."""
+    lookup = {name: i for i, name in enumerate(names)}
+    return np.array([lookup.get(v, -1) for v in np.asarray(values, dtype=object)], dtype=np.int64)
+
+
+def nan_max(*arrays):
+    """Element-wise max that ignores NaN (all-NaN positions stay NaN)."""
+    stacked = np.vstack([np.asarray(a, dtype=float) for a in arrays])
+    result = np.full(stacked.shape[1], np.nan)
+    valid = ~np.isnan(stacked).all(axis=0)
+    result[valid] = np.nanmax(stacked[:, valid], axis=0)
+    return result
+
+
+def interp2d(x, y, x_grid, y_grid, values):
+    """
+    Bilinear interpolation on a rectangular table, clamped at the edges.
+
+    x_grid (R,) and y_grid (C,) must be ascending with at least two points;
+    values has shape (R, C).
+    x and y are (N,) query arrays; NaN queries give NaN.
+    """
+    x_grid = np.asarray(x_grid, dtype=float)
+    y_grid = np.asarray(y_grid, dtype=float)
+    values = np.asarray(values, dtype=float)
+
+    def bracket(grid, q):
+        q = np.clip(q, grid[0], grid[-1])
+        hi = np.clip(np.searchsorted(grid, q, side='left'), 1, len(grid) - 1)
+        lo = hi - 1
+        span = grid[hi] - grid[lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(span > 0, (q - grid[lo]) / span, 0.0)
+        return lo, hi, weight
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    missing = np.isnan(x) | np.isnan(y)
+    x0, x1, wx = bracket(x_grid, np.nan_to_num(x))
+    y0, y1, wy = bracket(y_grid, np.nan_to_num(y))
+    top = values[x0, y0] * (1 - wy) + values[x0, y1] * wy
+    bottom = values[x1, y0] * (1 - wy) + values[x1, y1] * wy
+    return np.where(missing, np.nan, top * (1 - wx) + bottom * wx)
+
+
+def row_digests(columns, salt=''):
+    """
+    Hex digest of each row across `columns` (dict of field -> 1-D or 2-D
+    array, as returned by load_columns()), so a change to any input of a
+    component changes its digest. The primary key column is skipped and
+    `salt` (e.g. a table version) is mixed into every digest.
+
+    Values are hashed in a canonical form (numbers as floats, NULL and NaN
+    as None), so a column does not hash differently when load_columns()
+    infers another dtype for it, e.g. once its first non-NULL value arrives.
+    """
+    n = len(columns['pk'])
+    values = []
+    for field in sorted(field for field in columns if field != 'pk'):
+        column = np.asarray(columns[field])
+        if column.dtype == object:
+            values.append(column.tolist())
+        elif column.ndim == 1:
+            values.append([None if v != v else v for v in column.astype(float).tolist()])
+        else:
+            values.append([tuple(None if v != v else v for v in row) for row in column.astype(float).tolist()])
+    digests = np.empty(n, dtype=object)
+    for i, row in enumerate(zip(*values) if values else [()] * n):
+        digest = hashlib.blake2b(repr(row).encode(), digest_size=16)
+        digest.update(salt.encode())
+        digests[i] = digest.hexdigest()
+    return digests
@@ -0,0 +1,540 @@
+"""
+Consequence of Failure, Level 1 (API 581 Part 3, Section 4)
+
+Vectorized port of static/formula_app/js/cof_level_1.js and
+cof_level_1_4_8.js. Release rates, inventory limits, detection/isolation
+adjustments and the flammable, non-flammable and toxic consequence areas
+are evaluated for every component and all four release hole sizes as
+(N, 4) arrays. The coefficients come straight from the formula_app data
+modules (Tables 3.1, 4.1.x, 4.6/4.7 and 4.8-4.10, 4.13/4.14).
+
+Areas are in ft2, the same units the browser persists.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from . import risk_matrix
+from .common import index_of, load_columns
+from .tables import cof_table
+
+# Step 4.2 - release hole sizes, in the ComponentGFFs key order
+HOLE_NAMES = ('small', 'medium', 'large', 'rupture')
+HOLE_DIAMETERS_IN = np.array([0.25, 1.0, 4.0, 16.0])
+MAX_RELEASE_DIAMETER_IN = 8.0       # W_max8 (Step 4.4)
+INVENTORY_ADD_SECONDS = 180.0       # mass_add = 3 minutes of release
+
+GC = 32.174                         # lbm-ft / lbf-s2
+GAS_CONSTANT = 1545.3               # ft-lbf / lb-mol-R
+RANKINE_OFFSET = 459.67
+DEFAULT_TEMPERATURE_F = 70.0
+DEFAULT_ATM_PRESSURE_PSIA = 14.7
+DEFAULT_DISCHARGE_COEFFICIENT = 0.61
+GAS_DISCHARGE_COEFFICIENT = 1.0     # same default as the vapor release card
+DEFAULT_HEAT_CAPACITY_RATIO = 1.4
+
+# Table 4.3 - a stored liquid flashes to gas when its NBP is at or below this
+FLASH_NBP_F = 80.0
+
+# Eq. 3.18 / Step 4.5 - instantaneous release threshold C5 (lb/s)
+INSTANTANEOUS_RATE = 55.6
+CONTINUOUS_MAX_HOLE_IN = 0.25
+
+# Eq. 3.23 - 3.25 AIT blending band C6 (deg R)
+AIT_BLEND_RANGE_R = 100.0
+
+# Step 4.9 - toxic releases are capped at one hour
+TOXIC_MAX_DURATION_S = 3600.0
+TOXIC_MIN_DURATION_MIN = 5.0
+TOXIC_MAX_DURATION_MIN = 60.0
+MISC_INSTANTANEOUS_DURATION_MIN = 3.0
+
+# Ignition probabilities used to weight toxic outcomes (Step 4.9.11),
+# upper rate bounds (lb/s) and the probability below each one.
+IGNITION_RATE_BOUNDS = np.array([1.0, 10.0, 100.0])
+IGNITION_PROBABILITY_GAS = np.array([0.01, 0.07, 0.30, 0.80])
+IGNITION_PROBABILITY_LIQUID = np.array([0.01, 0.03, 0.07, 0.15])
+
+# Eq. 3.89 - liquid spills from fluids boiling below this evaporate fully
+EVAPORATION_MIN_NBP_F = 200.0
+SPILL_BBL_PER_FT3 = 0.178
+DEFAULT_LIQUID_DENSITY = 62.4       # lb/ft3, used when Table 4.1.2 has none
+
+# Flammable model columns of Tables 4.8 / 4.9
+FLAMMABLE_MODELS = ('AINL_CONT', 'AIL_CONT', 'AINL_INST', 'AIL_INST')
+PHASES = ('Gas', 'Liquid')
+
+# Toxic model families (Steps 4.9.6 - 4.9.8)
+LOG_TOXIC_FLUIDS = ('HF', 'H2S')
+POWER_TOXIC_FLUIDS = ('Ammonia', 'Chlorine')
+
+DETECTION_CLASSES = ('A', 'B', 'C')
+ISOLATION_CLASSES = ('A', 'B', 'C')
+
+
+@lru_cache(maxsize=None)
+def fluid_properties():
+    """
+    Table 4.1.2 as arrays indexed like the returned fluid names.
+
+    AIT is converted to deg R; 'Note 4' (pyrophoric) becomes -inf so the
+    release is always treated as auto-ignition likely.
+    """
+    table = cof_table('table4_1_2', 'FluidProperties')
+    names = tuple(table)
+
+    def column(key):
+        return np.array([
+            np.nan if table[n].get(key) is None else float(table[n][key]) for n in names
+        ], dtype=float)
+
+    ait = np.array([
+        -np.inf if isinstance(table[n]['ait'], str)
+        else np.nan if table[n]['ait'] is None
+        else table[n]['ait'] + RANKINE_OFFSET
+        for n in names
+    ], dtype=float)
+    props = {key: column(key) for key in ('mw', 'liquid_density', 'nbp', 'cp_eq', 'a', 'b', 'c', 'd', 'e')}
+    props['ait_r'] = ait
+    props['ambient_gas'] = np.array([table[n]['ambient_state'] == 'Gas' for n in names], dtype=bool)
+    return names, props
+
+
+@lru_cache(maxsize=None)
+def flammable_coefficients():
+    """
+    Tables 4.8 (component damage) and 4.9 (personnel injury).
+
+    Returns (fluid type per fluid_properties() row, -1 when non-flammable,
+    coefficients with shape (fluids, 2 areas cmd/inj, 4 models, 2 phases,
+    2 a/b)). Missing models are NaN.
+    """
+    names, _ = fluid_properties()
+    tables = (
+        cof_table('table4_8_9_10', 'ComponentDamageConstants'),
+        cof_table('table4_8_9_10', 'PersonnelInjuryConstants'),
+    )
+    fluid_type = np.full(len(names), -1, dtype=np.int64)
+    coefficients = np.full((len(names), 2, len(FLAMMABLE_MODELS), len(PHASES), 2), np.nan)
+    for f, name in enumerate(names):
+        if name not in tables[0]:
+            continue
+        fluid_type[f] = tables[0][name]['type']
+        for area, table in enumerate(tables):
+            for m, model in enumerate(FLAMMABLE_MODELS):
+                for p, phase in enumerate(PHASES):
+                    coeffs = (table[name].get(model) or {}).get(phase)
+                    if coeffs:
+                        coefficients[f, area, m, p] = (coeffs['a'], coeffs['b'])
+    return fluid_type, coefficients
+
+
+@lru_cache(maxsize=None)
+def detection_isolation_tables():
+    """
+    Table 4.6 reduction factors with shape (3 detection, 3 isolation) and
+    Table 4.7 maximum leak durations (minutes) with shape (3, 3, 4 holes).
+    Combinations without a rule get no reduction and a 60 minute duration.
+    """
+    factors = cof_table('table4_6_7', 'ResolutionFactors')
+    rules = cof_table('table4_6_7', 'LeakDurationRules')
+    reduction = np.zeros((len(DETECTION_CLASSES), len(ISOLATION_CLASSES)))
+    durations = np.full((len(DETECTION_CLASSES), len(ISOLATION_CLASSES), len(HOLE_NAMES)), 60.0)
+    for i, det in enumerate(DETECTION_CLASSES):
+        for j, iso in enumerate(ISOLATION_CLASSES):
+            reduction[i, j] = factors.get(det, {}).get(iso, 0.0)
+            rule = next((r for r in rules if det in r['det'] and iso in r['iso']), None)
+            if rule:
+                durations[i, j] = [rule['durations'][f'd{n}'] for n in range(1, 5)]
+    return reduction, durations
+
+
+@lru_cache(maxsize=None)
+def generic_failure_frequencies():
+    """Table 3.1 GFFs as {component type: (4,) array per hole size}."""
+    result = {}
+    for row in cof_table('gff_table_3_1', 'ComponentGFFs'):
+        result.setdefault(row['componentType'], np.array([row['gff'][h] for h in HOLE_NAMES], dtype=float))
+    return result
+
+
+@lru_cache(maxsize=None)
+def mitigation_factors():
+    """Table 4.10 area reduction factor by mitigation system key."""
+    return {key: row['factor'] for key, row in cof_table('table4_8_9_10', 'MitigationSystems').items()}
+
+
+def _take(column, index):
+    """column[index] with NaN where index is -1."""
+    return np.where(index >= 0, column[np.maximum(index, 0)], np.nan)
+
+
+def _fill(values, default):
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), default, values)
+
+
+def heat_capacity_ratio(fluid, temp_f):
+    """
+    k = Cp / (Cp - R) from the Table 4.1.2 ideal gas heat capacity
+    correlations. Fluids without a usable Cp fall back to 1.4.
+    """
+    _, props = fluid_properties()
+    t = (temp_f - 32.0) * 5.0 / 9.0 + 273.15
+    a, b, c, d, e = (_take(props[key], fluid) for key in ('a', 'b', 'c', 'd', 'e'))
+    equation = _take(props['cp_eq'], fluid)
+    with np.errstate(all='ignore'):
+        cp = np.select(
+            [equation == 1, equation == 2, equation == 3],
+            [
+                a + b * t + c * t ** 2 + d * t ** 3,
+                a + b * ((c / t) / np.sinh(c / t)) ** 2 + d * ((e / t) / np.cosh(e / t)) ** 2,
+                a + b * t + c * t ** 2 + d * t ** 3 + e * t ** 4,
+            ],
+            np.nan,
+        )
+        k = cp / (cp - np.where(equation == 1, 8.314, 8314.0))
+    return np.where(np.isfinite(k) & (k > 1.0), k, DEFAULT_HEAT_CAPACITY_RATIO)
+
+
+def liquid_release_rate(diameter_in, ps, patm, cd, kvn, density):
+    """Eq. 3.3 - liquid release rate (lb/s); diameter (N, H), the rest (N,)."""
+    area_ft2 = np.pi * diameter_in ** 2 / 4.0 / 144.0
+    delta_p = np.maximum(ps - patm, 0.0) * 144.0
+    return (cd * kvn * np.sqrt(2.0 * density * GC * delta_p))[:, None] * area_ft2
+
+
+def gas_release_rate(diameter_in, ps, patm, c2, mw, ts_r, k):
+    """Eqs. 3.5 - 3.7 - sonic or subsonic gas release rate (lb/s)."""
+    area_in2 = np.pi * diameter_in ** 2 / 4.0
+    with np.errstate(all='ignore'):
+        transition = patm * ((k + 1.0) / 2.0) ** (k / (k - 1.0))
+        sonic = np.sqrt(k * mw * GC / (GAS_CONSTANT * ts_r) * (2.0 / (k + 1.0)) ** ((k + 1.0) / (k - 1.0)))
+        ratio = patm / ps
+        subsonic = np.sqrt(
+            mw * GC / (GAS_CONSTANT * ts_r) * (2.0 * k / (k - 1.0))
+            * ratio ** (2.0 / k) * (1.0 - ratio ** ((k - 1.0) / k))
+        )
+    flow = np.where(ps > transition, sonic, np.where(ratio < 1.0, subsonic, 0.0))
+    return (GAS_DISCHARGE_COEFFICIENT / c2 * ps * flow)[:, None] * area_in2
+
+
+def _power(coefficients, x):
+    """a * x^b with NaN coefficients or a non-positive x giving 0."""
+    a, b = coefficients[..., 0], coefficients[..., 1]
+    with np.errstate(all='ignore'):
+        area = a * np.where(x > 0, x, 1.0) ** b
+    return np.where(np.isnan(a) | (x <= 0), 0.0, area)
+
+
+def flammable_areas(fluid, gas, rate, mass, ts_r, mitigation, instantaneous):
+    """
+    Step 4.8 - flammable component damage and personnel injury areas.
+
+    rate, mass and instantaneous are (N, H); the rest are (N,). Returns
+    (cmd, inj), each (N, H), zero for non-flammable fluids.
+    """
+    fluid_type, coefficients = flammable_coefficients()
+    _, props = fluid_properties()
+    kind = np.where(fluid >= 0, fluid_type[np.maximum(fluid, 0)], -1)
+    phase = np.where(gas, 0, 1)
+    # (N, 2 areas, 4 models, 2 a/b) for each component's fluid and phase
+    coeffs = coefficients[np.maximum(fluid, 0), :, :, phase]
+
+    with np.errstate(all='ignore'):
+        energy = np.where(mass > 10000.0, np.maximum(4.0 * np.log10(mass) - 15.0, 1.0), 1.0)
+    keep = (1.0 - mitigation)[:, None]
+
+    def model(area, m, x, inst):
+        result = _power(coeffs[:, None, area, m], x) * keep
+        return result / energy if inst else result
+
+    factor_ic = np.minimum(rate / INSTANTANEOUS_RATE, 1.0)
+    ait = _take(props['ait_r'], fluid)[:, None]
+    ts = ts_r[:, None]
+    factor_ait = np.where(
+        np.isnan(ait), 0.0,
+        np.clip((ts - ait + AIT_BLEND_RANGE_R) / (2.0 * AIT_BLEND_RANGE_R), 0.0, 1.0),
+    )
+
+    results = []
+    for area in (0, 1):
+        ainl_cont, ail_cont = model(area, 0, rate, False), model(area, 1, rate, False)
+        ainl_inst, ail_inst = model(area, 2, mass, True), model(area, 3, mass, True)
+        # Type 0 blends continuous / instantaneous (Eqs. 3.52 - 3.55);
+        # Type 1 takes whichever release type governs.
+        type0 = kind[:, None] == 0
+        ail = np.where(type0, ail_inst * factor_ic + ail_cont * (1.0 - factor_ic),
+                       np.where(instantaneous, ail_inst, ail_cont))
+        ainl = np.where(type0, ainl_inst * factor_ic + ainl_cont * (1.0 - factor_ic),
+                        np.where(instantaneous, ainl_inst, ainl_cont))
+        blended = ail * factor_ait + ainl * (1.0 - factor_ait)
+        results.append(np.where(kind[:, None] >= 0, blended, 0.0))
+    return results[0], results[1]
+
+
+def non_flammable_injury_area(fluid_names, rate, mass, ps):
+    """Step 4.10 - steam and acid/caustic personnel injury areas, (N, H)."""
+    steam = cof_table('table4_8_9_10', 'SteamConstants')
+    acid = cof_table('table4_8_9_10', 'AcidConstants')
+    is_steam = (fluid_names == 'Steam')[:, None]
+    is_acid = (fluid_names == 'Acid')[:, None]
+
+    factor_ic = np.minimum(rate / steam['C5'], 1.0)
+    with np.errstate(all='ignore'):
+        steam_area = (steam['C10'] * np.maximum(mass, 0.0) ** 0.6384) * factor_ic + steam['C9'] * rate * (1.0 - factor_ic)
+
+    level = np.where(ps > 45.0, 'HP', np.where(ps > 22.5, 'MP', 'LP'))
+    a = np.array([acid[v]['a'] for v in level])[:, None]
+    b = np.array([acid[v]['b'] for v in level])[:, None]
+    acid_area = 0.2 * _power(np.stack(np.broadcast_arrays(a, b), axis=-1), rate)
+    return np.where(is_steam, steam_area, np.where(is_acid, acid_area, 0.0))
+
+
+def _toxic_rows(constants, gas):
+    """Continuous toxic rows for one fluid/phase as (minutes, coef 1, coef 2)."""
+    rows = constants['continuous']
+    if isinstance(rows, dict):          # single-row tables (AlCl3)
+        rows = [dict(rows, min=TOXIC_MAX_DURATION_MIN)]
+    points = []
+    for row in rows:
+        point = row.get('gas' if gas else 'liquid') or row.get('gas') or row.get('liquid') or row
+        keys = ('c', 'd') if 'c' in point else ('e', 'f')
+        points.append((row['min'], point[keys[0]], point[keys[1]]))
+    points.sort()
+    return tuple(np.array(col, dtype=float) for col in zip(*points))
+
+
+def toxic_areas(fluid_names, gas, rate, mass, duration_s, diameter, toxic_fraction):
+    """
+    Step 4.9 - toxic consequence area (N, H) for release rate, mass and
+    duration arrays of shape (N, H). Coefficients between tabulated
+    durations are linearly interpolated and clamped to the table range.
+    """
+    constants = cof_table('table4_8_9_10', 'ToxicGasConstants')
+    result = np.zeros_like(rate)
+    instantaneous = (diameter > CONTINUOUS_MAX_HOLE_IN) & (rate > INSTANTANEOUS_RATE)
+    rate_tox = toxic_fraction[:, None] * rate
+    mass_tox = toxic_fraction[:, None] * mass
+    minutes = duration_s / 60.0
+
+    for name in np.unique(fluid_names[np.isin(fluid_names, list(constants))]):
+        consts = constants[name]
+        for phase_gas in (True, False):
+            rows = (fluid_names == name) & (gas == phase_gas)
+            if not rows.any():
+                continue
+            times, c1, c2 = _toxic_rows(consts, phase_gas)
+            inst, r, m, t = instantaneous[rows], rate_tox[rows], mass_tox[rows], minutes[rows]
+            with np.errstate(all='ignore'):
+                if name in LOG_TOXIC_FLUIDS or name in POWER_TOXIC_FLUIDS:
+                    t = np.clip(t, TOXIC_MIN_DURATION_MIN, TOXIC_MAX_DURATION_MIN)
+                    p1, p2 = np.interp(t, times, c1), np.interp(t, times, c2)
+                    i1, i2 = consts['instantaneous'].values()
+                    if name in LOG_TOXIC_FLUIDS:
+                        cont = 10.0 ** (p1 * np.log10(r) + p2)
+                        flash = 10.0 ** (i1 * np.log10(m) + i2)
+                    else:
+                        cont = p1 * r ** p2
+                        flash = i1 * m ** i2
+                    area = np.where(inst, np.where(m > 0, flash, 0.0), np.where(r > 0, cont, 0.0))
+                else:
+                    # Table 4.13 chemicals: continuous model only, an
+                    # instantaneous release is spread over three minutes.
+                    t = np.where(inst, MISC_INSTANTANEOUS_DURATION_MIN, np.minimum(t, TOXIC_MAX_DURATION_MIN))
+                    misc_rate = np.where(inst & (m > 0), m / (MISC_INSTANTANEOUS_DURATION_MIN * 60.0), r)
+                    t = np.clip(t, times[0], times[-1])
+                    area = np.where(misc_rate > 0, np.interp(t, times, c1) * misc_rate ** np.interp(t, times, c2), 0.0)
+            result[rows] = np.nan_to_num(area)
+    return result
+
+
+def ignition_probability(rate, gas):
+    """Probability of ignition by release rate and phase, (N, H)."""
+    band = np.searchsorted(IGNITION_RATE_BOUNDS, rate, side='right')
+    return np.where(gas[:, None], IGNITION_PROBABILITY_GAS[band], IGNITION_PROBABILITY_LIQUID[band])
+
+
+def evaporated_fraction(nbp_f):
+    """Eq. 3.89 fraction of a liquid spill that evaporates (1.0 below 200 F NBP)."""
+    nbp_f = np.nan_to_num(np.asarray(nbp_f, dtype=float))
+    with np.errstate(all='ignore'):
+        fraction = (-7.1408 + 8.5827e-3 * nbp_f - 3.5594e-6 * nbp_f ** 2
+                    + 2331.1 / nbp_f - 203545.0 / nbp_f ** 2)
+    return np.where(nbp_f >= EVAPORATION_MIN_NBP_F, np.clip(fraction, 0.0, 1.0), 1.0)
+
+
+@dataclass
+class ConsequenceResult:
+    gas: np.ndarray             # (N,) released phase is gas
+    release_rate: np.ndarray    # (N, 4) theoretical release rate W_n, lb/s
+    rate: np.ndarray            # (N, 4) rate after detection/isolation, lb/s
+    mass: np.ndarray            # (N, 4) release mass, lb
+    ca_cmd: np.ndarray          # (N,) GFF-weighted component damage area, ft2
+    ca_inj: np.ndarray          # (N,) personnel injury area (flammable, non-flammable or toxic)
+    ca_toxic: np.ndarray        # (N,) toxic area weighted by (1 - ignition probability)
+    consequence_area: np.ndarray  # (N,) final consequence area, NaN if inputs are missing
+    gffs: np.ndarray            # (N, 4) generic failure frequencies per hole size
+    spill_volume: np.ndarray    # (N,) GFF-weighted environmental spill volume, bbl
+
+    @property
+    def category(self):
+        return risk_matrix.consequence_area_category(self.consequence_area)
+
+
+COMPONENT_FIELDS = (
+    'representative_fluid',
+    'rbix_fluid',
+    'stored_phase',
+    'operational_fluid_phase',
+    'fluid_temperature',
+    'operating_temp_f',
+    'component_diameter',
+    'storage_pressure',
+    'operating_pressure_psia',
+    'atm_pressure',
+    'discharge_coeff',
+    'viscosity_correction',
+    'conversion_factor_c2',
+    'inventory_group_mass',
+    'component_mass',
+    'detection_class',
+    'isolation_class',
+    'mitigation_system',
+    'toxic_mass_fraction',
+    'rbix_component_type',
+)
+
+
+def _text(values, fallback=None):
+    """Non-empty strings from a text column, else the fallback column's value."""
+    fallback = [None] * len(values) if fallback is None else list(_text(fallback))
+    return np.array([
+        v if isinstance(v, str) and v else other for v, other in zip(values, fallback)
+    ], dtype=object)
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Run COF Level 1 for every component in `queryset`.
+
+    Returns (pks, ConsequenceResult). The representative fluid, phase,
+    temperature and pressure fall back to the Operating & Process fields
+    when the COF tab was not filled in. Components without a known fluid,
+    diameter, pressure or GFF component type get a NaN area.
+    """
+    cols = load_columns(queryset, COMPONENT_FIELDS)
+    pks = cols['pk']
+    n = len(pks)
+
+    names, props = fluid_properties()
+    fluid_names = _text(cols['representative_fluid'], cols['rbix_fluid'])
+    fluid = index_of(fluid_names, names)
+
+    # Table 4.3 - released phase
+    stored_gas = np.isin(_text(cols['stored_phase'], cols['operational_fluid_phase']), ('Vapor', 'Gas'))
+    flashes = _take(props['ambient_gas'].astype(float), fluid).astype(bool) & (_take(props['nbp'], fluid) <= FLASH_NBP_F)
+    gas = stored_gas | flashes
+
+    temp_f = _fill(np.where(np.isnan(cols['fluid_temperature']), cols['operating_temp_f'], cols['fluid_temperature']),
+                   DEFAULT_TEMPERATURE_F)
+    ts_r = temp_f + RANKINE_OFFSET
+    ps = np.where(np.isnan(cols['storage_pressure']), cols['operating_pressure_psia'], cols['storage_pressure'])
+    patm = _fill(cols['atm_pressure'], DEFAULT_ATM_PRESSURE_PSIA)
+
+    diameter = cols['component_diameter']
+    diameter = np.where(diameter > 0, diameter, np.nan)
+    holes = np.minimum(diameter[:, None], HOLE_DIAMETERS_IN)
+    max8 = np.minimum(diameter, MAX_RELEASE_DIAMETER_IN)[:, None]
+
+    # Step 4.3 - theoretical release rates, plus W_max8 for Step 4.4
+    density = _take(props['liquid_density'], fluid)
+    k = heat_capacity_ratio(fluid, temp_f)
+    mw = _take(props['mw'], fluid)
+    c2 = _fill(cols['conversion_factor_c2'], 1.0)
+    cd = _fill(cols['discharge_coeff'], DEFAULT_DISCHARGE_COEFFICIENT)
+    kvn = _fill(cols['viscosity_correction'], 1.0)
+    sizes = np.hstack([holes, max8]) if n else np.empty((0, len(HOLE_NAMES) + 1))
+    rates = np.where(
+        gas[:, None],
+        gas_release_rate(sizes, ps, patm, c2, mw, ts_r, k),
+        liquid_release_rate(sizes, ps, patm, cd, kvn, density),
+    )
+    release_rate, w_max8 = rates[:, :len(HOLE_NAMES)], rates[:, len(HOLE_NAMES):]
+
+    # Step 4.4 - available mass (an empty inventory group means unlimited)
+    component_mass = _fill(cols['component_mass'], 0.0)[:, None]
+    mass_add = INVENTORY_ADD_SECONDS * np.minimum(release_rate, w_max8)
+    inventory = _fill(cols['inventory_group_mass'], np.inf)[:, None]
+    mass_available = np.minimum(component_mass + mass_add, inventory)
+
+    # Steps 4.6 / 4.7 - detection and isolation
+    reduction, durations = detection_isolation_tables()
+    det = index_of(cols['detection_class'], DETECTION_CLASSES)
+    iso = index_of(cols['isolation_class'], ISOLATION_CLASSES)
+    classified = (det >= 0) & (iso >= 0)
+    fact_di = np.where(classified, reduction[np.maximum(det, 0), np.maximum(iso, 0)], 0.0)
+    hole_band = np.searchsorted([0.25, 1.0, 4.0], np.nan_to_num(holes), side='left')
+    leak_max_s = 60.0 * np.where(
+        classified[:, None],
+        durations[np.maximum(det, 0)[:, None], np.maximum(iso, 0)[:, None], hole_band],
+        0.0,
+    )
+
+    rate = release_rate * (1.0 - fact_di)[:, None]
+    with np.errstate(all='ignore'):
+        duration = np.where(rate > 0, np.minimum(mass_available / rate, leak_max_s), leak_max_s)
+    mass = np.minimum(rate * duration, mass_available)
+    instantaneous = (holes > CONTINUOUS_MAX_HOLE_IN) & (rate > INSTANTANEOUS_RATE)
+
+    # Step 4.8 - flammable, Step 4.10 - non-flammable
+    mitigation = np.array([mitigation_factors().get(m, 0.0) for m in cols['mitigation_system']], dtype=float)
+    cmd, inj = flammable_areas(fluid, gas, rate, mass, ts_r, mitigation, instantaneous)
+    inj = inj + non_flammable_injury_area(fluid_names, rate, mass, np.nan_to_num(ps))
+
+    # Step 4.9 - toxic, using the mitigated (not detection-adjusted) rate
+    toxic_rate = release_rate * (1.0 - mitigation)[:, None]
+    toxic_available = np.minimum(component_mass + INVENTORY_ADD_SECONDS * np.minimum(toxic_rate, w_max8), inventory)
+    with np.errstate(all='ignore'):
+        toxic_duration = np.minimum.reduce([
+            np.full_like(toxic_rate, TOXIC_MAX_DURATION_S),
+            np.where(toxic_rate > 0, toxic_available / toxic_rate, TOXIC_MAX_DURATION_S),
+            np.where(classified[:, None], leak_max_s, TOXIC_MAX_DURATION_S),
+        ]) if n else np.empty_like(toxic_rate)
+    toxic_mass = np.minimum(toxic_rate * toxic_duration, toxic_available)
+    toxic = toxic_areas(
+        fluid_names, gas, toxic_rate, toxic_mass, toxic_duration, holes, _fill(cols['toxic_mass_fraction'], 1.0),
+    ) * (1.0 - ignition_probability(toxic_rate, gas))
+
+    # Step 4.11 - GFF-weighted final areas
+    gff_table = generic_failure_frequencies()
+    gffs = np.array([
+        gff_table.get(t, np.full(len(HOLE_NAMES), np.nan)) for t in cols['rbix_component_type']
+    ], dtype=float).reshape(n, len(HOLE_NAMES))
+    gff_total = gffs.sum(axis=1)
+    with np.errstate(all='ignore'):
+        def weighted(area):
+            return np.where(gff_total > 0, (np.nan_to_num(area) * gffs).sum(axis=1) / gff_total, np.nan)
+
+        ca_cmd, ca_inj_release, ca_toxic = weighted(cmd), weighted(inj), weighted(toxic)
+        # Step 4.12 input - liquid left on the ground after evaporation
+        spill_density = np.where(density > 0, density, DEFAULT_LIQUID_DENSITY)
+        spill = SPILL_BBL_PER_FT3 * mass * (1.0 - evaporated_fraction(_take(props['nbp'], fluid)))[:, None]
+        spill_volume = weighted(np.where(gas[:, None], 0.0, spill / spill_density[:, None]))
+    ca_inj = np.fmax(ca_inj_release, ca_toxic)
+    area = np.fmax(ca_cmd, ca_inj)
+
+    known = (fluid >= 0) & ~np.isnan(diameter) & ~np.isnan(ps) & (gff_total > 0)
+    return pks, ConsequenceResult(
+        gas=gas,
+        release_rate=release_rate,
+        rate=rate,
+        mass=mass,
+        ca_cmd=np.where(known, ca_cmd, np.nan),
+        ca_inj=np.where(known, ca_inj, np.nan),
+        ca_toxic=np.where(known, ca_toxic, np.nan),
+        consequence_area=np.where(known, area, np.nan),
+        gffs=gffs,
+        spill_volume=np.where(known, spill_volume, np.nan),
+    )
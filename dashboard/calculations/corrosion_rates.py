@@ -0,0 +1,457 @@
+"""
+Thinning Corrosion Rates (API 581 Part 2, Annex 2.B)
+
+Server-side counterpart of the step-2 calculators in
+static/formula_app/components/modules-step2/. Every table under
+static/formula_app/data/json/*_corrosion/ is compiled once into a regular
+grid (one ascending axis per table level) and interpolated for whole
+arrays of components at once, instead of the browser fetching and walking
+the JSON on every click.
+
+Band labels in the tables become grid points: '<=20' / '<0.1' sit at
+their bound, '>20' / '>=5' just above it (so interpolation steps between
+the two bands) and '70_to_100' at its upper bound. Non-numeric keys
+('Naphtha', 'Yes') become categorical axes addressed by index.
+
+Amine (Tables 2.B.8.2 - 2.B.8.5), alkaline sour water (Table 2.B.7.2) and
+soil side rates are compiled too but not filled on components: they need
+the heat stable amine salts, NH4HS concentration and soil type, which the
+Component model does not capture.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .common import index_of, load_columns
+from .tables import FORMULA_APP_JSON, load_json
+
+# Tables outside the *_corrosion folders used by the rate services
+EXTRA_TABLES = ('table_2-B-2-3.JSON',)
+
+# US customary block of tables published in both unit systems
+CUSTOMARY_KEYS = ('temperature_in_f', 'temperature in f°')
+
+_BAND = re.compile(r'^(<=|>=|<|>)?\s*(-?\d+(?:\.\d+)?)$')
+_RANGE = re.compile(r'^(-?\d+(?:\.\d+)?)_to_(-?\d+(?:\.\d+)?)$')
+
+MM_PER_YEAR_TO_MPY = 39.4
+PSIA_TO_BAR = 0.0689476
+
+
+def _axis_point(key):
+    """Grid coordinate for a table key, or None for a categorical label."""
+    key = key.strip().replace('≤', '<=').replace('≥', '>=')
+    match = _RANGE.match(key)
+    if match:
+        return float(match.group(2))
+    match = _BAND.match(key)
+    if not match:
+        return None
+    value = float(match.group(2))
+    return float(np.nextafter(value, np.inf)) if match.group(1) in ('>', '>=') else value
+
+
+def _normalise(node):
+    """
+    Rewrite the list-shaped layouts into nested dicts:
+    {'temperatures': [...], 'data': {..: [rates]}} keys each rate list by
+    temperature, and a list of two-field rows ({'temperature': 42,
+    'acid_velocity': {...}}) is keyed by its first field.
+    """
+    if isinstance(node, dict) and set(node) == {'temperatures', 'data'}:
+        temps = [str(t) for t in node['temperatures']]
+
+        def by_temperature(value):
+            if isinstance(value, list):
+                return dict(zip(temps, value))
+            return {k: by_temperature(v) for k, v in value.items()}
+
+        node = by_temperature(node['data'])
+    if isinstance(node, list) and node and all(
+        isinstance(r, dict) and len(r) == 2 and isinstance(next(iter(r.values())), (int, float, str)) for r in node
+    ):
+        node = {str(key): value for key, value in (tuple(r.values()) for r in node)}
+    if isinstance(node, dict):
+        return {k: _normalise(v) for k, v in node.items()}
+    return node
+
+
+def _flatten(node, path=()):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _flatten(value, path + (key,))
+    elif node is None or isinstance(node, (int, float)):
+        yield path, node
+    else:
+        raise ValueError(f"Not a numeric table leaf: {node!r}")
+
+
+@dataclass(frozen=True)
+class Grid:
+    axes: tuple         # ascending float points per dimension
+    labels: tuple       # category labels per dimension, None for numeric axes
+    values: np.ndarray  # NaN where the table has no entry
+
+    def index(self, dim, values):
+        """Positions of category labels on a categorical axis (NaN if unknown)."""
+        position = index_of(values, self.labels[dim]).astype(float)
+        return np.where(position >= 0, position, np.nan)
+
+    def __call__(self, *coords):
+        """
+        Multilinear interpolation at (N,) coordinate arrays, one per axis,
+        clamped at the table edges. NaN coordinates give NaN.
+        """
+        coords = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in coords])
+        lower, upper, weights = [], [], []
+        for axis, x in zip(self.axes, coords):
+            clamped = np.clip(np.nan_to_num(x, nan=axis[0]), axis[0], axis[-1])
+            i = np.clip(np.searchsorted(axis, clamped, side='right') - 1, 0, max(len(axis) - 2, 0))
+            j = np.minimum(i + 1, len(axis) - 1)
+            span = axis[j] - axis[i]
+            with np.errstate(all='ignore'):
+                t = np.where(span > 0, (clamped - axis[i]) / span, 0.0)
+            lower.append(i)
+            upper.append(j)
+            weights.append(t)
+
+        result = np.zeros(coords[0].shape)
+        for corner in range(2 ** len(self.axes)):
+            index, weight = [], np.ones(coords[0].shape)
+            for dim in range(len(self.axes)):
+                if corner >> dim & 1:
+                    index.append(upper[dim])
+                    weight = weight * weights[dim]
+                else:
+                    index.append(lower[dim])
+                    weight = weight * (1.0 - weights[dim])
+            result = result + np.where(weight > 0, weight * self.values[tuple(index)], 0.0)
+
+        missing = np.zeros(coords[0].shape, dtype=bool)
+        for x in coords:
+            missing |= np.isnan(x)
+        return np.where(missing, np.nan, result)
+
+
+def compile_grid(node):
+    """Compile a nested table dict into a Grid; irregular cells become NaN."""
+    entries = list(_flatten(_normalise(node)))
+    depth = {len(path) for path, _ in entries}
+    if len(depth) != 1:
+        raise ValueError("Table levels are not uniform")
+
+    axes, labels, positions = [], [], []
+    for dim in range(depth.pop()):
+        keys = list(dict.fromkeys(path[dim] for path, _ in entries))
+        points = [_axis_point(k) for k in keys]
+        if None in points:
+            labels.append(tuple(keys))
+            axes.append(np.arange(len(keys), dtype=float))
+            positions.append({k: i for i, k in enumerate(keys)})
+        else:
+            order = sorted(set(points))
+            labels.append(None)
+            axes.append(np.array(order, dtype=float))
+            positions.append({k: order.index(p) for k, p in zip(keys, points)})
+
+    values = np.full(tuple(len(a) for a in axes), np.nan)
+    for path, value in entries:
+        if value is not None:
+            values[tuple(positions[d][k] for d, k in enumerate(path))] = value
+    return Grid(axes=tuple(axes), labels=tuple(labels), values=values)
+
+
+@lru_cache(maxsize=None)
+def corrosion_tables():
+    """
+    Every *_corrosion table (plus EXTRA_TABLES) compiled to a Grid, keyed
+    by its path relative to the JSON folder without extension, e.g.
+    'co2_corrosion/table_2b132'. Record lists that are not grids (soil
+    side factors, Table 2.B.10.3) and the SI editions are skipped.
+    """
+    paths = sorted(FORMULA_APP_JSON.glob('*_corrosion/*.JSON')) + [FORMULA_APP_JSON / p for p in EXTRA_TABLES]
+    tables = {}
+    for path in paths:
+        if path.stem.endswith('M'):
+            continue  # SI editions of the same tables
+        data = load_json(path)
+        customary = next((k for k in CUSTOMARY_KEYS if k in data), None)
+        try:
+            grid = compile_grid(data[customary] if customary else data)
+        except ValueError:
+            continue
+        tables[path.relative_to(FORMULA_APP_JSON).with_suffix('').as_posix()] = grid
+    return tables
+
+
+def table(name):
+    return corrosion_tables()[name]
+
+
+# --- CO2 (Section 2.B.13) ------------------------------------------------
+
+def co2_corrosion_rate(temp_f, ph, co2_mol_percent, pressure_psia, shear_stress_pa):
+    """
+    Eq. 2.B.26: CR = 0.0324 f(T, pH) f_CO2^0.62 (S / 19)^0.146 mm/y, with
+    the CO2 fugacity from Eqs. 2.B.30 / 2.B.32. Returned in mpy.
+    """
+    temp_f = np.asarray(temp_f, dtype=float)
+    p_co2 = np.asarray(co2_mol_percent, dtype=float) / 100.0 * np.asarray(pressure_psia, dtype=float) * PSIA_TO_BAR
+    temp_c = (temp_f - 32.0) * 5.0 / 9.0
+    with np.errstate(all='ignore'):
+        fugacity = 10.0 ** (np.minimum(250.0, p_co2) * (0.0031 - 1.4 / (temp_c + 273.0))) * p_co2
+        shear = np.asarray(shear_stress_pa, dtype=float)
+        shear_term = np.where(shear > 0, (shear / 19.0) ** 0.146, np.where(np.isnan(shear), np.nan, 0.0))
+        rate = 0.0324 * table('co2_corrosion/table_2b132')(temp_f, ph) * fugacity ** 0.62 * shear_term
+    return rate * MM_PER_YEAR_TO_MPY
+
+
+# --- HCl (Section 2.B.2) -------------------------------------------------
+
+@lru_cache(maxsize=None)
+def chloride_ph_bands():
+    """Table 2.B.2.2 as (lowest Cl wppm of each band descending, pH)."""
+    data = load_json(FORMULA_APP_JSON / 'table_2-B-2-2.JSON')
+    lows = [c[0] if isinstance(c, list) else c for c in data['ci_concentration']]
+    return np.array(lows, dtype=float), np.array(data['ph'], dtype=float)
+
+
+def chloride_ph(chloride_wppm):
+    """pH of the Table 2.B.2.2 band holding each chloride concentration."""
+    lows, ph = chloride_ph_bands()
+    chloride_wppm = np.asarray(chloride_wppm, dtype=float)
+    band = np.searchsorted(-lows, -np.nan_to_num(chloride_wppm), side='left')
+    return np.where(np.isnan(chloride_wppm), np.nan, ph[np.minimum(band, len(ph) - 1)])
+
+
+def hcl_corrosion_rate(temp_f, ph, hcl_wt_percent):
+    """Table 2.B.2.3 (carbon steel); pH falls back to the Cl concentration band."""
+    ph = np.asarray(ph, dtype=float)
+    ph = np.where(np.isnan(ph), chloride_ph(np.asarray(hcl_wt_percent, dtype=float) * 1e4), ph)
+    return table('table_2-B-2-3')(ph, temp_f)
+
+
+# --- Sulfuric acid (Section 2.B.5) ---------------------------------------
+
+# material_construction -> (table, axis order)
+SULFURIC_ACID_TABLES = {
+    'Carbon Steel': ('sa_corrosion/table_2b52', ('concentration', 'temperature', 'velocity')),
+    '304 SS': ('sa_corrosion/table_2b53', ('concentration', 'velocity', 'temperature')),
+    'Clad 304 SS': ('sa_corrosion/table_2b53', ('concentration', 'velocity', 'temperature')),
+    '316 SS': ('sa_corrosion/table_2b54', ('concentration', 'temperature', 'velocity')),
+    'Clad 316 SS': ('sa_corrosion/table_2b54', ('concentration', 'temperature', 'velocity')),
+    'Alloy 20': ('sa_corrosion/table_2b55', ('concentration', 'temperature', 'velocity')),
+    'Alloy C': ('sa_corrosion/table_2b56', ('concentration', 'temperature', 'velocity')),
+    'Alloy B': ('sa_corrosion/table_2b57', ('concentration', 'temperature', 'velocity')),
+}
+
+
+def _by_material(material, tables, default, evaluate):
+    """Run `evaluate(table spec, rows)` per material group; blank is `default`."""
+    material = np.array([m if isinstance(m, str) and m else default for m in material], dtype=object)
+    result = np.full(len(material), np.nan)
+    for name, spec in tables.items():
+        rows = material == name
+        if rows.any():
+            result[rows] = evaluate(spec, rows)
+    return result
+
+
+def sulfuric_acid_corrosion_rate(material, concentration_wt_percent, temp_f, velocity_fps):
+    """Tables 2.B.5.2 - 2.B.5.7 by material; unlisted materials give NaN."""
+    coords = {
+        'concentration': np.asarray(concentration_wt_percent, dtype=float),
+        'temperature': np.asarray(temp_f, dtype=float),
+        'velocity': np.asarray(velocity_fps, dtype=float),
+    }
+
+    def evaluate(spec, rows):
+        name, order = spec
+        return table(name)(*(coords[axis][rows] for axis in order))
+
+    return _by_material(material, SULFURIC_ACID_TABLES, 'Carbon Steel', evaluate)
+
+
+# --- HF (Section 2.B.6) --------------------------------------------------
+
+HF_ALLOY_400 = ('Alloy 400', 'Clad Alloy 400')
+
+
+def hf_corrosion_rate(material, temp_f, velocity_fps, hf_wt_percent):
+    """
+    Table 2.B.6.2 (carbon steel) or 2.B.6.3 (Alloy 400). Aeration is not
+    recorded on the component, so Alloy 400 takes the aerated column.
+    """
+    temp_f = np.asarray(temp_f, dtype=float)
+    hf_wt_percent = np.asarray(hf_wt_percent, dtype=float)
+    result = table('hf_corrosion/table_2b62')(temp_f, velocity_fps, hf_wt_percent)
+    alloy = np.isin(np.asarray(material, dtype=object), HF_ALLOY_400)
+    if alloy.any():
+        alloy_table = table('hf_corrosion/table_2b63')
+        aerated = alloy_table.index(1, ['Yes'])[0]
+        result[alloy] = alloy_table(temp_f[alloy], aerated, hf_wt_percent[alloy])
+    return result
+
+
+# --- Acid sour water (Section 2.B.10) ------------------------------------
+
+SIGNIFICANT_OXYGEN = 50.0
+
+
+@lru_cache(maxsize=None)
+def oxygen_adjustment_factors():
+    """Table 2.B.10.3 factors as {'not_significant': F_O, 'significant': F_O}."""
+    data = load_json(FORMULA_APP_JSON / 'acid_sw_corrosion' / 'table_2b103.JSON')
+    return dict(zip(data['oxygen_component'], data['adjustment_factor']))
+
+
+def velocity_factor(velocity_fps):
+    """Eq. 2.B.10 velocity factor F_V (1.0 below 6 ft/s, 5.0 above 20 ft/s)."""
+    velocity_fps = np.nan_to_num(np.asarray(velocity_fps, dtype=float))
+    return np.select([velocity_fps < 6.0, velocity_fps <= 20.0], [1.0, 0.25 * velocity_fps - 0.5], 5.0)
+
+
+def acid_water_corrosion_rate(temp_f, ph, dissolved_o2, velocity_fps):
+    """CR = CR_pH (Table 2.B.10.2) x F_O x F_V; blank oxygen counts as not significant."""
+    factors = oxygen_adjustment_factors()
+    oxygen = np.where(
+        np.nan_to_num(dissolved_o2) >= SIGNIFICANT_OXYGEN, factors['significant'], factors['not_significant'],
+    )
+    return table('acid_sw_corrosion/table_2b102')(temp_f, ph) * oxygen * velocity_factor(velocity_fps)
+
+
+# --- High temperature H2S/H2 (Section 2.B.4) -----------------------------
+
+H2S_H2_TABLES = {
+    'Carbon Steel': 'ht_h2s2_corrosion/table_2b42',
+    '1.25Cr-0.5Mo': 'ht_h2s2_corrosion/table_2b42',
+    '2.25Cr-1Mo': 'ht_h2s2_corrosion/table_2b42',
+    '5Cr-0.5Mo': 'ht_h2s2_corrosion/table_2b43',
+    '7Cr-0.5Mo': 'ht_h2s2_corrosion/table_2b44',
+    '9Cr-1Mo': 'ht_h2s2_corrosion/table_2b45',
+    '405 SS': 'ht_h2s2_corrosion/table_2b46',
+    '410 SS': 'ht_h2s2_corrosion/table_2b46',
+    '304 SS': 'ht_h2s2_corrosion/table_2b47',
+    'Clad 304 SS': 'ht_h2s2_corrosion/table_2b47',
+    '316 SS': 'ht_h2s2_corrosion/table_2b47',
+    'Clad 316 SS': 'ht_h2s2_corrosion/table_2b47',
+}
+
+# The stream type is not recorded; gas oil is the higher of the two curves.
+DEFAULT_HYDROCARBON = 'Gas oil'
+
+
+def h2s_h2_corrosion_rate(material, temp_f, h2s_partial_pressure_psia, pressure_psia):
+    """Tables 2.B.4.2 - 2.B.4.7 at the H2S mole % p_H2S / P x 100."""
+    temp_f = np.asarray(temp_f, dtype=float)
+    with np.errstate(all='ignore'):
+        h2s_mol_percent = np.asarray(h2s_partial_pressure_psia, dtype=float) / np.asarray(pressure_psia, dtype=float) * 100.0
+
+    def evaluate(name, rows):
+        grid = table(name)
+        if len(grid.axes) == 3:
+            hydrocarbon = grid.index(1, [DEFAULT_HYDROCARBON])[0]
+            return grid(h2s_mol_percent[rows], hydrocarbon, temp_f[rows])
+        return grid(h2s_mol_percent[rows], temp_f[rows])
+
+    return _by_material(material, H2S_H2_TABLES, 'Carbon Steel', evaluate)
+
+
+# --- Sulfidic / naphthenic acid (Section 2.B.3) --------------------------
+
+SULFIDIC_TABLES = {
+    'Carbon Steel': 'ht_sna_corrosion/table_2b32',
+    '1.25Cr-0.5Mo': 'ht_sna_corrosion/table_2b33',
+    '2.25Cr-1Mo': 'ht_sna_corrosion/table_2b33',
+    '5Cr-0.5Mo': 'ht_sna_corrosion/table_2b34',
+    '7Cr-0.5Mo': 'ht_sna_corrosion/table_2b35',
+    '9Cr-1Mo': 'ht_sna_corrosion/table_2b36',
+    '405 SS': 'ht_sna_corrosion/table_2b37',
+    '410 SS': 'ht_sna_corrosion/table_2b37',
+    '304 SS': 'ht_sna_corrosion/table_2b38',
+    'Clad 304 SS': 'ht_sna_corrosion/table_2b38',
+    '316 SS': 'ht_sna_corrosion/table_2b39',
+    'Clad 316 SS': 'ht_sna_corrosion/table_2b39',
+}
+
+HIGH_VELOCITY_FPS = 100.0
+HIGH_VELOCITY_FACTOR = 5.0
+
+
+def sulfidic_corrosion_rate(material, temp_f, sulfur_wt_percent, tan, velocity_fps):
+    """Tables 2.B.3.2 - 2.B.3.10; the rate is multiplied by 5 at 100 ft/s and above."""
+    temp_f = np.asarray(temp_f, dtype=float)
+    sulfur = np.asarray(sulfur_wt_percent, dtype=float)
+    tan = np.asarray(tan, dtype=float)
+    rate = _by_material(material, SULFIDIC_TABLES, 'Carbon Steel',
+                        lambda name, rows: table(name)(sulfur[rows], tan[rows], temp_f[rows]))
+    high = np.nan_to_num(np.asarray(velocity_fps, dtype=float)) >= HIGH_VELOCITY_FPS
+    return np.where(high, rate * HIGH_VELOCITY_FACTOR, rate)
+
+
+COMPONENT_FIELDS = (
+    'operating_temp_f',
+    'operating_pressure_psia',
+    'ph_value',
+    'flow_velocity_fts',
+    'material_construction',
+    'co2_concentration_mol_percent',
+    'co2_shear_stress_pa',
+    'hcl_concentration_wt_percent',
+    'h2so4_concentration_wt_percent',
+    'h2so4_velocity_fps',
+    'hf_concentration_wt_percent',
+    'hf_velocity_fps',
+    'acid_water_dissolved_o2_ppm',
+    'ht_h2s_partial_pressure_psia',
+    'sulfidic_tan',
+    'sulfidic_sulfur_wt_percent',
+    'sulfidic_velocity_fps',
+)
+
+# Component fields written by evaluate_components()
+RATE_FIELDS = (
+    'co2_corrosion_rate_mpy',
+    'hcl_corrosion_rate_mpy',
+    'h2so4_corrosion_rate_mpy',
+    'hf_corrosion_rate_mpy',
+    'acid_water_corrosion_rate_mpy',
+    'ht_h2s_h2_corrosion_rate_mpy',
+    'sulfidic_corrosion_rate_mpy',
+)
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Interpolate the corrosion rates for every component in `queryset`.
+
+    Returns (pks, {rate field: (N,) mpy}). NaN marks a component without
+    the inputs for that mechanism.
+    """
+    cols = load_columns(queryset, COMPONENT_FIELDS)
+    temp = cols['operating_temp_f']
+    pressure = cols['operating_pressure_psia']
+    material = cols['material_construction']
+    return cols['pk'], {
+        'co2_corrosion_rate_mpy': co2_corrosion_rate(
+            temp, cols['ph_value'], cols['co2_concentration_mol_percent'], pressure, cols['co2_shear_stress_pa'],
+        ),
+        'hcl_corrosion_rate_mpy': hcl_corrosion_rate(temp, cols['ph_value'], cols['hcl_concentration_wt_percent']),
+        'h2so4_corrosion_rate_mpy': sulfuric_acid_corrosion_rate(
+            material, cols['h2so4_concentration_wt_percent'], temp, cols['h2so4_velocity_fps'],
+        ),
+        'hf_corrosion_rate_mpy': hf_corrosion_rate(
+            material, temp, cols['hf_velocity_fps'], cols['hf_concentration_wt_percent'],
+        ),
+        'acid_water_corrosion_rate_mpy': acid_water_corrosion_rate(
+            temp, cols['ph_value'], cols['acid_water_dissolved_o2_ppm'], cols['flow_velocity_fts'],
+        ),
+        'ht_h2s_h2_corrosion_rate_mpy': h2s_h2_corrosion_rate(
+            material, temp, cols['ht_h2s_partial_pressure_psia'], pressure,
+        ),
+        'sulfidic_corrosion_rate_mpy': sulfidic_corrosion_rate(
+            material, temp, cols['sulfidic_sulfur_wt_percent'], cols['sulfidic_tan'], cols['sulfidic_velocity_fps'],
+        ),
+    }
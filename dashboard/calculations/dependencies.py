@@ -0,0 +1,125 @@
+"""
+Input field -> calculation stage dependency graph.
+
+Each stage declares the Component fields it reads (the COMPONENT_FIELDS of
+its engines) and the fields it writes. A stage that reads another stage's
+output is downstream of it, so editing a corrosion input re-runs the
+corrosion rates, the thinning DF, the FMS factor and the risk results,
+while editing `representative_fluid` re-runs the consequences and the
+risk results. The risk stage comes last and derives final_pof, the area
+risk and both matrix categories from the stored outputs of the others.
+
+save_component() saves only the dirty columns of an edited component with
+update_fields and synchronously refreshes the stages they feed.
+"""
+from functools import lru_cache
+
+from . import batch, consequence, corrosion_rates, financial, fms, memo, risk
+
+# Pseudo-field for the InspectionHistory rows counted by the thinning engine
+INSPECTION_HISTORY = 'inspection_history'
+
+# Stage -> (fields read, fields written), in evaluation order
+STAGES = {
+    'corrosion_rates': (corrosion_rates.COMPONENT_FIELDS, corrosion_rates.RATE_FIELDS),
+    **{
+        engine: (
+            module.COMPONENT_FIELDS + ((INSPECTION_HISTORY,) if engine == 'thinning' else ()),
+            ('calculated_total_damage_factor', 'damage_factor_input_hash')
+            + ((batch.PERSISTED_GROUPS[engine],) if engine in batch.PERSISTED_GROUPS else ())
+            + memo.VALUE_FIELDS.get(engine, ()),
+        )
+        for engine, (module, _) in memo.ENGINES.items()
+    },
+    'consequences': (
+        consequence.COMPONENT_FIELDS + financial.COMPONENT_FIELDS,
+        ('calculated_consequence_area', 'cof_category', 'calculated_cof'),
+    ),
+    'fms': (fms.COMPONENT_FIELDS, ('fms_pscore', 'fms_factor', 'final_pof')),
+    'risk': (risk.STORED_FIELDS, risk.RISK_FIELDS),
+}
+
+
+def _component_field(lookup):
+    """Component field behind a values_list() lookup ('equipment__system__unit_id' -> 'equipment')."""
+    return lookup.split('__', 1)[0]
+
+
+@lru_cache(maxsize=None)
+def dependency_graph():
+    """{Component field: stages that read it}, downstream stages included."""
+    graph = {}
+    for stage, (inputs, _) in STAGES.items():
+        for lookup in inputs:
+            graph.setdefault(_component_field(lookup), set()).add(stage)
+
+    # STAGES is in evaluation order, so one pass closes over every output
+    for stage, (_, outputs) in STAGES.items():
+        downstream = set().union(*(graph.get(field, set()) for field in outputs)) - {stage}
+        for field, stages in graph.items():
+            if stage in stages:
+                stages |= downstream
+    return {field: frozenset(stages) for field, stages in graph.items()}
+
+
+def affected_stages(fields):
+    """Stages to re-run after `fields` changed, in evaluation order."""
+    graph = dependency_graph()
+    dirty = set().union(*(graph.get(field, ()) for field in fields))
+    return [stage for stage in STAGES if stage in dirty]
+
+
+def refresh_stages(queryset, stages, today=None):
+    """Re-run `stages` for every component in `queryset`."""
+    from ..rollups import deferred_atomic
+
+    with deferred_atomic():
+        if 'corrosion_rates' in stages:
+            batch.recalculate_corrosion_rates(queryset)
+        batch.refresh_damage_factors(queryset, [stage for stage in stages if stage in memo.ENGINES], today=today)
+        if 'consequences' in stages:
+            batch.recalculate_consequences(queryset)
+        if 'fms' in stages:
+            batch.recalculate_fms(queryset)
+        if 'risk' in stages:
+            batch.recalculate_stored_risk(queryset)
+
+
+def refresh_component(component, fields, today=None):
+    """Re-run the stages fed by `fields` for one component. Returns the stages."""
+    from ..rollups import track
+
+    stages = affected_stages(fields)
+    if stages:
+        # Its rollup cells are updated by delta, not by regrouping its unit
+        track([component.pk])
+        refresh_stages(type(component).objects.filter(pk=component.pk), stages, today=today)
+    return stages
+
+
+def save_component(component, today=None):
+    """
+    Save a Component and refresh the stages its edits feed.
+
+    Existing components write only their dirty columns (update_fields);
+    new components are saved in full and run every stage. Returns the
+    stages that were re-run.
+    """
+    from ..models import SECTION_FIELDS
+    from ..rollups import deferred_atomic, track
+
+    if component._state.adding:
+        fields = [field.name for field in component._meta.concrete_fields] + list(SECTION_FIELDS)
+    else:
+        fields = component.dirty_fields()
+        if not fields:
+            return []
+    # One rollup refresh for the save and the stages, none if it rolls back
+    with deferred_atomic():
+        if component._state.adding:
+            component.save()
+        else:
+            track([component.pk])
+            component.save(update_fields=fields)
+        component.reset_dirty_fields()
+        return refresh_component(component, fields, today=today)
@@ -0,0 +1,300 @@
+"""
+External Damage Factors (API 581 Part 2, Sections 2.D.2 - 2.D.5)
+
+Vectorized counterpart of static/dashboard/js/calculations/external_damage.js.
+Atmospheric corrosion and corrosion under insulation (CUI) rates are
+evaluated for every component at once, then run through the thinning
+engine; external and CUI chloride SCC go through the SCC severity index
+and base DF tables. The CUI base rates (Table 2.D.3.2) and insulation
+factors (Table 2.D.3.3) are compiled from the formula_app JSON.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from . import scc, thinning
+from .common import age_years, load_columns
+from .tables import FORMULA_APP_JSON, formula_table
+
+# Table files read by this engine, including the thinning and SCC tables
+# it evaluates through (memo cache version)
+REFERENCE_TABLES = (
+    FORMULA_APP_JSON / 'table_2d_3_2.json',
+    FORMULA_APP_JSON / 'table_2d_3_3.json',
+    FORMULA_APP_JSON / 'table_2d_4_2.json',
+) + thinning.REFERENCE_TABLES + scc.REFERENCE_TABLES
+
+# Base atmospheric corrosion rate (mpy) by external driver
+EXTERNAL_DRIVER_RATES = {
+    'Severe': 10.0,
+    'Marine': 5.0,
+    'Temperate': 3.0,
+    'Arid/Dry': 0.5,
+    'None': 0.0,
+}
+
+# Table 2.D.3.2 columns, in model `cui_driver` spelling
+CUI_DRIVERS = ('Severe', 'Moderate', 'Mild', 'Dry')
+
+# Rows external_damage.js adds to Table 2.D.3.2: the 18 deg F rates hold up
+# to freezing. The shared JSON is left as the formula_app pages read it.
+CUI_EXTRA_ROWS = ({'temp': 32, 'severe': 3, 'moderate': 1, 'mild': 0, 'dry': 0},)
+
+# Complexity factor F_cm
+COMPLEXITY_FACTORS = {'High': 1.25, 'Medium': 1.0, 'Low': 0.75}
+
+# Insulation condition factor F_ic
+INSULATION_CONDITION_FACTORS = {'Good': 0.75, 'Average': 1.0, 'Poor': 1.25}
+
+# Component `insulation_type` choices -> Table 2.D.3.3 rows. 'Other' and
+# any type not listed keep the 1.25 used by external_damage.js; a blank
+# type is Unknown/unspecified.
+INSULATION_TYPE_ALIASES = {
+    'Calcium Silicate': 'Calcium silicate',
+    'Mineral Wool': 'Mineral wool',
+    'Fiberglass': 'Fiberglass',
+    'Foam Glass': 'Cellular glass',
+}
+OTHER_INSULATION_FACTOR = 1.25
+UNKNOWN_INSULATION = 'Unknown/unspecified'
+
+# Coating age credit C_age (years) by external coating quality
+COATING_CREDIT_YEARS = {'Poor': 0.0, 'Fair': 5.0, 'Good': 15.0, 'Excellent': 15.0}
+
+# Drivers that use the Marine column of the ClSCC table
+CLSCC_DRIVER_ALIASES = {'Severe': 'Marine'}
+
+# Table 2.D.4.2 labels -> SCC susceptibility codes
+SUSCEPTIBILITY_CODES = {'None': scc.NONE, 'Low': scc.LOW, 'Medium': scc.MEDIUM, 'High': scc.HIGH}
+
+# Crack finding capability -> SCC inspection effectiveness column
+CRACK_CAPABILITY_TO_EFFECTIVENESS = {'High': 'A', 'Medium': 'C', 'Low': 'D'}
+
+
+@lru_cache(maxsize=None)
+def cui_base_rate_grid():
+    """Table 2.D.3.2 as (temperatures deg F, rates mpy with shape (T, 4 drivers))."""
+    rows = sorted([*formula_table('table_2d_3_2.json'), *CUI_EXTRA_ROWS], key=lambda r: r['temp'])
+    return (
+        np.array([r['temp'] for r in rows], dtype=float),
+        np.array([[r[d.lower()] for d in CUI_DRIVERS] for r in rows], dtype=float),
+    )
+
+
+@lru_cache(maxsize=None)
+def insulation_type_factors():
+    """Table 2.D.3.3 keyed by the Component `insulation_type` choices, blank included."""
+    by_type = {row['type']: row['factor'] for row in formula_table('table_2d_3_3.json')}
+    factors = {choice: by_type[row] for choice, row in INSULATION_TYPE_ALIASES.items()}
+    factors.update(dict.fromkeys((None, ''), by_type[UNKNOWN_INSULATION]))
+    return factors, OTHER_INSULATION_FACTOR
+
+
+@lru_cache(maxsize=None)
+def clscc_susceptibility_table():
+    """Table 2.D.4.2 as (temperature bounds, drivers, codes with shape (drivers, bands))."""
+    table = formula_table('table_2d_4_2.json')
+    drivers = tuple(table['susceptibility'])
+    codes = np.array([
+        [SUSCEPTIBILITY_CODES[level] for level in table['susceptibility'][d]] for d in drivers
+    ], dtype=np.int64)
+    return np.array(table['temperature_bounds_f'], dtype=float), drivers, codes
+
+
+def _lookup(values, mapping, default):
+    return np.array([mapping.get(v, default) for v in np.asarray(values, dtype=object)], dtype=float)
+
+
+def external_corrosion_rate(driver, complexity):
+    """Atmospheric corrosion rate (mpy) = base rate x F_cm."""
+    return _lookup(driver, EXTERNAL_DRIVER_RATES, 0.0) * _lookup(complexity, COMPLEXITY_FACTORS, 1.0)
+
+
+def cui_corrosion_rate(driver, temp_f, insulation_type, insulation_condition, complexity):
+    """
+    CUI corrosion rate (mpy) = CrB(T, driver) x F_ins x F_cm x F_ic x max(F_eq, F_if).
+
+    The base rate is interpolated in Table 2.D.3.2 (with the 32 deg F row
+    of external_damage.js), which drops to zero at both ends; a missing
+    temperature or a 'None' driver gives zero. F_eq and
+    F_if are not captured on the component and stay at 1.0.
+    """
+    temps, rates = cui_base_rate_grid()
+    temp_f = np.asarray(temp_f, dtype=float)
+    driver = np.asarray(driver, dtype=object)
+
+    base = np.zeros(len(temp_f))
+    for j, name in enumerate(CUI_DRIVERS):
+        rows = (driver == name) & ~np.isnan(temp_f)
+        if rows.any():
+            base[rows] = np.interp(temp_f[rows], temps, rates[:, j], left=rates[0, j], right=0.0)
+
+    by_type, other = insulation_type_factors()
+    f_ins = _lookup(insulation_type, by_type, other)
+    f_ic = _lookup(insulation_condition, INSULATION_CONDITION_FACTORS, 1.0)
+    return base * f_ins * _lookup(complexity, COMPLEXITY_FACTORS, 1.0) * f_ic
+
+
+def clscc_susceptibility(driver, temp_f):
+    """Table 2.D.4.2 codes; no driver or no temperature gives NONE."""
+    bounds, drivers, codes = clscc_susceptibility_table()
+    temp_f = np.asarray(temp_f, dtype=float)
+    column = np.searchsorted(bounds, np.nan_to_num(temp_f), side='right')
+    result = np.full(len(temp_f), scc.NONE, dtype=np.int64)
+    for i, name in enumerate(drivers):
+        rows = np.array([CLSCC_DRIVER_ALIASES.get(d, d) == name for d in np.asarray(driver, dtype=object)], dtype=bool)
+        result[rows] = codes[i, column[rows]]
+    return np.where(np.isnan(temp_f), scc.NONE, result)
+
+
+def coating_adjustment(age_tk, coating_age, coating_quality):
+    """
+    Years of coating credit deducted from the time in service
+    (Section 2.D.3.6). No coating date means no credit.
+    """
+    credit = _lookup(coating_quality, COATING_CREDIT_YEARS, 0.0)
+    coating_age = np.nan_to_num(coating_age)
+    adjustment = np.where(
+        age_tk >= coating_age,
+        np.minimum(credit, coating_age),
+        np.minimum(credit, coating_age) - np.minimum(credit, coating_age - age_tk),
+    )
+    return np.maximum(np.nan_to_num(adjustment), 0.0)
+
+
+def _single_inspection(capability, dates, mapping):
+    """(N, 4) counts holding the last external inspection, if one was recorded."""
+    counts = np.zeros((len(capability), len(scc.EFFECTIVENESS_CATEGORIES)))
+    for i, (value, date) in enumerate(zip(np.asarray(capability, dtype=object), dates)):
+        category = mapping.get(value)
+        if category and date is not None:
+            counts[i, scc.EFFECTIVENESS_CATEGORIES.index(category)] = 1
+    return counts
+
+
+EXTERNAL_MECHANISMS = {
+    'external_corrosion': 'mech_ext_corrosion_active',
+    'cui': 'mech_cui_active',
+    'external_clscc': 'mech_ext_clscc_active',
+    'cui_clscc': 'mech_cui_clscc_active',
+}
+
+
+@dataclass
+class ExternalDamageResult:
+    external_rate: np.ndarray   # (N,) atmospheric corrosion rate, mpy
+    cui_rate: np.ndarray        # (N,) CUI rate, mpy
+    age: np.ndarray             # (N,) service years after coating credit
+    clscc_susceptibility: np.ndarray  # (N,) external ClSCC scc.* code
+    base_dfs: np.ndarray        # (N, 4) base DF per EXTERNAL_MECHANISMS key
+    damage_factors: np.ndarray  # (N, 4) DF per EXTERNAL_MECHANISMS key, NaN where inactive
+
+    @property
+    def governing_df(self):
+        """Largest DF across external mechanisms (NaN where none is active)."""
+        result = np.full(self.damage_factors.shape[0], np.nan)
+        valid = ~np.isnan(self.damage_factors).all(axis=1)
+        result[valid] = np.nanmax(self.damage_factors[valid], axis=1)
+        return result
+
+
+COMPONENT_FIELDS = (
+    'commissioning_date',
+    'nominal_thickness_in',
+    'smys_yield_psi',
+    'allowable_stress_psi',
+    'joint_efficiency',
+    'min_required_thickness_in',
+    'operating_temp_f',
+    'external_driver',
+    'cui_driver',
+    'insulation_type',
+    'insulation_condition',
+    'complexity',
+    'external_coating_date',
+    'external_coating_quality',
+    'last_ext_visual_inspection_date',
+    'external_corrosion_finding_capability',
+    'external_crack_finding_capability',
+) + tuple(EXTERNAL_MECHANISMS.values())
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Run the external damage evaluation for every component in `queryset`.
+
+    Returns (pks, ExternalDamageResult, mechanism keys). Time in service is
+    counted from the last external inspection when there is one, otherwise
+    from commissioning, less the coating credit.
+    """
+    return evaluate_columns(load_columns(queryset, COMPONENT_FIELDS), today)
+
+
+def evaluate_columns(cols, today=None, years_ahead=0.0):
+    """
+    evaluate_components() on columns that are already loaded.
+    `years_ahead` (scalar or one value per row) is added to every age,
+    coating age included, projecting the DFs to a future date.
+    """
+    pks = cols['pk']
+    temp = cols['operating_temp_f']
+
+    def years_since(field):
+        return age_years(cols[field], today) + years_ahead
+
+    since_inspection = years_since('last_ext_visual_inspection_date')
+    age_tk = np.where(np.isnan(since_inspection), years_since('commissioning_date'), since_inspection)
+    age = np.maximum(age_tk - coating_adjustment(
+        age_tk, years_since('external_coating_date'), cols['external_coating_quality'],
+    ), 0.0)
+
+    external_rate = external_corrosion_rate(cols['external_driver'], cols['complexity'])
+    cui_rate = cui_corrosion_rate(
+        cols['cui_driver'], temp, cols['insulation_type'], cols['insulation_condition'], cols['complexity'],
+    )
+
+    active = {key: np.asarray(cols[flag], dtype=bool) for key, flag in EXTERNAL_MECHANISMS.items()}
+    rates = np.column_stack([
+        np.where(active['external_corrosion'], external_rate, np.nan),
+        np.where(active['cui'], cui_rate, np.nan),
+    ]) if len(pks) else np.empty((0, 2))
+    wall_loss = thinning.compute_thinning_df(
+        corrosion_rate_mpy=rates,
+        age_tk=age,
+        t_rdi=cols['nominal_thickness_in'],
+        yield_strength=cols['smys_yield_psi'],
+        tensile_strength=np.nan,
+        allowable_stress=cols['allowable_stress_psi'],
+        joint_efficiency=cols['joint_efficiency'],
+        t_min=cols['min_required_thickness_in'],
+        inspection_counts=_single_inspection(
+            cols['external_corrosion_finding_capability'],
+            cols['last_ext_visual_inspection_date'],
+            thinning.CAPABILITY_TO_EFFECTIVENESS,
+        ),
+        confidence='Low',
+    )
+
+    susceptibility = clscc_susceptibility(cols['external_driver'], temp)
+    crack_counts = _single_inspection(
+        cols['external_crack_finding_capability'],
+        cols['last_ext_visual_inspection_date'],
+        CRACK_CAPABILITY_TO_EFFECTIVENESS,
+    )
+    _, clscc_base_df, clscc_df = scc.scc_damage_factor(susceptibility, crack_counts, age)
+
+    damage_factors = np.column_stack([
+        wall_loss.final_df[:, 0],
+        wall_loss.final_df[:, 1],
+        np.where(active['external_clscc'], clscc_df, np.nan),
+        np.where(active['cui_clscc'], clscc_df, np.nan),
+    ]) if len(pks) else np.empty((0, len(EXTERNAL_MECHANISMS)))
+    base_dfs = np.column_stack([
+        wall_loss.base_df[:, 0], wall_loss.base_df[:, 1], clscc_base_df, clscc_base_df,
+    ]) if len(pks) else np.empty((0, len(EXTERNAL_MECHANISMS)))
+
+    return pks, ExternalDamageResult(
+        external_rate=external_rate, cui_rate=cui_rate, age=age, clscc_susceptibility=susceptibility,
+        base_dfs=base_dfs, damage_factors=damage_factors,
+    ), list(EXTERNAL_MECHANISMS)
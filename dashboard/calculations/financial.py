@@ -0,0 +1,223 @@
+"""
+Financial Consequence of Failure (API 581 Part 3, Section 4.12)
+
+Vectorized port of Step 4.12 in static/formula_app/js/cof_level_1.js.
+Component damage, affected area, production loss, personnel injury and
+environmental cleanup costs are evaluated for every component at once on
+top of the COF Level 1 areas, and rolled up per unit and per facility in
+the same pass. Hole costs and outage days (Tables 4.15 / 4.16) come from
+the formula_app data module; material cost factors are the
+MATERIAL_COST_FACTORS table behind the `material_construction` choices.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from ..data.component_types import get_equipment_type
+from ..data.material_construction import MATERIAL_COST_FACTORS
+from . import consequence
+from .common import index_of, load_columns
+from .tables import cof_table
+
+# Pipe hole costs depend on the diameter (inches), not on the GFF group:
+# upper bound of each size band and its Table 4.15 key.
+PIPE_SIZE_BOUNDS_IN = np.array([1.5, 3.0, 5.0, 7.0, 9.0, 11.0, 14.0, 16.0])
+PIPE_COST_KEYS = ('PIPE-1', 'PIPE-2', 'PIPE-4', 'PIPE-6', 'PIPE-8', 'PIPE-10', 'PIPE-12', 'PIPE-16', 'PIPEGT16')
+
+# Component type tokens spelled differently in Tables 4.15 / 4.16
+COST_KEY_ALIASES = {
+    'PIPE-8+': 'PIPE-8',
+    'COURSE-1-10': 'COURSES-10',
+    'FINFAN TUBES': 'FINFAN_TUBE',
+}
+
+DEFAULT_MATERIAL_COST_FACTOR = 1.0
+DEFAULT_UNIT_AREA_FT2 = 10000.0
+
+# Eq. 3.86 - outage days for the affected area
+OUTAGE_AFFA_INTERCEPT = 1.242
+OUTAGE_AFFA_SLOPE = 0.585
+
+PERSONNEL_FIELDS = (
+    ('personnel_shift_1', 'time_present_shift_1'),
+    ('personnel_shift_2', 'time_present_shift_2'),
+    ('personnel_maintenance', 'time_present_maintenance'),
+)
+
+
+@lru_cache(maxsize=None)
+def material_cost_vector():
+    """MATERIAL_COST_FACTORS as (material names, factors) for indexed lookups."""
+    names = tuple(MATERIAL_COST_FACTORS)
+    return names, np.array([MATERIAL_COST_FACTORS[n] for n in names], dtype=float)
+
+
+@lru_cache(maxsize=None)
+def hole_cost_tables():
+    """
+    Tables 4.15 (hole cost, $) and 4.16 (outage, days).
+
+    Returns (cost keys, costs with shape (keys, 4 holes), outage days with
+    the same shape). Keys are normalised to the Table 4.15 spelling; a key
+    missing from one table gets zeros there.
+    """
+    costs = cof_table('table4_15_16', 'ComponentCostData')
+    outages = {k.replace(' ', '_'): v for k, v in cof_table('table4_15_16', 'ComponentOutageData').items()}
+    keys = tuple(costs)
+
+    def grid(table):
+        return np.array([
+            [(table.get(k) or {}).get(h) or 0.0 for h in consequence.HOLE_NAMES] for k in keys
+        ], dtype=float)
+
+    return keys, grid(costs), grid(outages)
+
+
+def cost_keys(component_type, diameter_in):
+    """Table 4.15 key per component: the first type token, pipes sized by diameter."""
+    diameter_in = np.asarray(diameter_in, dtype=float)
+    pipe_keys = np.array(PIPE_COST_KEYS, dtype=object)[
+        np.searchsorted(PIPE_SIZE_BOUNDS_IN, np.nan_to_num(diameter_in), side='left')
+    ]
+    result = []
+    for value, diameter, pipe_key in zip(np.asarray(component_type, dtype=object), diameter_in, pipe_keys):
+        if not isinstance(value, str) or not value:
+            result.append(None)
+            continue
+        key = value.split(',')[0].strip().upper()
+        if get_equipment_type(value) == 'Pipe' and diameter > 0:
+            key = pipe_key
+        result.append(COST_KEY_ALIASES.get(key, key))
+    return np.array(result, dtype=object)
+
+
+def weighted_hole_values(gffs, keys):
+    """
+    GFF-weighted hole cost (Eq. 3.83) and outage days (Eq. 3.85) per component.
+
+    `gffs` has shape (N, 4); `keys` are Table 4.15 keys from cost_keys().
+    Components without a table row or without GFFs get zeros.
+    """
+    table_keys, hole_costs, outage_days = hole_cost_tables()
+    key_index = index_of(keys, table_keys)
+    has_key = (key_index >= 0)[:, None]
+    costs = np.where(has_key, hole_costs[np.maximum(key_index, 0)], 0.0)
+    outages = np.where(has_key, outage_days[np.maximum(key_index, 0)], 0.0)
+
+    gffs = np.nan_to_num(gffs)
+    gff_total = gffs.sum(axis=1)
+    with np.errstate(all='ignore'):
+        weighted_cost = np.where(gff_total > 0, (gffs * costs).sum(axis=1) / gff_total, 0.0)
+        weighted_outage = np.where(gff_total > 0, (gffs * outages).sum(axis=1) / gff_total, 0.0)
+    return weighted_cost, weighted_outage
+
+
+def material_cost_factors(material):
+    """Table 4.16 factor per component; unknown or blank materials cost 1.0."""
+    names, factors = material_cost_vector()
+    index = index_of(material, names)
+    return np.where(index >= 0, factors[np.maximum(index, 0)], DEFAULT_MATERIAL_COST_FACTOR)
+
+
+def outage_affected_area(fc_affa):
+    """Eq. 3.86 outage days from the affected area cost; zero without one."""
+    fc_affa = np.nan_to_num(np.asarray(fc_affa, dtype=float))
+    with np.errstate(divide='ignore'):
+        days = 10.0 ** (OUTAGE_AFFA_INTERCEPT + OUTAGE_AFFA_SLOPE * np.log10(fc_affa * 1e-6))
+    return np.where(fc_affa > 0, days, 0.0)
+
+
+def population_density(personnel, time_present_pct, unit_area_ft2):
+    """
+    Eqs. 3.93 / 3.94: average personnel on site per ft2.
+
+    `personnel` and `time_present_pct` have shape (N, 3) for shift 1,
+    shift 2 and maintenance; missing entries count as zero.
+    """
+    average = (np.nan_to_num(personnel) * np.nan_to_num(time_present_pct) / 100.0).sum(axis=1)
+    area = np.where(np.isnan(unit_area_ft2), DEFAULT_UNIT_AREA_FT2, unit_area_ft2)
+    with np.errstate(all='ignore'):
+        return np.where(area > 0, average / area, 0.0)
+
+
+def rollup(group_ids, values):
+    """Sum `values` per group id (NaN values and ids skipped) as {id: total}."""
+    valid = ~np.isnan(group_ids) & ~np.isnan(values)
+    ids, inverse = np.unique(group_ids[valid].astype(np.int64), return_inverse=True)
+    totals = np.bincount(inverse, weights=values[valid], minlength=len(ids))
+    return {int(i): float(t) for i, t in zip(ids, totals)}
+
+
+@dataclass
+class FinancialResult:
+    fc_cmd: np.ndarray          # (N,) component damage cost (Eq. 3.83)
+    fc_affa: np.ndarray         # (N,) affected area cost (Eq. 3.84)
+    fc_prod: np.ndarray         # (N,) production loss cost (Eq. 3.87)
+    fc_inj: np.ndarray          # (N,) personnel injury cost (Eq. 3.88)
+    fc_environ: np.ndarray      # (N,) environmental cleanup cost (Eq. 3.91)
+    financial_cof: np.ndarray   # (N,) total FC, NaN where the consequence area is unknown
+    unit_totals: dict           # {unit id: FC total}
+    facility_totals: dict       # {facility id: FC total}
+
+
+COMPONENT_FIELDS = (
+    'equipment__system__unit_id',
+    'equipment__system__unit__facility_id',
+    'rbix_component_type',
+    'component_diameter',
+    'material_construction',
+    'cost_factor',
+    'equipment_cost_per_sqft',
+    'production_cost_per_day',
+    'outage_multiplier',
+    'unit_area_safety',
+    'injury_cost_per_person',
+    'environmental_cost_per_bbl',
+) + tuple(field for pair in PERSONNEL_FIELDS for field in pair)
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Run the Step 4.12 financial consequence for every component in `queryset`.
+
+    Returns (pks, ConsequenceResult, FinancialResult). Blank cost inputs
+    count as zero, except the cost factor and outage multiplier (1.0).
+    Outage days are looked up with the same resolved key as the hole
+    costs, so sized pipes and vessels find their Table 4.16 row.
+    """
+    pks, areas = consequence.evaluate_components(queryset, today)
+    cols = load_columns(queryset, COMPONENT_FIELDS)
+
+    weighted_cost, weighted_outage = weighted_hole_values(
+        areas.gffs, cost_keys(cols['rbix_component_type'], cols['component_diameter']),
+    )
+
+    def cost(field, default=0.0):
+        return np.where(np.isnan(cols[field]), default, cols[field])
+
+    fc_cmd = weighted_cost * material_cost_factors(cols['material_construction']) * cost('cost_factor', 1.0)
+    fc_affa = np.nan_to_num(areas.ca_cmd) * cost('equipment_cost_per_sqft')
+    outage_cmd = weighted_outage * cost('outage_multiplier', 1.0)
+    fc_prod = (outage_cmd + outage_affected_area(fc_affa)) * cost('production_cost_per_day')
+
+    popdens = population_density(
+        np.column_stack([cols[p] for p, _ in PERSONNEL_FIELDS]) if len(pks) else np.empty((0, 3)),
+        np.column_stack([cols[t] for _, t in PERSONNEL_FIELDS]) if len(pks) else np.empty((0, 3)),
+        cols['unit_area_safety'],
+    )
+    fc_inj = np.nan_to_num(areas.ca_inj) * popdens * cost('injury_cost_per_person')
+    fc_environ = np.nan_to_num(areas.spill_volume) * cost('environmental_cost_per_bbl')
+
+    total = fc_cmd + fc_affa + fc_prod + fc_inj + fc_environ
+    total = np.where(np.isnan(areas.consequence_area), np.nan, total)
+    return pks, areas, FinancialResult(
+        fc_cmd=fc_cmd,
+        fc_affa=fc_affa,
+        fc_prod=fc_prod,
+        fc_inj=fc_inj,
+        fc_environ=fc_environ,
+        financial_cof=total,
+        unit_totals=rollup(cols['equipment__system__unit_id'], total),
+        facility_totals=rollup(cols['equipment__system__unit__facility_id'], total),
+    )
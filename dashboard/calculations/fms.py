@@ -0,0 +1,172 @@
+"""
+Management Systems Factor (API 581 Part 2, Annex 2.A)
+
+Server-side counterpart of static/dashboard/js/calculations/fms.js. The
+questionnaire in static/formula_app/data/json/fms_questionnaire.json is
+compiled once into a section membership matrix and a section weight
+vector, so the P-score of every facility is a pair of matrix products
+over its stored audit answers (FacilityFMSAnswer). FMS is a site-wide
+factor: each component takes its facility's FMS, and final_pof follows
+as GFF x FMS x DF.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .common import load_columns
+from .inspection_planning import DEFAULT_GFF, MAX_POF, MIN_DAMAGE_FACTOR
+from .tables import formula_table
+
+# Fms = 2.38 * e^(-0.012 * pscore)
+FMS_COEFFICIENT = 2.38
+FMS_EXPONENT = -0.012
+MAX_SECTION_SCORE = 100.0
+
+
+@dataclass(frozen=True)
+class Questionnaire:
+    keys: tuple                 # (Q,) (section id, question id) pairs, as strings
+    sections: tuple             # (S,) section ids
+    titles: tuple               # (S,) section titles
+    weights: np.ndarray         # (S,) section weight, fraction of the P-score
+    membership: np.ndarray      # (S, Q) 1 where the question belongs to the section
+    max_scores: np.ndarray      # (Q,) possible score per question
+    questions: tuple            # (Q,) question text and guidance, for rendering
+
+
+@lru_cache(maxsize=None)
+def questionnaire():
+    """fms_questionnaire.json compiled into matrices."""
+    sections = formula_table('fms_questionnaire.json')['sections']
+    keys, owners, max_scores, questions = [], [], [], []
+    for s, section in enumerate(sections):
+        for question in section['questions']:
+            keys.append((section['id'], str(question['id'])))
+            owners.append(s)
+            max_scores.append(question['possible_score'])
+            questions.append(question)
+    membership = np.zeros((len(sections), len(keys)))
+    membership[owners, np.arange(len(keys))] = 1.0
+    return Questionnaire(
+        keys=tuple(keys),
+        sections=tuple(section['id'] for section in sections),
+        titles=tuple(section['title'] for section in sections),
+        weights=np.array([section['weight'] for section in sections], dtype=float) / 100.0,
+        membership=membership,
+        max_scores=np.array(max_scores, dtype=float),
+        questions=tuple(questions),
+    )
+
+
+def pscore(answers):
+    """
+    P-score (0-100) for one row of answers per facility.
+
+    answers: (F, Q) scores in questionnaire order (or (Q,)); each answer is
+    clipped to its possible score and each section total to 100, as in
+    calculateFMS().
+    """
+    q = questionnaire()
+    answers = np.clip(np.nan_to_num(np.asarray(answers, dtype=float)), 0.0, q.max_scores)
+    sections = np.minimum(answers @ q.membership.T, MAX_SECTION_SCORE)
+    return sections @ q.weights
+
+
+def fms_factor(score):
+    """Fms from the P-score."""
+    return FMS_COEFFICIENT * np.exp(FMS_EXPONENT * np.asarray(score, dtype=float))
+
+
+def answer_matrix(facility_ids):
+    """
+    (F, Q) stored audit scores aligned to `facility_ids`, plus a (F,) mask
+    of facilities that have answered at least one question.
+    """
+    from ..models import FacilityFMSAnswer
+
+    q = questionnaire()
+    row = {facility_id: i for i, facility_id in enumerate(facility_ids)}
+    column = {key: j for j, key in enumerate(q.keys)}
+    answers = np.zeros((len(row), len(column)))
+    answered = np.zeros(len(row), dtype=bool)
+    rows = FacilityFMSAnswer.objects.filter(facility_id__in=list(row)).values_list(
+        'facility_id', 'section', 'question', 'score',
+    )
+    for facility_id, section, question, score in rows:
+        j = column.get((section, question))
+        if j is not None:
+            answers[row[facility_id], j] = float(score)
+            answered[row[facility_id]] = True
+    return answers, answered
+
+
+def save_answers(facility_id, scores):
+    """
+    Upsert a facility's audit answers in one statement.
+
+    scores: {(section id, question id): score}; keys not in the
+    questionnaire are ignored and scores are clipped to the possible score.
+    """
+    from ..models import FacilityFMSAnswer
+
+    q = questionnaire()
+    limits = dict(zip(q.keys, q.max_scores))
+    answers = [
+        FacilityFMSAnswer(
+            facility_id=facility_id, section=section, question=question,
+            score=round(min(max(float(score), 0.0), limits[(section, question)]), 2),
+        )
+        for (section, question), score in scores.items() if (section, question) in limits
+    ]
+    FacilityFMSAnswer.objects.bulk_create(
+        answers,
+        update_conflicts=True,
+        unique_fields=['facility', 'section', 'question'],
+        update_fields=['score', 'updated_at'],
+    )
+    return len(answers)
+
+
+def facility_scores(facility_ids):
+    """(P-score, Fms, answered mask) per facility id."""
+    answers, answered = answer_matrix(facility_ids)
+    score = pscore(answers)
+    return score, fms_factor(score), answered
+
+
+@dataclass
+class FMSResult:
+    pscore: np.ndarray          # (N,) facility P-score, NaN where the facility has no audit
+    fms_factor: np.ndarray      # (N,) facility Fms, NaN where the facility has no audit
+    final_pof: np.ndarray       # (N,) GFF x Fms x DF, capped at 1
+
+
+COMPONENT_FIELDS = (
+    'equipment__system__unit__facility_id',
+    'gff_value',
+    'calculated_total_damage_factor',
+)
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Apply each facility's FMS to every component in `queryset`.
+
+    Returns (pks, FMSResult). Components of facilities without any audit
+    answers get NaN, so their per-component FMS is left alone. A missing
+    GFF or DF uses the inspection planning defaults.
+    """
+    cols = load_columns(queryset, COMPONENT_FIELDS)
+    facility = cols['equipment__system__unit__facility_id']
+    facility_ids, index = np.unique(np.nan_to_num(facility, nan=-1).astype(np.int64), return_inverse=True)
+    score, factor, answered = facility_scores([int(f) for f in facility_ids])
+
+    known = answered[index]
+    component_score = np.where(known, score[index], np.nan)
+    component_fms = np.where(known, factor[index], np.nan)
+
+    gff = np.where(np.isnan(cols['gff_value']), DEFAULT_GFF, cols['gff_value'])
+    df = np.fmax(np.nan_to_num(cols['calculated_total_damage_factor'], nan=MIN_DAMAGE_FACTOR), MIN_DAMAGE_FACTOR)
+    final_pof = np.minimum(gff * component_fms * df, MAX_POF)
+    return cols['pk'], FMSResult(pscore=component_score, fms_factor=component_fms, final_pof=final_pof)
@@ -0,0 +1,188 @@
+"""
+High Temperature Hydrogen Attack Damage Factor (API 581 Part 2, Annex 2.E)
+
+Vectorized counterpart of the formula_app HTHA module. The Nelson curves
+(static/formula_app/js/modules/htha/data/htha_nelson_curves.json) are
+compiled into one interpolation array per material, the temperature margin
+to the curve is evaluated for every component at once and ranked into the
+bands of htha_susceptibility_data.json, and the DF comes from
+htha_df_data.json. The component form's live preview
+(static/dashboard/js/calculations/htha.js) reads the same three tables
+from browser_tables(), so it shows the DF that is stored.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .common import load_columns
+from .tables import FORMULA_APP_MODULES, load_json
+
+HTHA_DATA = FORMULA_APP_MODULES / 'htha' / 'data'
+
+# Table files read by this engine (memo cache version)
+REFERENCE_TABLES = (
+    HTHA_DATA / 'htha_df_data.json',
+    HTHA_DATA / 'htha_nelson_curves.json',
+    HTHA_DATA / 'htha_susceptibility_data.json',
+)
+
+# Susceptibility codes, in htha_df_data.json order of severity
+NONE = 0
+LOW = 1
+MEDIUM = 2
+HIGH = 3
+DAMAGE_OBSERVED = 4
+
+SUSCEPTIBILITY_LABELS = {
+    NONE: 'No Susceptibility',
+    LOW: 'Low Susceptibility',
+    MEDIUM: 'Medium Susceptibility',
+    HIGH: 'High Susceptibility',
+    DAMAGE_OBSERVED: 'Damage Observed',
+}
+
+
+@lru_cache(maxsize=None)
+def damage_factor_table():
+    """DF for each susceptibility code (htha_df_data.json)."""
+    by_label = {row['susceptibility']: row['df'] for row in load_json(HTHA_DATA / 'htha_df_data.json')}
+    return np.array([by_label[SUSCEPTIBILITY_LABELS[code]] for code in sorted(SUSCEPTIBILITY_LABELS)], dtype=float)
+
+
+@lru_cache(maxsize=None)
+def susceptibility_bands():
+    """
+    Bands below the Nelson curve (htha_susceptibility_data.json), most
+    severe first, as (codes, deg F below the curve). The open-ended band
+    is left out; margins below every band get NONE.
+    """
+    codes = {label: code for code, label in SUSCEPTIBILITY_LABELS.items()}
+    bands = [
+        (codes[row['susceptibility']], float(row['below_curve_f']))
+        for row in load_json(HTHA_DATA / 'htha_susceptibility_data.json')
+        if row['below_curve_f'] is not None
+    ]
+    bands.sort(key=lambda band: band[1])
+    return tuple(code for code, _ in bands), np.array([below for _, below in bands])
+
+
+@lru_cache(maxsize=None)
+def nelson_curves():
+    """
+    Per-material curve arrays.
+
+    Returns (materials, curves, config) where curves[i] is a (pressures,
+    temperatures) pair for materials[i], or None for a material that is
+    not susceptible. Aliased materials share their target's arrays.
+    """
+    config = load_json(HTHA_DATA / 'htha_nelson_curves.json')
+    points = dict(config['curves'])
+    points.update({alias: config['curves'][target] for alias, target in config.get('aliases', {}).items()})
+    materials = tuple(points)
+    curves = tuple(
+        None if curve is None else (
+            np.array([p['p'] for p in curve], dtype=float),
+            np.array([p['t'] for p in curve], dtype=float),
+        )
+        for curve in points.values()
+    )
+    return materials, curves, config
+
+
+def browser_tables():
+    """The curve, band and DF tables for htha.js, rendered with json_script."""
+    return {
+        'curves': load_json(HTHA_DATA / 'htha_nelson_curves.json'),
+        'susceptibility': load_json(HTHA_DATA / 'htha_susceptibility_data.json'),
+        'damage_factors': load_json(HTHA_DATA / 'htha_df_data.json'),
+    }
+
+
+def curve_limit_temperature(material, h2_pressure_psia):
+    """
+    Nelson curve temperature limit (deg F) at each component's H2 partial
+    pressure. Immune materials give +inf; unknown materials fall back to
+    the conservative default limit.
+    """
+    materials, curves, config = nelson_curves()
+    material = np.asarray(material, dtype=object)
+    limit = np.full(len(material), float(config['default_limit_f']))
+    for name, curve in zip(materials, curves):
+        rows = material == name
+        if not rows.any():
+            continue
+        if curve is None:
+            limit[rows] = np.inf
+        else:
+            limit[rows] = np.interp(h2_pressure_psia[rows], *curve)
+    return limit
+
+
+def htha_susceptibility(material, temp_f, h2_pressure_psia, damage_observed, material_verified):
+    """
+    Susceptibility codes and the margin to the Nelson curve (deg F,
+    positive above the curve).
+
+    Carbon and C-0.5Mo steels with verified metallurgy use the screening
+    thresholds alone; everything else is ranked by its margin to the curve.
+    """
+    _, _, config = nelson_curves()
+    screening = config['screening']
+    codes, below_curve = susceptibility_bands()
+
+    material = np.asarray(material, dtype=object)
+    temp_f = np.nan_to_num(np.asarray(temp_f, dtype=float))
+    pressure = np.nan_to_num(np.asarray(h2_pressure_psia, dtype=float))
+    screened_in = (temp_f >= screening['min_temperature_f']) & (pressure >= screening['min_h2_partial_pressure_psia'])
+
+    margin = temp_f - curve_limit_temperature(material, pressure)
+    by_curve = np.select([margin >= -below for below in below_curve], codes, NONE)
+    threshold = np.isin(material, config['threshold_materials']) & material_verified
+    result = np.where(threshold, HIGH, by_curve)
+
+    has_material = np.array([isinstance(m, str) and bool(m) for m in material], dtype=bool)
+    result = np.where(screened_in & has_material, result, NONE)
+    result = np.where(damage_observed, DAMAGE_OBSERVED, result)
+    return result, margin
+
+
+@dataclass
+class HTHAResult:
+    margin_f: np.ndarray        # (N,) temperature above the Nelson curve
+    susceptibility: np.ndarray  # (N,) codes
+    damage_factor: np.ndarray   # (N,) NaN where the mechanism is inactive
+
+
+COMPONENT_FIELDS = (
+    'mechanism_htha_active',
+    'htha_material',
+    'operating_temp_f',
+    'htha_h2_partial_pressure_psia',
+    'htha_damage_observed',
+    'htha_material_verification',
+)
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Run the HTHA evaluation for every component in `queryset`.
+
+    Returns (pks, HTHAResult). `today` is accepted for symmetry with the
+    other engines; the tabulated DF does not depend on time in service.
+    """
+    return evaluate_columns(load_columns(queryset, COMPONENT_FIELDS))
+
+
+def evaluate_columns(cols):
+    """evaluate_components() on columns that are already loaded."""
+    susceptibility, margin = htha_susceptibility(
+        cols['htha_material'],
+        cols['operating_temp_f'],
+        cols['htha_h2_partial_pressure_psia'],
+        cols['htha_damage_observed'],
+        cols['htha_material_verification'],
+    )
+    df = damage_factor_table()[susceptibility]
+    df = np.where(np.asarray(cols['mechanism_htha_active'], dtype=bool), df, np.nan)
+    return cols['pk'], HTHAResult(margin_f=margin, susceptibility=susceptibility, damage_factor=df)
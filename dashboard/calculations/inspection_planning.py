@@ -0,0 +1,202 @@
+"""
+Inspection Planning (API 581 Part 1, Section 4.4)
+
+Server-side counterpart of static/dashboard/js/calculations/inspection_planning.js.
+The total DF is projected for N components over a grid of future ages in
+one pass: the time-dependent engines (thinning, SCC, external damage) are
+evaluated on their columns repeated once per grid point, the HTHA and
+brittle fracture DFs are constant in time. The date each component
+reaches its DF or risk target is bracketed on the grid and refined with a
+vectorized bisection.
+"""
+import datetime
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import brittle_fracture, external_damage, htha, scc, thinning
+from .common import DAYS_PER_YEAR, load_columns, nan_max
+
+# inspection_planning.js defaults
+DEFAULT_TARGET_DF = 100.0
+DEFAULT_GFF = 3.06e-5
+DEFAULT_FMS = 1.0
+MIN_DAMAGE_FACTOR = 1.0
+MAX_POF = 1.0
+FT2_TO_M2 = 0.092903
+
+DEFAULT_HORIZON_YEARS = 30.0
+DEFAULT_STEP_YEARS = 1.0
+DEFAULT_TOLERANCE_DAYS = 1.0
+
+RISK_FIELDS = ('gff_value', 'fms_factor', 'calculated_consequence_area')
+
+
+@dataclass
+class PlanningInputs:
+    pks: np.ndarray
+    thinning: dict              # thinning.COMPONENT_FIELDS columns
+    inspection_counts: np.ndarray
+    scc: dict                   # scc.COMPONENT_FIELDS columns
+    external: dict              # external_damage.COMPONENT_FIELDS columns
+    constant_df: np.ndarray     # (N,) governing HTHA / brittle fracture DF
+    risk: dict                  # RISK_FIELDS columns
+
+    def take(self, rows):
+        """The same inputs restricted to `rows`."""
+        def pick(columns):
+            return {field: values[rows] for field, values in columns.items()}
+
+        return PlanningInputs(
+            pks=self.pks[rows],
+            thinning=pick(self.thinning),
+            inspection_counts=self.inspection_counts[rows],
+            scc=pick(self.scc),
+            external=pick(self.external),
+            constant_df=self.constant_df[rows],
+            risk=pick(self.risk),
+        )
+
+
+def load_inputs(queryset):
+    """Load every column the projection needs, once per engine."""
+    _, hydrogen = htha.evaluate_components(queryset)
+    _, brittle = brittle_fracture.evaluate_components(queryset)
+    cols = load_columns(queryset, thinning.COMPONENT_FIELDS)
+    return PlanningInputs(
+        pks=cols['pk'],
+        thinning=cols,
+        inspection_counts=thinning.inspection_counts_for(cols['pk']),
+        scc=load_columns(queryset, scc.COMPONENT_FIELDS),
+        external=load_columns(queryset, external_damage.COMPONENT_FIELDS),
+        constant_df=nan_max(hydrogen.damage_factor, brittle.damage_factor),
+        risk=load_columns(queryset, RISK_FIELDS),
+    )
+
+
+def _repeat(columns, times):
+    return {field: np.repeat(values, times, axis=0) for field, values in columns.items()}
+
+
+def projected_total_df(inputs, years_ahead, today=None):
+    """
+    Total DF `years_ahead` from `today`, combined like the stored
+    calculated_total_damage_factor (governing DF across mechanism groups).
+
+    `years_ahead` is (N,) for one offset per component or (N, T) for a
+    grid; the result has the same shape. Components without an active
+    mechanism get MIN_DAMAGE_FACTOR, as in calculateRisk().
+    """
+    years_ahead = np.asarray(years_ahead, dtype=float)
+    grid = years_ahead.reshape(len(inputs.pks), -1)
+    times = grid.shape[1]
+    offsets = grid.reshape(-1)
+
+    _, thin, _ = thinning.evaluate_columns(
+        _repeat(inputs.thinning, times), np.repeat(inputs.inspection_counts, times, axis=0), today, offsets,
+    )
+    _, cracking, _ = scc.evaluate_columns(_repeat(inputs.scc, times), today, offsets)
+    _, outside, _ = external_damage.evaluate_columns(_repeat(inputs.external, times), today, offsets)
+
+    total = nan_max(
+        thin.governing_df, cracking.governing_df, outside.governing_df, np.repeat(inputs.constant_df, times),
+    )
+    return np.fmax(total, MIN_DAMAGE_FACTOR).reshape(years_ahead.shape)
+
+
+def projected_risk(inputs, total_df):
+    """
+    Area risk (m2/yr) = min(GFF x FMS x DF, 1) x CA, with the consequence
+    area stored in ft2. NaN where no consequence area has been calculated.
+    """
+    gff = np.where(np.isnan(inputs.risk['gff_value']), DEFAULT_GFF, inputs.risk['gff_value'])
+    fms = np.where(np.isnan(inputs.risk['fms_factor']), DEFAULT_FMS, inputs.risk['fms_factor'])
+    area_m2 = inputs.risk['calculated_consequence_area'] * FT2_TO_M2
+    shape = (-1,) + (1,) * (np.ndim(total_df) - 1)
+    pof = np.minimum((gff * fms).reshape(shape) * total_df, MAX_POF)
+    return pof * area_m2.reshape(shape)
+
+
+def _projection(inputs, years_ahead, today, target_risk):
+    total_df = projected_total_df(inputs, years_ahead, today)
+    return total_df, (projected_risk(inputs, total_df) if target_risk is not None else total_df)
+
+
+def solve_crossing(evaluate, grid, values, target, tolerance_years):
+    """
+    Years until `values` first reaches `target`, per row.
+
+    `values` is (N, T) over the ascending `grid`; the first grid interval
+    that crosses the target is bisected with `evaluate(rows, years)`
+    (vectorized over the rows still bracketing) until it is narrower than
+    `tolerance_years`. Rows already at the target give 0, rows that never
+    reach it within the grid give NaN.
+    """
+    reached = values >= target
+    first = np.argmax(reached, axis=1)
+    result = np.full(len(values), np.nan)
+    result[reached[:, 0]] = 0.0
+
+    rows = np.flatnonzero(reached.any(axis=1) & (first > 0))
+    if not len(rows):
+        return result
+    low, high = grid[first[rows] - 1], grid[first[rows]]
+    iterations = int(np.ceil(np.log2(max((high - low).max() / tolerance_years, 1.0))))
+    for _ in range(iterations):
+        middle = (low + high) / 2.0
+        above = evaluate(rows, middle) >= target
+        high = np.where(above, middle, high)
+        low = np.where(above, low, middle)
+    result[rows] = high
+    return result
+
+
+@dataclass
+class InspectionPlan:
+    ages: np.ndarray            # (T,) years ahead of today on the projection grid
+    total_df: np.ndarray        # (N, T) projected total DF
+    risk: np.ndarray            # (N, T) projected area risk, m2/yr
+    years_to_target: np.ndarray  # (N,) NaN where the target is not reached within the horizon
+    due_dates: np.ndarray       # (N,) next inspection date, None where the risk is unknown
+
+
+def plan_inspections(queryset, target_df=None, target_risk=None, today=None,
+                     horizon_years=DEFAULT_HORIZON_YEARS, step_years=DEFAULT_STEP_YEARS,
+                     tolerance_days=DEFAULT_TOLERANCE_DAYS):
+    """
+    Project the total DF of every component in `queryset` and solve for
+    the date it reaches the target: `target_risk` (m2/yr) when given,
+    otherwise `target_df` (DEFAULT_TARGET_DF by default).
+
+    Returns (pks, InspectionPlan). Components that stay below the target
+    are due at the end of the horizon; components already above it are
+    due today.
+    """
+    today = today or datetime.date.today()
+    target = target_risk if target_risk is not None else (target_df or DEFAULT_TARGET_DF)
+    inputs = load_inputs(queryset)
+    n = len(inputs.pks)
+
+    ages = np.arange(0.0, horizon_years + step_years / 2.0, step_years)
+    if not n:
+        empty = np.empty((0, len(ages)))
+        return inputs.pks, InspectionPlan(ages, empty, empty, np.empty(0), np.empty(0, dtype=object))
+    total_df, values = _projection(inputs, np.broadcast_to(ages, (n, len(ages))), today, target_risk)
+
+    def evaluate(rows, years):
+        return _projection(inputs.take(rows), years, today, target_risk)[1]
+
+    years = solve_crossing(evaluate, ages, values, target, tolerance_days / DAYS_PER_YEAR)
+    due_years = np.where(np.isnan(years), ages[-1], years)
+    due_dates = np.array([
+        today + datetime.timedelta(days=int(round(y * DAYS_PER_YEAR))) if known else None
+        for y, known in zip(due_years, ~np.isnan(values[:, 0]))
+    ], dtype=object)
+
+    return inputs.pks, InspectionPlan(
+        ages=ages,
+        total_df=total_df,
+        risk=projected_risk(inputs, total_df),
+        years_to_target=years,
+        due_dates=due_dates,
+    )
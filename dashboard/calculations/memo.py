@@ -0,0 +1,234 @@
+"""
+Input-hash memoization for the damage factor engines.
+
+Every engine result for a component is keyed by a digest of exactly the
+columns that engine reads (its COMPONENT_FIELDS, plus the inspection
+counts for thinning), salted with the version of the reference tables it
+uses. Rows with an active time-dependent mechanism also hash the
+evaluation date; rows without one give the same (all NaN) result on any
+date. Results live in a process-wide LRU cache bounded by
+settings.RBI_MEMO_CACHE_SIZE entries, and a table-version bump drops the
+engine's stale entries. Only the rows that miss are evaluated.
+"""
+import datetime
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+
+from . import brittle_fracture, external_damage, htha, scc, thinning
+from .common import row_digests
+from .tables import table_version
+
+DEFAULT_CACHE_SIZE = 100_000
+
+# engine -> (module, active flags of its time-dependent mechanisms)
+ENGINES = {
+    'thinning': (thinning, tuple(flag for flag, _ in thinning.THINNING_MECHANISMS.values())),
+    'scc': (scc, tuple(flag for flag, _ in scc.SCC_MECHANISMS.values())),
+    'external': (external_damage, tuple(external_damage.EXTERNAL_MECHANISMS.values())),
+    'htha': (htha, ()),
+    'brittle_fracture': (brittle_fracture, ()),
+}
+
+
+def mechanism_keys(engine):
+    """DamageFactorResult.mechanism keys produced by `engine`, in column order."""
+    if engine == 'thinning':
+        return tuple(f'thinning_{key}' for key in thinning.THINNING_MECHANISMS)
+    if engine == 'scc':
+        return tuple(f'scc_{key}' for key in scc.SCC_MECHANISMS)
+    if engine == 'external':
+        return tuple(external_damage.EXTERNAL_MECHANISMS)
+    return (engine,)
+
+
+def engine_salt(engine):
+    """Engine name and the version of its reference tables."""
+    module, _ = ENGINES[engine]
+    return f'{engine}:{table_version(module.REFERENCE_TABLES)}'
+
+
+def input_hashes(engine, cols, today=None, inspection_counts=None):
+    """(N,) memo key of each row of loaded `engine` columns."""
+    _, flags = ENGINES[engine]
+    inputs = dict(cols)
+    if inspection_counts is not None:
+        inputs['inspection_counts'] = inspection_counts
+    if flags:
+        active = np.zeros(len(cols['pk']), dtype=bool)
+        for flag in flags:
+            active |= np.asarray(cols[flag], dtype=bool)
+        evaluated = (today or datetime.date.today()).isoformat()
+        inputs['evaluation_date'] = np.where(active, evaluated, None).astype(object)
+    return row_digests(inputs, engine_salt(engine))
+
+
+@dataclass
+class EngineResult:
+    keys: tuple                 # (M,) mechanism keys
+    base_df: np.ndarray         # (N, M)
+    final_df: np.ndarray        # (N, M) NaN where the mechanism is inactive
+    susceptibility: np.ndarray  # (N, M) label, None where the mechanism has none
+    values: dict                # Component field -> (N,) intermediate values
+    input_hash: np.ndarray      # (N,) memo key of each row
+
+    @property
+    def governing_df(self):
+        """Largest final DF across the engine's mechanisms (NaN where none is active)."""
+        result = np.full(self.final_df.shape[0], np.nan)
+        valid = ~np.isnan(self.final_df).all(axis=1)
+        result[valid] = np.nanmax(self.final_df[valid], axis=1)
+        return result
+
+    def rows(self):
+        """One cache entry per component."""
+        return [
+            (self.base_df[i], self.final_df[i], self.susceptibility[i], {f: v[i] for f, v in self.values.items()})
+            for i in range(len(self.input_hash))
+        ]
+
+    @classmethod
+    def from_rows(cls, keys, entries, input_hash, value_fields=()):
+        m = len(keys)
+        if not entries:
+            empty = np.empty((0, m))
+            return cls(keys, empty, empty, np.empty((0, m), dtype=object),
+                       {f: np.empty(0) for f in value_fields}, input_hash)
+        return cls(
+            keys=keys,
+            base_df=np.vstack([e[0] for e in entries]),
+            final_df=np.vstack([e[1] for e in entries]),
+            susceptibility=np.vstack([e[2] for e in entries]).astype(object),
+            values={f: np.array([e[3][f] for e in entries], dtype=float) for f in value_fields},
+            input_hash=input_hash,
+        )
+
+
+def _labels(codes, labels):
+    return np.array([labels.get(int(code)) for code in np.ravel(codes)], dtype=object).reshape(np.shape(codes))
+
+
+def _evaluate(engine, cols, today, inspection_counts):
+    keys, base, final, labels, values = _run(engine, cols, today, inspection_counts)
+    # Inactive mechanisms keep no base DF, so their rows do not depend on the date
+    return keys, np.where(np.isnan(final), np.nan, base), final, labels, values
+
+
+def _run(engine, cols, today, inspection_counts):
+    n = len(cols['pk'])
+    keys = mechanism_keys(engine)
+    no_label = np.full((n, len(keys)), None, dtype=object)
+    if engine == 'thinning':
+        _, result, _ = thinning.evaluate_columns(cols, inspection_counts, today)
+        return keys, result.base_df, result.final_df, no_label, {}
+    if engine == 'scc':
+        _, result, _ = scc.evaluate_columns(cols, today)
+        return keys, result.base_df, result.final_df, _labels(result.susceptibility, scc.SUSCEPTIBILITY_LABELS), {}
+    if engine == 'external':
+        _, result, _ = external_damage.evaluate_columns(cols, today)
+        clscc = _labels(result.clscc_susceptibility, scc.SUSCEPTIBILITY_LABELS)
+        labels = np.column_stack([clscc if key.endswith('clscc') else no_label[:, 0] for key in keys]) \
+            if n else no_label
+        values = {
+            'external_corrosion_rate_mpy': result.external_rate,
+            'cui_corrosion_rate_mpy': result.cui_rate,
+        }
+        return keys, result.base_dfs, result.damage_factors, labels, values
+    if engine == 'htha':
+        _, result = htha.evaluate_columns(cols)
+        labels = _labels(result.susceptibility, htha.SUSCEPTIBILITY_LABELS)
+        return keys, result.damage_factor[:, None], result.damage_factor[:, None], labels[:, None], {}
+    _, result = brittle_fracture.evaluate_columns(cols)
+    return keys, result.df_brittle[:, None], result.damage_factor[:, None], no_label, {}
+
+
+# Intermediate values each engine returns alongside its DFs
+VALUE_FIELDS = {'external': ('external_corrosion_rate_mpy', 'cui_corrosion_rate_mpy')}
+
+
+class MemoCache:
+    """Bounded LRU of engine results keyed by (engine, input hash)."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._salts = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expire(self, engine, salt):
+        if self._salts.get(engine, salt) != salt:
+            for key in [key for key in self._entries if key[0] == engine]:
+                del self._entries[key]
+        self._salts[engine] = salt
+
+    def lookup(self, engine, salt, hashes):
+        """Cached entry per hash, None where it is missing."""
+        self._expire(engine, salt)
+        found = []
+        for digest in hashes:
+            entry = self._entries.get((engine, digest))
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end((engine, digest))
+                self.hits += 1
+            found.append(entry)
+        return found
+
+    def store(self, engine, salt, hashes, entries):
+        self._expire(engine, salt)
+        for digest, entry in zip(hashes, entries):
+            self._entries[(engine, digest)] = entry
+            self._entries.move_to_end((engine, digest))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self._salts.clear()
+        self.hits = self.misses = 0
+
+
+_cache = None
+
+
+def cache():
+    """The process-wide MemoCache."""
+    global _cache
+    if _cache is None:
+        _cache = MemoCache(getattr(settings, 'RBI_MEMO_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+    return _cache
+
+
+def evaluate(engine, cols, today=None, inspection_counts=None, memo=None, hashes=None):
+    """
+    Evaluate `engine` on loaded columns, reusing cached rows.
+
+    `inspection_counts` is required for thinning and `hashes` may carry
+    input_hashes() already computed for the same columns. Pass memo=False
+    to bypass the cache. Returns an EngineResult aligned with cols['pk'].
+    """
+    memo = None if memo is False else (cache() if memo is None else memo)
+    salt = engine_salt(engine)
+    if hashes is None:
+        hashes = input_hashes(engine, cols, today, inspection_counts)
+    value_fields = VALUE_FIELDS.get(engine, ())
+
+    entries = memo.lookup(engine, salt, hashes) if memo is not None else [None] * len(hashes)
+    missing = np.array([i for i, entry in enumerate(entries) if entry is None], dtype=np.int64)
+    if len(missing):
+        subset = {field: values[missing] for field, values in cols.items()}
+        counts = inspection_counts[missing] if inspection_counts is not None else None
+        keys, base, final, labels, values = _evaluate(engine, subset, today, counts)
+        fresh = EngineResult(keys, base, final, labels, values, hashes[missing]).rows()
+        if memo is not None:
+            memo.store(engine, salt, hashes[missing], fresh)
+        for i, entry in zip(missing, fresh):
+            entries[i] = entry
+    return EngineResult.from_rows(mechanism_keys(engine), entries, hashes, value_fields)
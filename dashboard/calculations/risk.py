@@ -0,0 +1,139 @@
+"""
+Component Risk (API 581 Part 1, Section 4)
+
+Chains the damage factor, consequence and FMS stages for a set of
+components and derives the stored risk results: final_pof = min(GFF x FMS
+x DF, 1), area risk = final_pof x CA, the financial COF and both matrix
+categories. evaluate_chunk() works on plain component ids and returns
+plain arrays, so chunks of a large register can be evaluated in worker
+processes and written back by the caller.
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import financial, risk_matrix
+from .common import load_columns
+from .inspection_planning import DEFAULT_FMS, DEFAULT_GFF, FT2_TO_M2, MAX_POF, MIN_DAMAGE_FACTOR
+
+COMPONENT_FIELDS = ('gff_value', 'fms_factor')
+
+# Stored stage outputs the risk results are derived from (evaluate_stored())
+STORED_FIELDS = COMPONENT_FIELDS + (
+    'calculated_total_damage_factor',
+    'calculated_consequence_area',
+    'calculated_cof',
+)
+
+# Component fields written by the risk stage alone
+RISK_FIELDS = ('final_pof', 'calculated_risk', 'pof_category', 'cof_category')
+
+# Component fields written from a RiskResult
+RESULT_FIELDS = (
+    'calculated_total_damage_factor',
+    'calculated_consequence_area',
+    'final_pof',
+    'calculated_risk',
+    'calculated_cof',
+    'pof_category',
+    'cof_category',
+)
+
+STAGES = ('damage_factors', 'consequences', 'risk')
+
+
+@dataclass
+class RiskResult:
+    total_df: np.ndarray            # (N,) governing DF, NaN where no mechanism is active
+    consequence_area: np.ndarray    # (N,) ft2, NaN where unknown
+    final_pof: np.ndarray           # (N,) GFF x FMS x DF, capped at 1
+    risk: np.ndarray                # (N,) m2/yr, NaN where the consequence area is unknown
+    financial_cof: np.ndarray       # (N,) USD, NaN where unknown
+    pof_category: np.ndarray        # (N,) Table 4.2 category 1-5
+    cof_category: np.ndarray        # (N,) 'A'-'E', None where unknown
+
+
+@contextmanager
+def timed(timings, stage):
+    """Add the wall time of the block to timings[stage]."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+def evaluate_components(queryset, today=None, timings=None):
+    """
+    Evaluate every stage for the components in `queryset`.
+
+    Returns (pks, RiskResult). A missing GFF or FMS uses the inspection
+    planning defaults; the FMS is the stored fms_factor, which the
+    facility audit keeps up to date. Stage wall times are added to
+    `timings` when given.
+    """
+    from .batch import evaluate_damage_factors
+
+    timings = {} if timings is None else timings
+    with timed(timings, 'damage_factors'):
+        pks, _, total, _, _ = evaluate_damage_factors(queryset, today=today)
+    with timed(timings, 'consequences'):
+        _, areas, costs = financial.evaluate_components(queryset, today)
+    with timed(timings, 'risk'):
+        cols = load_columns(queryset, COMPONENT_FIELDS)
+        result = risk_result(total, areas.consequence_area, costs.financial_cof, cols['gff_value'], cols['fms_factor'])
+    return pks, result
+
+
+def risk_result(total_df, consequence_area, financial_cof, gff, fms):
+    """RiskResult of evaluated DFs and consequences; a missing GFF or FMS uses the inspection planning defaults."""
+    gff = np.where(np.isnan(gff), DEFAULT_GFF, gff)
+    fms = np.where(np.isnan(fms), DEFAULT_FMS, fms)
+    df = np.fmax(np.nan_to_num(total_df, nan=MIN_DAMAGE_FACTOR), MIN_DAMAGE_FACTOR)
+    final_pof = np.minimum(gff * fms * df, MAX_POF)
+    return RiskResult(
+        total_df=total_df,
+        consequence_area=consequence_area,
+        final_pof=final_pof,
+        risk=final_pof * consequence_area * FT2_TO_M2,
+        financial_cof=financial_cof,
+        pof_category=risk_matrix.pf_to_pof_category(final_pof),
+        cof_category=risk_matrix.financial_cof_category(financial_cof),
+    )
+
+
+def evaluate_stored(queryset):
+    """
+    Risk results from the stored stage outputs (total DF, consequence
+    area, financial COF and FMS factor) without re-evaluating any stage.
+    Returns (pks, RiskResult).
+    """
+    cols = load_columns(queryset, STORED_FIELDS)
+    return cols['pk'], risk_result(
+        cols['calculated_total_damage_factor'],
+        cols['calculated_consequence_area'],
+        cols['calculated_cof'],
+        cols['gff_value'],
+        cols['fms_factor'],
+    )
+
+
+def evaluate_chunk(pks, today=None):
+    """
+    Process-pool entry point: evaluate the components with ids `pks`.
+    Returns (pks, RiskResult, {stage: seconds}).
+    """
+    from ..models import Component
+
+    timings = {}
+    pks, result = evaluate_components(Component.objects.filter(pk__in=list(pks)).order_by('pk'), today, timings)
+    return pks, result, timings
+
+
+def init_worker():
+    """Process-pool initializer: set Django up in a freshly spawned worker."""
+    import django
+
+    django.setup()
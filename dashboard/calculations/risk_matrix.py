@@ -0,0 +1,216 @@
+"""
+Risk Matrix Classification (API 580 / API 581 Part 1)
+
+Server-side counterpart of static/dashboard/js/calculations/risk_matrix.js.
+Every component is placed in the 5x5 matrix from its probability category
+(1-5) and consequence category (A-E); the risk level is banded from the
+sum of the two indices, exactly as `calculateRiskLevel` does.
+
+The classification is available twice: as vectorized NumPy functions for
+the batch engines, and as ORM expressions (CASE over final_pof /
+calculated_cof / calculated_consequence_area) so views can group, filter
+and rank a whole register by risk cell inside the database.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Case, CharField, Count, F, IntegerField, Value, When
+
+# dfToPofCategory: Df < 10 -> 1, < 100 -> 2, < 1000 -> 3, otherwise 4
+DF_POF_BOUNDS = (10.0, 100.0, 1000.0)
+
+# API 581 Part 1 Table 4.2: upper Pf (failures/year) of categories 1-4
+PF_POF_BOUNDS = (3.06e-5, 3.06e-4, 3.06e-3, 3.06e-2)
+
+# API 580 Table 5.1: financial consequence (USD) lower bounds of B-E
+FC_COF_BOUNDS = (1e4, 1e5, 1e6, 1e7)
+
+# Consequence area (ft2) lower bounds of B-E
+CA_COF_BOUNDS_FT2 = (1000.0, 5000.0, 15000.0, 40000.0)
+
+COF_CATEGORIES = ('A', 'B', 'C', 'D', 'E')
+
+# Upper risk score (POF + COF index) of low, medium and medium-high
+RISK_SCORE_BOUNDS = (3, 5, 7)
+RISK_LEVELS = ('low', 'medium', 'medium-high', 'high')
+RISK_PRIORITIES = {
+    'high': 'Priority 1 - Immediate Action Required',
+    'medium-high': 'Priority 2 - Mitigation Required',
+    'medium': 'Priority 3 - Monitor',
+    'low': 'Priority 4 - Acceptable',
+}
+
+PROBABILITY_METRICS = {'pf': 'final_pof', 'df': 'calculated_total_damage_factor'}
+CONSEQUENCE_METRICS = {'fc': 'calculated_cof', 'ca': 'calculated_consequence_area'}
+DEFAULT_PROBABILITY_METRIC = 'pf'
+DEFAULT_CONSEQUENCE_METRIC = 'fc'
+
+
+# =============================================================================
+# VECTORIZED
+# =============================================================================
+
+def df_to_pof_category(df):
+    """dfToPofCategory: 1-4 from the total Df; 0 where Df is zero or unknown."""
+    df = np.asarray(df, dtype=float)
+    category = np.searchsorted(DF_POF_BOUNDS, np.nan_to_num(df), side='right') + 1
+    return np.where(df > 0, category, 0)
+
+
+def pf_to_pof_category(pf):
+    """Table 4.2 probability category 1-5; 0 where Pf is zero or unknown."""
+    pf = np.asarray(pf, dtype=float)
+    category = np.searchsorted(PF_POF_BOUNDS, np.nan_to_num(pf), side='left') + 1
+    return np.where(pf > 0, category, 0)
+
+
+def _cof_category(values, bounds):
+    values = np.asarray(values, dtype=float)
+    category = np.array(COF_CATEGORIES, dtype=object)[
+        np.searchsorted(bounds, np.nan_to_num(values), side='right')
+    ]
+    return np.where(np.isnan(values), None, category)
+
+
+def financial_cof_category(fc):
+    """calculateCOFCategory: A-E from the financial COF; None where unknown."""
+    return _cof_category(fc, FC_COF_BOUNDS)
+
+
+def consequence_area_category(area_ft2):
+    """calculateCACategory: A-E from the consequence area; None where unknown."""
+    return _cof_category(area_ft2, CA_COF_BOUNDS_FT2)
+
+
+def cof_index(categories):
+    """A-E as 1-5; 0 for blank or unknown categories."""
+    lookup = {c: i + 1 for i, c in enumerate(COF_CATEGORIES)}
+    return np.array([lookup.get(c, 0) for c in np.asarray(categories, dtype=object)], dtype=np.int64)
+
+
+def risk_level(pof, cof):
+    """
+    calculateRiskLevel over arrays of POF categories and COF indices.
+    Components missing either axis (0) get None instead of 'low'.
+    """
+    pof = np.asarray(pof, dtype=np.int64)
+    cof = np.asarray(cof, dtype=np.int64)
+    level = np.array(RISK_LEVELS, dtype=object)[np.searchsorted(RISK_SCORE_BOUNDS, pof + cof, side='left')]
+    return np.where((pof > 0) & (cof > 0), level, None)
+
+
+@dataclass
+class RiskClassification:
+    pof_category: np.ndarray    # (N,) 1-5 (1-4 on Df), 0 where unknown
+    cof_category: np.ndarray    # (N,) 'A'-'E', None where unknown
+    score: np.ndarray           # (N,) POF + COF index, 0 where either is unknown
+    level: np.ndarray           # (N,) RISK_LEVELS entry, None where unknown
+
+
+def classify(probability, consequence, probability_metric=DEFAULT_PROBABILITY_METRIC,
+             consequence_metric=DEFAULT_CONSEQUENCE_METRIC):
+    """
+    Place components in the matrix from raw probability (Pf or Df) and
+    consequence (FC in USD or CA in ft2) values.
+    """
+    pof = (df_to_pof_category if probability_metric == 'df' else pf_to_pof_category)(probability)
+    cof = (consequence_area_category if consequence_metric == 'ca' else financial_cof_category)(consequence)
+    index = cof_index(cof)
+    known = (pof > 0) & (index > 0)
+    return RiskClassification(
+        pof_category=pof,
+        cof_category=cof,
+        score=np.where(known, pof + index, 0),
+        level=risk_level(pof, index),
+    )
+
+
+# =============================================================================
+# ORM EXPRESSIONS
+# =============================================================================
+
+def _bands(field, lookup, bounds, values, default, fallback):
+    whens = [When(**{f'{field}__isnull': True}, then=fallback)]
+    whens += [When(**{f'{field}__{lookup}': Decimal(repr(b))}, then=Value(v)) for b, v in zip(bounds, values)]
+    return Case(*whens, default=Value(default), output_field=IntegerField())
+
+
+def pof_category_expression(metric=DEFAULT_PROBABILITY_METRIC):
+    """
+    Probability category as a CASE expression. Components without a
+    calculated Pf / Df (null or zero) fall back to the stored pof_category.
+    """
+    field = PROBABILITY_METRICS[metric]
+    stored = F('pof_category')
+    if metric == 'df':
+        expression = _bands(field, 'lt', DF_POF_BOUNDS, (1, 2, 3), 4, stored)
+    else:
+        expression = _bands(field, 'lte', PF_POF_BOUNDS, (1, 2, 3, 4), 5, stored)
+    return Case(When(**{f'{field}__lte': 0}, then=stored), default=expression, output_field=IntegerField())
+
+
+def cof_index_expression(metric=DEFAULT_CONSEQUENCE_METRIC):
+    """
+    Consequence category as a 1-5 CASE expression (A=1 ... E=5). Components
+    without a calculated FC / CA fall back to the stored cof_category.
+    """
+    stored = Case(
+        *[When(cof_category=c, then=Value(i + 1)) for i, c in enumerate(COF_CATEGORIES)],
+        default=None, output_field=IntegerField(),
+    )
+    bounds = FC_COF_BOUNDS if metric == 'fc' else CA_COF_BOUNDS_FT2
+    return _bands(CONSEQUENCE_METRICS[metric], 'lt', bounds, (1, 2, 3, 4), 5, stored)
+
+
+def cof_category_expression(index='risk_cof_index'):
+    """A-E label for an annotated COF index."""
+    return Case(
+        *[When(**{index: i + 1}, then=Value(c)) for i, c in enumerate(COF_CATEGORIES)],
+        default=None, output_field=CharField(max_length=1),
+    )
+
+
+def risk_level_expression(score='risk_score'):
+    """calculateRiskLevel banding of an annotated risk score (null stays null)."""
+    whens = [When(**{f'{score}__isnull': True}, then=Value(None))]
+    whens += [When(**{f'{score}__lte': b}, then=Value(level)) for b, level in zip(RISK_SCORE_BOUNDS, RISK_LEVELS)]
+    return Case(*whens, default=Value(RISK_LEVELS[-1]), output_field=CharField(max_length=11))
+
+
+def annotate_risk(queryset, probability_metric=DEFAULT_PROBABILITY_METRIC,
+                  consequence_metric=DEFAULT_CONSEQUENCE_METRIC):
+    """
+    Annotate a Component queryset with its matrix cell:
+    risk_pof (1-5), risk_cof_index (1-5), risk_cof (A-E), risk_score and
+    risk_level. The annotations can be filtered, grouped and ordered on.
+    """
+    return queryset.annotate(
+        risk_pof=pof_category_expression(probability_metric),
+        risk_cof_index=cof_index_expression(consequence_metric),
+    ).annotate(
+        risk_cof=cof_category_expression(),
+        risk_score=F('risk_pof') + F('risk_cof_index'),
+    ).annotate(
+        risk_level=risk_level_expression(),
+    )
+
+
+def risk_cell_counts(queryset, **metrics):
+    """{(pof, cof letter): component count} grouped in the database."""
+    rows = (
+        annotate_risk(queryset, **metrics)
+        .filter(risk_pof__isnull=False, risk_cof__isnull=False)
+        .values('risk_pof', 'risk_cof')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    return {(row['risk_pof'], row['risk_cof']): row['count'] for row in rows}
+
+
+def risk_level_counts(queryset, **metrics):
+    """{risk level: component count} for every level, unclassified under None."""
+    rows = annotate_risk(queryset, **metrics).values('risk_level').annotate(count=Count('pk')).order_by()
+    counts = dict.fromkeys(RISK_LEVELS + (None,), 0)
+    counts.update({row['risk_level']: row['count'] for row in rows})
+    return counts
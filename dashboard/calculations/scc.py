@@ -0,0 +1,473 @@
+"""
+Stress Corrosion Cracking Damage Factors (API 581 Part 2, Annex 2.C)
+
+Vectorized port of the SCC calculators in
+static/dashboard/js/calculations/formula_app_adapter.js (caustic, amine,
+SSC, HIC/SOHIC-H2S, ACSCC, PASCC, ClSCC and HSC-HF).
+
+Every mechanism follows the same pipeline:
+
+    susceptibility -> severity index (SVI) -> inspection effectiveness
+    (2:1 rule) -> base DF (Table 2.C.1.3) -> final DF (Equation 2.C.3)
+
+Susceptibilities are carried as small integer codes so the lookups are
+plain array indexing instead of string comparisons.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .common import age_years, load_columns
+from .tables import DASHBOARD_JSON, FORMULA_APP_DATA, FORMULA_APP_JSON, formula_table, load_json
+
+# Table files read by this engine (memo cache version)
+REFERENCE_TABLES = (
+    DASHBOARD_JSON / 'scc_severity_index.json',
+    DASHBOARD_JSON / 'scc_base_damage_factor.json',
+    DASHBOARD_JSON / 'scc_caustic_chart.json',
+    FORMULA_APP_DATA / 'scc_ssc_environmental_severity.json',
+    FORMULA_APP_DATA / 'scc_ssc_susceptibility.json',
+    FORMULA_APP_JSON / 'scc_acscc_susceptibility.json',
+    FORMULA_APP_JSON / 'scc_clscc_susceptibility.json',
+    FORMULA_APP_JSON / 'scc_hsc_hf_susceptibility.json',
+)
+
+# Susceptibility codes. FFS ("Fitness For Service evaluation required") maps
+# to SVI 0 exactly like getSVI() does in the browser; UNKNOWN means required
+# inputs are missing and no DF is produced.
+UNKNOWN = -1
+NONE = 0
+LOW = 1
+MEDIUM = 2
+HIGH = 3
+FFS = 4
+
+SUSCEPTIBILITY_LABELS = {
+    UNKNOWN: 'Unknown',
+    NONE: 'Not Susceptible',
+    LOW: 'Low',
+    MEDIUM: 'Medium',
+    HIGH: 'High',
+    FFS: 'FFS (Fitness For Service Evaluation Required)',
+}
+
+# mechanism key -> (active flag, field prefix). Same list as
+# calculateCrackingPof() in formula_app_adapter.js.
+SCC_MECHANISMS = {
+    'caustic': ('mechanism_scc_caustic_active', 'scc_caustic'),
+    'amine': ('mechanism_scc_amine_active', 'scc_amine'),
+    'ssc': ('mechanism_scc_ssc_active', 'scc_ssc'),
+    'hic_h2s': ('mechanism_scc_hic_h2s_active', 'scc_hic_h2s'),
+    'acscc': ('mechanism_scc_acscc_active', 'scc_acscc'),
+    'pascc': ('mechanism_scc_pascc_active', 'scc_pascc'),
+    'clscc': ('mechanism_scc_clscc_active', 'scc_clscc'),
+    'hsc_hf': ('mechanism_scc_hsc_hf_active', 'scc_hsc_hf'),
+}
+
+EFFECTIVENESS_CATEGORIES = ('A', 'B', 'C', 'D')
+MAX_INSPECTION_COUNT = 6
+
+# Equation 2.C.3
+AGE_EXPONENT = 1.1
+MAX_DAMAGE_FACTOR = 5000.0
+
+# Environmental severity levels shared by SSC and HIC/SOHIC-H2S (Table 2.C.3.1)
+SEVERITY_LEVELS = ('None', 'Low', 'Moderate', 'High')
+H2S_PPM_EDGES = np.array([1.0, 50.0, 1000.0, 10000.0])
+
+# HIC/SOHIC-H2S susceptibility by [environmental severity][banding severity]
+# (calculateHICSusceptibility(); rows Low/Moderate/High, columns
+# None/Low/Medium/High banding).
+BANDING_LEVELS = ('None', 'Low', 'Medium', 'High')
+HIC_SUSCEPTIBILITY = np.array([
+    [NONE, NONE, NONE, NONE],
+    [LOW, LOW, LOW, MEDIUM],
+    [LOW, LOW, MEDIUM, HIGH],
+    [HIGH, MEDIUM, HIGH, HIGH],
+])
+
+# ClSCC modifiers (scc_clscc_modifiers.json)
+CLSCC_LOW_CHLORIDE_PPM = 10.0
+CLSCC_HIGH_CHLORIDE_PPM = 100.0
+
+# Caustic: below this NaOH concentration (%) the milder branches apply
+CAUSTIC_LOW_NAOH_PERCENT = 5.0
+
+# Amine: above this temperature (deg F) lean amine service is High
+AMINE_HIGH_TEMP_F = 180.0
+
+_LEVEL_CODES = {'None': NONE, 'Low': LOW, 'Medium': MEDIUM, 'Moderate': MEDIUM, 'High': HIGH}
+
+
+@lru_cache(maxsize=None)
+def severity_index_table():
+    """SVI for each susceptibility code (indexed by code, FFS included)."""
+    mappings = load_json(DASHBOARD_JSON / 'scc_severity_index.json')['mappings']
+    svi = np.zeros(FFS + 1)
+    for label, code in (('None', NONE), ('Low', LOW), ('Medium', MEDIUM), ('High', HIGH)):
+        svi[code] = mappings[label]
+    return svi
+
+
+@lru_cache(maxsize=None)
+def base_damage_factor_table():
+    """
+    Table 2.C.1.3 as a dense grid.
+
+    Returns (svi_values, grid) where grid has shape (len(svi_values),
+    MAX_INSPECTION_COUNT + 1, 4). Count index 0 holds the "E" (no
+    inspection) value for every category.
+    """
+    data = load_json(DASHBOARD_JSON / 'scc_base_damage_factor.json')['data']
+    svi_values = np.array(sorted(int(key) for key in data), dtype=float)
+    grid = np.zeros((len(svi_values), MAX_INSPECTION_COUNT + 1, len(EFFECTIVENESS_CATEGORIES)))
+    for i, svi in enumerate(svi_values):
+        row = data[str(int(svi))]
+        grid[i, 0, :] = row['E']
+        for count in range(1, MAX_INSPECTION_COUNT + 1):
+            grid[i, count, :] = [row[str(count)].get(cat, row['E']) for cat in EFFECTIVENESS_CATEGORIES]
+    return svi_values, grid
+
+
+def inspection_effectiveness(counts):
+    """
+    API 581 Part 2 Section 3.4.3 2:1 equivalency rule.
+
+    counts: (N, 4) A/B/C/D inspection counts. Two inspections of one
+    category count as one of the next better category. Returns (category
+    index into A-D, count); count 0 means no credited inspection (E).
+    """
+    counts = np.nan_to_num(np.asarray(counts, dtype=float)).astype(np.int64)
+    a, b, c, d = (counts[:, i].copy() for i in range(4))
+    c += d // 2
+    d %= 2
+    b += c // 2
+    c %= 2
+    a += b // 2
+    b %= 2
+
+    stacked = np.column_stack([a, b, c, d])
+    present = stacked > 0
+    category = np.argmax(present, axis=1)
+    count = np.where(present.any(axis=1), stacked[np.arange(len(stacked)), category], 0)
+    return category, count
+
+
+def scc_damage_factor(susceptibility, inspection_counts, age):
+    """
+    Base and final SCC DF for N components.
+
+    susceptibility: (N,) codes; inspection_counts: (N, 4); age: (N,) years
+    in service. UNKNOWN susceptibility or a missing age gives NaN.
+    Returns (svi, base_df, final_df).
+    """
+    susceptibility = np.asarray(susceptibility, dtype=np.int64)
+    known = susceptibility >= 0
+    svi = np.where(known, severity_index_table()[np.where(known, susceptibility, 0)], np.nan)
+
+    svi_values, grid = base_damage_factor_table()
+    category, count = inspection_effectiveness(inspection_counts)
+    row = np.clip(np.searchsorted(svi_values, np.nan_to_num(svi)), 0, len(svi_values) - 1)
+    base_df = grid[row, np.minimum(count, MAX_INSPECTION_COUNT), category]
+    base_df = np.where(known, base_df, np.nan)
+
+    age = np.asarray(age, dtype=float)
+    final_df = np.minimum(base_df * np.maximum(age, 1.0) ** AGE_EXPONENT, MAX_DAMAGE_FACTOR)
+    return svi, base_df, np.round(final_df, 1)
+
+
+def _apply_cracks(result, observed, removed):
+    """Cracks found in service override every table: removed -> High, else FFS."""
+    result = np.where(observed & removed, HIGH, result)
+    return np.where(observed & ~removed, FFS, result)
+
+
+# --- Caustic (Section 2.C.1) -------------------------------------------------
+
+@lru_cache(maxsize=None)
+def caustic_area_a_curve():
+    """(NaOH %, max temp deg F) points bounding Area A of Figure 2.C.4.1."""
+    points = load_json(DASHBOARD_JSON / 'scc_caustic_chart.json')['area_a_curve_f']
+    return np.array([p['c'] for p in points], dtype=float), np.array([p['t'] for p in points], dtype=float)
+
+
+def caustic_susceptibility(naoh_percent, temp_f, heat_traced, steamed_out, stress_relieved,
+                           cracks_observed, cracks_removed):
+    conc, limit = caustic_area_a_curve()
+    in_range = (naoh_percent >= conc[0]) & (naoh_percent <= conc[-1])
+    area_a = in_range & (temp_f <= np.interp(naoh_percent, conc, limit))
+    dilute = naoh_percent < CAUSTIC_LOW_NAOH_PERCENT
+
+    in_area_a = np.select(
+        [heat_traced & dilute, heat_traced, steamed_out & dilute, steamed_out],
+        [MEDIUM, HIGH, LOW, MEDIUM],
+        NONE,
+    )
+    outside = np.where(dilute, MEDIUM, np.where(steamed_out & ~heat_traced, MEDIUM, HIGH))
+    result = np.where(area_a, in_area_a, outside)
+    result = np.where(np.isnan(naoh_percent) | np.isnan(temp_f), UNKNOWN, result)
+    result = np.where(stress_relieved, NONE, result)
+    return _apply_cracks(result, cracks_observed, cracks_removed)
+
+
+# --- Amine (Section 2.C.2) ---------------------------------------------------
+
+def amine_susceptibility(solution_type, temp_f, heat_traced, steamed_out, lean_amine,
+                         stress_relieved, cracks_observed, cracks_removed):
+    solution_type = np.asarray(solution_type, dtype=object)
+    hot = temp_f > AMINE_HIGH_TEMP_F
+    promoted = heat_traced | steamed_out
+    mea = solution_type == 'MEA_DIPA'
+    dea = solution_type == 'DEA_OTHER'
+
+    result = np.full(len(temp_f), LOW)
+    result = np.where(mea, np.where(hot, HIGH, np.where(promoted, MEDIUM, LOW)), result)
+    result = np.where(dea, np.where(hot, HIGH, np.where(promoted, MEDIUM, NONE)), result)
+    result = np.where(~lean_amine | stress_relieved, NONE, result)
+    return _apply_cracks(result, cracks_observed, cracks_removed)
+
+
+# --- SSC and HIC/SOHIC-H2S environmental severity (Section 2.C.3) -----------
+
+@lru_cache(maxsize=None)
+def ssc_tables():
+    """
+    Environmental severity and SSC susceptibility tables as arrays.
+
+    Returns (ph_bounds, severity, hardness_edges, susceptibility):
+    ph_bounds (R, 2) inclusive pH ranges, severity (R, 5) severity codes
+    per H2S column, hardness_edges the Brinell bin edges and
+    susceptibility (4 severities, 2 [as-welded, PWHT], hardness bins).
+    """
+    rows = load_json(FORMULA_APP_DATA / 'scc_ssc_environmental_severity.json')
+    ph_bounds = np.array([[r['ph_min'], r['ph_max']] for r in rows], dtype=float)
+    severity = np.array([[SEVERITY_LEVELS.index(s) for s in r['severity']] for r in rows])
+
+    table = load_json(FORMULA_APP_DATA / 'scc_ssc_susceptibility.json')
+    rules = table['High']['As-welded']
+    hardness_edges = np.array([r['max'] for r in rules if 'max' in r], dtype=float)
+    susceptibility = np.zeros((len(SEVERITY_LEVELS), 2, len(rules)), dtype=np.int64)
+    for level, name in enumerate(SEVERITY_LEVELS[1:], start=1):
+        for treatment, key in enumerate(('As-welded', 'PWHT')):
+            susceptibility[level, treatment] = [_LEVEL_CODES[r['result']] for r in table[name][key]]
+    return ph_bounds, severity, hardness_edges, susceptibility
+
+
+def environmental_severity(ph, h2s_ppm):
+    """Severity code per component; UNKNOWN when pH or H2S is missing."""
+    ph_bounds, severity, _, _ = ssc_tables()
+    column = np.searchsorted(H2S_PPM_EDGES, np.nan_to_num(h2s_ppm), side='left')
+    result = np.full(len(ph), NONE)
+    for i, (low, high) in enumerate(ph_bounds):
+        match = (ph >= low) & (ph <= high) & (result == NONE)
+        result = np.where(match, severity[i][column], result)
+    return np.where(np.isnan(ph) | np.isnan(h2s_ppm), UNKNOWN, result)
+
+
+def ssc_susceptibility(ph, h2s_ppm, hardness_hb, pwht, cracks_observed, cracks_removed):
+    _, _, hardness_edges, table = ssc_tables()
+    severity = environmental_severity(ph, h2s_ppm)
+    hardness_bin = np.searchsorted(hardness_edges, np.nan_to_num(hardness_hb), side='left')
+    result = table[np.maximum(severity, 0), pwht.astype(np.int64), hardness_bin]
+    result = _apply_cracks(result, cracks_observed, cracks_removed)
+    # A benign environment is not susceptible, whatever was found.
+    result = np.where(severity == NONE, NONE, result)
+    return np.where((severity == UNKNOWN) | np.isnan(hardness_hb), UNKNOWN, result)
+
+
+def hic_susceptibility(ph, h2s_ppm, banding, cyanide_present, cracks_observed, cracks_removed):
+    severity = environmental_severity(ph, h2s_ppm)
+    severity = np.where(cyanide_present & (severity > NONE), HIGH, np.maximum(severity, NONE))
+    banding_index = np.array([
+        BANDING_LEVELS.index(b) if b in BANDING_LEVELS else 0 for b in banding
+    ], dtype=np.int64)
+    result = HIC_SUSCEPTIBILITY[severity, banding_index]
+    return _apply_cracks(result, cracks_observed, cracks_removed)
+
+
+# --- ACSCC (Section 2.C.4) ---------------------------------------------------
+
+def acscc_susceptibility(ph, co3, stress_relieved, cracks_observed, cracks_removed):
+    ranges = formula_table('scc_acscc_susceptibility.json')['susceptibility_map']['ineffective_pwht']
+    result = np.where(ph >= ranges[-1]['ph_max'], HIGH, NONE)
+    for row in ranges:
+        maxima = np.array([r['max'] for r in row['co3_ranges']], dtype=float)
+        levels = np.array([_LEVEL_CODES[r['susc']] for r in row['co3_ranges']] + [HIGH])
+        match = (ph >= row['ph_min']) & (ph < row['ph_max'])
+        result = np.where(match, levels[np.searchsorted(maxima, np.nan_to_num(co3), side='left')], result)
+    result = np.where(np.isnan(ph) | np.isnan(co3), UNKNOWN, result)
+    result = np.where(stress_relieved, NONE, result)
+    return _apply_cracks(result, cracks_observed, cracks_removed)
+
+
+# --- PASCC (Section 2.C.5) ---------------------------------------------------
+
+def pascc_susceptibility(sensitized, sulfur_exposure, downtime_protected, cracks_observed, cracks_removed):
+    result = np.where(downtime_protected, LOW, HIGH)
+    result = np.where(sensitized & sulfur_exposure, result, NONE)
+    return _apply_cracks(result, cracks_observed, cracks_removed)
+
+
+# --- ClSCC (Section 2.C.6) ---------------------------------------------------
+
+@lru_cache(maxsize=None)
+def clscc_tables():
+    """(temperature row bounds (R, 2) deg F, pH columns, level grid (R, C))."""
+    data = formula_table('scc_clscc_susceptibility.json')
+    rows = np.array([[r['min'], r['max']] for r in data['rows_f']], dtype=float)
+    grid = np.array([[_LEVEL_CODES[v] for v in row] for row in data['susceptibility_grid']])
+    return rows, np.array(data['ph_columns'], dtype=float), grid
+
+
+def clscc_susceptibility(temp_f, ph, chloride_ppm, oxygen_present, deposits_present,
+                         cracks_observed, cracks_removed):
+    rows, ph_columns, grid = clscc_tables()
+    row = np.full(len(temp_f), -1)
+    for i, (low, high) in enumerate(rows):
+        row = np.where((row < 0) & (temp_f >= low) & (temp_f < high), i, row)
+    column = np.minimum(np.searchsorted(ph_columns, np.nan_to_num(ph), side='left'), len(ph_columns) - 1)
+    level = grid[np.maximum(row, 0), column]
+
+    level = level - (chloride_ppm < CLSCC_LOW_CHLORIDE_PPM) + (chloride_ppm > CLSCC_HIGH_CHLORIDE_PPM)
+    level = level - ~oxygen_present + deposits_present
+    result = np.clip(level, NONE, HIGH)
+    result = np.where((row < 0) | np.isnan(ph), UNKNOWN, result)
+    return _apply_cracks(result, cracks_observed, cracks_removed)
+
+
+# --- HSC-HF (Section 2.C.7) --------------------------------------------------
+
+@lru_cache(maxsize=None)
+def hsc_hf_hardness_limits():
+    """(highest Low hardness, lowest High hardness) in HB from Table 2.C.7.2."""
+    rows = formula_table('scc_hsc_hf_susceptibility.json')['data']
+    low = max(r['hardness_max'] for r in rows if r['susceptibility'] == 'Low' and r['pwht'] == 'Any')
+    high = min(r['hardness_min'] for r in rows if r['susceptibility'] == 'High')
+    return float(low), float(high)
+
+
+def hsc_hf_susceptibility(hardness_hb, pwht, hf_present, cracks_observed, cracks_removed):
+    low, high = hsc_hf_hardness_limits()
+    result = np.where(pwht, LOW, MEDIUM)
+    result = np.where(hardness_hb <= low, LOW, result)
+    result = np.where(hardness_hb >= high, HIGH, result)
+    result = np.where(np.isnan(hardness_hb), UNKNOWN, result)
+    result = np.where(hf_present, result, NONE)
+    return _apply_cracks(result, cracks_observed, cracks_removed)
+
+
+# --- Components --------------------------------------------------------------
+
+@dataclass
+class SCCResult:
+    susceptibility: np.ndarray  # (N, M) codes
+    svi: np.ndarray             # (N, M)
+    base_df: np.ndarray         # (N, M)
+    final_df: np.ndarray        # (N, M), NaN where inactive
+
+    @property
+    def governing_df(self):
+        """Largest final DF across active mechanisms (NaN where none is active)."""
+        result = np.full(self.final_df.shape[0], np.nan)
+        valid = ~np.isnan(self.final_df).all(axis=1)
+        result[valid] = np.nanmax(self.final_df[valid], axis=1)
+        return result
+
+
+def _inspection_fields(prefix):
+    return tuple(f'{prefix}_inspection_count_{cat.lower()}' for cat in EFFECTIVENESS_CATEGORIES)
+
+
+COMPONENT_FIELDS = (
+    'commissioning_date', 'operating_temp_f', 'ph_value', 'pwht', 'heat_traced', 'contains_oxygen',
+    'scc_caustic_cracks_observed', 'scc_caustic_cracks_removed', 'scc_caustic_stress_relieved',
+    'scc_caustic_naoh_conc_percent', 'scc_caustic_steamed_out_prior',
+    'scc_amine_cracks_observed', 'scc_amine_cracks_removed', 'scc_amine_stress_relieved',
+    'scc_amine_lean_amine', 'scc_amine_solution_type', 'scc_amine_steamed_out',
+    'scc_ssc_ph', 'scc_ssc_h2s_ppm', 'scc_ssc_hardness_hb', 'scc_ssc_pwht',
+    'scc_ssc_cracks_observed', 'scc_ssc_cracks_removed',
+    'scc_hic_h2s_ph', 'scc_hic_h2s_h2s_ppm', 'scc_hic_h2s_cyanide_present', 'scc_hic_h2s_banding_severity',
+    'scc_hic_h2s_cracks_observed', 'scc_hic_h2s_cracks_removed',
+    'scc_acscc_cracks_observed', 'scc_acscc_cracks_removed', 'scc_acscc_stress_relieved',
+    'scc_acscc_co3_conc_percent',
+    'scc_pascc_cracks_observed', 'scc_pascc_cracks_removed', 'scc_pascc_sensitized',
+    'scc_pascc_sulfur_exposure', 'scc_pascc_downtime_protected',
+    'scc_clscc_cracks_observed', 'scc_clscc_cracks_removed', 'scc_clscc_cl_conc_ppm',
+    'scc_clscc_deposits_present',
+    'scc_hsc_hf_cracks_observed', 'scc_hsc_hf_cracks_removed', 'scc_hsc_hf_present', 'scc_hsc_hf_hardness_hb',
+) + tuple(flag for flag, _ in SCC_MECHANISMS.values()) \
+  + tuple(field for _, prefix in SCC_MECHANISMS.values() for field in _inspection_fields(prefix))
+
+
+def susceptibilities(cols):
+    """(N, M) susceptibility codes for every mechanism, in SCC_MECHANISMS order."""
+    def cracks(prefix):
+        return cols[f'{prefix}_cracks_observed'], cols[f'{prefix}_cracks_removed']
+
+    temp = cols['operating_temp_f']
+    shared_ph = cols['ph_value']
+    ssc_ph = np.where(np.isnan(cols['scc_ssc_ph']), shared_ph, cols['scc_ssc_ph'])
+    hic_ph = np.where(np.isnan(cols['scc_hic_h2s_ph']), shared_ph, cols['scc_hic_h2s_ph'])
+
+    by_mechanism = {
+        'caustic': caustic_susceptibility(
+            cols['scc_caustic_naoh_conc_percent'], temp, cols['heat_traced'],
+            cols['scc_caustic_steamed_out_prior'], cols['scc_caustic_stress_relieved'], *cracks('scc_caustic')),
+        'amine': amine_susceptibility(
+            cols['scc_amine_solution_type'], temp, cols['heat_traced'], cols['scc_amine_steamed_out'],
+            cols['scc_amine_lean_amine'], cols['scc_amine_stress_relieved'], *cracks('scc_amine')),
+        'ssc': ssc_susceptibility(
+            ssc_ph, cols['scc_ssc_h2s_ppm'], cols['scc_ssc_hardness_hb'],
+            cols['pwht'] | cols['scc_ssc_pwht'], *cracks('scc_ssc')),
+        'hic_h2s': hic_susceptibility(
+            hic_ph, cols['scc_hic_h2s_h2s_ppm'], cols['scc_hic_h2s_banding_severity'],
+            cols['scc_hic_h2s_cyanide_present'], *cracks('scc_hic_h2s')),
+        'acscc': acscc_susceptibility(
+            shared_ph, cols['scc_acscc_co3_conc_percent'], cols['scc_acscc_stress_relieved'], *cracks('scc_acscc')),
+        'pascc': pascc_susceptibility(
+            cols['scc_pascc_sensitized'], cols['scc_pascc_sulfur_exposure'],
+            cols['scc_pascc_downtime_protected'], *cracks('scc_pascc')),
+        'clscc': clscc_susceptibility(
+            temp, shared_ph, cols['scc_clscc_cl_conc_ppm'], cols['contains_oxygen'],
+            cols['scc_clscc_deposits_present'], *cracks('scc_clscc')),
+        'hsc_hf': hsc_hf_susceptibility(
+            cols['scc_hsc_hf_hardness_hb'], cols['pwht'], cols['scc_hsc_hf_present'], *cracks('scc_hsc_hf')),
+    }
+    return np.column_stack([by_mechanism[key] for key in SCC_MECHANISMS])
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Run every SCC mechanism for every component in `queryset`.
+
+    Returns (pks, SCCResult, mechanism keys). Inactive mechanisms are NaN.
+    """
+    return evaluate_columns(load_columns(queryset, COMPONENT_FIELDS), today)
+
+
+def evaluate_columns(cols, today=None, years_ahead=0.0):
+    """
+    evaluate_components() on columns that are already loaded.
+    `years_ahead` (scalar or one value per row) is added to the time in
+    service, projecting the DF to a future date.
+    """
+    pks = cols['pk']
+    mechanisms = list(SCC_MECHANISMS)
+    n, m = len(pks), len(mechanisms)
+    if not n:
+        empty = np.empty((0, m))
+        return pks, SCCResult(empty.astype(np.int64), empty, empty, empty), mechanisms
+
+    susceptibility = susceptibilities(cols)
+    age = age_years(cols['commissioning_date'], today) + years_ahead
+
+    svi = np.empty((n, m))
+    base_df = np.empty((n, m))
+    final_df = np.empty((n, m))
+    for j, (flag, prefix) in enumerate(SCC_MECHANISMS.values()):
+        counts = np.column_stack([cols[field] for field in _inspection_fields(prefix)])
+        svi[:, j], base_df[:, j], final_df[:, j] = scc_damage_factor(susceptibility[:, j], counts, age)
+        final_df[~cols[flag], j] = np.nan
+
+    return pks, SCCResult(susceptibility, svi, base_df, final_df), mechanisms
@@ -0,0 +1,95 @@
+"""
+Reference table loader.
+
+The API 581 tables used by the browser calculators live as JSON files under
+static/. They are parsed once per process and cached. The COF Level 1
+tables are ES modules (static/formula_app/data/cof/*.js); their object
+literals are read with load_js_constant() so both sides share one copy.
+"""
+import hashlib
+import json
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+FORMULA_APP_DATA = settings.BASE_DIR / 'static' / 'formula_app' / 'data'
+FORMULA_APP_JSON = FORMULA_APP_DATA / 'json'
+FORMULA_APP_COF = FORMULA_APP_DATA / 'cof'
+FORMULA_APP_MODULES = settings.BASE_DIR / 'static' / 'formula_app' / 'js' / 'modules'
+DASHBOARD_JSON = settings.BASE_DIR / 'dashboard' / 'static' / 'dashboard' / 'json'
+
+
+@lru_cache(maxsize=None)
+def load_json(path):
+    """Parse a JSON table file once and keep it for the life of the process."""
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def formula_table(relative_path):
+    """Load a table from static/formula_app/data/json/."""
+    return load_json(FORMULA_APP_JSON / relative_path)
+
+
+@lru_cache(maxsize=None)
+def table_version(paths):
+    """
+    Short digest of the contents of the table files in `paths` (a tuple).
+    Like the tables themselves it is computed once per process, so it
+    changes exactly when a deploy ships edited tables.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        with open(path, 'rb') as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+_JS_COMMENT = re.compile(r'/\*.*?\*/|//[^\n]*', re.S)
+_JS_KEY = re.compile(r'([{,]\s*)([A-Za-z_$][\w$]*)\s*:')
+_JS_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+
+
+def _js_literal(text, start):
+    """The balanced {...} or [...] literal beginning at text[start]."""
+    depth, quote = 0, None
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote:
+            if char == quote and text[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    raise ValueError('Unterminated JavaScript literal')
+
+
+@lru_cache(maxsize=None)
+def load_js_constant(path, name):
+    """
+    Parse `const <name> = {...}` (or [...]) from a JavaScript data module.
+
+    Only plain data literals are supported: bare or quoted keys, single or
+    double quoted strings, numbers, null/true/false and trailing commas.
+    """
+    with open(path, encoding='utf-8') as fh:
+        text = _JS_COMMENT.sub('', fh.read())
+    match = re.search(r'\bconst\s+%s\s*=\s*' % re.escape(name), text)
+    if match is None:
+        raise KeyError(f'{name} not found in {path}')
+    literal = _js_literal(text, match.end())
+    literal = re.sub(r"'([^'\\]*)'", lambda m: json.dumps(m.group(1)), literal)
+    literal = _JS_KEY.sub(r'\1"\2":', literal)
+    literal = _JS_TRAILING_COMMA.sub(r'\1', literal)
+    return json.loads(literal)
+
+
+def cof_table(module, name):
+    """Load an exported constant from static/formula_app/data/cof/<module>.js."""
+    return load_js_constant(FORMULA_APP_COF / f'{module}.js', name)
@@ -0,0 +1,291 @@
+"""
+Thinning Damage Factor (API 581 Part 2, Section 4)
+
+Vectorized port of the formula_app thinning wizard
+(static/formula_app/components/step1_calcs.js ... step13_calcs.js).
+Instead of handing values from step to step through sessionStorage, every
+step is evaluated for all components (and all active thinning mechanisms)
+as array operations.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+from django.db.models import Count
+from scipy.special import ndtr
+
+from .common import age_years, load_columns
+from .tables import FORMULA_APP_JSON, formula_table
+
+# mechanism key -> (active flag, corrosion rate field). Same list as
+# calculateThinningPof() in formula_app_adapter.js.
+THINNING_MECHANISMS = {
+    'co2': ('mech_thinning_co2_active', 'co2_corrosion_rate_mpy'),
+    'hcl': ('mech_thinning_hcl_active', 'hcl_corrosion_rate_mpy'),
+    'h2so4': ('mech_thinning_h2so4_active', 'h2so4_corrosion_rate_mpy'),
+    'hf': ('mech_thinning_hf_active', 'hf_corrosion_rate_mpy'),
+    'amine': ('mech_thinning_amine_active', 'amine_corrosion_rate_mpy'),
+    'alkaline': ('mech_thinning_alkaline_active', 'alkaline_water_corrosion_rate_mpy'),
+    'acid': ('mech_thinning_acid_active', 'acid_water_corrosion_rate_mpy'),
+    'soil': ('mech_thinning_soil_active', 'soil_corrosion_rate_mpy'),
+    'h2s_h2': ('mech_thinning_h2s_h2_active', 'ht_h2s_h2_corrosion_rate_mpy'),
+    'sulfidic': ('mech_thinning_sulfidic_active', 'sulfidic_corrosion_rate_mpy'),
+}
+
+# Table files read by this engine (memo cache version)
+REFERENCE_TABLES = (FORMULA_APP_JSON / 'step8' / 'table45.JSON', FORMULA_APP_JSON / 'step8' / 'table46.JSON')
+
+# Damage state factors D_S1..D_S3 (Step 11)
+DAMAGE_STATES = np.array([1.0, 2.0, 4.0])
+
+# Coefficients of variance (Equation 2.18)
+COV_DT = 0.20
+COV_SF = 0.20
+COV_P = 0.05
+
+# Equation 2.19 denominator
+BASE_DF_DENOMINATOR = 1.56e-4
+
+# Inspection effectiveness categories, in the column order used for counts
+EFFECTIVENESS_CATEGORIES = ('A', 'B', 'C', 'D')
+CONFIDENCE_LEVELS = ('Low', 'Medium', 'High')
+
+# Inspection history "corrosion finding capability" -> effectiveness category
+CAPABILITY_TO_EFFECTIVENESS = {
+    'High': 'A',
+    'Medium-High': 'B',
+    'Medium': 'C',
+    'Low': 'D',
+}
+
+
+@lru_cache(maxsize=None)
+def inspection_tables():
+    """
+    Table 4.5 priors and Table 4.6 conditional probabilities as arrays.
+
+    Returns (priors, conditional) where priors has shape (3 confidence
+    levels, 3 damage states) and conditional has shape (3 damage states,
+    4 effectiveness categories A-D).
+    """
+    table45 = {row['damage_state']: row for row in formula_table('step8/table45.JSON')['data']}
+    table46 = {row['condition']: row for row in formula_table('step8/table46.JSON')['data']}
+
+    priors = np.array([
+        [table45[f'Pr_p{state}_Thin'][f'{level.lower()}_confidence'] for state in (1, 2, 3)]
+        for level in CONFIDENCE_LEVELS
+    ])
+    columns = ('A_highly_effective', 'B_usually_effective', 'C_fairly_effective', 'D_poorly_effective')
+    conditional = np.array([
+        [table46[f'Cp_p{state}_Thin'][column] for column in columns]
+        for state in (1, 2, 3)
+    ])
+    return priors, conditional
+
+
+@dataclass
+class ThinningResult:
+    art: np.ndarray               # (N, M) Step 5
+    flow_stress: np.ndarray       # (N,)   Step 6
+    strength_ratio: np.ndarray    # (N,)   Step 7
+    posteriors: np.ndarray        # (N, 3) Step 10
+    beta: np.ndarray              # (N, M, 3) Step 11
+    base_df: np.ndarray           # (N, M) Step 12
+    final_df: np.ndarray          # (N, M) Step 13
+
+    @property
+    def governing_df(self):
+        """Largest final DF across mechanisms (NaN where none is active)."""
+        result = np.full(self.final_df.shape[0], np.nan)
+        valid = ~np.isnan(self.final_df).all(axis=1)
+        result[valid] = np.nanmax(self.final_df[valid], axis=1)
+        return result
+
+
+def posterior_probabilities(inspection_counts, confidence):
+    """
+    Steps 9-10: inspection effectiveness factors and posterior probabilities.
+
+    inspection_counts: (N, 4) counts of A/B/C/D inspections.
+    confidence: (N,) array of 'Low' / 'Medium' / 'High'.
+    Computed in log space so large inspection counts do not underflow.
+    """
+    priors, conditional = inspection_tables()
+    level_index = np.array([
+        CONFIDENCE_LEVELS.index(c) if c in CONFIDENCE_LEVELS else 0 for c in confidence
+    ], dtype=int)
+
+    log_i = np.log(priors[level_index]) + np.asarray(inspection_counts, dtype=float) @ np.log(conditional).T
+    log_i -= log_i.max(axis=1, keepdims=True)
+    weights = np.exp(log_i)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def compute_thinning_df(
+    corrosion_rate_mpy,
+    age_tk,
+    t_rdi,
+    yield_strength,
+    tensile_strength,
+    allowable_stress,
+    joint_efficiency,
+    t_min,
+    inspection_counts,
+    confidence,
+    age_rc=0.0,
+    t_c=0.0,
+    f_ip=1.0,
+    f_dl=1.0,
+    f_om=1.0,
+):
+    """
+    Evaluate Steps 5-13 for N components and M mechanisms at once.
+
+    corrosion_rate_mpy is (N, M) (or (N,) for a single mechanism); NaN marks
+    an inactive mechanism. All other inputs are (N,) arrays or scalars in
+    imperial units (in, years, psi). Invalid geometry (t_rdi <= 0) or
+    strength data yields NaN rather than raising.
+    """
+    rate = np.asarray(corrosion_rate_mpy, dtype=float)
+    if rate.ndim == 1:
+        rate = rate[:, None]
+    n = rate.shape[0]
+
+    def column(values):
+        return np.broadcast_to(np.asarray(values, dtype=float), (n,)).copy()
+
+    age_tk, t_rdi, age_rc, t_c = column(age_tk), column(t_rdi), column(age_rc), column(t_c)
+    ys, ts = column(yield_strength), column(tensile_strength)
+    stress, t_min = column(allowable_stress), column(t_min)
+
+    efficiency = column(joint_efficiency)
+    efficiency = np.where(np.isnan(efficiency), 1.0, efficiency)
+    efficiency = np.where(efficiency > 1.0, efficiency / 100.0, efficiency)
+
+    t_rdi = np.where(t_rdi > 0, t_rdi, np.nan)
+
+    # Step 5 - Equation 2.12 (rate converted from mpy to in/yr)
+    art = np.maximum(
+        (rate / 1000.0) * (np.maximum(age_tk, 0.0) - np.nan_to_num(age_rc))[:, None] / t_rdi[:, None],
+        0.0,
+    )
+
+    # Step 6 - Equation 2.13. Without a tensile strength the yield strength is
+    # used on its own, which gives the lower (conservative) flow stress.
+    ts = np.where(np.isnan(ts), ys, ts)
+    flow_stress = (ys + ts) / 2.0 * efficiency * 1.1
+    flow_stress = np.where(flow_stress > 0, flow_stress, np.nan)
+
+    # Step 7 - Equation 2.14
+    strength_ratio = (stress * efficiency / flow_stress) * (np.fmax(t_min, np.nan_to_num(t_c)) / t_rdi)
+
+    # Steps 9-10 - Equations 2.16 / 2.17
+    posteriors = posterior_probabilities(inspection_counts, np.broadcast_to(np.asarray(confidence, dtype=object), (n,)))
+
+    # Step 11 - Equation 2.18, shape (N, M, 3)
+    ds_art = art[..., None] * DAMAGE_STATES
+    sr = strength_ratio[:, None, None]
+    numerator = 1.0 - ds_art - sr
+    denominator = np.sqrt((ds_art * COV_DT) ** 2 + ((1.0 - ds_art) * COV_SF) ** 2 + (sr * COV_P) ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = np.where(denominator > 0, numerator / denominator, 0.0)
+    beta = np.where(np.isnan(numerator), np.nan, beta)
+
+    # Step 12 - Equation 2.19
+    base_df = (posteriors[:, None, :] * ndtr(-beta)).sum(axis=-1) / BASE_DF_DENOMINATOR
+    base_df = np.where(np.isnan(beta).any(axis=-1), np.nan, base_df)
+
+    # Step 13 - Equation 2.20
+    adjust = column(f_ip) * column(f_dl) / column(f_om)
+    final_df = np.maximum(base_df * adjust[:, None], 0.1)
+    final_df = np.where(np.isnan(base_df), np.nan, final_df)
+
+    return ThinningResult(
+        art=art,
+        flow_stress=flow_stress,
+        strength_ratio=strength_ratio,
+        posteriors=posteriors,
+        beta=beta,
+        base_df=base_df,
+        final_df=final_df,
+    )
+
+
+COMPONENT_FIELDS = (
+    'commissioning_date',
+    'nominal_thickness_in',
+    'thickness_measured_mm',
+    'last_int_visual_inspection_date',
+    'smys_yield_psi',
+    'allowable_stress_psi',
+    'joint_efficiency',
+    'min_required_thickness_in',
+) + tuple(flag for flag, _ in THINNING_MECHANISMS.values()) \
+  + tuple(rate for _, rate in THINNING_MECHANISMS.values())
+
+
+def inspection_counts_for(pks):
+    """(N, 4) A-D inspection counts from InspectionHistory, aligned to `pks`."""
+    from ..models import InspectionHistory
+
+    index = {pk: i for i, pk in enumerate(pks)}
+    counts = np.zeros((len(pks), len(EFFECTIVENESS_CATEGORIES)))
+    rows = (
+        InspectionHistory.objects
+        .filter(component_id__in=list(index))
+        .values('component_id', 'corrosion_finding_capability')
+        .annotate(n=Count('id'))
+    )
+    for row in rows:
+        category = CAPABILITY_TO_EFFECTIVENESS.get(row['corrosion_finding_capability'])
+        if category:
+            counts[index[row['component_id']], EFFECTIVENESS_CATEGORIES.index(category)] += row['n']
+    return counts
+
+
+def evaluate_components(queryset, today=None):
+    """
+    Run the thinning engine for every component in `queryset`.
+
+    Returns (pks, ThinningResult, mechanism keys). Only active mechanisms
+    contribute a rate; the rest are NaN. The thickness reading is the
+    measured thickness when one was recorded at the last internal
+    inspection, otherwise the nominal thickness since commissioning.
+    """
+    cols = load_columns(queryset, COMPONENT_FIELDS)
+    return evaluate_columns(cols, inspection_counts_for(cols['pk']), today)
+
+
+def evaluate_columns(cols, inspection_counts, today=None, years_ahead=0.0):
+    """
+    evaluate_components() on columns that are already loaded.
+    `years_ahead` (scalar or one value per row) is added to every time in
+    service, projecting the DF to a future date.
+    """
+    pks = cols['pk']
+
+    age = age_years(cols['commissioning_date'], today) + years_ahead
+    measured_in = cols['thickness_measured_mm'] / 25.4
+    since_inspection = age_years(cols['last_int_visual_inspection_date'], today) + years_ahead
+    use_measured = ~np.isnan(measured_in) & ~np.isnan(since_inspection)
+    t_rdi = np.where(use_measured, measured_in, cols['nominal_thickness_in'])
+    age_tk = np.where(use_measured, since_inspection, age)
+
+    mechanisms = list(THINNING_MECHANISMS)
+    rates = np.column_stack([
+        np.where(cols[flag], cols[rate], np.nan) for flag, rate in THINNING_MECHANISMS.values()
+    ]) if len(pks) else np.empty((0, len(mechanisms)))
+
+    result = compute_thinning_df(
+        corrosion_rate_mpy=rates,
+        age_tk=age_tk,
+        t_rdi=t_rdi,
+        yield_strength=cols['smys_yield_psi'],
+        tensile_strength=np.nan,
+        allowable_stress=cols['allowable_stress_psi'],
+        joint_efficiency=cols['joint_efficiency'],
+        t_min=cols['min_required_thickness_in'],
+        inspection_counts=inspection_counts,
+        confidence='Low',
+    )
+    return pks, result, mechanisms
@@ -0,0 +1,211 @@
+"""
+Maintained hierarchy counters behind the dashboard landing page.
+
+HierarchyCounts holds one row per owner (facility NULL) and one per
+facility. The receivers below keep them current in the same transaction
+as the change:
+
+- creating a facility, unit, system, equipment or component adds one to
+  its facility row and its owner row;
+- deleting a node subtracts the node and everything below it, counted
+  before the delete cascades. Rows removed by the cascade are skipped,
+  because the node the delete started from already counted them;
+- moving a node to another parent recounts the rows it left and joined.
+
+bulk_create(), QuerySet.update() and raw SQL bypass the signals. Callers
+that use them call refresh_counts() for the scopes they touched, and
+`manage.py reconcile_counts` repairs any remaining drift.
+"""
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.utils import timezone
+
+from .models import Component, Equipment, Facility, HierarchyCounts, System, Unit
+
+# Counter field of each hierarchy level
+COUNTERS = {
+    Facility: 'facilities',
+    Unit: 'units',
+    System: 'systems',
+    Equipment: 'equipment',
+    Component: 'components',
+}
+
+# Lookup from each level to the levels above it, through the hierarchy
+# foreign keys (the denormalized Component keys can lag behind a move)
+ANCESTOR_LOOKUPS = {
+    Facility: {},
+    Unit: {Facility: 'facility'},
+    System: {Facility: 'unit__facility', Unit: 'unit'},
+    Equipment: {Facility: 'system__unit__facility', Unit: 'system__unit', System: 'system'},
+    Component: {
+        Facility: 'equipment__system__unit__facility',
+        Unit: 'equipment__system__unit',
+        System: 'equipment__system',
+        Equipment: 'equipment',
+    },
+}
+
+
+def _facility_lookup(model):
+    return 'pk' if model is Facility else ANCESTOR_LOOKUPS[model][Facility]
+
+
+def _owner_lookup(model):
+    return 'owner' if model is Facility else f'{ANCESTOR_LOOKUPS[model][Facility]}__owner'
+
+
+def node_scope(node):
+    """(facility id, owner id) of a hierarchy node, as currently stored."""
+    model = type(node)
+    return model.objects.filter(pk=node.pk).values_list(
+        _facility_lookup(model), _owner_lookup(model),
+    ).first() or (None, None)
+
+
+def subtree_counts(node):
+    """{counter: count} of a node and everything below it."""
+    node_model = type(node)
+    counts = {COUNTERS[node_model]: 1}
+    for model, lookups in ANCESTOR_LOOKUPS.items():
+        if node_model in lookups:
+            counts[COUNTERS[model]] = model.objects.filter(**{lookups[node_model]: node.pk}).count()
+    return counts
+
+
+def add_counts(facility_id, owner_id, deltas, create=True):
+    """
+    Add `deltas` ({counter: n}) to the facility and owner rows. A missing
+    row is recounted from the hierarchy when `create` is set (the change
+    being already stored), and left alone otherwise.
+    """
+    changes = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    # A facility row always counts its one facility
+    facility_changes = {name: change for name, change in changes.items() if name != 'facilities'}
+    now = timezone.now()
+
+    if facility_id is not None and facility_changes:
+        updated = HierarchyCounts.objects.filter(facility_id=facility_id).update(updated_at=now, **facility_changes)
+        if not updated and create:
+            refresh_counts(facilities=[facility_id])
+    if owner_id is not None and changes:
+        updated = HierarchyCounts.objects.filter(owner_id=owner_id, facility__isnull=True).update(updated_at=now, **changes)
+        if not updated and create:
+            refresh_counts(owners=[owner_id])
+
+
+def _grouped_counts(lookup, ids):
+    """{counter: {id: count}} of every level, grouped by `lookup(model)` restricted to `ids`."""
+    counts = {}
+    for model, name in COUNTERS.items():
+        path = lookup(model)
+        queryset = model.objects.all() if ids is None else model.objects.filter(**{f'{path}__in': ids})
+        rows = queryset.values(path).annotate(count=Count('pk')).order_by().values_list(path, 'count')
+        counts[name] = dict(rows)
+    return counts
+
+
+@transaction.atomic
+def refresh_counts(owners=None, facilities=None):
+    """
+    Recount the owner rows of user ids `owners` and the facility rows of
+    facility ids `facilities` from the hierarchy; with neither given,
+    every owner and facility is recounted.
+    Returns the number of rows whose stored counts were wrong or missing.
+    """
+    everything = owners is None and facilities is None
+    repaired = 0
+    scopes = []
+    if everything or owners is not None:
+        owner_ids = None if everything else [owner for owner in owners if owner is not None]
+        scopes.append(('owner', owner_ids, _owner_lookup, Facility.objects.values_list('owner', flat=True)))
+    if everything or facilities is not None:
+        facility_ids = None if everything else [facility for facility in facilities if facility is not None]
+        scopes.append(('facility', facility_ids, _facility_lookup, Facility.objects.values_list('pk', flat=True)))
+
+    for scope, ids, lookup, all_ids in scopes:
+        counts = _grouped_counts(lookup, ids)
+        stored = HierarchyCounts.objects.filter(facility__isnull=scope == 'owner')
+        if ids is not None:
+            stored = stored.filter(**{f'{scope}__in': ids})
+        stored = {getattr(row, f'{scope}_id'): row for row in stored}
+        # Stored rows go away with their owner or facility; the others may just have counted down to zero
+        targets = (set(all_ids if ids is None else ids) | set(stored)) - {None}
+        if scope == 'facility':
+            owners_of = dict(Facility.objects.filter(pk__in=targets).values_list('pk', 'owner'))
+            targets &= set(owners_of)
+
+        for target in targets:
+            values = {name: counts[name].get(target, 0) for name in HierarchyCounts.COUNTERS}
+            if scope == 'facility':
+                values['facilities'] = 1
+                values['owner_id'] = owners_of[target]
+            row = stored.get(target)
+            if row is not None and all(getattr(row, name) == value for name, value in values.items()):
+                continue
+            repaired += 1
+            if row is None:
+                HierarchyCounts.objects.create(**{f'{scope}_id': target}, **values)
+            else:
+                HierarchyCounts.objects.filter(pk=row.pk).update(updated_at=timezone.now(), **values)
+    return repaired
+
+
+def owner_counts(user):
+    """The user's HierarchyCounts row, counted on first use."""
+    row = HierarchyCounts.objects.filter(owner=user, facility__isnull=True).first()
+    if row is None:
+        refresh_counts(owners=[user.pk])
+        row = HierarchyCounts.objects.get(owner=user, facility__isnull=True)
+    return row
+
+
+def moved(instance):
+    """Whether a loaded hierarchy node now points at another parent."""
+    if isinstance(instance, Component):
+        loaded = getattr(instance, '_loaded_values', {})
+        return 'equipment_id' in loaded and loaded['equipment_id'] != instance.equipment_id
+    return '_loaded_parent' in instance.__dict__ and instance._loaded_parent != getattr(instance, instance.parent_field)
+
+
+def remember_scope(sender, instance, raw=False, **kwargs):
+    """Before a node moves, note the facility and owner it is leaving."""
+    if not raw and not instance._state.adding and moved(instance):
+        instance._counted_scope = node_scope(instance)
+
+
+def count_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        facility_id, owner_id = node_scope(instance)
+        if sender is Facility:
+            refresh_counts(facilities=[instance.pk])
+        add_counts(facility_id, owner_id, {COUNTERS[sender]: 1})
+    elif '_counted_scope' in instance.__dict__:
+        left = instance.__dict__.pop('_counted_scope')
+        joined = node_scope(instance)
+        refresh_counts(owners={left[1], joined[1]}, facilities={left[0], joined[0]})
+
+
+def cascaded(sender, instance, origin):
+    """Whether a pre_delete/post_delete of `instance` comes from the cascade of another model's delete."""
+    if isinstance(origin, models.Model):
+        return origin is not instance
+    return isinstance(origin, models.QuerySet) and origin.model is not sender
+
+
+def count_deleted(sender, instance, origin=None, **kwargs):
+    # Rows removed by a cascade are part of the subtree counted for the node the delete started from
+    if cascaded(sender, instance, origin):
+        return
+    facility_id, owner_id = node_scope(instance)
+    add_counts(facility_id, owner_id, {name: -count for name, count in subtree_counts(instance).items()}, create=False)
+
+
+for _model in COUNTERS:
+    pre_save.connect(remember_scope, sender=_model, dispatch_uid=f'counters_pre_save_{_model.__name__}')
+    post_save.connect(count_saved, sender=_model, dispatch_uid=f'counters_post_save_{_model.__name__}')
+    pre_delete.connect(count_deleted, sender=_model, dispatch_uid=f'counters_pre_delete_{_model.__name__}')
+del _model
@@ -0,0 +1,121 @@
+"""
+Risk register export to CSV or Parquet.
+
+Rows are read with values_list(...).iterator(chunk_size=...), a
+server-side cursor on PostgreSQL, so only one chunk of plain tuples is in
+memory at a time however large the register is:
+
+- csv_chunks() yields the CSV text one chunk at a time, for a
+  StreamingHttpResponse or a file;
+- write_parquet() streams the same CSV to a temporary file and has polars
+  convert it with its streaming engine, in row groups of `chunk_size`
+  rows, with a typed schema.
+
+Columns are named like the import columns (see importer), so an export
+can be edited and imported again: id, the facility / unit / system /
+equipment names, and any Component field (core or section).
+"""
+import csv
+import io
+import tempfile
+from decimal import Decimal
+from itertools import islice
+
+import polars as pl
+from django.db import models
+
+from .models import COMPONENT_SECTIONS, Component
+
+CHUNK_SIZE = 2000
+
+HIERARCHY_LOOKUPS = {
+    'facility': 'facility__name',
+    'unit': 'equipment__system__unit__name',
+    'system': 'equipment__system__name',
+    'equipment': 'equipment__number',
+    'plant_equipment_type': 'equipment__plant_equipment_type',
+}
+
+# The risk register: where each component is and its stored results
+DEFAULT_COLUMNS = (
+    'id', 'facility', 'unit', 'system', 'equipment', 'rbix_equipment_type', 'rbix_component_type', 'description',
+    'calculated_total_damage_factor', 'final_pof', 'pof_category', 'calculated_consequence_area',
+    'calculated_cof', 'cof_category', 'calculated_risk', 'next_inspection_due_date',
+)
+
+
+def _dtype(field):
+    if isinstance(field, models.BooleanField):
+        return pl.Boolean
+    if isinstance(field, (models.DecimalField, models.FloatField)):
+        return pl.Float64
+    if isinstance(field, models.IntegerField):
+        return pl.Int64
+    if isinstance(field, models.DateField) and not isinstance(field, models.DateTimeField):
+        return pl.Date
+    return pl.String
+
+
+def export_columns():
+    """{column: (ORM lookup, polars dtype)} of every exportable column."""
+    columns = {'id': ('id', pl.Int64)}
+    columns.update((name, (lookup, pl.String)) for name, lookup in HIERARCHY_LOOKUPS.items())
+    fields = [field for field in Component._meta.concrete_fields if not field.is_relation and not field.primary_key]
+    for section in COMPONENT_SECTIONS.values():
+        fields.extend(section.input_fields())
+    columns.update((field.name, (Component.field_lookup(field.name), _dtype(field))) for field in fields)
+    return columns
+
+
+def resolve_columns(names=None):
+    """{column: (lookup, dtype)} of the requested column names, DEFAULT_COLUMNS when none; ValueError on unknown names."""
+    available = export_columns()
+    names = list(dict.fromkeys(names or DEFAULT_COLUMNS))
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f'Unknown columns: {", ".join(unknown)}')
+    return {name: available[name] for name in names}
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, Decimal):
+        return format(value, 'f')
+    return value
+
+
+def csv_chunks(components, columns, chunk_size=CHUNK_SIZE):
+    """
+    CSV text of a Component queryset: the header, then one string per
+    chunk of rows (ordered by id).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    rows = components.order_by('pk').values_list(*(lookup for lookup, dtype in columns.values()))
+    rows = rows.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_text(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+
+
+def write_csv(file, components, columns, chunk_size=CHUNK_SIZE):
+    """Write the CSV export to a text file opened with newline=''."""
+    for text in csv_chunks(components, columns, chunk_size):
+        file.write(text)
+
+
+def write_parquet(path, components, columns, chunk_size=CHUNK_SIZE):
+    """Write the export as a Parquet file at `path`, in row groups of `chunk_size` rows."""
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8') as staging:
+        write_csv(staging, components, columns, chunk_size)
+        staging.flush()
+        schema = {name: dtype for name, (lookup, dtype) in columns.items()}
+        pl.scan_csv(staging.name, schema=schema).sink_parquet(path, row_group_size=chunk_size)
@@ -1,5 +1,6 @@
 from django import forms
-from .models import Facility, Unit, System, Equipment, Component
+from django.forms.models import construct_instance, fields_for_model
+from .models import Facility, Unit, System, Equipment, Component, COMPONENT_SECTIONS, SECTION_FIELDS
 
 class FacilityForm(forms.ModelForm):
     class Meta:
@@ -56,10 +57,29 @@ class EquipmentForm(forms.ModelForm):
         super(EquipmentForm, self).__init__(*args, **kwargs)
         self.fields['system'].queryset = System.objects.filter(unit__facility__owner=user)
 
+def with_section_fields(form_class):
+    """
+    Add the Meta.all_fields entries kept in Component section tables to a
+    Component ModelForm, which only builds fields for the core table, and
+    order base_fields as Meta.all_fields lists them.
+    """
+    meta = form_class.Meta
+    fields = dict(form_class.base_fields)
+    for name, model in COMPONENT_SECTIONS.items():
+        names = [field for field in meta.all_fields if SECTION_FIELDS.get(field) == name]
+        fields.update(fields_for_model(model, fields=names, widgets=meta.widgets))
+    form_class.base_fields = {
+        name: fields.pop(name) for name in dict.fromkeys(meta.all_fields) if name in fields
+    } | fields
+    return form_class
+
+
+@with_section_fields
 class ComponentForm(forms.ModelForm):
     class Meta:
         model = Component
-        fields = [
+        # Every edited field; ModelForm gets the core ones, with_section_fields() the rest
+        all_fields = [
             # Original fields
             'equipment', 'rbix_equipment_type', 'rbix_component_type', 'description',
             'p_and_id', 'p_and_id_other', 'other_drawings', 'commissioning_date',
@@ -243,6 +263,7 @@ class ComponentForm(forms.ModelForm):
             'calculated_consequence_area', 'calculated_total_damage_factor', 
             'calculated_risk', 'calculated_cof'
         ]
+        fields = [name for name in all_fields if name not in SECTION_FIELDS]
         widgets = {
             # Original widgets
             'equipment': forms.Select(attrs={'class': 'select select-bordered w-full'}),
@@ -559,5 +580,37 @@ class ComponentForm(forms.ModelForm):
     def __init__(self, user, *args, **kwargs):
         super(ComponentForm, self).__init__(*args, **kwargs)
         self.fields['equipment'].queryset = Equipment.objects.filter(system__unit__facility__owner=user)
+        for name in self.fields.keys() & SECTION_FIELDS.keys():
+            self.initial.setdefault(name, getattr(self.instance, name))
+
+    def save(self, commit=True):
+        # Section fields are written to the component's section rows, which Component.save() stores
+        for name in COMPONENT_SECTIONS:
+            fields = [field for field in self.fields if SECTION_FIELDS.get(field) == name]
+            if fields:
+                construct_instance(self, self.instance.section(name), fields=fields)
+        return super().save(commit)
+
+
+class ComponentImportForm(forms.Form):
+    facility = forms.ModelChoiceField(
+        queryset=Facility.objects.none(), required=False, empty_label="Facility column of the file",
+        widget=forms.Select(attrs={'class': 'select select-bordered w-full'}),
+    )
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={'class': 'file-input file-input-bordered w-full', 'accept': '.csv,.parquet'}),
+    )
+
+    def __init__(self, user, *args, **kwargs):
+        super(ComponentImportForm, self).__init__(*args, **kwargs)
+        self.fields['facility'].queryset = Facility.objects.filter(owner=user)
 
+    def clean_file(self):
+        from .importer import file_format
 
+        upload = self.cleaned_data['file']
+        try:
+            file_format(upload.name)
+        except ValueError as exc:
+            raise forms.ValidationError(str(exc))
+        return upload
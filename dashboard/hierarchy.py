@@ -0,0 +1,66 @@
+"""
+Facility -> Unit -> System -> Equipment -> Component browsing, one node's
+children at a time.
+
+children() returns a keyset page (ordered by id, `after` the last id of the
+previous page) of plain dicts holding only the columns the hierarchy pages
+show, plus `has_children` for the levels that can be expanded. Nothing is
+prefetched, so a request costs the same whatever the size of the plant.
+"""
+from dataclasses import dataclass
+
+from django.db.models import Exists, OuterRef
+
+from .models import Component, Equipment, Facility, System, Unit
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+@dataclass(frozen=True)
+class Level:
+    model: type
+    parent: str | None      # level of the parent node, also the parent foreign key name
+    owner_lookup: str       # lookup from this level to the owning user
+    fields: tuple           # columns returned for each node, besides id
+    child: str | None       # level of the children
+
+
+LEVELS = {
+    'facility': Level(Facility, None, 'owner', ('name', 'location', 'facility_type', 'company'), 'unit'),
+    'unit': Level(Unit, 'facility', 'facility__owner', ('facility_id', 'name', 'description', 'people_density'), 'system'),
+    'system': Level(System, 'unit', 'unit__facility__owner', ('unit_id', 'name', 'description'), 'equipment'),
+    'equipment': Level(
+        Equipment, 'system', 'system__unit__facility__owner',
+        ('system_id', 'number', 'plant_equipment_type', 'plant_equipment_desc'), 'component',
+    ),
+    'component': Level(
+        Component, 'equipment', 'owner',
+        ('equipment_id', 'rbix_equipment_type', 'rbix_component_type', 'description', 'rep_pipe_no'), None,
+    ),
+}
+
+
+def children(user, level, parent=None, after=None, limit=PAGE_SIZE):
+    """
+    One page of the `level` nodes owned by `user` under the `parent` node
+    (facilities have no parent). Returns (rows, next_after), next_after
+    being None on the last page.
+    """
+    spec = LEVELS[level]
+    queryset = spec.model.objects.filter(**{spec.owner_lookup: user})
+    if spec.parent:
+        queryset = queryset.filter(**{f'{spec.parent}_id': parent})
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+
+    fields = ['id', *spec.fields]
+    if spec.child:
+        child = LEVELS[spec.child].model.objects.filter(**{f'{level}_id': OuterRef('pk')})
+        queryset = queryset.annotate(has_children=Exists(child))
+        fields.append('has_children')
+
+    rows = list(queryset.order_by('pk').values(*fields)[:limit + 1])
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1]['id']
+    return rows, None
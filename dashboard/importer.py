@@ -0,0 +1,408 @@
+"""
+Bulk component import from CSV or Parquet files.
+
+import_components() scans the file with polars and streams it through
+in batches of about CHUNK_SIZE rows, so only one batch is materialized at
+a time:
+
+- every column of a batch is validated in one polars expression per
+  field (numbers and their digit limits, booleans, dates, lengths,
+  choices). A row with a bad cell is reported and skipped; the other rows
+  are loaded;
+- the facility / unit / system / equipment columns are resolved against
+  maps of the owner's hierarchy loaded once. Units, systems and equipment
+  that are not found are created;
+- components, with their facility / owner keys, and their section rows
+  (COMPONENT_SECTIONS) are written with COPY on PostgreSQL and with
+  bulk_create() elsewhere.
+
+COPY and bulk_create() bypass the counter and rollup signals, so the
+counts of the touched facilities and the rollups of the touched units are
+refreshed at the end. The whole import is one transaction.
+
+Columns are the Component input names (core or section fields) plus
+facility (name), unit, system and equipment (number), and optionally
+plant_equipment_type / plant_equipment_desc for equipment the import
+creates (the RBIX equipment type is used when missing). Other columns
+are ignored and reported.
+"""
+import csv
+import io
+import os
+from dataclasses import dataclass, field as dataclass_field
+from decimal import Decimal
+
+import polars as pl
+from django.db import connection, models, transaction
+
+from . import counters, rollups
+from .models import COMPONENT_SECTIONS, SECTION_FIELDS, Component, Equipment, Facility, System, Unit
+
+CHUNK_SIZE = 5000
+BATCH_SIZE = 1000
+FORMATS = ('csv', 'parquet')
+
+# Hierarchy column -> model field its values are checked against
+HIERARCHY_COLUMNS = {
+    'facility': Facility._meta.get_field('name'),
+    'unit': Unit._meta.get_field('name'),
+    'system': System._meta.get_field('name'),
+    'equipment': Equipment._meta.get_field('number'),
+}
+EQUIPMENT_COLUMNS = {
+    'plant_equipment_type': Equipment._meta.get_field('plant_equipment_type'),
+    'plant_equipment_desc': Equipment._meta.get_field('plant_equipment_desc'),
+}
+
+TRUE_VALUES = ['true', 't', 'yes', 'y', '1']
+FALSE_VALUES = ['false', 'f', 'no', 'n', '0']
+
+
+@dataclass
+class RowError:
+    row: int        # data row of the file, from 1 (the header is not counted)
+    column: str
+    message: str
+
+    def __str__(self):
+        return f'row {self.row}, {self.column}: {self.message}'
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    created: dict = dataclass_field(default_factory=lambda: {'units': 0, 'systems': 0, 'equipment': 0})
+    errors: list = dataclass_field(default_factory=list)
+    ignored_columns: list = dataclass_field(default_factory=list)
+
+    @property
+    def skipped(self):
+        return self.rows - self.imported
+
+    def summary(self, max_errors=20):
+        """Totals and the first `max_errors` errors, JSON serializable (job results)."""
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'skipped': self.skipped,
+            **{f'{level}_created': count for level, count in self.created.items()},
+            'ignored_columns': self.ignored_columns,
+            'errors': [str(error) for error in self.errors[:max_errors]],
+        }
+
+
+def input_fields():
+    """{column: model field} of every importable Component input."""
+    fields = {
+        field.name: field for field in Component._meta.concrete_fields
+        if field.editable and not field.is_relation and not field.primary_key
+    }
+    for section in COMPONENT_SECTIONS.values():
+        fields.update((field.name, field) for field in section.input_fields())
+    return fields
+
+
+def file_format(name):
+    """'csv' or 'parquet', from a file name's extension."""
+    extension = os.path.splitext(name)[1].lower().lstrip('.')
+    if extension not in FORMATS:
+        raise ValueError(f'Unsupported file type: {name} (expected .csv or .parquet)')
+    return extension
+
+
+def scan_frame(source, file_format):
+    """
+    The file as a LazyFrame of text columns, header names stripped. Pass a
+    path to stream from disk; polars reads a file object into memory first.
+    """
+    if file_format == 'csv':
+        frame = pl.scan_csv(source, infer_schema=False)
+    elif file_format == 'parquet':
+        frame = pl.scan_parquet(source)
+        frame = frame.with_columns(pl.col(pl.Datetime).dt.date()).with_columns(pl.all().cast(pl.String))
+    else:
+        raise ValueError(f'Unsupported file format: {file_format}')
+    return frame.rename(lambda column: column.strip().lstrip('\ufeff'))
+
+
+# =============================================================================
+# VALIDATION
+# =============================================================================
+
+def _column_checks(name, field, required):
+    """(value expression, [(invalid expression, message)]) of one column."""
+    text = pl.col(name).str.strip_chars()
+    blank = text.is_null() | (text == '')
+    checks = [(blank, 'required')] if required else []
+
+    if isinstance(field, models.BooleanField):
+        lower = text.str.to_lowercase()
+        value = pl.when(lower.is_in(TRUE_VALUES)).then(True).when(lower.is_in(FALSE_VALUES)).then(False)
+        checks.append((~blank & value.is_null(), 'expected true or false'))
+    elif isinstance(field, models.DecimalField):
+        # Checked as floats, stored from the text so no digit is lost
+        number = text.cast(pl.Float64, strict=False)
+        limit = 10 ** (field.max_digits - field.decimal_places)
+        not_number = number.is_null() | number.is_nan() | number.is_infinite()
+        value = pl.when(not_number).then(None).otherwise(text)
+        checks.append((~blank & not_number, 'expected a number'))
+        checks.append((number.abs() >= limit, f'must be less than {limit:g} in absolute value'))
+    elif isinstance(field, models.IntegerField):
+        value = text.cast(pl.Int64, strict=False)
+        low, high = connection.ops.integer_field_range(field.get_internal_type())
+        checks.append((~blank & value.is_null(), 'expected a whole number'))
+        if low is not None and high is not None:
+            checks.append(((value < low) | (value > high), f'must be between {low} and {high}'))
+    elif isinstance(field, models.DateField):
+        value = text.str.to_date('%Y-%m-%d', strict=False)
+        checks.append((~blank & value.is_null(), 'expected a date (YYYY-MM-DD)'))
+    else:
+        value = pl.when(blank).then(None).otherwise(text)
+        if field.max_length:
+            checks.append((text.str.len_chars() > field.max_length, f'longer than {field.max_length} characters'))
+        if field.choices:
+            choices = [str(key) for key, label in field.flatchoices]
+            checks.append((~blank & ~text.is_in(choices), 'not one of the allowed values'))
+    return value, checks
+
+
+def validate(chunk, columns):
+    """
+    Check every cell of `columns` ({column: (model field, required)}) in
+    the chunk. Returns ({column: list of Python values, None when blank},
+    [(row index, column, message)]).
+    """
+    expressions, checks = [], []
+    for name, (field, required) in columns.items():
+        value, column_checks = _column_checks(name, field, required)
+        expressions.append(value.alias(name))
+        for invalid, message in column_checks:
+            alias = f'__invalid_{len(checks)}'
+            expressions.append(invalid.fill_null(False).alias(alias))
+            checks.append((name, alias, message))
+    checked = chunk.select(expressions)
+
+    errors = [
+        (index, name, message)
+        for name, alias, message in checks
+        for index in checked[alias].arg_true().to_list()
+    ]
+    values = {}
+    for name, (field, required) in columns.items():
+        column = checked[name].to_list()
+        if isinstance(field, models.DecimalField):
+            column = [None if value is None else Decimal(value) for value in column]
+        values[name] = column
+    return values, errors
+
+
+# =============================================================================
+# HIERARCHY
+# =============================================================================
+
+class Hierarchy:
+    """
+    The owner's facilities, units, systems and equipment as {key: id} maps,
+    loaded once, and the creation of the nodes an import refers to that do
+    not exist yet. Nodes with duplicate names resolve to the oldest.
+    """
+
+    def __init__(self, user, facility=None):
+        facilities = Facility.objects.filter(owner=user)
+        if facility is not None:
+            facilities = facilities.filter(pk=facility)
+        self.facilities = dict(facilities.order_by('-pk').values_list('name', 'pk'))
+        ids = list(self.facilities.values())
+        self.units = {
+            (facility_id, name): pk for pk, facility_id, name
+            in Unit.objects.filter(facility__in=ids).order_by('-pk').values_list('pk', 'facility_id', 'name')
+        }
+        self.systems = {
+            (unit_id, name): pk for pk, unit_id, name
+            in System.objects.filter(unit__facility__in=ids).order_by('-pk').values_list('pk', 'unit_id', 'name')
+        }
+        self.equipment = {
+            (system_id, number): pk for pk, system_id, number
+            in Equipment.objects.filter(system__unit__facility__in=ids).order_by('-pk').values_list('pk', 'system_id', 'number')
+        }
+        self.touched_facilities = set()
+        self.touched_units = set()
+
+    def _ensure(self, nodes, model, keys, build):
+        """Ids of `keys` in `nodes`, bulk-creating the missing ones. Returns (ids, created count)."""
+        missing = list(dict.fromkeys(key for key in keys if key not in nodes))
+        for key, node in zip(missing, model.objects.bulk_create([build(key) for key in missing], batch_size=BATCH_SIZE)):
+            nodes[key] = node.pk
+        return [nodes[key] for key in keys], len(missing)
+
+    def resolve(self, facility_ids, units, systems, numbers, equipment_types, equipment_descs, created):
+        """Equipment id of each row, adding the nodes created to the `created` counts."""
+        unit_ids, count = self._ensure(
+            self.units, Unit, list(zip(facility_ids, units)),
+            lambda key: Unit(facility_id=key[0], name=key[1]),
+        )
+        created['units'] += count
+        system_ids, count = self._ensure(
+            self.systems, System, list(zip(unit_ids, systems)),
+            lambda key: System(unit_id=key[0], name=key[1]),
+        )
+        created['systems'] += count
+        # New equipment takes its type and description from the first row that names it
+        details = {}
+        for key, equipment_type, desc in zip(zip(system_ids, numbers), equipment_types, equipment_descs):
+            details.setdefault(key, (equipment_type, desc))
+        equipment_ids, count = self._ensure(
+            self.equipment, Equipment, list(zip(system_ids, numbers)),
+            lambda key: Equipment(system_id=key[0], number=key[1],
+                                  plant_equipment_type=details[key][0], plant_equipment_desc=details[key][1]),
+        )
+        created['equipment'] += count
+        self.touched_facilities.update(facility_ids)
+        self.touched_units.update(unit_ids)
+        return equipment_ids
+
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+def _copy_text(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return value
+
+
+def _copy(cursor, model, objects):
+    """COPY model instances into their table, every concrete column included."""
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for obj in objects:
+        writer.writerow([_copy_text(field.get_db_prep_save(getattr(obj, field.attname), connection)) for field in fields])
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    cursor.copy_expert(f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer)
+
+
+def write_components(components, sections):
+    """
+    Insert unsaved Components and their section rows, `sections` holding
+    {section name: [field values of each component]}. COPY is used on
+    PostgreSQL (psycopg2), with the ids taken from the table's sequence
+    first; bulk_create() otherwise.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql' and hasattr(cursor, 'copy_expert'):
+            table, pk = Component._meta.db_table, Component._meta.pk.column
+            cursor.execute('SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                           [table, pk, len(components)])
+            for component, (pk,) in zip(components, cursor.fetchall()):
+                component.pk = pk
+            _copy(cursor, Component, components)
+            for name, model in COMPONENT_SECTIONS.items():
+                _copy(cursor, model, [model(component_id=c.pk, **values) for c, values in zip(components, sections[name])])
+            return
+
+    Component.objects.bulk_create(components, batch_size=BATCH_SIZE)
+    for name, model in COMPONENT_SECTIONS.items():
+        model.objects.bulk_create(
+            [model(component_id=c.pk, **values) for c, values in zip(components, sections[name])],
+            batch_size=BATCH_SIZE,
+        )
+
+
+# =============================================================================
+# IMPORT
+# =============================================================================
+
+def _load_chunk(chunk, first_row, fields, hierarchy, default_facility, user, result):
+    columns = {name: (field, not field.null and not field.has_default()) for name, field in fields.items()}
+    columns.update((name, (field, name != 'facility' or default_facility is None))
+                   for name, field in HIERARCHY_COLUMNS.items() if name in chunk.columns)
+    columns.update((name, (field, False)) for name, field in EQUIPMENT_COLUMNS.items() if name in chunk.columns)
+    values, errors = validate(chunk, columns)
+
+    facility_ids = []
+    for index, name in enumerate(values.get('facility') or [None] * chunk.height):
+        facility_id = default_facility if name is None else hierarchy.facilities.get(name)
+        if name is not None and facility_id is None:
+            errors.append((index, 'facility', f'no facility named {name!r}'))
+        facility_ids.append(facility_id)
+
+    bad = {index for index, name, message in errors}
+    result.errors.extend(sorted(
+        (RowError(first_row + index, name, message) for index, name, message in errors),
+        key=lambda error: error.row,
+    ))
+    rows = [index for index in range(chunk.height) if index not in bad]
+    if not rows:
+        return
+
+    def column(name):
+        source = values.get(name) or [None] * chunk.height
+        return [source[index] for index in rows]
+
+    equipment_types = [
+        plant_type or rbix_type for plant_type, rbix_type
+        in zip(column('plant_equipment_type'), column('rbix_equipment_type'))
+    ]
+    equipment_ids = hierarchy.resolve(
+        [facility_ids[index] for index in rows], column('unit'), column('system'), column('equipment'),
+        equipment_types, column('plant_equipment_desc'), result.created,
+    )
+
+    # Blank cells are left out, so the model defaults apply
+    components = []
+    sections = {name: [] for name in COMPONENT_SECTIONS}
+    for row, index in enumerate(rows):
+        core, section_values = {}, {name: {} for name in COMPONENT_SECTIONS}
+        for name in fields:
+            value = values[name][index]
+            if value is not None:
+                (section_values[SECTION_FIELDS[name]] if name in SECTION_FIELDS else core)[name] = value
+        components.append(Component(
+            equipment_id=equipment_ids[row], facility_id=facility_ids[index], owner_id=user.pk, **core,
+        ))
+        for name, section in section_values.items():
+            sections[name].append(section)
+    write_components(components, sections)
+    result.imported += len(components)
+
+
+def import_components(source, user, facility=None, file_format='csv', chunk_size=CHUNK_SIZE):
+    """
+    Load the components of a CSV or Parquet file (path or file object) into
+    the facilities of `user` named in its facility column, or all into the
+    facility id `facility`. The file is validated and written one batch of
+    about `chunk_size` rows at a time. Returns an ImportResult; raises
+    ValueError when the file cannot be imported at all (unknown format or
+    facility, missing columns).
+    """
+    frame = scan_frame(source, file_format)
+    columns = frame.collect_schema().names()
+    fields = {name: field for name, field in input_fields().items() if name in columns}
+
+    required = {name for name in HIERARCHY_COLUMNS if name != 'facility' or facility is None}
+    required |= {name for name, field in input_fields().items() if not field.null and not field.has_default()}
+    missing = required - set(columns)
+    if missing:
+        raise ValueError(f'Missing columns: {", ".join(sorted(missing))}')
+
+    result = ImportResult(
+        ignored_columns=sorted(set(columns) - set(fields) - set(HIERARCHY_COLUMNS) - set(EQUIPMENT_COLUMNS)),
+    )
+    with transaction.atomic():
+        hierarchy = Hierarchy(user, facility)
+        if facility is not None and facility not in hierarchy.facilities.values():
+            raise ValueError(f'Unknown facility: {facility}')
+        for chunk in frame.collect_batches(chunk_size=chunk_size, lazy=True):
+            _load_chunk(chunk, result.rows + 1, fields, hierarchy, facility, user, result)
+            result.rows += chunk.height
+
+        counters.refresh_counts(owners=[user.pk], facilities=hierarchy.touched_facilities)
+        rollups.refresh_rollups(units=hierarchy.touched_units)
+    return result
@@ -0,0 +1,340 @@
+"""
+Database-backed background job queue.
+
+Long recalculations are stored as BackgroundJob rows and run by one or
+more `manage.py rbi_worker` processes, on any host that reaches the
+database. Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED where
+the database supports it (PostgreSQL), so concurrent workers never wait
+on each other; elsewhere (SQLite) a job is claimed with a conditional
+UPDATE that only one worker can win. Failed jobs are retried with an
+exponential backoff until max_attempts, except those whose handler raised
+JobFailed (bad input that a retry would not fix). While a job runs, a thread of
+its worker refreshes the job's heartbeat (locked_at) every
+HEARTBEAT_INTERVAL; jobs whose heartbeat is older than STALE_AFTER were
+left by a worker that died and are put back in the queue, however long
+the live ones take.
+"""
+import datetime
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 30
+HEARTBEAT_INTERVAL = datetime.timedelta(seconds=30)
+# Several missed heartbeats, so a slow database round trip never requeues a live job
+STALE_AFTER = datetime.timedelta(minutes=5)
+POLL_INTERVAL_SECONDS = 2.0
+
+JOB_HANDLERS = {}
+# kind -> function called with the job params once the job succeeded or failed for good
+JOB_FINALIZERS = {}
+
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job without retrying; `result` is stored on the job."""
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def job(kind, finalize=None):
+    """
+    Register a function as the handler for jobs of `kind`. It receives the
+    job params, as does `finalize` when the job will not run again.
+    """
+    def register(handler):
+        JOB_HANDLERS[kind] = handler
+        if finalize is not None:
+            JOB_FINALIZERS[kind] = finalize
+        return handler
+    return register
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue(kind, params=None, owner=None, facility=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Queue a job. `params` (JSON serializable) are passed to the handler as
+    keyword arguments; `owner` and `facility` only label the job for the
+    jobs page.
+    """
+    from .models import BackgroundJob
+
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return BackgroundJob.objects.create(
+        kind=kind, params=params or {}, owner=owner, facility=facility, max_attempts=max_attempts,
+    )
+
+
+def claim(worker):
+    """Take the oldest due job for `worker`, or None when the queue is empty."""
+    from .models import BackgroundJob
+
+    now = timezone.now()
+    due = BackgroundJob.objects.filter(status=BackgroundJob.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = due.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status, job.worker, job.locked_at = BackgroundJob.RUNNING, worker, now
+            job.attempts += 1
+            job.save(update_fields=['status', 'worker', 'locked_at', 'attempts'])
+            return job
+
+    for pk in due.values_list('pk', flat=True)[:10]:
+        won = BackgroundJob.objects.filter(pk=pk, status=BackgroundJob.QUEUED).update(
+            status=BackgroundJob.RUNNING, worker=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if won:
+            return BackgroundJob.objects.get(pk=pk)
+    return None
+
+
+@contextmanager
+def heartbeat(job, interval=HEARTBEAT_INTERVAL):
+    """Refresh the running job's locked_at every `interval` from a background thread while the block runs."""
+    from .models import BackgroundJob
+
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval.total_seconds()):
+                try:
+                    BackgroundJob.objects.filter(pk=job.pk, status=BackgroundJob.RUNNING, worker=job.worker).update(
+                        locked_at=timezone.now(),
+                    )
+                except Exception:
+                    logger.exception('Heartbeat of job %s failed', job.pk)
+        finally:
+            # The thread's own connection
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'job-{job.pk}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run(job, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """Run a claimed job and record its outcome. Returns the job."""
+    from .models import BackgroundJob
+    from .rollups import discard
+
+    started = time.perf_counter()
+    try:
+        with heartbeat(job, heartbeat_interval):
+            result = JOB_HANDLERS[job.kind](**job.params)
+    except JobFailed as error:
+        discard()
+        job.status = BackgroundJob.FAILED
+        job.finished_at = timezone.now()
+        job.result = error.result
+        job.error = str(error)
+        logger.warning('Job %s failed without retry: %s', job.pk, error)
+        job.save(update_fields=['status', 'finished_at', 'result', 'error'])
+    except Exception:
+        # Its rollup refreshes were rolled back with it
+        discard()
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = BackgroundJob.QUEUED
+            job.run_after = timezone.now() + datetime.timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+            logger.warning('Job %s failed (attempt %s/%s), retrying', job.pk, job.attempts, job.max_attempts)
+        else:
+            job.status = BackgroundJob.FAILED
+            job.finished_at = timezone.now()
+            logger.error('Job %s failed after %s attempts', job.pk, job.attempts)
+        job.save(update_fields=['status', 'run_after', 'finished_at', 'error'])
+    else:
+        job.status = BackgroundJob.SUCCEEDED
+        job.finished_at = timezone.now()
+        job.result = {**(result or {}), 'elapsed_seconds': round(time.perf_counter() - started, 2)}
+        job.error = ''
+        job.save(update_fields=['status', 'finished_at', 'result', 'error'])
+    if job.status != BackgroundJob.QUEUED and job.kind in JOB_FINALIZERS:
+        try:
+            JOB_FINALIZERS[job.kind](**job.params)
+        except Exception:
+            logger.exception('Finalizing job %s failed', job.pk)
+    return job
+
+
+def requeue_stale(stale_after=STALE_AFTER):
+    """Put back running jobs without a heartbeat for `stale_after` (their worker died). Returns the count."""
+    from .models import BackgroundJob
+
+    return BackgroundJob.objects.filter(
+        status=BackgroundJob.RUNNING, locked_at__lt=timezone.now() - stale_after,
+    ).update(status=BackgroundJob.QUEUED, worker='', locked_at=None)
+
+
+def work(worker=None, burst=False, max_jobs=None, poll_interval=POLL_INTERVAL_SECONDS, should_stop=lambda: False):
+    """
+    Claim and run jobs until stopped. With `burst` the loop exits as soon
+    as the queue is empty. Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    count = 0
+    while not should_stop() and (max_jobs is None or count < max_jobs):
+        close_old_connections()
+        requeue_stale()
+        job = claim(worker)
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run(job)
+        count += 1
+    return count
+
+
+# =============================================================================
+# HANDLERS
+# =============================================================================
+
+def _components(facility=None, unit=None, system=None):
+    from .calculations.batch import scoped_components
+
+    return scoped_components(facility=facility, unit=unit, system=system)
+
+
+@job('recalculate_facility')
+def recalculate_facility(facility=None, unit=None, system=None, force=False):
+    """Corrosion rates, damage factors, consequences, FMS and risk, in dependency order."""
+    from .calculations import batch
+    from .rollups import deferred
+
+    queryset = _components(facility, unit, system)
+    # Rebuild the risk rollups once, after the last stage
+    with deferred():
+        rates = batch.recalculate_corrosion_rates(queryset)
+        updated, unchanged = batch.recalculate_damage_factors(queryset, force=force)
+        consequences, _ = batch.recalculate_consequences(queryset)
+        fms = batch.recalculate_fms(queryset)
+        risk = batch.recalculate_stored_risk(queryset)
+    return {
+        'corrosion_rates': sum(rates.values()),
+        'damage_factors': updated,
+        'damage_factors_unchanged': unchanged,
+        'consequences': consequences,
+        'fms': fms,
+        'risk': risk,
+    }
+
+
+@job('recalculate_fms')
+def recalculate_fms(facility=None, unit=None, system=None):
+    """FMS factor, then the risk results that depend on final_pof."""
+    from .calculations import batch
+    from .rollups import deferred
+
+    queryset = _components(facility, unit, system)
+    with deferred():
+        fms = batch.recalculate_fms(queryset)
+        risk = batch.recalculate_stored_risk(queryset)
+    return {'fms': fms, 'risk': risk}
+
+
+@job('plan_inspections')
+def plan_inspections(facility=None, unit=None, system=None, target_df=None, target_risk=None, horizon_years=None):
+    from .calculations import batch, inspection_planning
+
+    count, due_now = batch.recalculate_inspection_dates(
+        _components(facility, unit, system), target_df=target_df, target_risk=target_risk,
+        horizon_years=horizon_years or inspection_planning.DEFAULT_HORIZON_YEARS,
+    )
+    return {'planned': count, 'due_now': due_now}
+
+
+@contextmanager
+def local_path(path):
+    """
+    A filesystem path for a default_storage file, so polars can stream it
+    from disk. Storages without local paths are copied to a temporary file.
+    """
+    from django.core.files.storage import default_storage
+
+    try:
+        local = default_storage.path(path)
+    except NotImplementedError:
+        local = None
+    if local is not None:
+        yield local
+        return
+    # Closed first so polars can reopen it by name on any platform; removed when the block exits
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(path)[1], delete_on_close=False) as target:
+        with default_storage.open(path) as source:
+            for chunk in source.chunks():
+                target.write(chunk)
+        target.close()
+        yield target.name
+
+
+def delete_upload(path, **params):
+    from django.core.files.storage import default_storage
+
+    default_storage.delete(path)
+
+
+@job('import_components', finalize=delete_upload)
+def import_components(path, owner, facility=None):
+    """
+    Import an uploaded component file (a default_storage path). A file the
+    importer rejects (bad format, missing columns, unknown facility) fails
+    the job without retry; the upload is deleted once the job is done.
+    """
+    from accounts.models import CustomUser
+    from . import importer
+
+    try:
+        with local_path(path) as source:
+            result = importer.import_components(
+                source, CustomUser.objects.get(pk=owner), facility=facility, file_format=importer.file_format(path),
+            )
+    except ValueError as error:
+        raise JobFailed(str(error), {'errors': [str(error)]}) from error
+    return result.summary()
+
+
+@job('export_register')
+def export_register(owner, facility=None, columns=None):
+    """Write the owner's risk register as Parquet to default_storage; the jobs page links to the file."""
+    from django.core.files import File
+    from django.core.files.storage import default_storage
+    from . import exporter
+    from .models import Component
+
+    components = Component.objects.filter(owner_id=owner)
+    if facility:
+        components = components.filter(facility_id=facility)
+    name = f'exports/{owner}/risk-register-{timezone.localdate():%Y-%m-%d}.parquet'
+    # Removed when the block exits; closed first so polars can reopen it by name on any platform
+    with tempfile.NamedTemporaryFile(suffix='.parquet', delete_on_close=False) as target:
+        target.close()
+        exporter.write_parquet(target.name, components, exporter.resolve_columns(columns))
+        with open(target.name, 'rb') as export:
+            path = default_storage.save(name, File(export))
+    return {'rows': components.count(), 'file': path}
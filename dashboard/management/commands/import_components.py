@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.importer import CHUNK_SIZE, file_format, import_components
+
+
+class Command(BaseCommand):
+    help = (
+        "Import components from a CSV or Parquet file, creating the units, systems and equipment "
+        "it names. Rows with invalid cells are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or Parquet file")
+        parser.add_argument('--facility', type=int, help="Facility ID to import every row into (default: the file's facility column)")
+        parser.add_argument('--owner', help="Owner's email, when importing by the facility column")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--max-errors', type=int, default=50, help="Row errors to print")
+
+    def handle(self, *args, **options):
+        from accounts.models import CustomUser
+        from dashboard.models import Facility
+
+        if options['facility'] is not None:
+            facility = Facility.objects.filter(pk=options['facility']).select_related('owner').first()
+            if facility is None or facility.owner is None:
+                raise CommandError(f"Facility {options['facility']} not found or has no owner")
+            owner = facility.owner
+        elif options['owner']:
+            owner = CustomUser.objects.filter(email=options['owner']).first()
+            if owner is None:
+                raise CommandError(f"No user with email {options['owner']}")
+        else:
+            raise CommandError("Pass --facility or --owner")
+
+        started = time.perf_counter()
+        try:
+            result = import_components(
+                options['path'], owner, facility=options['facility'],
+                file_format=file_format(options['path']), chunk_size=options['chunk_size'],
+            )
+        except (ValueError, OSError) as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        for error in result.errors[:options['max_errors']]:
+            self.stderr.write(str(error))
+        if len(result.errors) > options['max_errors']:
+            self.stderr.write(f"... {len(result.errors) - options['max_errors']} more errors")
+        if result.ignored_columns:
+            self.stdout.write(f"Ignored columns: {', '.join(result.ignored_columns)}")
+        created = ', '.join(f"{count} {level}" for level, count in result.created.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.imported} of {result.rows} components ({result.skipped} skipped; "
+            f"created {created}) in {elapsed:.2f}s ({result.imported / max(elapsed, 1e-9):.0f} components/s)"
+        ))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.calculations.batch import recalculate_inspection_dates, scoped_components
+from dashboard.calculations.inspection_planning import DEFAULT_HORIZON_YEARS, DEFAULT_TARGET_DF
+
+
+class Command(BaseCommand):
+    help = "Project the total DF and store the next inspection due date for a facility, unit or system."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--facility', type=int, help="Facility ID")
+        parser.add_argument('--unit', type=int, help="Unit ID")
+        parser.add_argument('--system', type=int, help="System ID")
+        parser.add_argument('--target-df', type=float, default=DEFAULT_TARGET_DF, help="Maximum total DF")
+        parser.add_argument('--target-risk', type=float, help="Maximum area risk (m2/yr); overrides --target-df")
+        parser.add_argument('--horizon', type=float, default=DEFAULT_HORIZON_YEARS, help="Planning horizon (years)")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = scoped_components(
+            facility=options['facility'],
+            unit=options['unit'],
+            system=options['system'],
+        )
+        started = time.perf_counter()
+        count, due_now = recalculate_inspection_dates(
+            queryset,
+            target_df=options['target_df'],
+            target_risk=options['target_risk'],
+            horizon_years=options['horizon'],
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{due_now} components are already at the target")
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {count} components in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,37 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from dashboard import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (recalculations, planning). Start as many workers as needed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help="Exit once the queue is empty")
+        parser.add_argument('--max-jobs', type=int, help="Exit after running this many jobs")
+        parser.add_argument('--sleep', type=float, default=jobs.POLL_INTERVAL_SECONDS,
+                            help="Seconds to wait when the queue is empty")
+        parser.add_argument('--worker', help="Worker name (default host:pid)")
+
+    def handle(self, *args, **options):
+        stopping = []
+
+        def stop(signum, frame):
+            # Finish the running job, then exit
+            stopping.append(signum)
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        worker = options['worker'] or jobs.worker_name()
+        self.stdout.write(f"Worker {worker} waiting for jobs")
+        count = jobs.work(
+            worker=worker,
+            burst=options['burst'],
+            max_jobs=options['max_jobs'],
+            poll_interval=options['sleep'],
+            should_stop=lambda: bool(stopping),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker} ran {count} jobs"))
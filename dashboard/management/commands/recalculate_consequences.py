@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.calculations.batch import recalculate_consequences, scoped_components
+
+
+class Command(BaseCommand):
+    help = "Recalculate and store the COF Level 1 consequence area, category and financial COF for a facility, unit or system."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--facility', type=int, help="Facility ID")
+        parser.add_argument('--unit', type=int, help="Unit ID")
+        parser.add_argument('--system', type=int, help="System ID")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = scoped_components(
+            facility=options['facility'],
+            unit=options['unit'],
+            system=options['system'],
+        )
+        started = time.perf_counter()
+        count, costs = recalculate_consequences(queryset, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+
+        for unit_id, total in sorted(costs.unit_totals.items()):
+            self.stdout.write(f"Unit {unit_id}: ${total:,.0f}")
+        for facility_id, total in sorted(costs.facility_totals.items()):
+            self.stdout.write(f"Facility {facility_id}: ${total:,.0f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {count} components in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.calculations.batch import recalculate_corrosion_rates, scoped_components
+
+
+class Command(BaseCommand):
+    help = "Interpolate and store the Annex 2.B corrosion rates (CO2, HCl, H2SO4, HF, acid water, H2S/H2, sulfidic) for a facility, unit or system."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--facility', type=int, help="Facility ID")
+        parser.add_argument('--unit', type=int, help="Unit ID")
+        parser.add_argument('--system', type=int, help="System ID")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = scoped_components(
+            facility=options['facility'],
+            unit=options['unit'],
+            system=options['system'],
+        )
+        started = time.perf_counter()
+        counts = recalculate_corrosion_rates(queryset, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        for field, count in counts.items():
+            self.stdout.write(f"{field}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated corrosion rates in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.calculations.batch import recalculate_damage_factors, scoped_components
+
+
+class Command(BaseCommand):
+    help = "Recalculate and store the total damage factor for a facility, unit or system."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--facility', type=int, help="Facility ID")
+        parser.add_argument('--unit', type=int, help="Unit ID")
+        parser.add_argument('--system', type=int, help="System ID")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--force', action='store_true',
+                            help="Recalculate components whose inputs have not changed")
+
+    def handle(self, *args, **options):
+        queryset = scoped_components(
+            facility=options['facility'],
+            unit=options['unit'],
+            system=options['system'],
+        )
+        started = time.perf_counter()
+        count, unchanged = recalculate_damage_factors(
+            queryset, batch_size=options['batch_size'], force=options['force'],
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {count} components ({unchanged} unchanged) in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.calculations.batch import recalculate_fms, scoped_components
+
+
+class Command(BaseCommand):
+    help = "Apply the facility FMS audit and recalculate final_pof for a facility, unit or system."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--facility', type=int, help="Facility ID")
+        parser.add_argument('--unit', type=int, help="Unit ID")
+        parser.add_argument('--system', type=int, help="System ID")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = scoped_components(
+            facility=options['facility'],
+            unit=options['unit'],
+            system=options['system'],
+        )
+        started = time.perf_counter()
+        count = recalculate_fms(queryset, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {count} components in {elapsed:.2f}s"
+        ))
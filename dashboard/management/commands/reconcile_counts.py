@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.counters import refresh_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the dashboard HierarchyCounts rows from the hierarchy and repair any that "
+        "drifted (bulk loads, raw SQL or QuerySet.update() bypass the counting signals)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, help="User ID (default: every owner and facility)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['owner'] is None:
+            repaired = refresh_counts()
+        else:
+            from dashboard.models import Facility
+            facilities = Facility.objects.filter(owner_id=options['owner']).values_list('pk', flat=True)
+            repaired = refresh_counts(owners=[options['owner']], facilities=list(facilities))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} counter rows in {elapsed:.2f}s"))
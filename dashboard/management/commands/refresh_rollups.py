@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the RiskRollup rows (per-unit and per-facility risk matrix cells) from the "
+        "stored component results, for one facility or the whole register."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--facility', type=int, help="Facility ID (default: every facility)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['facility'] is None:
+            written = refresh_rollups()
+        else:
+            from dashboard.models import Unit
+            units = Unit.objects.filter(facility_id=options['facility']).values_list('pk', flat=True)
+            written = refresh_rollups(units=list(units), facilities=[options['facility']])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup rows in {elapsed:.2f}s"))
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0042_component_cof_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='next_inspection_due_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Next Inspection Due Date'),
+        ),
+    ]
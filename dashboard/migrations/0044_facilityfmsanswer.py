@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0043_component_next_inspection_due_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacilityFMSAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20, verbose_name='Section')),
+                ('question', models.CharField(max_length=20, verbose_name='Question')),
+                ('score', models.DecimalField(decimal_places=2, default=0, max_digits=6, verbose_name='Score')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fms_answers', to='dashboard.facility')),
+            ],
+            options={
+                'verbose_name': 'FMS Answer',
+                'verbose_name_plural': 'FMS Answers',
+                'ordering': ['facility', 'section', 'question'],
+                'constraints': [models.UniqueConstraint(fields=('facility', 'section', 'question'), name='unique_facility_fms_answer')],
+            },
+        ),
+    ]
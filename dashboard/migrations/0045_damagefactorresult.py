@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0044_facilityfmsanswer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DamageFactorResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mechanism', models.CharField(max_length=40, verbose_name='Mechanism')),
+                ('base_df', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Base DF')),
+                ('final_df', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Final DF')),
+                ('susceptibility', models.CharField(blank=True, max_length=50, null=True, verbose_name='Susceptibility')),
+                ('governing', models.BooleanField(default=False, verbose_name='Governs Total DF')),
+                ('computed_at', models.DateTimeField(verbose_name='Computed At')),
+                ('input_hash', models.CharField(max_length=32, verbose_name='Input Hash')),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='damage_factor_results', to='dashboard.component')),
+            ],
+            options={
+                'verbose_name': 'Damage Factor Result',
+                'verbose_name_plural': 'Damage Factor Results',
+                'ordering': ['component', 'mechanism'],
+                'indexes': [models.Index(fields=['mechanism', '-final_df'], name='df_result_mechanism_df_idx'), models.Index(condition=models.Q(('governing', True)), fields=['mechanism', 'component'], name='df_result_governing_idx')],
+                'constraints': [models.UniqueConstraint(fields=('component', 'mechanism'), name='unique_component_mechanism_df')],
+            },
+        ),
+    ]
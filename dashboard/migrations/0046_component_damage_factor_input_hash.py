@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0045_damagefactorresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='damage_factor_input_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, verbose_name='DF Input Hash'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0047_backgroundjob'),
+        ('formula_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='facility',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dashboard.facility'),
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='inspectionhistory',
+            name='facility',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dashboard.facility'),
+        ),
+        migrations.AddField(
+            model_name='inspectionhistory',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['owner', 'facility'], name='component_owner_facility_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionhistory',
+            index=models.Index(fields=['owner', 'component'], name='inspection_owner_component_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill(apps, schema_editor):
+    Component = apps.get_model('dashboard', 'Component')
+    Equipment = apps.get_model('dashboard', 'Equipment')
+    InspectionHistory = apps.get_model('dashboard', 'InspectionHistory')
+
+    hierarchy = Equipment.objects.filter(pk=OuterRef('equipment_id'))
+    Component.objects.update(
+        facility_id=Subquery(hierarchy.values('system__unit__facility_id')[:1]),
+        owner_id=Subquery(hierarchy.values('system__unit__facility__owner_id')[:1]),
+    )
+    component = Component.objects.filter(pk=OuterRef('component_id'))
+    InspectionHistory.objects.update(
+        facility_id=Subquery(component.values('facility_id')[:1]),
+        owner_id=Subquery(component.values('owner_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0048_component_ownership_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
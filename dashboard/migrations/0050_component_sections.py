@@ -0,0 +1,206 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+import dashboard.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0049_backfill_ownership_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComponentBrittleFracture',
+            fields=[
+                ('component', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='brittle_fracture_inputs', serialize=False, to='dashboard.component')),
+                ('mechanism_brittle_fracture_active', models.BooleanField(default=False, verbose_name='Mech. Active: Brittle Fracture')),
+                ('brittle_admin_controls', models.BooleanField(default=False, verbose_name='Admin Controls Prevent Pressurization?')),
+                ('brittle_min_operating_temp_f', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Min. Operating Temp (°F)')),
+                ('brittle_delta_fatt', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Delta FATT')),
+                ('brittle_cet_f', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Critical Exposure Temp (CET) (°F)')),
+                ('brittle_pwht', models.BooleanField(default=False, verbose_name='PWHT (Brittle Specific)')),
+                ('brittle_curve', models.CharField(blank=True, max_length=10, null=True, verbose_name='Exemption Curve')),
+                ('brittle_yield_strength_ksi', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Yield Strength (ksi)')),
+                ('brittle_material_type', models.CharField(blank=True, max_length=50, null=True, verbose_name='Material Type')),
+            ],
+            options={
+                'verbose_name': 'Brittle fracture inputs',
+                'verbose_name_plural': 'Brittle fracture inputs',
+            },
+            bases=(dashboard.models.DirtyFieldsMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ComponentExternalDamage',
+            fields=[
+                ('component', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='external_inputs', serialize=False, to='dashboard.component')),
+                ('mech_ext_corrosion_active', models.BooleanField(default=False, verbose_name='External Corrosion Active')),
+                ('mech_cui_active', models.BooleanField(default=False, verbose_name='CUI Active')),
+                ('mech_ext_clscc_active', models.BooleanField(default=False, verbose_name='External ClSCC Active')),
+                ('mech_cui_clscc_active', models.BooleanField(default=False, verbose_name='CUI ClSCC Active')),
+                ('external_driver', models.CharField(blank=True, choices=[('None', 'None'), ('Marine', 'Marine'), ('Temperate', 'Temperate'), ('Arid/Dry', 'Arid/Dry'), ('Severe', 'Severe')], max_length=50, null=True, verbose_name='External Corrosion Driver')),
+                ('cui_driver', models.CharField(blank=True, choices=[('None', 'None'), ('Mild', 'Mild'), ('Moderate', 'Moderate'), ('Severe', 'Severe')], max_length=50, null=True, verbose_name='CUI Driver')),
+                ('insulation_condition', models.CharField(blank=True, choices=[('Good', 'Good'), ('Average', 'Average'), ('Poor', 'Poor')], max_length=50, null=True, verbose_name='Insulation Condition')),
+                ('complexity', models.CharField(blank=True, choices=[('High', 'High (Pipe, <1.5" OD)'), ('Medium', 'Medium'), ('Low', 'Low')], max_length=50, null=True, verbose_name='Complexity')),
+                ('mechanism_external_damage_active', models.BooleanField(default=False, verbose_name='Mech. Active: External Damage')),
+            ],
+            options={
+                'verbose_name': 'External damage inputs',
+                'verbose_name_plural': 'External damage inputs',
+            },
+            bases=(dashboard.models.DirtyFieldsMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ComponentHTHA',
+            fields=[
+                ('component', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='htha_inputs', serialize=False, to='dashboard.component')),
+                ('mechanism_htha_active', models.BooleanField(default=False, verbose_name='Mech. Active: HTHA')),
+                ('htha_material', models.CharField(blank=True, max_length=100, null=True, verbose_name='HTHA Material')),
+                ('htha_h2_partial_pressure_psia', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='H2 Partial Pressure (psia)')),
+                ('htha_exposure_time_years', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='HTHA Exposure Time (years)')),
+                ('htha_damage_observed', models.BooleanField(default=False, verbose_name='HTHA Damage Observed?')),
+                ('htha_material_verification', models.BooleanField(default=False, verbose_name='HTHA Material Verification Done?')),
+            ],
+            options={
+                'verbose_name': 'HTHA inputs',
+                'verbose_name_plural': 'HTHA inputs',
+            },
+            bases=(dashboard.models.DirtyFieldsMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ComponentSCC',
+            fields=[
+                ('component', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='scc_inputs', serialize=False, to='dashboard.component')),
+                ('mechanism_scc_caustic_active', models.BooleanField(default=False, verbose_name='Mech. Active: SCC Caustic')),
+                ('scc_caustic_cracks_observed', models.BooleanField(default=False, verbose_name='Caustic Cracks Observed?')),
+                ('scc_caustic_cracks_removed', models.BooleanField(default=False, verbose_name='Caustic Cracks Removed?')),
+                ('scc_caustic_stress_relieved', models.BooleanField(default=False, verbose_name='Caustic Stress Relieved?')),
+                ('scc_caustic_naoh_conc_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='NaOH Concentration (%)')),
+                ('scc_caustic_steamed_out_prior', models.BooleanField(default=False, verbose_name='Steamed Out Prior to Service?')),
+                ('scc_caustic_inspection_count_a', models.IntegerField(default=0, verbose_name='Insp. Count Cat A (Caustic)')),
+                ('scc_caustic_inspection_count_b', models.IntegerField(default=0, verbose_name='Insp. Count Cat B (Caustic)')),
+                ('scc_caustic_inspection_count_c', models.IntegerField(default=0, verbose_name='Insp. Count Cat C (Caustic)')),
+                ('scc_caustic_inspection_count_d', models.IntegerField(default=0, verbose_name='Insp. Count Cat D (Caustic)')),
+                ('mechanism_scc_amine_active', models.BooleanField(default=False, verbose_name='Mech. Active: SCC Amine')),
+                ('scc_amine_cracks_observed', models.BooleanField(default=False, verbose_name='Amine Cracks Observed?')),
+                ('scc_amine_cracks_removed', models.BooleanField(default=False, verbose_name='Amine Cracks Removed?')),
+                ('scc_amine_stress_relieved', models.BooleanField(default=False, verbose_name='Amine Stress Relieved?')),
+                ('scc_amine_lean_amine', models.BooleanField(default=False, verbose_name='Exposed to Lean Amine?')),
+                ('scc_amine_solution_type', models.CharField(blank=True, choices=[('MEA_DIPA', 'MEA or DIPA'), ('DEA_OTHER', 'DEA or Others')], max_length=20, null=True, verbose_name='Amine Solution Type')),
+                ('scc_amine_steamed_out', models.BooleanField(default=False, verbose_name='Amine Steamed Out?')),
+                ('scc_amine_inspection_count_a', models.IntegerField(default=0, verbose_name='Insp. Count Cat A (Amine)')),
+                ('scc_amine_inspection_count_b', models.IntegerField(default=0, verbose_name='Insp. Count Cat B (Amine)')),
+                ('scc_amine_inspection_count_c', models.IntegerField(default=0, verbose_name='Insp. Count Cat C (Amine)')),
+                ('scc_amine_inspection_count_d', models.IntegerField(default=0, verbose_name='Insp. Count Cat D (Amine)')),
+                ('mechanism_scc_ssc_active', models.BooleanField(default=False, verbose_name='Mech. Active: SSC')),
+                ('scc_ssc_ph', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, verbose_name='pH')),
+                ('scc_ssc_h2s_ppm', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='H2S Content (ppm)')),
+                ('scc_ssc_hardness_hb', models.DecimalField(blank=True, decimal_places=1, max_digits=6, null=True, verbose_name='Max Hardness (HB)')),
+                ('scc_ssc_pwht', models.BooleanField(default=False, verbose_name='SSC PWHT?')),
+                ('scc_ssc_cracks_observed', models.BooleanField(default=False, verbose_name='SSC Cracks Observed?')),
+                ('scc_ssc_cracks_removed', models.BooleanField(default=False, verbose_name='SSC Cracks Removed?')),
+                ('scc_ssc_inspection_count_a', models.IntegerField(default=0, verbose_name='Insp. Count Cat A (SSC)')),
+                ('scc_ssc_inspection_count_b', models.IntegerField(default=0, verbose_name='Insp. Count Cat B (SSC)')),
+                ('scc_ssc_inspection_count_c', models.IntegerField(default=0, verbose_name='Insp. Count Cat C (SSC)')),
+                ('scc_ssc_inspection_count_d', models.IntegerField(default=0, verbose_name='Insp. Count Cat D (SSC)')),
+                ('mechanism_scc_hic_h2s_active', models.BooleanField(default=False, verbose_name='Mech. Active: HIC/SOHIC-H2S')),
+                ('scc_hic_h2s_ph', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, verbose_name='pH (HIC)')),
+                ('scc_hic_h2s_h2s_ppm', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='H2S (ppm) (HIC)')),
+                ('scc_hic_h2s_cyanide_present', models.BooleanField(default=False, verbose_name='Cyanide Present?')),
+                ('scc_hic_h2s_banding_severity', models.CharField(choices=[('None', 'None'), ('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], default='None', max_length=20, verbose_name='Banding Severity')),
+                ('scc_hic_h2s_cracks_observed', models.BooleanField(default=False, verbose_name='HIC Cracks Observed?')),
+                ('scc_hic_h2s_cracks_removed', models.BooleanField(default=False, verbose_name='HIC Cracks Removed?')),
+                ('scc_hic_h2s_inspection_count_a', models.IntegerField(default=0, verbose_name='Insp. Count Cat A (HIC)')),
+                ('scc_hic_h2s_inspection_count_b', models.IntegerField(default=0, verbose_name='Insp. Count Cat B (HIC)')),
+                ('scc_hic_h2s_inspection_count_c', models.IntegerField(default=0, verbose_name='Insp. Count Cat C (HIC)')),
+                ('scc_hic_h2s_inspection_count_d', models.IntegerField(default=0, verbose_name='Insp. Count Cat D (HIC)')),
+                ('mechanism_scc_acscc_active', models.BooleanField(default=False, verbose_name='Mech. Active: ACSCC')),
+                ('scc_acscc_cracks_observed', models.BooleanField(default=False, verbose_name='ACSCC Cracks Observed?')),
+                ('scc_acscc_cracks_removed', models.BooleanField(default=False, verbose_name='ACSCC Cracks Removed?')),
+                ('scc_acscc_stress_relieved', models.BooleanField(default=False, verbose_name='ACSCC Stress Relieved?')),
+                ('scc_acscc_co3_conc_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='CO3 Concentration (%)')),
+                ('scc_acscc_inspection_count_a', models.IntegerField(default=0, verbose_name='Insp. Count Cat A (ACSCC)')),
+                ('scc_acscc_inspection_count_b', models.IntegerField(default=0, verbose_name='Insp. Count Cat B (ACSCC)')),
+                ('scc_acscc_inspection_count_c', models.IntegerField(default=0, verbose_name='Insp. Count Cat C (ACSCC)')),
+                ('scc_acscc_inspection_count_d', models.IntegerField(default=0, verbose_name='Insp. Count Cat D (ACSCC)')),
+                ('mechanism_scc_pascc_active', models.BooleanField(default=False, verbose_name='Mech. Active: PASCC')),
+                ('scc_pascc_cracks_observed', models.BooleanField(default=False, verbose_name='PASCC Cracks Observed?')),
+                ('scc_pascc_cracks_removed', models.BooleanField(default=False, verbose_name='PASCC Cracks Removed?')),
+                ('scc_pascc_sensitized', models.BooleanField(default=False, verbose_name='Material Sensitized?')),
+                ('scc_pascc_sulfur_exposure', models.BooleanField(default=False, verbose_name='Sulfur Exposure?')),
+                ('scc_pascc_downtime_protected', models.BooleanField(default=False, verbose_name='Downtime Protection Used?')),
+                ('scc_pascc_inspection_count_a', models.IntegerField(default=0, verbose_name='Insp. Count Cat A (PASCC)')),
+                ('scc_pascc_inspection_count_b', models.IntegerField(default=0, verbose_name='Insp. Count Cat B (PASCC)')),
+                ('scc_pascc_inspection_count_c', models.IntegerField(default=0, verbose_name='Insp. Count Cat C (PASCC)')),
+                ('scc_pascc_inspection_count_d', models.IntegerField(default=0, verbose_name='Insp. Count Cat D (PASCC)')),
+                ('mechanism_scc_clscc_active', models.BooleanField(default=False, verbose_name='Mech. Active: ClSCC')),
+                ('scc_clscc_cracks_observed', models.BooleanField(default=False, verbose_name='ClSCC Cracks Observed?')),
+                ('scc_clscc_cracks_removed', models.BooleanField(default=False, verbose_name='ClSCC Cracks Removed?')),
+                ('scc_clscc_cl_conc_ppm', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Cl Concentration (ppm)')),
+                ('scc_clscc_deposits_present', models.BooleanField(default=False, verbose_name='Deposits Present?')),
+                ('scc_clscc_inspection_count_a', models.IntegerField(default=0, verbose_name='Insp. Count Cat A (ClSCC)')),
+                ('scc_clscc_inspection_count_b', models.IntegerField(default=0, verbose_name='Insp. Count Cat B (ClSCC)')),
+                ('scc_clscc_inspection_count_c', models.IntegerField(default=0, verbose_name='Insp. Count Cat C (ClSCC)')),
+                ('scc_clscc_inspection_count_d', models.IntegerField(default=0, verbose_name='Insp. Count Cat D (ClSCC)')),
+                ('mechanism_scc_hsc_hf_active', models.BooleanField(default=False, verbose_name='Mech. Active: HSC-HF')),
+                ('scc_hsc_hf_cracks_observed', models.BooleanField(default=False, verbose_name='HSC-HF Cracks Observed?')),
+                ('scc_hsc_hf_cracks_removed', models.BooleanField(default=False, verbose_name='HSC-HF Cracks Removed?')),
+                ('scc_hsc_hf_present', models.BooleanField(default=False, verbose_name='HF Present?')),
+                ('scc_hsc_hf_hf_conc_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='HF Concentration (%)')),
+                ('scc_hsc_hf_hardness_hb', models.DecimalField(blank=True, decimal_places=1, max_digits=6, null=True, verbose_name='Hardness (HB)')),
+                ('scc_hsc_hf_inspection_count_a', models.IntegerField(default=0, verbose_name='Insp. Count Cat A (HSC-HF)')),
+                ('scc_hsc_hf_inspection_count_b', models.IntegerField(default=0, verbose_name='Insp. Count Cat B (HSC-HF)')),
+                ('scc_hsc_hf_inspection_count_c', models.IntegerField(default=0, verbose_name='Insp. Count Cat C (HSC-HF)')),
+                ('scc_hsc_hf_inspection_count_d', models.IntegerField(default=0, verbose_name='Insp. Count Cat D (HSC-HF)')),
+            ],
+            options={
+                'verbose_name': 'SCC inputs',
+                'verbose_name_plural': 'SCC inputs',
+            },
+            bases=(dashboard.models.DirtyFieldsMixin, models.Model),
+        ),
+        migrations.CreateModel(
+            name='ComponentThinning',
+            fields=[
+                ('component', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='thinning_inputs', serialize=False, to='dashboard.component')),
+                ('mech_thinning_co2_active', models.BooleanField(default=False, verbose_name='Mech. Active: CO2 Corrosion')),
+                ('mech_thinning_hcl_active', models.BooleanField(default=False, verbose_name='Mech. Active: HCl Corrosion')),
+                ('mech_thinning_h2so4_active', models.BooleanField(default=False, verbose_name='Mech. Active: H2SO4 Corrosion')),
+                ('mech_thinning_hf_active', models.BooleanField(default=False, verbose_name='Mech. Active: HF Corrosion')),
+                ('mech_thinning_amine_active', models.BooleanField(default=False, verbose_name='Mech. Active: Amine Corrosion')),
+                ('mech_thinning_alkaline_active', models.BooleanField(default=False, verbose_name='Mech. Active: Alkaline Water Corrosion')),
+                ('mech_thinning_acid_active', models.BooleanField(default=False, verbose_name='Mech. Active: Acid Water Corrosion')),
+                ('mech_thinning_soil_active', models.BooleanField(default=False, verbose_name='Mech. Active: Soil Side Corrosion')),
+                ('mech_thinning_h2s_h2_active', models.BooleanField(default=False, verbose_name='Mech. Active: High Temp H2S/H2')),
+                ('mech_thinning_sulfidic_active', models.BooleanField(default=False, verbose_name='Mech. Active: Sulfidic/Naphthenic')),
+                ('co2_concentration_mol_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='CO2 Concentration (mol %)')),
+                ('co2_shear_stress_pa', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='CO2 Shear Stress (Pa)')),
+                ('hcl_concentration_wt_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='HCl Concentration (wt %)')),
+                ('hcl_velocity_fps', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='HCl Velocity (ft/s)')),
+                ('h2so4_concentration_wt_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='H2SO4 Concentration (wt %)')),
+                ('h2so4_velocity_fps', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='H2SO4 Velocity (ft/s)')),
+                ('hf_concentration_wt_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='HF Concentration (wt %)')),
+                ('hf_velocity_fps', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='HF Velocity (ft/s)')),
+                ('amine_type', models.CharField(blank=True, choices=[('MEA', 'Monoethanolamine (MEA)'), ('DEA', 'Diethanolamine (DEA)'), ('MDEA', 'Methyldiethanolamine (MDEA)'), ('DGA', 'Diglycolamine (DGA)')], max_length=10, null=True, verbose_name='Amine Type')),
+                ('amine_concentration_wt_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='Amine Concentration (wt %)')),
+                ('amine_acid_gas_loading', models.DecimalField(blank=True, decimal_places=3, max_digits=6, null=True, verbose_name='Acid Gas Loading (mol/mol)')),
+                ('alkaline_water_velocity_fps', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Alkaline Water Velocity (ft/s)')),
+                ('acid_water_dissolved_o2_ppm', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Dissolved O2 (ppm)')),
+                ('soil_coating_condition', models.CharField(blank=True, choices=[('GOOD', 'Good'), ('FAIR', 'Fair'), ('POOR', 'Poor'), ('NONE', 'No Coating')], max_length=10, null=True, verbose_name='Coating Condition')),
+                ('soil_cathodic_protection', models.BooleanField(default=False, verbose_name='Cathodic Protection Active')),
+                ('soil_resistivity_ohm_cm', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Soil Resistivity (ohm-cm)')),
+                ('ht_h2s_partial_pressure_psia', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='H2S Partial Pressure (psia)')),
+                ('ht_h2_partial_pressure_psia', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='H2 Partial Pressure (psia)')),
+                ('sulfidic_tan', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='TAN (Total Acid Number)')),
+                ('sulfidic_sulfur_wt_percent', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True, verbose_name='Sulfur Content (wt %)')),
+                ('sulfidic_velocity_fps', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True, verbose_name='Velocity (ft/s)')),
+            ],
+            options={
+                'verbose_name': 'Thinning inputs',
+                'verbose_name_plural': 'Thinning inputs',
+            },
+            bases=(dashboard.models.DirtyFieldsMixin, models.Model),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations
+
+SECTION_MODELS = (
+    'ComponentThinning',
+    'ComponentSCC',
+    'ComponentExternalDamage',
+    'ComponentBrittleFracture',
+    'ComponentHTHA',
+)
+
+BATCH_SIZE = 2000
+
+
+def copy_sections(apps, schema_editor):
+    """Give every component one row per section, copied from its own columns."""
+    Component = apps.get_model('dashboard', 'Component')
+    for model_name in SECTION_MODELS:
+        Section = apps.get_model('dashboard', model_name)
+        fields = [field.attname for field in Section._meta.concrete_fields if field.name != 'component']
+        rows = Component.objects.order_by('pk').values_list('pk', *fields).iterator(chunk_size=BATCH_SIZE)
+        batch = []
+        for pk, *values in rows:
+            batch.append(Section(component_id=pk, **dict(zip(fields, values))))
+            if len(batch) == BATCH_SIZE:
+                Section.objects.bulk_create(batch)
+                batch = []
+        Section.objects.bulk_create(batch)
+
+
+def restore_sections(apps, schema_editor):
+    """Write the section rows back onto the re-added Component columns."""
+    Component = apps.get_model('dashboard', 'Component')
+    for model_name in SECTION_MODELS:
+        Section = apps.get_model('dashboard', model_name)
+        fields = [field.attname for field in Section._meta.concrete_fields if field.name != 'component']
+        components = [
+            Component(pk=pk, **dict(zip(fields, values)))
+            for pk, *values in Section.objects.values_list('component_id', *fields)
+        ]
+        Component.objects.bulk_update(components, fields, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0050_component_sections'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_sections, restore_sections),
+    ]
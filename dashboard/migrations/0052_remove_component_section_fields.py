@@ -0,0 +1,557 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0051_copy_component_sections'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='component',
+            name='acid_water_dissolved_o2_ppm',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='alkaline_water_velocity_fps',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='amine_acid_gas_loading',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='amine_concentration_wt_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='amine_type',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='brittle_admin_controls',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='brittle_cet_f',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='brittle_curve',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='brittle_delta_fatt',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='brittle_material_type',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='brittle_min_operating_temp_f',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='brittle_pwht',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='brittle_yield_strength_ksi',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='co2_concentration_mol_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='co2_shear_stress_pa',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='complexity',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='cui_driver',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='external_driver',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='h2so4_concentration_wt_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='h2so4_velocity_fps',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='hcl_concentration_wt_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='hcl_velocity_fps',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='hf_concentration_wt_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='hf_velocity_fps',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='ht_h2_partial_pressure_psia',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='ht_h2s_partial_pressure_psia',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='htha_damage_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='htha_exposure_time_years',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='htha_h2_partial_pressure_psia',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='htha_material',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='htha_material_verification',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='insulation_condition',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_cui_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_cui_clscc_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_ext_clscc_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_ext_corrosion_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_acid_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_alkaline_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_amine_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_co2_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_h2s_h2_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_h2so4_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_hcl_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_hf_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_soil_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mech_thinning_sulfidic_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_brittle_fracture_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_external_damage_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_htha_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_scc_acscc_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_scc_amine_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_scc_caustic_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_scc_clscc_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_scc_hic_h2s_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_scc_hsc_hf_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_scc_pascc_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='mechanism_scc_ssc_active',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_acscc_co3_conc_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_acscc_cracks_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_acscc_cracks_removed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_acscc_inspection_count_a',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_acscc_inspection_count_b',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_acscc_inspection_count_c',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_acscc_inspection_count_d',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_acscc_stress_relieved',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_cracks_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_cracks_removed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_inspection_count_a',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_inspection_count_b',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_inspection_count_c',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_inspection_count_d',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_lean_amine',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_solution_type',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_steamed_out',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_amine_stress_relieved',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_cracks_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_cracks_removed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_inspection_count_a',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_inspection_count_b',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_inspection_count_c',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_inspection_count_d',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_naoh_conc_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_steamed_out_prior',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_caustic_stress_relieved',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_clscc_cl_conc_ppm',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_clscc_cracks_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_clscc_cracks_removed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_clscc_deposits_present',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_clscc_inspection_count_a',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_clscc_inspection_count_b',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_clscc_inspection_count_c',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_clscc_inspection_count_d',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_banding_severity',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_cracks_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_cracks_removed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_cyanide_present',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_h2s_ppm',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_inspection_count_a',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_inspection_count_b',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_inspection_count_c',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_inspection_count_d',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hic_h2s_ph',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_cracks_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_cracks_removed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_hardness_hb',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_hf_conc_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_inspection_count_a',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_inspection_count_b',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_inspection_count_c',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_inspection_count_d',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_hsc_hf_present',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_cracks_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_cracks_removed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_downtime_protected',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_inspection_count_a',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_inspection_count_b',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_inspection_count_c',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_inspection_count_d',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_sensitized',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_pascc_sulfur_exposure',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_cracks_observed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_cracks_removed',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_h2s_ppm',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_hardness_hb',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_inspection_count_a',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_inspection_count_b',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_inspection_count_c',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_inspection_count_d',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_ph',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='scc_ssc_pwht',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='soil_cathodic_protection',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='soil_coating_condition',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='soil_resistivity_ohm_cm',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='sulfidic_sulfur_wt_percent',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='sulfidic_tan',
+        ),
+        migrations.RemoveField(
+            model_name='component',
+            name='sulfidic_velocity_fps',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0052_remove_component_section_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HierarchyCounts',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facilities', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('systems', models.IntegerField(default=0)),
+                ('equipment', models.IntegerField(default=0)),
+                ('components', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('facility', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dashboard.facility')),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Hierarchy Counts',
+                'verbose_name_plural': 'Hierarchy Counts',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('facility__isnull', True)), fields=('owner',), name='counts_owner_total_uniq'), models.UniqueConstraint(condition=models.Q(('facility__isnull', False)), fields=('facility',), name='counts_facility_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0053_hierarchy_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RiskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pof', models.PositiveSmallIntegerField(verbose_name='POF Category (0 = unknown)')),
+                ('cof', models.CharField(blank=True, max_length=1, verbose_name="COF Category ('' = unknown)")),
+                ('components', models.IntegerField(default=0)),
+                ('max_risk', models.DecimalField(blank=True, decimal_places=10, max_digits=20, null=True, verbose_name='Max Risk (m2/yr)')),
+                ('sum_risk', models.DecimalField(blank=True, decimal_places=10, max_digits=30, null=True, verbose_name='Total Risk (m2/yr)')),
+                ('sum_cof', models.DecimalField(blank=True, decimal_places=2, max_digits=30, null=True, verbose_name='Total Financial COF ($)')),
+                ('mechanisms', models.JSONField(blank=True, default=dict, verbose_name='Governing Mechanisms')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='risk_rollups', to='dashboard.facility')),
+                ('unit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='risk_rollups', to='dashboard.unit')),
+            ],
+            options={
+                'verbose_name': 'Risk Rollup',
+                'verbose_name_plural': 'Risk Rollups',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('unit__isnull', False)), fields=('unit', 'pof', 'cof'), name='rollup_unit_cell_uniq'), models.UniqueConstraint(condition=models.Q(('unit__isnull', True)), fields=('facility', 'pof', 'cof'), name='rollup_facility_cell_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,160 @@
+# Generated by Django 6.0.1 on 2026-10-17 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0054_risk_rollup'),
+        ('formula_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # New indexes first, then drop the ones they cover
+    operations = [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['equipment', 'rbix_component_type'], name='component_equipment_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(condition=models.Q(('calculated_risk__isnull', False)), fields=['owner', '-calculated_risk', '-id'], name='component_owner_risk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(condition=models.Q(('final_pof__isnull', False)), fields=['owner', '-final_pof', '-id'], name='component_owner_pof_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(condition=models.Q(('calculated_cof__isnull', False)), fields=['owner', '-calculated_cof', '-id'], name='component_owner_cof_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['facility', 'pof_category', 'cof_category'], name='component_fac_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentbrittlefracture',
+            index=models.Index(condition=models.Q(('mechanism_brittle_fracture_active', True)), fields=['component'], name='brittle_fracture_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentexternaldamage',
+            index=models.Index(condition=models.Q(('mech_ext_corrosion_active', True)), fields=['component'], name='ext_corrosion_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentexternaldamage',
+            index=models.Index(condition=models.Q(('mech_cui_active', True)), fields=['component'], name='cui_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentexternaldamage',
+            index=models.Index(condition=models.Q(('mech_ext_clscc_active', True)), fields=['component'], name='ext_clscc_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentexternaldamage',
+            index=models.Index(condition=models.Q(('mech_cui_clscc_active', True)), fields=['component'], name='cui_clscc_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentexternaldamage',
+            index=models.Index(condition=models.Q(('mechanism_external_damage_active', True)), fields=['component'], name='external_damage_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componenththa',
+            index=models.Index(condition=models.Q(('mechanism_htha_active', True)), fields=['component'], name='htha_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentscc',
+            index=models.Index(condition=models.Q(('mechanism_scc_caustic_active', True)), fields=['component'], name='scc_caustic_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentscc',
+            index=models.Index(condition=models.Q(('mechanism_scc_amine_active', True)), fields=['component'], name='scc_amine_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentscc',
+            index=models.Index(condition=models.Q(('mechanism_scc_ssc_active', True)), fields=['component'], name='scc_ssc_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentscc',
+            index=models.Index(condition=models.Q(('mechanism_scc_hic_h2s_active', True)), fields=['component'], name='scc_hic_h2s_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentscc',
+            index=models.Index(condition=models.Q(('mechanism_scc_acscc_active', True)), fields=['component'], name='scc_acscc_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentscc',
+            index=models.Index(condition=models.Q(('mechanism_scc_pascc_active', True)), fields=['component'], name='scc_pascc_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentscc',
+            index=models.Index(condition=models.Q(('mechanism_scc_clscc_active', True)), fields=['component'], name='scc_clscc_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentscc',
+            index=models.Index(condition=models.Q(('mechanism_scc_hsc_hf_active', True)), fields=['component'], name='scc_hsc_hf_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_co2_active', True)), fields=['component'], name='thinning_co2_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_hcl_active', True)), fields=['component'], name='thinning_hcl_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_h2so4_active', True)), fields=['component'], name='thinning_h2so4_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_hf_active', True)), fields=['component'], name='thinning_hf_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_amine_active', True)), fields=['component'], name='thinning_amine_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_alkaline_active', True)), fields=['component'], name='thinning_alkaline_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_acid_active', True)), fields=['component'], name='thinning_acid_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_soil_active', True)), fields=['component'], name='thinning_soil_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_h2s_h2_active', True)), fields=['component'], name='thinning_h2s_h2_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='componentthinning',
+            index=models.Index(condition=models.Q(('mech_thinning_sulfidic_active', True)), fields=['component'], name='thinning_sulfidic_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['system', 'number'], name='equipment_system_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inspectionhistory',
+            index=models.Index(fields=['owner', 'component', '-date'], name='inspection_owner_comp_date_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='inspectionhistory',
+            name='inspection_owner_component_idx',
+        ),
+        migrations.AlterField(
+            model_name='component',
+            name='equipment',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='dashboard.equipment'),
+        ),
+        migrations.AlterField(
+            model_name='equipment',
+            name='system',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='dashboard.system'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-17 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0055_hot_query_indexes'),
+    ]
+
+    # The composite index first, then drop the foreign key indexes it and rollup_unit_cell_uniq cover
+    operations = [
+        migrations.AddIndex(
+            model_name='riskrollup',
+            index=models.Index(fields=['facility', 'unit'], name='rollup_facility_unit_idx'),
+        ),
+        migrations.AlterField(
+            model_name='riskrollup',
+            name='facility',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='risk_rollups', to='dashboard.facility'),
+        ),
+        migrations.AlterField(
+            model_name='riskrollup',
+            name='unit',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='risk_rollups', to='dashboard.unit'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-17 14:30
+
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    from dashboard.rollups import CHUNK_SIZE, facility_cells, unit_cells
+
+    Component = apps.get_model('dashboard', 'Component')
+    RiskRollup = apps.get_model('dashboard', 'RiskRollup')
+
+    # Same grouping as rollups.refresh_rollups(), over the historical models
+    RiskRollup.objects.all().delete()
+    unit_rows = RiskRollup.objects.bulk_create(unit_cells(Component.objects.all()), batch_size=CHUNK_SIZE)
+    RiskRollup.objects.bulk_create(facility_cells(unit_rows), batch_size=CHUNK_SIZE)
+
+
+def clear(apps, schema_editor):
+    apps.get_model('dashboard', 'RiskRollup').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0056_rollup_facility_unit_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, clear),
+    ]
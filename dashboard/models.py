@@ -1,51 +1,149 @@
 from django.db import models
+from django.utils import timezone
 from .data.representative_fluids import REPRESENTATIVE_FLUIDS
 from .data.component_types import COMPONENT_TYPES
 from .data.materials import MATERIAL_CHOICES
 from .data.material_construction import MATERIAL_CONSTRUCTION_CHOICES
 
 
-class Facility(models.Model):
+def sync_ownership_keys(components):
+    """
+    Re-stamp the denormalized facility/owner keys of a Component queryset
+    and of its inspection history from the current hierarchy.
+    """
+    hierarchy = Equipment.objects.filter(pk=models.OuterRef('equipment_id'))
+    components.update(
+        facility_id=models.Subquery(hierarchy.values('system__unit__facility_id')[:1]),
+        owner_id=models.Subquery(hierarchy.values('system__unit__facility__owner_id')[:1]),
+    )
+    component = Component.objects.filter(pk=models.OuterRef('component_id'))
+    InspectionHistory.objects.filter(component__in=components).update(
+        facility_id=models.Subquery(component.values('facility_id')[:1]),
+        owner_id=models.Subquery(component.values('owner_id')[:1]),
+    )
+
+
+class ReparentMixin:
+    """
+    Hierarchy level whose components carry denormalized facility/owner
+    keys: moving it to another parent re-stamps every component below.
+    """
+    parent_field = None     # attname of the parent foreign key
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.parent_field in instance.__dict__:
+            instance._loaded_parent = instance.__dict__[cls.parent_field]
+        return instance
+
+    def components(self):
+        raise NotImplementedError
+
+    def save(self, *args, **kwargs):
+        moved = '_loaded_parent' in self.__dict__ and self._loaded_parent != getattr(self, self.parent_field)
+        super().save(*args, **kwargs)
+        if moved:
+            sync_ownership_keys(self.components())
+        self._loaded_parent = getattr(self, self.parent_field)
+
+
+class DirtyFieldsMixin:
+    """Tracks which concrete fields changed since the row was loaded or saved."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.reset_dirty_fields()
+        return instance
+
+    def reset_dirty_fields(self):
+        """Remember the current column values as the clean state."""
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields if field.attname in self.__dict__
+        }
+
+    def dirty_fields(self):
+        """Names of the fields changed since the row was loaded or saved."""
+        loaded = getattr(self, '_loaded_values', {})
+        return [
+            field.name for field in self._meta.concrete_fields
+            if field.attname in loaded and getattr(self, field.attname) != loaded[field.attname]
+        ]
+
+
+class Facility(ReparentMixin, models.Model):
     name = models.CharField(max_length=255)
     company = models.CharField(max_length=255, null=True, blank=True)
     location = models.CharField(max_length=255)
     facility_type = models.CharField(max_length=255, verbose_name="Type")
     owner = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, null=True, blank=True)
 
+    parent_field = 'owner_id'
+
     def __str__(self):
         return self.name
 
+    def components(self):
+        return Component.objects.filter(facility=self)
+
     class Meta:
         verbose_name_plural = "Facilities"
 
-class Unit(models.Model):
+class Unit(ReparentMixin, models.Model):
     name = models.CharField(max_length=255)
     description = models.CharField(max_length=255, null=True, blank=True)
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE)
     people_density = models.FloatField(default=0.0, verbose_name="People per Sq Ft")
 
+    parent_field = 'facility_id'
+
     def __str__(self):
         return self.name
 
-class System(models.Model):
+    def components(self):
+        return Component.objects.filter(equipment__system__unit=self)
+
+class System(ReparentMixin, models.Model):
     name = models.CharField(max_length=255)
     description = models.CharField(max_length=255, null=True, blank=True)
     unit = models.ForeignKey(Unit, on_delete=models.CASCADE)
 
+    parent_field = 'unit_id'
+
     def __str__(self):
         return self.name
 
-class Equipment(models.Model):
+    def components(self):
+        return Component.objects.filter(equipment__system=self)
+
+class Equipment(ReparentMixin, models.Model):
     number = models.CharField(max_length=255)
     plant_equipment_type = models.CharField(max_length=255, verbose_name="Plant Equipment Type")
     plant_equipment_desc = models.CharField(max_length=255, verbose_name="Plant Equipment Description", null=True, blank=True)
-    system = models.ForeignKey(System, on_delete=models.CASCADE)
+    system = models.ForeignKey(System, on_delete=models.CASCADE, db_index=False)
+
+    parent_field = 'system_id'
+
+    class Meta:
+        indexes = [
+            # Equipment of a system by tag number (unit report order, hierarchy pages)
+            models.Index(fields=['system', 'number'], name='equipment_system_number_idx'),
+        ]
 
     def __str__(self):
         return self.number
 
-class Component(models.Model):
-    equipment = models.ForeignKey(Equipment, on_delete=models.CASCADE)
+    def components(self):
+        return Component.objects.filter(equipment=self)
+
+class Component(DirtyFieldsMixin, models.Model):
+    equipment = models.ForeignKey(Equipment, on_delete=models.CASCADE, db_index=False)
+    # Denormalized from equipment -> system -> unit -> facility, for single-table ownership checks
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='+')
+    owner = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, null=True, blank=True, editable=False,
+                              related_name='+', db_index=False)
     rbix_equipment_type = models.CharField(max_length=255, verbose_name="RBIX Equipment Type")
     rbix_component_type = models.CharField(max_length=255, verbose_name="RBIX Component Type", choices=COMPONENT_TYPES)
     description = models.TextField(null=True, blank=True)
@@ -69,7 +167,6 @@ class Component(models.Model):
     
     # COF Level 1 - Release Hole Size & GFF (4.2)
     component_diameter = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Component Diameter (inches)")
-    heat_traced = models.BooleanField(default=False, verbose_name="Heat Traced")
     
     # COF Level 1 - Release Rate Parameters (4.3.2 & 4.3.3) - Shared
     storage_pressure = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Storage Pressure Ps (psia)")
@@ -270,51 +367,6 @@ class Component(models.Model):
                                                              choices=[('Low', 'Low'), ('Medium', 'Medium'), ('Medium-High', 'Medium-High'), ('High', 'High')])
     
     # Thickness Inspection
-    # =========================================================================
-    # EXTERNAL DAMAGE MECHANISMS
-    # =========================================================================
-    
-    # Mechanism Active Checkboxes
-    mech_ext_corrosion_active = models.BooleanField(default=False, verbose_name="External Corrosion Active")
-    mech_cui_active = models.BooleanField(default=False, verbose_name="CUI Active")
-    mech_ext_clscc_active = models.BooleanField(default=False, verbose_name="External ClSCC Active")
-    mech_cui_clscc_active = models.BooleanField(default=False, verbose_name="CUI ClSCC Active")
-    
-    # External Corrosion Inputs
-    external_driver = models.CharField(max_length=50, null=True, blank=True, verbose_name="External Corrosion Driver",
-                                      choices=[('None', 'None'), ('Marine', 'Marine'), ('Temperate', 'Temperate'), ('Arid/Dry', 'Arid/Dry'), ('Severe', 'Severe')])
-    external_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True, verbose_name="External Corrosion Rate (mpy)")
-    
-    # CUI Inputs
-    cui_driver = models.CharField(max_length=50, null=True, blank=True, verbose_name="CUI Driver", 
-                                 choices=[('None', 'None'), ('Mild', 'Mild'), ('Moderate', 'Moderate'), ('Severe', 'Severe')])
-    insulation_condition = models.CharField(max_length=50, null=True, blank=True, verbose_name="Insulation Condition",
-                                           choices=[('Good', 'Good'), ('Average', 'Average'), ('Poor', 'Poor')])
-    cui_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True, verbose_name="CUI Corrosion Rate (mpy)")
-    
-    # Complexity (for External DF adjustment)
-    complexity = models.CharField(max_length=50, null=True, blank=True, verbose_name="Complexity",
-                                 choices=[('High', 'High (Pipe, <1.5" OD)'), ('Medium', 'Medium'), ('Low', 'Low')])
-    
-    # =========================================================================
-    # THINNING (METAL LOSS) MECHANISMS
-    # =========================================================================
-    
-    # Mechanism Active Checkboxes (to persist UI state)
-    mech_thinning_co2_active = models.BooleanField(default=False, verbose_name="CO2 Corrosion Active")
-    mech_thinning_hcl_active = models.BooleanField(default=False, verbose_name="HCl Corrosion Active")
-    mech_thinning_h2so4_active = models.BooleanField(default=False, verbose_name="H2SO4 Corrosion Active")
-    mech_thinning_hf_active = models.BooleanField(default=False, verbose_name="HF Corrosion Active")
-    mech_thinning_amine_active = models.BooleanField(default=False, verbose_name="Amine Corrosion Active")
-    mech_thinning_alkaline_active = models.BooleanField(default=False, verbose_name="Alkaline Water Active")
-    mech_thinning_acid_active = models.BooleanField(default=False, verbose_name="Acid Water Active")
-    mech_thinning_soil_active = models.BooleanField(default=False, verbose_name="Soil Side Active")
-    mech_thinning_h2s_h2_active = models.BooleanField(default=False, verbose_name="High Temp H2S/H2 Active")
-    mech_thinning_sulfidic_active = models.BooleanField(default=False, verbose_name="Sulfidic/Naphthenic Active")
-    
-    # Shared Inputs (used across mechanisms)
-    min_required_thickness_in = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True, verbose_name="Min Required Thickness (in)")
-    future_corrosion_allowance_in = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True, verbose_name="Future Corrosion Allowance (in)")
     thickness_nominal_mm = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Nominal Thickness (mm)")
     thickness_minimum_required_mm = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Minimum Required Thickness (mm)")
     thickness_measured_mm = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Measured Thickness (mm)")
@@ -323,9 +375,284 @@ class Component(models.Model):
     # Inspection Summary
     inspection_summary = models.TextField(null=True, blank=True, verbose_name="Inspection Summary")
 
+    # =========================================================================
+    # DAMAGE MECHANISM RESULTS
+    # Mechanism inputs live in the ComponentSection tables below
+    # =========================================================================
+
+    # External Damage
+    external_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True, verbose_name="External Corrosion Rate (mpy)")
+    cui_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=4, null=True, blank=True, verbose_name="CUI Corrosion Rate (mpy)")
+
+    # Brittle Fracture
+    brittle_damage_factor = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Brittle Fracture DF")
+
+    # HTHA (High Temperature Hydrogen Attack)
+    htha_damage_factor = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HTHA Damage Factor")
 
-    # --- RISK PROBABILITY CALCULATIONS (MIGRATION) ---
+    # POF Calculation Fields (GFF + FMS)
+    pof_category = models.IntegerField(null=True, blank=True, verbose_name="POF Category (1-5)")
+    cof_category = models.CharField(max_length=1, null=True, blank=True, verbose_name="COF Category (A-E)", 
+                                    choices=[('A', 'A - Negligible'), ('B', 'B - Minor'), ('C', 'C - Moderate'), 
+                                            ('D', 'D - Major'), ('E', 'E - Catastrophic')])
+    gff_value = models.DecimalField(max_digits=15, decimal_places=10, null=True, blank=True, verbose_name="Generic Failure Frequency")
+    fms_factor = models.DecimalField(max_digits=5, decimal_places=3, null=True, blank=True, verbose_name="FMS Factor")
+    fms_pscore = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="FMS P-Score")
+    final_pof = models.DecimalField(max_digits=15, decimal_places=10, null=True, blank=True, verbose_name="Final POF (failures/year)")
     
+    # Persisted Calculated Results (Populated by JS before save)
+    calculated_consequence_area = models.DecimalField(max_digits=15, decimal_places=4, null=True, blank=True, verbose_name="Calculated Consequence Area (m2)")
+    calculated_total_damage_factor = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Calculated Total DF")
+    damage_factor_input_hash = models.CharField(max_length=32, null=True, blank=True, editable=False, verbose_name="DF Input Hash")
+    calculated_risk = models.DecimalField(max_digits=20, decimal_places=10, null=True, blank=True, verbose_name="Calculated Risk (m2/yr)")
+    calculated_cof = models.DecimalField(max_digits=20, decimal_places=2, null=True, blank=True, verbose_name="Calculated Financial COF ($)")
+    next_inspection_due_date = models.DateField(null=True, blank=True, verbose_name="Next Inspection Due Date")
+
+    # GFF Equipment/Component Type (Links to formula_app for API 581 data)
+    gff_equipment_type = models.ForeignKey(
+        'formula_app.EquipmentType', 
+        on_delete=models.SET_NULL, 
+        null=True, 
+        blank=True,
+        related_name='dashboard_components',
+        verbose_name="GFF Equipment Type"
+    )
+    gff_component_type = models.ForeignKey(
+        'formula_app.ComponentType',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='dashboard_components',
+        verbose_name="GFF Component Type"
+    )
+
+    # Thinning (Metal Loss) corrosion rates, interpolated from the ComponentThinning inputs
+    co2_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="CO2 Corrosion Rate (mpy)")
+    hcl_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HCl Corrosion Rate (mpy)")
+    h2so4_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="H2SO4 Corrosion Rate (mpy)")
+    hf_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HF Corrosion Rate (mpy)")
+    amine_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Amine Corrosion Rate (mpy)")
+    alkaline_water_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Alkaline Water CR (mpy)")
+    acid_water_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Acid Water CR (mpy)")
+    soil_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Soil Side CR (mpy)")
+    ht_h2s_h2_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HT H2S/H2 CR (mpy)")
+    sulfidic_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Sulfidic CR (mpy)")
+
+    # Thinning Damage Factor Inputs (API 581 Section 4.4)
+    min_required_thickness_in = models.DecimalField(
+        max_digits=6, decimal_places=3, null=True, blank=True, 
+        verbose_name="Minimum Required Thickness (in)",
+        help_text="Per ASME design calculation (t_min). If unknown, leave blank for simplified DF calculation."
+    )
+    future_corrosion_allowance_in = models.DecimalField(
+        max_digits=6, decimal_places=3, null=True, blank=True, 
+        default=0.125,  # API 570 typical default: 1/8" for moderate corrosive service
+        verbose_name="Future Corrosion Allowance (in)",
+        help_text="FCA per API 570. Typical: 0.125\" (1/8\") for moderate service, 0.250\" (1/4\") for severe."
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'facility'], name='component_owner_facility_idx'),
+            # Components of an equipment in unit report order
+            models.Index(fields=['equipment', 'rbix_component_type'], name='component_equipment_type_idx'),
+            # An owner's register ranked by each risk result, keyset-paginated on id
+            models.Index(fields=['owner', '-calculated_risk', '-id'], condition=models.Q(calculated_risk__isnull=False),
+                         name='component_owner_risk_idx'),
+            models.Index(fields=['owner', '-final_pof', '-id'], condition=models.Q(final_pof__isnull=False),
+                         name='component_owner_pof_idx'),
+            models.Index(fields=['owner', '-calculated_cof', '-id'], condition=models.Q(calculated_cof__isnull=False),
+                         name='component_owner_cof_idx'),
+            # Stored matrix cell of a facility's components
+            models.Index(fields=['facility', 'pof_category', 'cof_category'], name='component_fac_category_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.rbix_component_type} - {self.equipment.number}"
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        section_fields = set()
+        if kwargs.get('update_fields') is not None:
+            section_fields = {name for name in kwargs['update_fields'] if name in SECTION_FIELDS}
+            kwargs['update_fields'] = [name for name in kwargs['update_fields'] if name not in section_fields]
+
+        loaded = getattr(self, '_loaded_values', {}).get('equipment_id', self.equipment_id)
+        moved = not adding and loaded != self.equipment_id
+        if adding or moved or self.facility_id is None:
+            self.facility_id, self.owner_id = Equipment.objects.filter(pk=self.equipment_id).values_list(
+                'system__unit__facility_id', 'system__unit__facility__owner_id',
+            ).first() or (None, None)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'facility', 'owner'}
+        super().save(*args, **kwargs)
+        if moved:
+            sync_ownership_keys(Component.objects.filter(pk=self.pk))
+
+        # Every component has a row in every section table; new ones get them all.
+        for name in COMPONENT_SECTIONS:
+            section = self.section(name) if adding else self._state.fields_cache.get(name)
+            if section is None:
+                continue
+            if section._state.adding:
+                section.save(force_insert=True)
+            elif kwargs.get('update_fields') is None:
+                section.save()
+            else:
+                fields = [field for field in section_fields if SECTION_FIELDS[field] == name]
+                if fields:
+                    section.save(update_fields=fields)
+
+    def section(self, name):
+        """
+        The `name` section row (see COMPONENT_SECTIONS), loaded on first
+        use. A component without one yet gets an unsaved row holding the
+        field defaults, which save() inserts.
+        """
+        try:
+            return getattr(self, name)
+        except models.ObjectDoesNotExist:
+            section = COMPONENT_SECTIONS[name](component=self)
+            setattr(self, name, section)
+            return section
+
+    def loaded_sections(self):
+        return [
+            section for name in COMPONENT_SECTIONS
+            if (section := self._state.fields_cache.get(name)) is not None
+        ]
+
+    @classmethod
+    def field_lookup(cls, name):
+        """ORM lookup for a Component input, following section fields into their table."""
+        if name in SECTION_FIELDS:
+            return f'{SECTION_FIELDS[name]}__{name}'
+        return name
+
+    def reset_dirty_fields(self):
+        super().reset_dirty_fields()
+        for section in self.loaded_sections():
+            section.reset_dirty_fields()
+
+    def dirty_fields(self):
+        dirty = super().dirty_fields()
+        for section in self.loaded_sections():
+            dirty.extend(section.dirty_fields())
+        return dirty
+
+
+def active_flag_indexes(*flags):
+    """
+    One partial index per mechanism toggle, over the few rows that have it
+    set, so "components with <mechanism> active" never scans the table.
+    """
+    return [
+        models.Index(
+            fields=['component'], condition=models.Q(**{flag: True}),
+            name=f"{flag.removeprefix('mechanism_').removeprefix('mech_').removesuffix('_active')}_on_idx",
+        )
+        for flag in flags
+    ]
+
+
+class ComponentSection(DirtyFieldsMixin, models.Model):
+    """
+    Mechanism-specific Component inputs, one row per component and
+    mechanism family. Each field is also readable and writable as a
+    Component attribute, so forms and calculations keep addressing them as
+    before while list and report queries on the core table never load them.
+    Subclasses declare `component` as a primary-key OneToOneField with
+    their own related_name.
+    """
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self._meta.verbose_name} - {self.component_id}"
+
+    @classmethod
+    def input_fields(cls):
+        return [field for field in cls._meta.concrete_fields if field.name != 'component']
+
+    def dirty_fields(self):
+        if self._state.adding:
+            return [field.name for field in self.input_fields()]
+        return [name for name in super().dirty_fields() if name != 'component']
+
+
+class ComponentThinning(ComponentSection):
+    """Thinning (metal loss) toggles and process inputs; the interpolated rates stay on Component."""
+    component = models.OneToOneField(Component, on_delete=models.CASCADE, primary_key=True, related_name='thinning_inputs')
+
+    mech_thinning_co2_active = models.BooleanField(default=False, verbose_name="Mech. Active: CO2 Corrosion")
+    mech_thinning_hcl_active = models.BooleanField(default=False, verbose_name="Mech. Active: HCl Corrosion")
+    mech_thinning_h2so4_active = models.BooleanField(default=False, verbose_name="Mech. Active: H2SO4 Corrosion")
+    mech_thinning_hf_active = models.BooleanField(default=False, verbose_name="Mech. Active: HF Corrosion")
+    mech_thinning_amine_active = models.BooleanField(default=False, verbose_name="Mech. Active: Amine Corrosion")
+    mech_thinning_alkaline_active = models.BooleanField(default=False, verbose_name="Mech. Active: Alkaline Water Corrosion")
+    mech_thinning_acid_active = models.BooleanField(default=False, verbose_name="Mech. Active: Acid Water Corrosion")
+    mech_thinning_soil_active = models.BooleanField(default=False, verbose_name="Mech. Active: Soil Side Corrosion")
+    mech_thinning_h2s_h2_active = models.BooleanField(default=False, verbose_name="Mech. Active: High Temp H2S/H2")
+    mech_thinning_sulfidic_active = models.BooleanField(default=False, verbose_name="Mech. Active: Sulfidic/Naphthenic")
+    # CO2 Corrosion Inputs
+    co2_concentration_mol_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="CO2 Concentration (mol %)")
+    co2_shear_stress_pa = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="CO2 Shear Stress (Pa)")
+    # HCl Corrosion Inputs
+    hcl_concentration_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="HCl Concentration (wt %)")
+    hcl_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="HCl Velocity (ft/s)")
+    # H2SO4 Corrosion Inputs
+    h2so4_concentration_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="H2SO4 Concentration (wt %)")
+    h2so4_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="H2SO4 Velocity (ft/s)")
+    # HF Corrosion Inputs
+    hf_concentration_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="HF Concentration (wt %)")
+    hf_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="HF Velocity (ft/s)")
+    # Amine Corrosion Inputs
+    AMINE_CHOICES = [
+        ('MEA', 'Monoethanolamine (MEA)'),
+        ('DEA', 'Diethanolamine (DEA)'),
+        ('MDEA', 'Methyldiethanolamine (MDEA)'),
+        ('DGA', 'Diglycolamine (DGA)'),
+    ]
+    amine_type = models.CharField(max_length=10, choices=AMINE_CHOICES, null=True, blank=True, verbose_name="Amine Type")
+    amine_concentration_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="Amine Concentration (wt %)")
+    amine_acid_gas_loading = models.DecimalField(max_digits=6, decimal_places=3, null=True, blank=True, verbose_name="Acid Gas Loading (mol/mol)")
+    # Alkaline Water Corrosion Inputs (uses shared pH)
+    alkaline_water_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Alkaline Water Velocity (ft/s)")
+    # Acid Water Corrosion Inputs
+    acid_water_dissolved_o2_ppm = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Dissolved O2 (ppm)")
+    # Soil Side Corrosion Inputs
+    COATING_CHOICES = [
+        ('GOOD', 'Good'),
+        ('FAIR', 'Fair'),
+        ('POOR', 'Poor'),
+        ('NONE', 'No Coating'),
+    ]
+    soil_coating_condition = models.CharField(max_length=10, choices=COATING_CHOICES, null=True, blank=True, verbose_name="Coating Condition")
+    soil_cathodic_protection = models.BooleanField(default=False, verbose_name="Cathodic Protection Active")
+    soil_resistivity_ohm_cm = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Soil Resistivity (ohm-cm)")
+    # High Temperature H2S/H2 Corrosion Inputs
+    ht_h2s_partial_pressure_psia = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="H2S Partial Pressure (psia)")
+    ht_h2_partial_pressure_psia = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="H2 Partial Pressure (psia)")
+    # Sulfidic/Naphthenic Acid Corrosion Inputs
+    sulfidic_tan = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="TAN (Total Acid Number)")
+    sulfidic_sulfur_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="Sulfur Content (wt %)")
+    sulfidic_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Velocity (ft/s)")
+
+    class Meta:
+        verbose_name = "Thinning inputs"
+        verbose_name_plural = "Thinning inputs"
+        indexes = active_flag_indexes(
+            'mech_thinning_co2_active', 'mech_thinning_hcl_active', 'mech_thinning_h2so4_active',
+            'mech_thinning_hf_active', 'mech_thinning_amine_active', 'mech_thinning_alkaline_active',
+            'mech_thinning_acid_active', 'mech_thinning_soil_active', 'mech_thinning_h2s_h2_active',
+            'mech_thinning_sulfidic_active',
+        )
+
+
+class ComponentSCC(ComponentSection):
+    """SCC mechanism toggles, susceptibility inputs and inspection counts."""
+    component = models.OneToOneField(Component, on_delete=models.CASCADE, primary_key=True, related_name='scc_inputs')
+
     # SCC - Caustic Cracking
     mechanism_scc_caustic_active = models.BooleanField(default=False, verbose_name="Mech. Active: SCC Caustic")
     scc_caustic_cracks_observed = models.BooleanField(default=False, verbose_name="Caustic Cracks Observed?")
@@ -333,12 +660,10 @@ class Component(models.Model):
     scc_caustic_stress_relieved = models.BooleanField(default=False, verbose_name="Caustic Stress Relieved?")
     scc_caustic_naoh_conc_percent = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="NaOH Concentration (%)")
     scc_caustic_steamed_out_prior = models.BooleanField(default=False, verbose_name="Steamed Out Prior to Service?")
-    
     scc_caustic_inspection_count_a = models.IntegerField(default=0, verbose_name="Insp. Count Cat A (Caustic)")
     scc_caustic_inspection_count_b = models.IntegerField(default=0, verbose_name="Insp. Count Cat B (Caustic)")
     scc_caustic_inspection_count_c = models.IntegerField(default=0, verbose_name="Insp. Count Cat C (Caustic)")
     scc_caustic_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (Caustic)")
-
     # SCC - Amine Cracking
     mechanism_scc_amine_active = models.BooleanField(default=False, verbose_name="Mech. Active: SCC Amine")
     scc_amine_cracks_observed = models.BooleanField(default=False, verbose_name="Amine Cracks Observed?")
@@ -352,7 +677,6 @@ class Component(models.Model):
     scc_amine_inspection_count_b = models.IntegerField(default=0, verbose_name="Insp. Count Cat B (Amine)")
     scc_amine_inspection_count_c = models.IntegerField(default=0, verbose_name="Insp. Count Cat C (Amine)")
     scc_amine_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (Amine)")
-
     # SCC - SSC (Sulfide Stress Cracking)
     mechanism_scc_ssc_active = models.BooleanField(default=False, verbose_name="Mech. Active: SSC")
     scc_ssc_ph = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True, verbose_name="pH")
@@ -365,7 +689,6 @@ class Component(models.Model):
     scc_ssc_inspection_count_b = models.IntegerField(default=0, verbose_name="Insp. Count Cat B (SSC)")
     scc_ssc_inspection_count_c = models.IntegerField(default=0, verbose_name="Insp. Count Cat C (SSC)")
     scc_ssc_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (SSC)")
-
     # SCC - HIC/SOHIC-H2S
     mechanism_scc_hic_h2s_active = models.BooleanField(default=False, verbose_name="Mech. Active: HIC/SOHIC-H2S")
     scc_hic_h2s_ph = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True, verbose_name="pH (HIC)")
@@ -384,7 +707,6 @@ class Component(models.Model):
     scc_hic_h2s_inspection_count_b = models.IntegerField(default=0, verbose_name="Insp. Count Cat B (HIC)")
     scc_hic_h2s_inspection_count_c = models.IntegerField(default=0, verbose_name="Insp. Count Cat C (HIC)")
     scc_hic_h2s_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (HIC)")
-
     # SCC - ACSCC (Alkaline Carbonate)
     mechanism_scc_acscc_active = models.BooleanField(default=False, verbose_name="Mech. Active: ACSCC")
     scc_acscc_cracks_observed = models.BooleanField(default=False, verbose_name="ACSCC Cracks Observed?")
@@ -395,7 +717,6 @@ class Component(models.Model):
     scc_acscc_inspection_count_b = models.IntegerField(default=0, verbose_name="Insp. Count Cat B (ACSCC)")
     scc_acscc_inspection_count_c = models.IntegerField(default=0, verbose_name="Insp. Count Cat C (ACSCC)")
     scc_acscc_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (ACSCC)")
-
     # SCC - PASCC (Polythionic Acid)
     mechanism_scc_pascc_active = models.BooleanField(default=False, verbose_name="Mech. Active: PASCC")
     scc_pascc_cracks_observed = models.BooleanField(default=False, verbose_name="PASCC Cracks Observed?")
@@ -407,7 +728,6 @@ class Component(models.Model):
     scc_pascc_inspection_count_b = models.IntegerField(default=0, verbose_name="Insp. Count Cat B (PASCC)")
     scc_pascc_inspection_count_c = models.IntegerField(default=0, verbose_name="Insp. Count Cat C (PASCC)")
     scc_pascc_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (PASCC)")
-
     # SCC - ClSCC (Chloride)
     mechanism_scc_clscc_active = models.BooleanField(default=False, verbose_name="Mech. Active: ClSCC")
     scc_clscc_cracks_observed = models.BooleanField(default=False, verbose_name="ClSCC Cracks Observed?")
@@ -418,7 +738,6 @@ class Component(models.Model):
     scc_clscc_inspection_count_b = models.IntegerField(default=0, verbose_name="Insp. Count Cat B (ClSCC)")
     scc_clscc_inspection_count_c = models.IntegerField(default=0, verbose_name="Insp. Count Cat C (ClSCC)")
     scc_clscc_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (ClSCC)")
-
     # SCC - HSC-HF (Hydrogen Stress Cracking - HF)
     mechanism_scc_hsc_hf_active = models.BooleanField(default=False, verbose_name="Mech. Active: HSC-HF")
     scc_hsc_hf_cracks_observed = models.BooleanField(default=False, verbose_name="HSC-HF Cracks Observed?")
@@ -431,161 +750,120 @@ class Component(models.Model):
     scc_hsc_hf_inspection_count_c = models.IntegerField(default=0, verbose_name="Insp. Count Cat C (HSC-HF)")
     scc_hsc_hf_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (HSC-HF)")
 
+    class Meta:
+        verbose_name = "SCC inputs"
+        verbose_name_plural = "SCC inputs"
+        indexes = active_flag_indexes(
+            'mechanism_scc_caustic_active', 'mechanism_scc_amine_active', 'mechanism_scc_ssc_active',
+            'mechanism_scc_hic_h2s_active', 'mechanism_scc_acscc_active', 'mechanism_scc_pascc_active',
+            'mechanism_scc_clscc_active', 'mechanism_scc_hsc_hf_active',
+        )
+
+
+class ComponentExternalDamage(ComponentSection):
+    """External corrosion, CUI and external ClSCC toggles and drivers."""
+    component = models.OneToOneField(Component, on_delete=models.CASCADE, primary_key=True, related_name='external_inputs')
+
+    # Mechanism Active Checkboxes
+    mech_ext_corrosion_active = models.BooleanField(default=False, verbose_name="External Corrosion Active")
+    mech_cui_active = models.BooleanField(default=False, verbose_name="CUI Active")
+    mech_ext_clscc_active = models.BooleanField(default=False, verbose_name="External ClSCC Active")
+    mech_cui_clscc_active = models.BooleanField(default=False, verbose_name="CUI ClSCC Active")
+    # External Corrosion Inputs
+    external_driver = models.CharField(max_length=50, null=True, blank=True, verbose_name="External Corrosion Driver",
+                                      choices=[('None', 'None'), ('Marine', 'Marine'), ('Temperate', 'Temperate'), ('Arid/Dry', 'Arid/Dry'), ('Severe', 'Severe')])
+    # CUI Inputs
+    cui_driver = models.CharField(max_length=50, null=True, blank=True, verbose_name="CUI Driver", 
+                                 choices=[('None', 'None'), ('Mild', 'Mild'), ('Moderate', 'Moderate'), ('Severe', 'Severe')])
+    insulation_condition = models.CharField(max_length=50, null=True, blank=True, verbose_name="Insulation Condition",
+                                           choices=[('Good', 'Good'), ('Average', 'Average'), ('Poor', 'Poor')])
+    # Complexity (for External DF adjustment)
+    complexity = models.CharField(max_length=50, null=True, blank=True, verbose_name="Complexity",
+                                 choices=[('High', 'High (Pipe, <1.5" OD)'), ('Medium', 'Medium'), ('Low', 'Low')])
+    # External Damage (Uses mostly existing fields, but might need a toggle)
+    mechanism_external_damage_active = models.BooleanField(default=False, verbose_name="Mech. Active: External Damage")
+
+    class Meta:
+        verbose_name = "External damage inputs"
+        verbose_name_plural = "External damage inputs"
+        indexes = active_flag_indexes(
+            'mech_ext_corrosion_active', 'mech_cui_active', 'mech_ext_clscc_active', 'mech_cui_clscc_active',
+            'mechanism_external_damage_active',
+        )
+
+
+class ComponentBrittleFracture(ComponentSection):
+    """Brittle fracture inputs. brittle_damage_factor stays on Component."""
+    component = models.OneToOneField(Component, on_delete=models.CASCADE, primary_key=True, related_name='brittle_fracture_inputs')
 
-    # Brittle Fracture
     mechanism_brittle_fracture_active = models.BooleanField(default=False, verbose_name="Mech. Active: Brittle Fracture")
     brittle_admin_controls = models.BooleanField(default=False, verbose_name="Admin Controls Prevent Pressurization?")
     brittle_min_operating_temp_f = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Min. Operating Temp (°F)")
     brittle_delta_fatt = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Delta FATT")
     brittle_cet_f = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Critical Exposure Temp (CET) (°F)")
     brittle_pwht = models.BooleanField(default=False, verbose_name="PWHT (Brittle Specific)")
-    brittle_damage_factor = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Brittle Fracture DF")
     brittle_curve = models.CharField(max_length=10, null=True, blank=True, verbose_name="Exemption Curve")
     brittle_yield_strength_ksi = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Yield Strength (ksi)")
     brittle_material_type = models.CharField(max_length=50, null=True, blank=True, verbose_name="Material Type")
 
-    # HTHA (High Temperature Hydrogen Attack)
+    class Meta:
+        verbose_name = "Brittle fracture inputs"
+        verbose_name_plural = "Brittle fracture inputs"
+        indexes = active_flag_indexes('mechanism_brittle_fracture_active')
+
+
+class ComponentHTHA(ComponentSection):
+    """High temperature hydrogen attack inputs. htha_damage_factor stays on Component."""
+    component = models.OneToOneField(Component, on_delete=models.CASCADE, primary_key=True, related_name='htha_inputs')
+
     mechanism_htha_active = models.BooleanField(default=False, verbose_name="Mech. Active: HTHA")
     htha_material = models.CharField(max_length=100, null=True, blank=True, verbose_name="HTHA Material")
     htha_h2_partial_pressure_psia = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="H2 Partial Pressure (psia)")
     htha_exposure_time_years = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HTHA Exposure Time (years)")
     htha_damage_observed = models.BooleanField(default=False, verbose_name="HTHA Damage Observed?")
     htha_material_verification = models.BooleanField(default=False, verbose_name="HTHA Material Verification Done?")
-    htha_damage_factor = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HTHA Damage Factor")
 
-    # POF Calculation Fields (GFF + FMS)
-    pof_category = models.IntegerField(null=True, blank=True, verbose_name="POF Category (1-5)")
-    cof_category = models.CharField(max_length=1, null=True, blank=True, verbose_name="COF Category (A-E)", 
-                                    choices=[('A', 'A - Negligible'), ('B', 'B - Minor'), ('C', 'C - Moderate'), 
-                                            ('D', 'D - Major'), ('E', 'E - Catastrophic')])
-    gff_value = models.DecimalField(max_digits=15, decimal_places=10, null=True, blank=True, verbose_name="Generic Failure Frequency")
-    fms_factor = models.DecimalField(max_digits=5, decimal_places=3, null=True, blank=True, verbose_name="FMS Factor")
-    fms_pscore = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, verbose_name="FMS P-Score")
-    final_pof = models.DecimalField(max_digits=15, decimal_places=10, null=True, blank=True, verbose_name="Final POF (failures/year)")
-    
-    # Persisted Calculated Results (Populated by JS before save)
-    calculated_consequence_area = models.DecimalField(max_digits=15, decimal_places=4, null=True, blank=True, verbose_name="Calculated Consequence Area (m2)")
-    calculated_total_damage_factor = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Calculated Total DF")
-    calculated_risk = models.DecimalField(max_digits=20, decimal_places=10, null=True, blank=True, verbose_name="Calculated Risk (m2/yr)")
-    calculated_cof = models.DecimalField(max_digits=20, decimal_places=2, null=True, blank=True, verbose_name="Calculated Financial COF ($)")
+    class Meta:
+        verbose_name = "HTHA inputs"
+        verbose_name_plural = "HTHA inputs"
+        indexes = active_flag_indexes('mechanism_htha_active')
 
-    # GFF Equipment/Component Type (Links to formula_app for API 581 data)
-    gff_equipment_type = models.ForeignKey(
-        'formula_app.EquipmentType', 
-        on_delete=models.SET_NULL, 
-        null=True, 
-        blank=True,
-        related_name='dashboard_components',
-        verbose_name="GFF Equipment Type"
-    )
-    gff_component_type = models.ForeignKey(
-        'formula_app.ComponentType',
-        on_delete=models.SET_NULL,
-        null=True,
-        blank=True,
-        related_name='dashboard_components',
-        verbose_name="GFF Component Type"
-    )
 
-    # External Damage (Uses mostly existing fields, but might need a toggle)
-    mechanism_external_damage_active = models.BooleanField(default=False, verbose_name="Mech. Active: External Damage")
-    scc_hsc_hf_inspection_count_d = models.IntegerField(default=0, verbose_name="Insp. Count Cat D (HSC-HF)")
+# Section tables by their Component accessor, and the accessor holding each section field
+COMPONENT_SECTIONS = {
+    'thinning_inputs': ComponentThinning,
+    'scc_inputs': ComponentSCC,
+    'external_inputs': ComponentExternalDamage,
+    'brittle_fracture_inputs': ComponentBrittleFracture,
+    'htha_inputs': ComponentHTHA,
+}
+SECTION_FIELDS = {
+    field.name: name for name, model in COMPONENT_SECTIONS.items() for field in model.input_fields()
+}
 
-    # Thinning (Metal Loss) Mechanisms
-    mech_thinning_co2_active = models.BooleanField(default=False, verbose_name="Mech. Active: CO2 Corrosion")
-    mech_thinning_hcl_active = models.BooleanField(default=False, verbose_name="Mech. Active: HCl Corrosion")
-    mech_thinning_h2so4_active = models.BooleanField(default=False, verbose_name="Mech. Active: H2SO4 Corrosion")
-    mech_thinning_hf_active = models.BooleanField(default=False, verbose_name="Mech. Active: HF Corrosion")
-    mech_thinning_amine_active = models.BooleanField(default=False, verbose_name="Mech. Active: Amine Corrosion")
-    mech_thinning_alkaline_active = models.BooleanField(default=False, verbose_name="Mech. Active: Alkaline Water Corrosion")
-    mech_thinning_acid_active = models.BooleanField(default=False, verbose_name="Mech. Active: Acid Water Corrosion")
-    mech_thinning_soil_active = models.BooleanField(default=False, verbose_name="Mech. Active: Soil Side Corrosion")
-    mech_thinning_h2s_h2_active = models.BooleanField(default=False, verbose_name="Mech. Active: High Temp H2S/H2")
-    mech_thinning_sulfidic_active = models.BooleanField(default=False, verbose_name="Mech. Active: Sulfidic/Naphthenic")
 
-    # CO2 Corrosion Inputs
-    co2_concentration_mol_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="CO2 Concentration (mol %)")
-    co2_shear_stress_pa = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="CO2 Shear Stress (Pa)")
-    co2_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="CO2 Corrosion Rate (mpy)")
-    
-    # HCl Corrosion Inputs
-    hcl_concentration_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="HCl Concentration (wt %)")
-    hcl_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="HCl Velocity (ft/s)")
-    hcl_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HCl Corrosion Rate (mpy)")
-    
-    # H2SO4 Corrosion Inputs
-    h2so4_concentration_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="H2SO4 Concentration (wt %)")
-    h2so4_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="H2SO4 Velocity (ft/s)")
-    h2so4_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="H2SO4 Corrosion Rate (mpy)")
-    
-    # HF Corrosion Inputs
-    hf_concentration_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="HF Concentration (wt %)")
-    hf_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="HF Velocity (ft/s)")
-    hf_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HF Corrosion Rate (mpy)")
-    
-    # Amine Corrosion Inputs
-    AMINE_CHOICES = [
-        ('MEA', 'Monoethanolamine (MEA)'),
-        ('DEA', 'Diethanolamine (DEA)'),
-        ('MDEA', 'Methyldiethanolamine (MDEA)'),
-        ('DGA', 'Diglycolamine (DGA)'),
-    ]
-    amine_type = models.CharField(max_length=10, choices=AMINE_CHOICES, null=True, blank=True, verbose_name="Amine Type")
-    amine_concentration_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="Amine Concentration (wt %)")
-    amine_acid_gas_loading = models.DecimalField(max_digits=6, decimal_places=3, null=True, blank=True, verbose_name="Acid Gas Loading (mol/mol)")
-    amine_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Amine Corrosion Rate (mpy)")
-    
-    # Alkaline Water Corrosion Inputs (uses shared pH)
-    alkaline_water_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Alkaline Water Velocity (ft/s)")
-    alkaline_water_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Alkaline Water CR (mpy)")
-    
-    # Acid Water Corrosion Inputs
-    acid_water_dissolved_o2_ppm = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Dissolved O2 (ppm)")
-    acid_water_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Acid Water CR (mpy)")
-    
-    # Soil Side Corrosion Inputs
-    COATING_CHOICES = [
-        ('GOOD', 'Good'),
-        ('FAIR', 'Fair'),
-        ('POOR', 'Poor'),
-        ('NONE', 'No Coating'),
-    ]
-    soil_coating_condition = models.CharField(max_length=10, choices=COATING_CHOICES, null=True, blank=True, verbose_name="Coating Condition")
-    soil_cathodic_protection = models.BooleanField(default=False, verbose_name="Cathodic Protection Active")
-    soil_resistivity_ohm_cm = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Soil Resistivity (ohm-cm)")
-    soil_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Soil Side CR (mpy)")
-    
-    # High Temperature H2S/H2 Corrosion Inputs
-    ht_h2s_partial_pressure_psia = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="H2S Partial Pressure (psia)")
-    ht_h2_partial_pressure_psia = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="H2 Partial Pressure (psia)")
-    ht_h2s_h2_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="HT H2S/H2 CR (mpy)")
-    
-    # Sulfidic/Naphthenic Acid Corrosion Inputs
-    sulfidic_tan = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="TAN (Total Acid Number)")
-    sulfidic_sulfur_wt_percent = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, verbose_name="Sulfur Content (wt %)")
-    sulfidic_velocity_fps = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, verbose_name="Velocity (ft/s)")
-    sulfidic_corrosion_rate_mpy = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Sulfidic CR (mpy)")
-    
-    # Thinning Damage Factor Inputs (API 581 Section 4.4)
-    min_required_thickness_in = models.DecimalField(
-        max_digits=6, decimal_places=3, null=True, blank=True, 
-        verbose_name="Minimum Required Thickness (in)",
-        help_text="Per ASME design calculation (t_min). If unknown, leave blank for simplified DF calculation."
-    )
-    future_corrosion_allowance_in = models.DecimalField(
-        max_digits=6, decimal_places=3, null=True, blank=True, 
-        default=0.125,  # API 570 typical default: 1/8" for moderate corrosive service
-        verbose_name="Future Corrosion Allowance (in)",
-        help_text="FCA per API 570. Typical: 0.125\" (1/8\") for moderate service, 0.250\" (1/4\") for severe."
-    )
+def _section_property(section, name):
+    def fget(component):
+        return getattr(component.section(section), name)
 
-    def __str__(self):
-        return f"{self.rbix_component_type} - {self.equipment.number}"
+    def fset(component, value):
+        setattr(component.section(section), name, value)
+
+    return property(fget, fset, doc=f"{section}.{name}")
+
+
+for _name, _section in SECTION_FIELDS.items():
+    setattr(Component, _name, _section_property(_section, _name))
+del _name, _section
 
 
 class InspectionHistory(models.Model):
     """Model for tracking inspection history records"""
     component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name='inspection_history')
+    # Copied from the component, for single-table ownership checks
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='+')
+    owner = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, null=True, blank=True, editable=False,
+                              related_name='+', db_index=False)
     inspection_type = models.CharField(max_length=20, verbose_name="Method", 
                                        choices=[('Internal Visual', 'Internal Visual'), ('External Visual', 'External Visual')])
     date = models.DateField(verbose_name="Date")
@@ -604,8 +882,178 @@ class InspectionHistory(models.Model):
         ordering = ['-date']
         verbose_name = "Inspection History"
         verbose_name_plural = "Inspection Histories"
+        indexes = [
+            # A component's history, newest first (get_inspection_history)
+            models.Index(fields=['owner', 'component', '-date'], name='inspection_owner_comp_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.inspection_type} - {self.component} - {self.date}"
 
+    def save(self, *args, **kwargs):
+        self.facility_id, self.owner_id = Component.objects.filter(pk=self.component_id).values_list(
+            'facility_id', 'owner_id',
+        ).first() or (None, None)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'facility', 'owner'}
+        super().save(*args, **kwargs)
+
+
 
+
+class FacilityFMSAnswer(models.Model):
+    """Site-wide FMS audit score for one questionnaire item (API 581 Part 2, Annex 2.A)"""
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name='fms_answers')
+    section = models.CharField(max_length=20, verbose_name="Section")
+    question = models.CharField(max_length=20, verbose_name="Question")
+    score = models.DecimalField(max_digits=6, decimal_places=2, default=0, verbose_name="Score")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['facility', 'section', 'question']
+        verbose_name = "FMS Answer"
+        verbose_name_plural = "FMS Answers"
+        constraints = [
+            models.UniqueConstraint(fields=['facility', 'section', 'question'], name='unique_facility_fms_answer'),
+        ]
+
+    def __str__(self):
+        return f"{self.facility} - {self.section} Q{self.question}: {self.score}"
+
+
+class DamageFactorResult(models.Model):
+    """Latest batch DF of one damage mechanism for one component"""
+    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name='damage_factor_results')
+    mechanism = models.CharField(max_length=40, verbose_name="Mechanism")
+    base_df = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Base DF")
+    final_df = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Final DF")
+    susceptibility = models.CharField(max_length=50, null=True, blank=True, verbose_name="Susceptibility")
+    governing = models.BooleanField(default=False, verbose_name="Governs Total DF")
+    computed_at = models.DateTimeField(verbose_name="Computed At")
+    input_hash = models.CharField(max_length=32, verbose_name="Input Hash")
+
+    class Meta:
+        ordering = ['component', 'mechanism']
+        verbose_name = "Damage Factor Result"
+        verbose_name_plural = "Damage Factor Results"
+        constraints = [
+            models.UniqueConstraint(fields=['component', 'mechanism'], name='unique_component_mechanism_df'),
+        ]
+        indexes = [
+            models.Index(fields=['mechanism', '-final_df'], name='df_result_mechanism_df_idx'),
+            models.Index(fields=['mechanism', 'component'], condition=models.Q(governing=True),
+                         name='df_result_governing_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.component} - {self.mechanism}: {self.final_df}"
+
+
+class BackgroundJob(models.Model):
+    """Long-running task queued in the database and run by `manage.py rbi_worker`"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50, verbose_name="Job")
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    owner = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, null=True, blank=True)
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Background Job"
+        verbose_name_plural = "Background Jobs"
+        indexes = [
+            models.Index(fields=['run_after', 'id'], condition=models.Q(status='queued'), name='job_queued_idx'),
+            models.Index(fields=['locked_at'], condition=models.Q(status='running'), name='job_running_idx'),
+            models.Index(fields=['owner', '-created_at'], name='job_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class HierarchyCounts(models.Model):
+    """
+    Facility, unit, system, equipment and component counts of one owner
+    (facility NULL) or of one facility, kept current by dashboard.counters
+    and repaired by `manage.py reconcile_counts`.
+    """
+    owner = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    facilities = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    systems = models.IntegerField(default=0)
+    equipment = models.IntegerField(default=0)
+    components = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    COUNTERS = ('facilities', 'units', 'systems', 'equipment', 'components')
+
+    class Meta:
+        verbose_name = "Hierarchy Counts"
+        verbose_name_plural = "Hierarchy Counts"
+        constraints = [
+            models.UniqueConstraint(fields=['owner'], condition=models.Q(facility__isnull=True), name='counts_owner_total_uniq'),
+            models.UniqueConstraint(fields=['facility'], condition=models.Q(facility__isnull=False), name='counts_facility_uniq'),
+        ]
+
+    def __str__(self):
+        scope = f"facility {self.facility_id}" if self.facility_id else f"owner {self.owner_id}"
+        return f"Counts for {scope}"
+
+
+class RiskRollup(models.Model):
+    """
+    Components of one unit (or, unit NULL, of one whole facility) in one
+    risk matrix cell, kept current by dashboard.rollups. Unclassified
+    components are counted under pof 0 / cof ''.
+    """
+    # Served by rollup_facility_unit_idx and rollup_unit_cell_uniq
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name='risk_rollups', db_index=False)
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE, null=True, blank=True, related_name='risk_rollups',
+                             db_index=False)
+    pof = models.PositiveSmallIntegerField(verbose_name="POF Category (0 = unknown)")
+    cof = models.CharField(max_length=1, blank=True, verbose_name="COF Category ('' = unknown)")
+    components = models.IntegerField(default=0)
+    max_risk = models.DecimalField(max_digits=20, decimal_places=10, null=True, blank=True, verbose_name="Max Risk (m2/yr)")
+    sum_risk = models.DecimalField(max_digits=30, decimal_places=10, null=True, blank=True, verbose_name="Total Risk (m2/yr)")
+    sum_cof = models.DecimalField(max_digits=30, decimal_places=2, null=True, blank=True, verbose_name="Total Financial COF ($)")
+    mechanisms = models.JSONField(default=dict, blank=True, verbose_name="Governing Mechanisms")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Risk Rollup"
+        verbose_name_plural = "Risk Rollups"
+        indexes = [
+            # Every row of a facility, or (unit NULL) its facility-level cells
+            models.Index(fields=['facility', 'unit'], name='rollup_facility_unit_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['unit', 'pof', 'cof'], condition=models.Q(unit__isnull=False),
+                                    name='rollup_unit_cell_uniq'),
+            models.UniqueConstraint(fields=['facility', 'pof', 'cof'], condition=models.Q(unit__isnull=True),
+                                    name='rollup_facility_cell_uniq'),
+        ]
+
+    def __str__(self):
+        scope = f"unit {self.unit_id}" if self.unit_id else f"facility {self.facility_id}"
+        return f"Risk {self.pof or '-'}{self.cof or '-'} of {scope}: {self.components}"
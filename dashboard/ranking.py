@@ -0,0 +1,78 @@
+"""
+Riskiest components across everything a user owns.
+
+riskiest() returns one keyset page of components ordered by a stored risk
+metric, largest first (ties by id, largest first), optionally narrowed to
+a facility, a unit or a governing damage mechanism. The ordering matches
+the partial component_owner_{risk,pof,cof}_idx indexes, so a page is read
+from the owner's index entries in order and stops after `limit` rows. No
+sort of the register is needed however deep the page.
+
+Components without a value for the metric are not ranked.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Component, DamageFactorResult
+
+# Ranking metric -> stored Component field (each has an owner index ordered by it)
+METRICS = {
+    'risk': 'calculated_risk',
+    'pof': 'final_pof',
+    'cof': 'calculated_cof',
+}
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Columns returned for each component
+FIELDS = (
+    'id', 'facility_id', 'facility__name', 'equipment__system__unit_id', 'equipment__system__unit__name',
+    'equipment__number', 'rbix_equipment_type', 'rbix_component_type', 'description',
+    'calculated_risk', 'final_pof', 'calculated_cof', 'pof_category', 'cof_category',
+)
+
+
+def parse_cursor(cursor):
+    """(value, id) of a `<value>:<id>` cursor; ValueError if malformed."""
+    value, _, pk = cursor.rpartition(':')
+    try:
+        return Decimal(value), int(pk)
+    except InvalidOperation:
+        raise ValueError(f'Malformed cursor: {cursor}') from None
+
+
+def ranked(user, metric='risk', facility=None, unit=None, mechanism=None, after=None):
+    """
+    The user's components with a `metric` value, largest first, from after
+    the `after` cursor. `facility` and `unit` are ids, `mechanism` a
+    DamageFactorResult mechanism key that must govern the total DF.
+    """
+    field = METRICS[metric]
+    queryset = Component.objects.filter(owner=user, **{f'{field}__isnull': False})
+    if facility is not None:
+        queryset = queryset.filter(facility_id=facility)
+    if unit is not None:
+        queryset = queryset.filter(equipment__system__unit_id=unit)
+    if mechanism:
+        governs = DamageFactorResult.objects.filter(component=OuterRef('pk'), mechanism=mechanism, governing=True)
+        queryset = queryset.filter(Exists(governs))
+    if after is not None:
+        value, pk = parse_cursor(after)
+        # The range bound keeps the index scan starting at the cursor; the OR only drops ties already shown
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(pk__lt=pk), **{f'{field}__lte': value})
+    return queryset.order_by(f'-{field}', '-id')
+
+
+def riskiest(user, metric='risk', facility=None, unit=None, mechanism=None, after=None, limit=PAGE_SIZE):
+    """
+    One page of ranked() as plain dicts of FIELDS. Returns (rows, next
+    cursor), the cursor being None on the last page.
+    """
+    queryset = ranked(user, metric, facility=facility, unit=unit, mechanism=mechanism, after=after)
+    rows = list(queryset.values(*FIELDS)[:limit + 1])
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return rows[:limit], f'{last[METRICS[metric]]}:{last["id"]}'
+    return rows, None
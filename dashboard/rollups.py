@@ -0,0 +1,520 @@
+"""
+Materialized risk matrix of every unit and facility.
+
+RiskRollup holds one row per risk matrix cell of each unit, and of each
+facility (unit NULL): the component count, the largest and total
+calculated_risk, the total calculated_cof and a histogram of the
+governing damage mechanisms. The unit and facility reports, the portfolio
+heat map and the dashboard read these rows, so they cost O(cells) rather
+than O(components).
+
+A component saved, created or deleted on its own is applied as a delta:
+its stored state is remembered before the write (track()), and afterwards
+it leaves its old unit and facility cells and joins its new ones, the
+sums following. Bulk writes and moves regroup the touched units instead,
+and re-add their facilities from the unit rows, as does a delta that
+would take a cell's max risk out (a max cannot be decremented in place).
+The writers report what they touched:
+
+- the batch engines call components_changed() after their bulk_update();
+  components tracked beforehand (save_component()) get a delta;
+- the receivers below react to components saved with new results,
+  created, moved or deleted, and to moved or deleted equipment, systems
+  and units.
+
+The refreshes run when the current transaction commits. Inside
+deferred() they are collected and run once at the end of the block, which
+the chunked recalculations use. Writers that track components inside
+their own transaction use deferred_atomic(), which forgets what the block
+requested if it rolls back; whatever is still pending when a request or
+a background job ends was rolled back with an outer transaction and is
+dropped too, so it never reaches the next one run by the thread.
+`manage.py refresh_rollups` rebuilds every row.
+"""
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import Count, Max, OuterRef, Q, Subquery, Sum
+from django.core.signals import request_finished
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.utils import timezone
+
+from .calculations import risk_matrix
+from .counters import cascaded, moved
+from .models import Component, Equipment, Facility, RiskRollup, System, Unit
+
+# Component fields the rows are grouped or summed on (the default risk matrix metrics)
+ROLLUP_FIELDS = frozenset({'final_pof', 'pof_category', 'calculated_cof', 'cof_category', 'calculated_risk'})
+
+# Lookup from each level below Unit to its unit
+UNIT_LOOKUPS = {Component: 'equipment__system__unit', Equipment: 'system__unit', System: 'unit'}
+
+CHUNK_SIZE = 1000
+
+
+# =============================================================================
+# REBUILD
+# =============================================================================
+
+def _sum(a, b):
+    return b if a is None else a if b is None else a + b
+
+
+def _max(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+
+def _merge(row, components, max_risk, sum_risk, sum_cof, mechanisms):
+    row.components += components
+    row.max_risk = _max(row.max_risk, max_risk)
+    row.sum_risk = _sum(row.sum_risk, sum_risk)
+    row.sum_cof = _sum(row.sum_cof, sum_cof)
+    for mechanism, count in mechanisms.items():
+        row.mechanisms[mechanism] = row.mechanisms.get(mechanism, 0) + count
+
+
+def _cell(rows, key, model=RiskRollup, **scope):
+    if key not in rows:
+        rows[key] = model(**scope, pof=key[-2], cof=key[-1], components=0, mechanisms={})
+    return rows[key]
+
+
+def _annotated(components):
+    """Components annotated with their risk matrix cell and governing mechanism."""
+    results = components.model._meta.apps.get_model('dashboard', 'DamageFactorResult')
+    governing = results.objects.filter(component=OuterRef('pk'), governing=True).values('mechanism')[:1]
+    return risk_matrix.annotate_risk(components).annotate(governing_mechanism=Subquery(governing))
+
+
+def unit_cells(components):
+    """
+    Unsaved unit RiskRollup rows of a Component queryset, grouped in the
+    database. The models are taken from the queryset's app registry, so
+    migrations can pass historical models.
+    """
+    model = components.model._meta.apps.get_model('dashboard', 'RiskRollup')
+    groups = (
+        _annotated(components)
+        .values('equipment__system__unit', 'equipment__system__unit__facility',
+                'risk_pof', 'risk_cof', 'governing_mechanism')
+        .annotate(count=Count('pk'), max_risk=Max('calculated_risk'),
+                  sum_risk=Sum('calculated_risk'), sum_cof=Sum('calculated_cof'))
+        .order_by()
+    )
+    rows = {}
+    for group in groups:
+        unit = group['equipment__system__unit']
+        row = _cell(rows, (unit, group['risk_pof'] or 0, group['risk_cof'] or ''), model,
+                    unit_id=unit, facility_id=group['equipment__system__unit__facility'])
+        mechanisms = {group['governing_mechanism']: group['count']} if group['governing_mechanism'] else {}
+        _merge(row, group['count'], group['max_risk'], group['sum_risk'], group['sum_cof'], mechanisms)
+    return list(rows.values())
+
+
+def facility_cells(unit_rows):
+    """Unsaved facility RiskRollup rows adding up unit rows."""
+    rows = {}
+    for unit_row in unit_rows:
+        row = _cell(rows, (unit_row.facility_id, unit_row.pof, unit_row.cof), type(unit_row),
+                    facility_id=unit_row.facility_id)
+        _merge(row, unit_row.components, unit_row.max_risk, unit_row.sum_risk, unit_row.sum_cof, unit_row.mechanisms)
+    return list(rows.values())
+
+
+@transaction.atomic
+def refresh_rollups(units=None, facilities=None):
+    """
+    Rebuild the rows of the unit ids `units`, then the facility rows of
+    the facility ids `facilities` and of every facility those units are
+    in or were in. With neither given, every row is rebuilt. Returns the
+    number of rows written.
+    """
+    everything = units is None and facilities is None
+    if everything:
+        components = Component.objects.all()
+        stale_units = RiskRollup.objects.filter(unit__isnull=False)
+    else:
+        units = set(units or ()) - {None}
+        facilities = set(facilities or ()) - {None}
+        facilities |= set(Unit.objects.filter(pk__in=units).values_list('facility_id', flat=True))
+        facilities |= set(RiskRollup.objects.filter(unit__in=units).values_list('facility_id', flat=True))
+        # One rebuild of a facility at a time, so concurrent ones never insert the same rows
+        list(Facility.objects.select_for_update().filter(pk__in=facilities).order_by('pk').values_list('pk'))
+        components = Component.objects.filter(equipment__system__unit__in=units)
+        stale_units = RiskRollup.objects.filter(unit__in=units)
+
+    stale_units.delete()
+    written = len(RiskRollup.objects.bulk_create(unit_cells(components), batch_size=CHUNK_SIZE))
+
+    unit_rows = RiskRollup.objects.filter(unit__isnull=False)
+    stale_facilities = RiskRollup.objects.filter(unit__isnull=True)
+    if not everything:
+        unit_rows = unit_rows.filter(facility__in=facilities)
+        stale_facilities = stale_facilities.filter(facility__in=facilities)
+    stale_facilities.delete()
+    written += len(RiskRollup.objects.bulk_create(
+        facility_cells(unit_rows.iterator(chunk_size=CHUNK_SIZE)), batch_size=CHUNK_SIZE,
+    ))
+    return written
+
+
+# =============================================================================
+# DELTAS
+# =============================================================================
+
+@dataclass(frozen=True)
+class Contribution:
+    """What one component adds to the rows of its unit and facility."""
+    unit: int
+    facility: int
+    pof: int
+    cof: str
+    risk: Decimal | None
+    cof_value: Decimal | None
+    mechanism: str | None
+
+
+def contributions(pks):
+    """{component id: Contribution} of the stored state of these components."""
+    rows = _annotated(Component.objects.filter(pk__in=list(pks))).values_list(
+        'pk', 'equipment__system__unit', 'equipment__system__unit__facility', 'risk_pof', 'risk_cof',
+        'calculated_risk', 'calculated_cof', 'governing_mechanism',
+    )
+    return {
+        pk: Contribution(unit, facility, pof or 0, cof or '', risk, cof_value, mechanism)
+        for pk, unit, facility, pof, cof, risk, cof_value, mechanism in rows
+    }
+
+
+def _add(row, contribution):
+    mechanisms = {contribution.mechanism: 1} if contribution.mechanism else {}
+    _merge(row, 1, contribution.risk, contribution.risk, contribution.cof_value, mechanisms)
+
+
+def _remove(row, contribution):
+    """
+    Take a contribution out of a row. Returns False when that cannot be
+    done in place: the row is missing, or it held the cell's max risk or
+    the last non-zero total, which only a regroup can tell.
+    """
+    if row is None or row.components < 1:
+        return False
+    if row.components == 1:
+        # The row empties: deleted, or refilled from scratch by _add()
+        row.components, row.max_risk, row.sum_risk, row.sum_cof, row.mechanisms = 0, None, None, None, {}
+        return True
+    if contribution.risk is not None and (row.max_risk is None or contribution.risk >= row.max_risk):
+        return False
+    for value, total in ((contribution.risk, row.sum_risk), (contribution.cof_value, row.sum_cof)):
+        if value is not None and (total is None or total - value <= 0):
+            return False
+    row.components -= 1
+    if contribution.risk is not None:
+        row.sum_risk -= contribution.risk
+    if contribution.cof_value is not None:
+        row.sum_cof -= contribution.cof_value
+    if contribution.mechanism:
+        count = row.mechanisms.get(contribution.mechanism, 0) - 1
+        if count > 0:
+            row.mechanisms[contribution.mechanism] = count
+        else:
+            row.mechanisms.pop(contribution.mechanism, None)
+    return True
+
+
+@transaction.atomic
+def apply_changes(before, skip_units=()):
+    """
+    Move components from the cells of their `before` contributions
+    ({component id: Contribution, None for a new component}) to the cells
+    of their stored state: the old unit and facility cells lose one
+    component, the new ones gain one, and the sums follow. Components in
+    `skip_units`, or that moved unit, are left to a regroup.
+
+    Returns the unit ids whose rows could not be updated in place and
+    must be regrouped.
+    """
+    after = contributions(before)
+    changes = [(old, after.get(pk)) for pk, old in before.items() if old != after.get(pk)]
+    regroup = set()
+    for old, new in changes:
+        units = {c.unit for c in (old, new) if c}
+        if len(units) > 1 or units & set(skip_units):
+            regroup |= units
+    changes = [(old, new) for old, new in changes if not {c.unit for c in (old, new) if c} & regroup]
+    if not changes:
+        return regroup
+
+    units = {c.unit for pair in changes for c in pair if c}
+    facilities = {c.facility for pair in changes for c in pair if c}
+    # Serialized with refresh_rollups() on the facility rows
+    list(Facility.objects.select_for_update().filter(pk__in=facilities).order_by('pk').values_list('pk'))
+    rows = {
+        (row.unit_id, row.facility_id if row.unit_id is None else None, row.pof, row.cof): row
+        for row in RiskRollup.objects.filter(Q(unit__in=units) | Q(unit__isnull=True, facility__in=facilities))
+    }
+
+    def cells(contribution):
+        keys = ((contribution.unit, None), (None, contribution.facility))
+        return [(unit, facility, contribution.pof, contribution.cof) for unit, facility in keys]
+
+    touched = set()
+    for old, new in changes:
+        unit = (old or new).unit
+        if unit in regroup:
+            continue
+        if old and not all(_remove(rows.get(key), old) for key in cells(old)):
+            regroup.add(unit)
+            continue
+        for key in cells(new) if new else ():
+            if key not in rows:
+                rows[key] = RiskRollup(unit_id=key[0], facility_id=new.facility, pof=key[2], cof=key[3],
+                                       components=0, mechanisms={})
+            _add(rows[key], new)
+        touched.update(cells(old) if old else ())
+        touched.update(cells(new) if new else ())
+
+    # Rows of units being regrouped are rebuilt, and so are their facilities
+    facilities_regrouped = set(Unit.objects.filter(pk__in=regroup).values_list('facility_id', flat=True))
+    saved = [
+        rows[key] for key in touched
+        if key[0] not in regroup and (key[0] is not None or key[1] not in facilities_regrouped)
+    ]
+    now = timezone.now()
+    for row in saved:
+        row.updated_at = now
+    RiskRollup.objects.filter(pk__in=[row.pk for row in saved if row.pk and row.components < 1]).delete()
+    RiskRollup.objects.bulk_update(
+        [row for row in saved if row.pk and row.components > 0],
+        ['components', 'max_risk', 'sum_risk', 'sum_cof', 'mechanisms', 'updated_at'],
+    )
+    RiskRollup.objects.bulk_create([row for row in saved if not row.pk and row.components > 0])
+    return regroup
+
+
+# =============================================================================
+# CHANGE TRACKING
+# =============================================================================
+
+class _Pending(threading.local):
+    def __init__(self):
+        self.units = set()
+        self.facilities = set()
+        self.before = {}
+        self.changed = set()
+        self.deferred = 0
+
+
+_pending = _Pending()
+
+
+def flush():
+    """Run the refreshes requested so far: per-cell deltas for tracked components, regroups for the rest."""
+    units, facilities, before, changed = _pending.units, _pending.facilities, _pending.before, _pending.changed
+    discard()
+    if changed:
+        units |= apply_changes({pk: before[pk] for pk in changed}, skip_units=units)
+    if units or facilities:
+        refresh_rollups(units, facilities)
+
+
+def discard(**kwargs):
+    """Forget the refreshes requested so far, e.g. by changes rolled back with their transaction."""
+    _pending.units, _pending.facilities, _pending.before, _pending.changed = set(), set(), {}, set()
+
+
+def _schedule():
+    if not _pending.deferred:
+        transaction.on_commit(flush)
+
+
+def units_changed(units=(), facilities=()):
+    """Refresh the rows of these unit and facility ids once the change is committed."""
+    units = set(units) - {None}
+    facilities = set(facilities) - {None}
+    if not units and not facilities:
+        return
+    _pending.units |= units
+    _pending.facilities |= facilities
+    _schedule()
+
+
+def track(pks):
+    """
+    Remember the stored state of a few components about to change, so
+    the refresh after the change moves them between cells instead of
+    regrouping their units. The first state seen before a refresh is kept.
+    """
+    pks = [int(pk) for pk in pks if pk is not None and int(pk) not in _pending.before]
+    if pks:
+        known = contributions(pks)
+        _pending.before.update({pk: known.get(pk) for pk in pks})
+
+
+def components_changed(pks):
+    """
+    Refresh the rows of these components (ids or a Component queryset)
+    once the change is committed: tracked components by delta, the units
+    of the others by regroup.
+    """
+    if not isinstance(pks, models.QuerySet):
+        pks = [int(pk) for pk in pks]
+        tracked = [pk for pk in pks if pk in _pending.before]
+        if tracked:
+            _pending.changed.update(tracked)
+            _schedule()
+        pks = [pk for pk in pks if pk not in _pending.before]
+        chunks = [pks[start:start + CHUNK_SIZE] for start in range(0, len(pks), CHUNK_SIZE)]
+    else:
+        chunks = [pks]
+    units = set()
+    for chunk in chunks:
+        units.update(
+            Component.objects.filter(pk__in=chunk).values_list(UNIT_LOOKUPS[Component], flat=True).distinct()
+        )
+    units_changed(units)
+
+
+@contextmanager
+def deferred():
+    """Collect the refreshes requested in the block and run them once, at its end."""
+    _pending.deferred += 1
+    try:
+        yield
+    finally:
+        _pending.deferred -= 1
+        _schedule()
+
+
+@contextmanager
+def deferred_atomic(using=None):
+    """
+    transaction.atomic() and deferred() in one block. If the block rolls
+    back, the refreshes it requested are forgotten with it; those
+    requested before it are kept.
+    """
+    saved = (set(_pending.units), set(_pending.facilities), dict(_pending.before), set(_pending.changed))
+    try:
+        with transaction.atomic(using=using), deferred():
+            yield
+    except BaseException:
+        _pending.units, _pending.facilities, _pending.before, _pending.changed = saved
+        raise
+
+
+def _unit_of(instance):
+    return type(instance).objects.filter(pk=instance.pk).values_list(UNIT_LOOKUPS[type(instance)], flat=True).first()
+
+
+def remember_unit(sender, instance, raw=False, **kwargs):
+    """
+    Before a save, note whether the rows are affected: a moved node
+    regroups the unit it leaves and the one it joins, a component whose
+    results change is tracked for a delta.
+    """
+    if raw:
+        return
+    if not instance._state.adding and moved(instance):
+        instance._rollup_units = {_unit_of(instance)}
+    elif sender is Component and (
+        instance._state.adding
+        or not hasattr(instance, '_loaded_values')
+        or ROLLUP_FIELDS.intersection(instance.dirty_fields())
+    ):
+        if not instance._state.adding:
+            track([instance.pk])
+        instance._rollup_tracked = True
+
+
+def rollup_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.__dict__.pop('_rollup_tracked', False):
+        if created:
+            _pending.before.setdefault(instance.pk, None)
+        components_changed([instance.pk])
+    elif '_rollup_units' in instance.__dict__:
+        units_changed({*instance.__dict__.pop('_rollup_units'), _unit_of(instance)})
+
+
+def unit_moved(sender, instance, created, raw=False, **kwargs):
+    # refresh_rollups() finds the facility a unit left from its stored rows
+    if not raw and not created and moved(instance):
+        units_changed([instance.pk])
+
+
+def rollup_deleted(sender, instance, origin=None, **kwargs):
+    # The node a delete started from covers the rows its cascade removes
+    if cascaded(sender, instance, origin):
+        return
+    if sender is Unit:
+        units_changed(facilities=[instance.facility_id])
+    elif sender is Component:
+        track([instance.pk])
+        components_changed([instance.pk])
+    else:
+        units_changed([_unit_of(instance)])
+
+
+for _model in UNIT_LOOKUPS:
+    pre_save.connect(remember_unit, sender=_model, dispatch_uid=f'rollups_pre_save_{_model.__name__}')
+    post_save.connect(rollup_saved, sender=_model, dispatch_uid=f'rollups_post_save_{_model.__name__}')
+    pre_delete.connect(rollup_deleted, sender=_model, dispatch_uid=f'rollups_pre_delete_{_model.__name__}')
+post_save.connect(unit_moved, sender=Unit, dispatch_uid='rollups_post_save_Unit')
+pre_delete.connect(rollup_deleted, sender=Unit, dispatch_uid='rollups_pre_delete_Unit')
+# Committed refreshes ran by now; the rest were rolled back by an outer transaction
+request_finished.connect(discard, dispatch_uid='rollups_request_finished')
+del _model
+
+
+# =============================================================================
+# READING
+# =============================================================================
+
+def summarize(rows):
+    """
+    Totals of RiskRollup rows of one scope: component count, (risk level,
+    count) pairs from high to low plus the unclassified count, largest /
+    total risk, total COF, governing mechanism counts (largest first) and
+    the matrix cells ({pof, cof, count, max_risk, sum_risk}, classified
+    cells only).
+    """
+    cells = {}
+    for row in rows:
+        _merge(_cell(cells, (row.pof, row.cof)), row.components, row.max_risk, row.sum_risk,
+               row.sum_cof, row.mechanisms)
+    cells = list(cells.values())
+    total = RiskRollup(pof=0, cof='', components=0, mechanisms={})
+    for cell in cells:
+        _merge(total, cell.components, cell.max_risk, cell.sum_risk, cell.sum_cof, cell.mechanisms)
+
+    levels = risk_matrix.risk_level([cell.pof for cell in cells], risk_matrix.cof_index([cell.cof for cell in cells]))
+    level_counts = dict.fromkeys(risk_matrix.RISK_LEVELS + (None,), 0)
+    for cell, level in zip(cells, levels):
+        level_counts[level] += cell.components
+
+    return {
+        'components': total.components,
+        'levels': [(level, level_counts[level]) for level in reversed(risk_matrix.RISK_LEVELS)],
+        'unclassified': level_counts[None],
+        'max_risk': total.max_risk,
+        'sum_risk': total.sum_risk,
+        'sum_cof': total.sum_cof,
+        'mechanisms': sorted(total.mechanisms.items(), key=lambda item: (-item[1], item[0])),
+        'cells': [
+            {'pof': cell.pof, 'cof': cell.cof, 'count': cell.components,
+             'max_risk': cell.max_risk, 'sum_risk': cell.sum_risk}
+            for cell, level in zip(cells, levels) if level is not None
+        ],
+    }
+
+
+def summarize_by(rows, key):
+    """{key(row): summarize() of its rows}"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(key(row), []).append(row)
+    return {group: summarize(group_rows) for group, group_rows in groups.items()}
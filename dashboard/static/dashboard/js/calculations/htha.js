@@ -1,6 +1,26 @@
 // HTHA Calculation Logic (API 581 Part 2, Section 6)
 
 document.addEventListener('DOMContentLoaded', function () {
+    // Nelson curves, susceptibility bands and DFs, rendered by the view from
+    // dashboard/calculations/htha.py browser_tables() (the tables behind the stored DF)
+    const tablesEl = document.getElementById('htha-tables');
+    if (!tablesEl) return;
+    const HTHA_TABLES = JSON.parse(tablesEl.textContent);
+
+    // Labels used by older callers (inspection_planning.js)
+    const SHORT_LABELS = {
+        "None": "No Susceptibility",
+        "Low": "Low Susceptibility",
+        "Medium": "Medium Susceptibility",
+        "High": "High Susceptibility"
+    };
+    const SUSCEPTIBILITY_COLORS = {
+        "Red": "text-red-600",
+        "Orange": "text-orange-500",
+        "Yellow": "text-yellow-600",
+        "Green": "text-green-600"
+    };
+
     // Inputs
     const activeCheck = document.getElementById('id_mechanism_htha_active');
     const inputMaterial = document.getElementById('id_htha_material');
@@ -80,26 +100,14 @@ document.addEventListener('DOMContentLoaded', function () {
         const materialVerified = checkMaterialVerified?.checked || false;
 
         // 1. Determine Susceptibility
-        let susceptibility = "None"; // None, Low, Medium, High
-
-        // Use Carbon Steel Curve if material is not verified? 
-        // For simplicity, we use the selected material, but flag validation if needed.
-        let selectedMaterial = material;
-        if (!materialVerified && material !== 'Carbon Steel') {
-            // Conservative: Check against Carbon Steel if not verified? 
-            // API 581 says verify metallurgy. 
-            // For this UI, we calc based on selection.
-        }
-
-        // Damage Observed Override
+        let susceptibility;
         if (damageObserved) {
-            susceptibility = "High";
+            susceptibility = "Damage Observed";
         } else {
-            // Nelson Curve Logic
-            susceptibility = determineSusceptibility(selectedMaterial, tempF, pressure);
+            susceptibility = determineSusceptibility(material, tempF, pressure, materialVerified);
         }
 
-        // 2. Calculate Damage Factor (DF)
+        // 2. Damage Factor (htha_df_data.json, same table as the stored htha_damage_factor)
         let df = calculateHTHADamageFactor(susceptibility, timeYears);
 
         // Display Results
@@ -120,121 +128,58 @@ document.addEventListener('DOMContentLoaded', function () {
 
     // --- Helper: Get Nelson Curve Limit Temperature (F) for a given Pressure ---
     function getNelsonCurveLimit(material, pressure) {
-        // Simplified Nelson Curves (Polyline Approximations)
-        // Returns the Temperature (F) limit for the given H2 partial pressure (psia)
-        // If pressure is below curve range, usually safe -> returns high temp (e.g. 2000)
-        // If pressure is above curve range, returns safe limit.
-
-        // Absolute Lower Limits (API 941)
-        // CS: ~400F below 50 psia.
-
-        // Simplification for key materials:
-
-        // Carbon Steel
-        if (material === 'Carbon Steel') {
-            // Roughly: constant 500F below 50 psia? No, standard curve starts higher.
-            // API 941 Figure 1: 
-            // ~ 500 - 600 F range until 100 psia.
-            // Drops to 400F at high pressure.
-            // Linear approx for demo:
-            if (pressure < 50) return 9999; // Safe
-            if (pressure > 2500) return 400;
-            // Approx descent
-            return 600 - (0.05 * pressure); // Very rough, needs precise data points
-        }
-
-        // C-0.5Mo (Same as CS in recent API editions due to failure history)
-        if (material === 'C-0.5Mo' || material === 'C-0.5Mo Normalized') {
-            return getNelsonCurveLimit('Carbon Steel', pressure);
-        }
-
-        // 1Cr-0.5Mo
-        if (material === '1Cr-0.5Mo') {
-            // Higher resistance
-            if (pressure < 50) return 9999;
-            return 850 - (0.02 * pressure); // Demo
-        }
-
-        // 1.25Cr-0.5Mo
-        if (material === '1.25Cr-0.5Mo') {
-            if (pressure < 50) return 9999;
-            return 950 - (0.02 * pressure); // Demo
+        // Polyline from htha_nelson_curves.json, clamped to its end points
+        const curves = HTHA_TABLES.curves;
+        const name = (curves.aliases || {})[material] || material;
+        if (!(name in curves.curves)) return curves.default_limit_f; // Default/Conservative
+        const points = curves.curves[name];
+        if (points === null) return Infinity; // Not susceptible in refining service
+
+        if (pressure <= points[0].p) return points[0].t;
+        for (let i = 1; i < points.length; i++) {
+            if (pressure <= points[i].p) {
+                const a = points[i - 1], b = points[i];
+                return a.t + (b.t - a.t) * (pressure - a.p) / (b.p - a.p);
+            }
         }
+        return points[points.length - 1].t;
+    }
 
-        // 2.25Cr-1Mo
-        if (material === '2.25Cr-1Mo') {
-            return 1100; // Very resistant
+    function determineSusceptibility(material, tempF, pressure, materialVerified) {
+        const screening = HTHA_TABLES.curves.screening;
+        if (!material) return "No Susceptibility";
+        if (tempF < screening.min_temperature_f || pressure < screening.min_h2_partial_pressure_psia) {
+            return "No Susceptibility"; // API 581 Screening
         }
 
-        // 3Cr and above
-        if (material === '3Cr-1Mo' || material === '5Cr-0.5Mo' || material === '7Cr-0.5Mo') {
-            return 9999; // Effectively immune in typical refining conditions
+        // Verified carbon / C-0.5Mo steels inside the screening window
+        if (materialVerified && HTHA_TABLES.curves.threshold_materials.includes(material)) {
+            return "High Susceptibility";
         }
 
-        return 500; // Default/Conservative
-    }
-
-    function determineSusceptibility(material, tempF, pressure) {
-        if (!material) return "None";
-        if (tempF < 350 || pressure < 50) return "None"; // API 581 Screening
-
-        const tLimit = getNelsonCurveLimit(material, pressure);
-
-        // Time constant relative to curve
-        const deltaF = tempF - tLimit; // Positive means above curve (Bad)
-
-        if (deltaF >= 0) {
-            return "High";
-        } else if (deltaF >= -50) {
-            // Between curve and 50F below
-            return "Medium";
-        } else if (deltaF >= -100) {
-            // Between 50F and 100F below
-            return "Low";
-        } else {
-            // More than 100F below
-            return "None";
-        }
+        // Positive means above curve (Bad); bands from htha_susceptibility_data.json
+        const deltaF = tempF - getNelsonCurveLimit(material, pressure);
+        const bands = HTHA_TABLES.susceptibility
+            .filter(band => band.below_curve_f !== null)
+            .sort((a, b) => a.below_curve_f - b.below_curve_f);
+        const band = bands.find(b => deltaF >= -b.below_curve_f);
+        return band ? band.susceptibility : "No Susceptibility";
     }
 
     function calculateHTHADamageFactor(susceptibility, timeYears) {
-        // API 581 Table 6.3 (Simplified Logic)
-        if (susceptibility === "None") return 0;
-
-        // Basic DF Values based on time in service for each susceptibility
-        // (Using approximate values commonly generated by API 581 calcs)
-
-        if (susceptibility === "High") {
-            // Increases rapidly with time
-            if (timeYears < 1) return 10;
-            if (timeYears < 5) return 500;
-            return 5000; // Max out
-        }
-
-        if (susceptibility === "Medium") {
-            if (timeYears < 5) return 0;
-            if (timeYears < 10) return 50;
-            if (timeYears < 20) return 500;
-            return 1000;
-        }
-
-        if (susceptibility === "Low") {
-            if (timeYears < 10) return 0;
-            if (timeYears < 20) return 10;
-            return 100;
-        }
-
-        return 0;
+        // API 581 Table 2.E.3.1: the DF depends on the susceptibility only
+        const label = SHORT_LABELS[susceptibility] || susceptibility;
+        const row = HTHA_TABLES.damage_factors.find(r => r.susceptibility === label);
+        return row ? row.df : 0;
     }
 
     // Expose globally for Inspection Planning
     window.calculateHTHADamageFactor = calculateHTHADamageFactor;
 
     function getSusceptibilityColor(susceptibility) {
-        if (susceptibility === "High") return "text-red-600";
-        if (susceptibility === "Medium") return "text-orange-500";
-        if (susceptibility === "Low") return "text-yellow-600";
-        return "text-green-600";
+        const band = HTHA_TABLES.susceptibility.find(b => b.susceptibility === susceptibility);
+        const color = band ? band.color : (susceptibility === "Damage Observed" ? "Red" : "Green");
+        return SUSCEPTIBILITY_COLORS[color] || "text-green-600";
     }
 
     // Run calculation on load if active
@@ -0,0 +1,38 @@
+"""
+Shared test data: a user's equipment with components saved the way the
+forms save them, section rows included.
+"""
+import datetime
+
+from accounts.models import CustomUser
+
+from ..models import Component, Equipment, Facility, System, Unit
+
+# Fixed evaluation date of the batch tests
+TODAY = datetime.date(2025, 1, 1)
+
+
+def years_before(years, today=TODAY):
+    """The date `years` (whole or quarter years, so a whole number of days) before `today`."""
+    return today - datetime.timedelta(days=years * 365.25)
+
+
+def create_equipment(email):
+    """One drum in a new facility, unit and system of a new user."""
+    user = CustomUser.objects.create_user(email=email, password=email)
+    facility = Facility.objects.create(owner=user, name='Site', location='Coast', facility_type='Refinery')
+    system = System.objects.create(unit=Unit.objects.create(facility=facility, name='Crude'), name='Feed')
+    return Equipment.objects.create(system=system, number='V-101', plant_equipment_type='Drum')
+
+
+def create_component(equipment, **fields):
+    """
+    Save a component (a drum unless the RBIX types are given); section
+    fields (e.g. htha_material) are written to their section rows.
+    """
+    component = Component(
+        equipment=equipment,
+        **{'rbix_equipment_type': 'Drum', 'rbix_component_type': 'Drum, Reactor, Column', **fields},
+    )
+    component.save()
+    return component
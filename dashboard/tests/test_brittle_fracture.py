@@ -0,0 +1,89 @@
+"""
+The vectorized brittle fracture engine against the formula_app module.
+
+Tref comes from the exemption curve handler in
+static/formula_app/js/modules/brittle_fracture/interactions.js. The DFs
+come from calculateBaseDf(), calculateBrit885Df(), calculateSigmaDf() and
+calculateGoverningDf() in logic.js.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, brittle_fracture
+from ..models import Component
+from .fixtures import TODAY, create_component, create_equipment
+
+# material, curve, yield strength ksi, Tmin F, thickness in, PWHT -> (Tref F, base DF)
+CASES = [
+    ('Carbon Steel', 'A', 30, -20, 0.5, False, (104, 61)),
+    ('Carbon Steel', 'B', 35, 0, 1.0, False, (50.5, 288.25)),
+    ('Carbon Steel', 'C', 40, -40, 2.25, True, (2, 68.65)),
+    ('Low-Alloy Steel', 'D', 45, -60, 1.5, False, (-19, 711.55)),
+    ('Carbon Steel', 'A', 30, 150, 0.75, True, (104, 0)),
+]
+
+# Tmin - Tref F -> 885 F embrittlement DF
+BRIT885_CASES = [(-150, 1381), (-35, 750), (12.5, 264), (80, 8), (150, 0)]
+
+# Tmin F, sigma content -> sigma phase DF
+SIGMA_CASES = [(1300, 'Low', 0), (700, 'Medium', 0.55), (125, 'High', 4033.5), (-100, 'Low', 1.1)]
+
+# Df_brit, Df_tempe, Df_885, Df_sigma -> governing DF
+GOVERNING_CASES = [(61, 10, 8, 0.55, 71), (61, np.nan, 264, 0, 264), (0, 0, 0, 4033.5, 4033.5)]
+
+
+class BrittleFractureEngineTests(SimpleTestCase):
+    def test_carbon_and_low_alloy_steels(self):
+        material, curve, ys, t_min, thickness, pwht, expected = zip(*CASES)
+        t_ref = brittle_fracture.reference_temperature(
+            np.array(material, dtype=object), np.array(curve, dtype=object), np.array(ys, dtype=float),
+        )
+        df = brittle_fracture.base_damage_factor(
+            np.array(t_min, dtype=float) - t_ref, np.array(thickness, dtype=float), np.array(pwht, dtype=bool),
+        )
+        for i, (expected_t_ref, expected_df) in enumerate(expected):
+            with self.subTest(case=CASES[i][:6]):
+                self.assertAlmostEqual(t_ref[i], expected_t_ref, places=6)
+                self.assertAlmostEqual(df[i], expected_df, places=6)
+
+    def test_885_embrittlement(self):
+        difference, expected = zip(*BRIT885_CASES)
+        np.testing.assert_allclose(brittle_fracture.brit885_damage_factor(np.array(difference, dtype=float)), expected)
+
+    def test_sigma_phase(self):
+        t_min, amount, expected = zip(*SIGMA_CASES)
+        df = brittle_fracture.sigma_damage_factor(np.array(t_min, dtype=float), np.array(amount, dtype=object))
+        np.testing.assert_allclose(df, expected)
+
+    def test_governing(self):
+        brittle, temper, brit885, sigma, expected = (np.array(column, dtype=float) for column in zip(*GOVERNING_CASES))
+        np.testing.assert_allclose(brittle_fracture.governing_damage_factor(brittle, temper, brit885, sigma), expected)
+
+
+class BrittleFractureBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # The second case; the 35 ksi yield strength comes from the SMYS
+        cls.component = create_component(
+            create_equipment('brittle@example.com'),
+            nominal_thickness_in=Decimal('1.0'),
+            smys_yield_psi=Decimal('35000'),
+            mechanism_brittle_fracture_active=True,
+            brittle_admin_controls=True,
+            brittle_min_operating_temp_f=Decimal('0'),
+            brittle_curve='B',
+            brittle_material_type='Carbon Steel',
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_logic_df(self):
+        batch.recalculate_damage_factors(Component.objects.filter(pk=self.component.pk), today=TODAY)
+
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.brittle_damage_factor, Decimal('288.25'))
+        self.assertEqual(self.component.calculated_total_damage_factor, Decimal('288.25'))
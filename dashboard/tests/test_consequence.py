@@ -0,0 +1,110 @@
+"""
+The vectorized COF Level 1 engine against the formula_app calculator.
+
+Release rates were run through calcWn() / calcWnGas() in
+static/formula_app/js/cof_level_1.js, for the four hole sizes. Flammable
+areas were run through calcFlammableCA() in cof_level_1_4_8.js. The
+flammable cases stay below the AIT blending band, or are pyrophoric,
+because calcFlammableCA() compares the storage temperature in deg R with
+the Table 4.1.2 AIT in deg F.
+
+The dashboard's own COF card is a one-hole approximation, so the stored
+Level 1 area is checked against the engine run on the loaded component,
+whose release rates are the calculator's.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, consequence
+from ..calculations.common import to_decimal
+from ..models import Component
+from .fixtures import create_component, create_equipment
+
+# Ps psia, liquid density lb/ft3 -> release rate per hole (lb/s), Patm 14.7, Cd 0.61, Kvn 1.0
+LIQUID_CASES = [
+    (100, 42.702, (1.2080492, 19.328788, 309.26061, 4948.1697)),
+    (14.7, 42.702, (0, 0, 0, 0)),
+]
+
+# Ps psia, MW, Ts F -> release rate per hole (lb/s), k 1.4; sonic then subsonic
+GAS_CASES = [
+    (300, 23, 100, (0.29495480, 4.7192768, 75.508428, 1208.1348)),
+    (20, 23, 100, (0.017695510, 0.28312817, 4.5300507, 72.480811)),
+]
+
+# fluid, gas, rate lb/s, mass lb, Ts F, mitigation, instantaneous -> (CA_cmd, CA_inj) ft2
+FLAMMABLE_CASES = [
+    ('C1-C2', True, 10, 500, 100, 0, False, (811.05217, 1736.6014)),
+    ('C3-C4', True, 80, 20000, 60, 0.25, True, (11887.890, 33031.238)),
+    ('Aromatic', False, 20, 3000, 100, 0, False, (0, 0)),
+    ('Pyrophoric', False, 5, 1000, 100, 0.15, False, (2195.9804, 5234.9130)),
+]
+
+
+def _column(values):
+    return np.array(values, dtype=float)
+
+
+class ConsequenceEngineTests(SimpleTestCase):
+    def test_liquid_release_rate(self):
+        ps, density, expected = zip(*LIQUID_CASES)
+        rate = consequence.liquid_release_rate(
+            consequence.HOLE_DIAMETERS_IN, _column(ps), consequence.DEFAULT_ATM_PRESSURE_PSIA,
+            consequence.DEFAULT_DISCHARGE_COEFFICIENT, 1.0, _column(density),
+        )
+        np.testing.assert_allclose(rate, expected, rtol=1e-7)
+
+    def test_gas_release_rate(self):
+        ps, mw, temp, expected = zip(*GAS_CASES)
+        rate = consequence.gas_release_rate(
+            consequence.HOLE_DIAMETERS_IN, _column(ps), consequence.DEFAULT_ATM_PRESSURE_PSIA, 1.0, _column(mw),
+            _column(temp) + consequence.RANKINE_OFFSET, np.full(len(ps), consequence.DEFAULT_HEAT_CAPACITY_RATIO),
+        )
+        np.testing.assert_allclose(rate, expected, rtol=1e-7)
+
+    def test_flammable_areas(self):
+        fluid, gas, rate, mass, temp, mitigation, instantaneous, expected = zip(*FLAMMABLE_CASES)
+        names, _ = consequence.fluid_properties()
+        cmd, inj = consequence.flammable_areas(
+            np.array([names.index(name) for name in fluid]),
+            np.array(gas, dtype=bool),
+            _column(rate)[:, None],
+            _column(mass)[:, None],
+            _column(temp) + consequence.RANKINE_OFFSET,
+            _column(mitigation),
+            np.array(instantaneous, dtype=bool)[:, None],
+        )
+        np.testing.assert_allclose(np.column_stack([cmd[:, 0], inj[:, 0]]), expected, rtol=1e-7)
+
+
+class ConsequenceBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # C6-C8 (42.702 lb/ft3) liquid at 100 psia, the first liquid case
+        cls.component = create_component(
+            create_equipment('consequence@example.com'),
+            representative_fluid='C6-C8',
+            stored_phase='Liquid',
+            operating_temp_f=Decimal('100'),
+            operating_pressure_psia=Decimal('100'),
+            component_diameter=Decimal('48'),
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_level_1_area(self):
+        queryset = Component.objects.filter(pk=self.component.pk)
+        batch.recalculate_consequences(queryset)
+
+        _, result = consequence.evaluate_components(queryset)
+        np.testing.assert_allclose(result.release_rate[0], LIQUID_CASES[0][2], rtol=1e-7)
+        self.component.refresh_from_db()
+        self.assertGreater(result.consequence_area[0], 0)
+        self.assertEqual(
+            self.component.calculated_consequence_area,
+            to_decimal(result.consequence_area[0], places=4, max_digits=15),
+        )
@@ -0,0 +1,83 @@
+"""
+The vectorized corrosion rates against the step-2 calculators.
+
+CO2 rates were run through interpolate_fT_pH() and Eq. 2.B.26 in
+static/formula_app/components/modules-step2/co2_corrosion_calcs.js; acid
+sour water rates through the Table 2.B.10.2 double interpolation and the
+F_O / F_V factors in acid_sw_corrosion_calcs.js. The rows stay inside the
+table ranges, where the calculators interpolate like the compiled grids.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, corrosion_rates
+from ..models import Component
+from .fixtures import create_component, create_equipment
+
+# temp F, pH, CO2 mol %, pressure psia, shear stress Pa -> CO2 corrosion rate (mpy)
+CO2_CASES = [
+    (100, 5.2, 5, 500, 40, 10.511314),
+    (68, 3.5, 2, 200, 19, 3.4440116),
+    (140, 6.0, 10, 1000, 0, 0),
+    (77, 4.25, 3, 300, 100, 7.5953174),
+]
+
+# pH, temp F, dissolved O2 ppb, velocity ft/s -> acid sour water corrosion rate (mpy)
+ACID_WATER_CASES = [
+    (5.0, 150, 10, 3, 3.25),
+    (4.75, 100, 60, 12, 5.0),
+    (6.5, 200, 0, 30, 7.5),
+    (5.5, 112.5, 50, 20, 10.35),
+]
+
+
+def _columns(cases):
+    return (np.array(column, dtype=float) for column in zip(*cases))
+
+
+class CorrosionRateEngineTests(SimpleTestCase):
+    def test_co2(self):
+        temp, ph, co2, pressure, shear, expected = _columns(CO2_CASES)
+        rate = corrosion_rates.co2_corrosion_rate(temp, ph, co2, pressure, shear)
+        np.testing.assert_allclose(rate, expected, rtol=1e-7)
+
+    def test_acid_sour_water(self):
+        ph, temp, oxygen, velocity, expected = _columns(ACID_WATER_CASES)
+        rate = corrosion_rates.acid_water_corrosion_rate(temp, ph, oxygen, velocity)
+        np.testing.assert_allclose(rate, expected, rtol=1e-7)
+
+
+class CorrosionRateBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        equipment = create_equipment('rates@example.com')
+        # The first CO2 case and the second acid sour water case
+        cls.co2 = create_component(
+            equipment,
+            operating_temp_f=Decimal('100'),
+            operating_pressure_psia=Decimal('500'),
+            ph_value=Decimal('5.2'),
+            co2_concentration_mol_percent=Decimal('5'),
+            co2_shear_stress_pa=Decimal('40'),
+        )
+        cls.acid_water = create_component(
+            equipment,
+            operating_temp_f=Decimal('100'),
+            ph_value=Decimal('4.75'),
+            acid_water_dissolved_o2_ppm=Decimal('60'),
+            flow_velocity_fts=Decimal('12'),
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_calculator_rates(self):
+        batch.recalculate_corrosion_rates(Component.objects.filter(pk__in=[self.co2.pk, self.acid_water.pk]))
+
+        self.co2.refresh_from_db()
+        self.acid_water.refresh_from_db()
+        self.assertEqual(self.co2.co2_corrosion_rate_mpy, Decimal('10.51'))
+        self.assertEqual(self.acid_water.acid_water_corrosion_rate_mpy, Decimal('5.00'))
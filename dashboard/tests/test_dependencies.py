@@ -0,0 +1,81 @@
+"""
+Tests for the field -> stage dependency graph and save_component().
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+
+from accounts.models import CustomUser
+
+from ..calculations import risk
+from ..calculations.dependencies import STAGES, affected_stages, save_component
+from ..models import Component, Equipment, Facility, System, Unit
+
+
+class AffectedStagesTests(TestCase):
+    def test_risk_stage_runs_last(self):
+        self.assertEqual(list(STAGES)[-1], 'risk')
+
+    def test_consequence_input_refreshes_risk(self):
+        self.assertEqual(affected_stages(['representative_fluid']), ['consequences', 'risk'])
+
+    def test_damage_factor_input_refreshes_fms_and_risk(self):
+        self.assertEqual(affected_stages(['insulation_condition']), ['external', 'fms', 'risk'])
+
+    def test_unknown_field_refreshes_nothing(self):
+        self.assertEqual(affected_stages(['description']), [])
+
+
+class SaveComponentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email='editor@example.com', password='editor')
+        facility = Facility.objects.create(owner=user, name='Site', location='Coast', facility_type='Refinery')
+        system = System.objects.create(unit=Unit.objects.create(facility=facility, name='Crude'), name='Feed')
+        cls.equipment = Equipment.objects.create(system=system, number='V-101', plant_equipment_type='Drum')
+
+    def create_component(self):
+        component = Component(
+            equipment=self.equipment,
+            rbix_equipment_type='Drum',
+            rbix_component_type='Drum, Reactor, Column',
+            representative_fluid='C1-C2',
+            stored_phase='Gas',
+            component_diameter=Decimal('48'),
+            operating_pressure_psia=Decimal('300'),
+            fluid_temperature=Decimal('150'),
+            gff_value=Decimal('0.00003'),
+        )
+        save_component(component)
+        return Component.objects.get(pk=component.pk)
+
+    def assertStoredRiskIsFresh(self, component):
+        pks, fresh = risk.evaluate_components(Component.objects.filter(pk=component.pk))
+        component.refresh_from_db()
+        self.assertAlmostEqual(float(component.final_pof), fresh.final_pof[0], places=9)
+        self.assertAlmostEqual(float(component.calculated_risk), fresh.risk[0], places=6)
+        self.assertEqual(component.pof_category, int(fresh.pof_category[0]))
+        self.assertEqual(component.cof_category, fresh.cof_category[0])
+
+    def test_new_component_stores_risk(self):
+        component = self.create_component()
+        self.assertIsNotNone(component.calculated_risk)
+        self.assertStoredRiskIsFresh(component)
+
+    def test_consequence_edit_refreshes_stored_risk(self):
+        component = self.create_component()
+        risk_before = component.calculated_risk
+
+        component.representative_fluid = 'C6-C8'
+        component.stored_phase = 'Liquid'
+        self.assertEqual(save_component(component), ['consequences', 'risk'])
+        self.assertNotEqual(Component.objects.get(pk=component.pk).calculated_risk, risk_before)
+        self.assertStoredRiskIsFresh(component)
+
+    def test_gff_edit_refreshes_final_pof_without_fms_audit(self):
+        component = self.create_component()
+
+        component.gff_value = Decimal('0.003')
+        self.assertEqual(save_component(component), ['fms', 'risk'])
+        self.assertStoredRiskIsFresh(component)
+        self.assertAlmostEqual(float(component.final_pof), 0.003 * risk.DEFAULT_FMS, places=9)
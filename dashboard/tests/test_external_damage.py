@@ -0,0 +1,86 @@
+"""
+The vectorized external damage rates against external_damage.js.
+
+Each row was run through calculateAtmosphericCorrosion() or
+calculateCUIRate(), with F_eq and F_if left at their 1.0 default.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, external_damage
+from ..models import Component
+from .fixtures import TODAY, create_component, create_equipment
+
+# external driver, complexity -> atmospheric corrosion rate (mpy)
+ATMOSPHERIC_CASES = [
+    ('Severe', 'High', 12.5),
+    ('Marine', 'Medium', 5.0),
+    ('Temperate', 'Low', 2.25),
+    ('Arid/Dry', 'Medium', 0.5),
+    ('None', 'High', 0.0),
+]
+
+# operating temp F, CUI driver, insulation type, insulation condition, complexity -> CUI rate (mpy)
+CUI_CASES = [
+    (100, 'Severe', 'Mineral Wool', 'Poor', 'High', 26.785714),
+    (200, 'Moderate', 'Calcium Silicate', 'Average', 'Medium', 8.653846),
+    (60, 'Mild', 'Foam Glass', 'Good', 'Low', 1.265625),
+    (300, 'Dry', 'Fiberglass', 'Average', 'Medium', 0.0),
+    (120, 'Dry', 'Fiberglass', 'Average', 'Medium', 1.785714),
+    (400, 'Severe', 'Other', 'Poor', 'High', 0.0),
+    (250, 'None', 'Other', 'Poor', 'High', 0.0),
+    (32, 'Severe', 'Mineral Wool', 'Average', 'Medium', 4.5),
+    (25, 'Moderate', 'Fiberglass', 'Average', 'Medium', 1.25),
+    (40, 'Severe', 'Calcium Silicate', 'Average', 'Medium', 10.113636),
+    (100, 'Severe', '', 'Average', 'Medium', 17.142857),
+    (100, 'Severe', None, 'Average', 'Medium', 17.142857),
+    (100, 'Severe', 'Polyurethane', 'Average', 'Medium', 14.285714),
+]
+
+
+def _labels(values):
+    return np.array(values, dtype=object)
+
+
+class ExternalDamageEngineTests(SimpleTestCase):
+    def test_atmospheric_corrosion_rate(self):
+        driver, complexity, expected = zip(*ATMOSPHERIC_CASES)
+        rate = external_damage.external_corrosion_rate(_labels(driver), _labels(complexity))
+        np.testing.assert_allclose(rate, expected)
+
+    def test_cui_corrosion_rate(self):
+        temp, driver, insulation, condition, complexity, expected = zip(*CUI_CASES)
+        rate = external_damage.cui_corrosion_rate(
+            _labels(driver), np.array(temp, dtype=float), _labels(insulation), _labels(condition), _labels(complexity),
+        )
+        np.testing.assert_allclose(rate, expected, atol=1e-6)
+
+
+class ExternalDamageBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # The first atmospheric and the first CUI case, on one component
+        cls.component = create_component(
+            create_equipment('external@example.com'),
+            operating_temp_f=Decimal('100'),
+            external_driver='Severe',
+            cui_driver='Severe',
+            insulation_type='Mineral Wool',
+            insulation_condition='Poor',
+            complexity='High',
+            mech_ext_corrosion_active=True,
+            mech_cui_active=True,
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_calculator_rates(self):
+        batch.recalculate_damage_factors(Component.objects.filter(pk=self.component.pk), today=TODAY)
+
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.external_corrosion_rate_mpy, Decimal('12.5'))
+        self.assertEqual(self.component.cui_corrosion_rate_mpy, Decimal('26.7857'))
@@ -0,0 +1,88 @@
+"""
+The vectorized financial consequence against the formula_app calculator.
+
+Each row was run through Step 4.12 of static/formula_app/js/cof_level_1.js
+with the Table 3.1 GFFs and Tables 4.15 / 4.16. The calculator looks the
+outage days up by the raw component token, so the rows use components
+whose token is also their Table 4.16 key.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, consequence, financial
+from ..models import Component
+from .fixtures import create_component, create_equipment
+
+# component type, diameter in, material, cost factor, CA_cmd ft2, equipment $/ft2, outage multiplier, production $/day
+# -> (cost key, FC_cmd, FC_affa, FC_prod)
+CASES = [
+    ('COMPC', np.nan, 'Carbon Steel', 1.0, 1500, 300, 1.0, 50000, ('COMPC', 22666.667, 450000, 670474.42)),
+    ('HEXSS, HEXTS', np.nan, '2.25Cr-1Mo', 1.2, 250, 500, 2.0, 10000, ('HEXSS', 8266.6667, 125000, 109240.37)),
+    ('PIPE-4, PIPE-6', 4, 'Carbon Steel', 1.0, 80, 400, 1.0, 25000, ('PIPE-4', 12.941176, 32000, 78859.272)),
+    ('PUMP2S, PUMPR, PUMP1S', np.nan, '410 SS', 1.5, 0, 300, 1.5, 30000, ('PUMP2S', 9745.0980, 0, 0)),
+]
+
+# (personnel, % time present) for shift 1, shift 2 and maintenance, unit area ft2 -> popdens per ft2
+POPULATION_CASES = [
+    (((10, 100), (5, 50), (2, 25)), 20000, 0.00065),
+    (((4, 40), (0, 0), (0, 0)), 10000, 0.00016),
+    (((3, 100), (3, 100), (0, 0)), 0, 0),
+    (((6, 50), (2, 100), (4, 10)), 15000, 0.00036),
+]
+
+
+def _column(values):
+    return np.array(values, dtype=float)
+
+
+class FinancialEngineTests(SimpleTestCase):
+    def test_component_and_production_costs(self):
+        (component, diameter, material, cost_factor, ca_cmd,
+         equipment_cost, multiplier, production, expected) = zip(*CASES)
+        gff_table = consequence.generic_failure_frequencies()
+        keys = financial.cost_keys(np.array(component, dtype=object), _column(diameter))
+        weighted_cost, weighted_outage = financial.weighted_hole_values(
+            np.array([gff_table[c] for c in component]), keys,
+        )
+        fc_cmd = weighted_cost * financial.material_cost_factors(np.array(material, dtype=object)) * cost_factor
+        fc_affa = _column(ca_cmd) * equipment_cost
+        fc_prod = (weighted_outage * multiplier + financial.outage_affected_area(fc_affa)) * production
+
+        expected_key, expected_costs = [e[0] for e in expected], [e[1:] for e in expected]
+        self.assertEqual(list(keys), expected_key)
+        np.testing.assert_allclose(np.column_stack([fc_cmd, fc_affa, fc_prod]), expected_costs, rtol=1e-7)
+
+    def test_population_density(self):
+        shifts, area, expected = zip(*POPULATION_CASES)
+        shifts = np.array(shifts, dtype=float)
+        popdens = financial.population_density(shifts[:, :, 0], shifts[:, :, 1], _column(area))
+        np.testing.assert_allclose(popdens, expected, rtol=1e-12)
+
+
+class FinancialBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # The first case without the area-driven costs, so FC = FC_cmd
+        cls.component = create_component(
+            create_equipment('financial@example.com'),
+            rbix_equipment_type='Compressor',
+            rbix_component_type='COMPC',
+            material_construction='Carbon Steel',
+            cost_factor=Decimal('1.0'),
+            representative_fluid='C1-C2',
+            stored_phase='Vapor',
+            operating_pressure_psia=Decimal('300'),
+            component_diameter=Decimal('12'),
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_calculator_cof(self):
+        batch.recalculate_consequences(Component.objects.filter(pk=self.component.pk))
+
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.calculated_cof, Decimal('22666.67'))
@@ -0,0 +1,80 @@
+"""
+The vectorized HTHA engine against the browser calculator.
+
+Susceptibilities and DFs were run through calculateHTHA() in
+static/dashboard/js/calculations/htha.js, loaded in node with the
+browser_tables() payload. The curve limits were interpolated by hand from
+htha_nelson_curves.json.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, htha
+from ..models import Component, DamageFactorResult
+from .fixtures import TODAY, create_component, create_equipment
+
+# material, temp F, H2 partial pressure psia, verified -> (curve limit F or None when not checked, susceptibility, DF)
+CASES = [
+    ('Carbon Steel', 600, 100, False, (750, htha.NONE, 0)),
+    ('Carbon Steel', 560, 500, False, (500, htha.HIGH, 5000)),
+    ('Carbon Steel', 420, 1000, False, (450, htha.MEDIUM, 2000)),
+    ('Carbon Steel', 370, 2000, False, (430, htha.LOW, 100)),
+    ('Carbon Steel', 340, 1000, False, (None, htha.NONE, 0)),
+    ('1Cr-0.5Mo', 900, 1000, False, (960, htha.LOW, 100)),
+    ('1.25Cr-0.5Mo', 1000, 400, False, (1045, htha.MEDIUM, 2000)),
+    ('2.25Cr-1Mo', 1080, 1500, False, (1075, htha.HIGH, 5000)),
+    ('5Cr-0.5Mo', 1050, 3000, False, (1120 - 10 / 11, htha.LOW, 100)),
+    ('C-0.5Mo', 580, 40, False, (None, htha.NONE, 0)),
+    ('C-0.5Mo Normalized', 480, 700, False, (475, htha.HIGH, 5000)),
+    ('Other', 460, 600, False, (500, htha.MEDIUM, 2000)),
+    ('Carbon Steel', 400, 100, True, (None, htha.HIGH, 5000)),
+]
+
+
+class HTHAEngineTests(SimpleTestCase):
+    def test_matches_the_browser_calculator(self):
+        material, temp, pressure, verified, expected = zip(*CASES)
+        susceptibility, margin = htha.htha_susceptibility(
+            np.array(material, dtype=object), np.array(temp, dtype=float), np.array(pressure, dtype=float),
+            np.zeros(len(CASES), dtype=bool), np.array(verified, dtype=bool),
+        )
+        df = htha.damage_factor_table()[susceptibility]
+        for i, (limit, code, expected_df) in enumerate(expected):
+            with self.subTest(case=CASES[i][:4]):
+                if limit is not None:
+                    self.assertAlmostEqual(temp[i] - margin[i], limit, places=6)
+                self.assertEqual(susceptibility[i], code)
+                self.assertEqual(df[i], expected_df)
+
+    def test_bands_come_from_the_susceptibility_table(self):
+        codes, below_curve = htha.susceptibility_bands()
+        self.assertEqual(codes, (htha.HIGH, htha.MEDIUM, htha.LOW))
+        np.testing.assert_array_equal(below_curve, [0, 50, 100])
+
+
+class HTHABatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # The second case: carbon steel 60 deg F above its curve
+        cls.component = create_component(
+            create_equipment('htha@example.com'),
+            operating_temp_f=Decimal('560'),
+            mechanism_htha_active=True,
+            htha_material='Carbon Steel',
+            htha_h2_partial_pressure_psia=Decimal('500'),
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_calculator_df(self):
+        batch.recalculate_damage_factors(Component.objects.filter(pk=self.component.pk), today=TODAY)
+
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.htha_damage_factor, Decimal('5000'))
+        self.assertEqual(self.component.calculated_total_damage_factor, Decimal('5000'))
+        result = DamageFactorResult.objects.get(component=self.component, mechanism='htha')
+        self.assertEqual((result.final_df, result.susceptibility), (Decimal('5000'), 'High Susceptibility'))
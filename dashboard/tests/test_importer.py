@@ -0,0 +1,53 @@
+"""
+Tests for the streamed component import.
+"""
+import os
+import tempfile
+
+from django.test import TestCase
+
+from accounts.models import CustomUser
+
+from .. import importer, rollups
+from ..models import Component, Facility
+
+HEADER = 'facility,unit,system,equipment,rbix_equipment_type,rbix_component_type,operating_pressure_psia,mechanism_htha_active'
+
+
+class StreamedImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='import@example.com', password='import')
+        cls.facility = Facility.objects.create(owner=cls.user, name='Site', location='Coast', facility_type='Refinery')
+
+    def setUp(self):
+        rollups.discard()
+
+    def write_csv(self, rows):
+        target = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False)
+        self.addCleanup(os.remove, target.name)
+        with target:
+            target.write('\n'.join([HEADER] + rows) + '\n')
+        return target.name
+
+    def test_batches_keep_file_row_numbers(self):
+        rows = [f'Site,Crude,Feed,V-{i},Drum,"Drum, Reactor, Column",{100 + i},false' for i in range(1, 8)]
+        rows[4] = 'Site,Crude,Feed,V-5,Drum,"Drum, Reactor, Column",high,maybe'
+        with self.captureOnCommitCallbacks(execute=True):
+            result = importer.import_components(self.write_csv(rows), self.user, chunk_size=3)
+
+        self.assertEqual((result.rows, result.imported, result.skipped), (7, 6, 1))
+        self.assertEqual(sorted((e.row, e.column) for e in result.errors),
+                         [(5, 'mechanism_htha_active'), (5, 'operating_pressure_psia')])
+        self.assertEqual(result.created, {'units': 1, 'systems': 1, 'equipment': 6})
+        self.assertEqual(
+            sorted(Component.objects.filter(facility=self.facility).values_list('operating_pressure_psia', flat=True)),
+            [101, 102, 103, 104, 106, 107],
+        )
+
+    def test_missing_columns_are_reported_before_reading_rows(self):
+        path = self.write_csv([])
+        with open(path, 'w') as target:
+            target.write('unit,system,equipment\nCrude,Feed,V-1\n')
+        with self.assertRaisesMessage(ValueError, 'Missing columns: facility, rbix_component_type, rbix_equipment_type'):
+            importer.import_components(path, self.user)
@@ -0,0 +1,121 @@
+"""
+The inspection planning risk and target crossing against inspection_planning.js.
+
+Area risks were run through calculateRisk() in
+static/dashboard/js/calculations/inspection_planning.js. Crossings were
+found with the chart's 0.1 year intersection scan, on the calculator's
+rate x age thinning projection, so the bisected ages match within one
+scan step. The rows all have a consequence area: the calculator falls
+back to 100 ft2 where the engine leaves the risk unknown.
+"""
+import datetime
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, inspection_planning
+from ..calculations.common import DAYS_PER_YEAR
+from ..models import Component
+from .fixtures import TODAY, create_component, create_equipment, years_before
+
+# total DF, GFF, FMS, consequence area ft2 -> area risk (m2/yr)
+RISK_CASES = [
+    (0.5, 3.06e-5, 1, 2000, 0.0056856636),
+    (250, 3.06e-5, 1, 4000, 2.8428318),
+    (1e5, 1e-4, 2, 500, 46.4515),
+    (40, 8e-5, 0.5, 12000, 1.7837376),
+]
+
+# thinning rate mpy, GFF, FMS, consequence area ft2, target risk m2/yr -> first scanned age (NaN: not within 50 years)
+CROSSING_CASES = [
+    (20, 3.06e-5, 1, 20000, 4, 3.6),
+    (5, 1e-4, 1, 8000, 1.5, 4.1),
+    (100, 3.06e-5, 2, 50000, 0.01, 0),
+    (1, 3.06e-5, 1, 1000, 4, np.nan),
+]
+
+SCAN_STEP_YEARS = 0.1
+HORIZON_YEARS = 50.0
+
+
+def _inputs(gff, fms, area):
+    return inspection_planning.PlanningInputs(
+        pks=np.arange(len(gff)), thinning={}, inspection_counts=None, scc={}, external={}, constant_df=None,
+        risk={'gff_value': gff, 'fms_factor': fms, 'calculated_consequence_area': area},
+    )
+
+
+class InspectionPlanningEngineTests(SimpleTestCase):
+    def test_area_risk(self):
+        df, gff, fms, area, expected = (np.array(column, dtype=float) for column in zip(*RISK_CASES))
+        total_df = np.fmax(df, inspection_planning.MIN_DAMAGE_FACTOR)
+        risk = inspection_planning.projected_risk(_inputs(gff, fms, area), total_df)
+        np.testing.assert_allclose(risk, expected, rtol=1e-7)
+
+    def test_target_crossing(self):
+        ages = np.arange(0.0, HORIZON_YEARS + 0.5, 1.0)
+        for rate, gff, fms, area, target, expected in CROSSING_CASES:
+            inputs = _inputs(np.array([gff]), np.array([fms]), np.array([area]))
+
+            def evaluate(rows, years):
+                total_df = np.fmax(rate * np.asarray(years), inspection_planning.MIN_DAMAGE_FACTOR)
+                return inspection_planning.projected_risk(inputs, total_df)
+
+            with self.subTest(case=(rate, target)):
+                years = inspection_planning.solve_crossing(
+                    evaluate, ages, evaluate(None, ages[None, :]), target, 1.0 / DAYS_PER_YEAR,
+                )[0]
+                if np.isnan(expected):
+                    self.assertTrue(np.isnan(years))
+                else:
+                    self.assertLessEqual(years, expected)
+                    self.assertLess(expected - years, SCAN_STEP_YEARS)
+
+
+class InspectionPlanningBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        equipment = create_equipment('planning@example.com')
+        # HTHA DF 5000, already above the target
+        cls.above = create_component(
+            equipment, operating_temp_f=Decimal('560'), mechanism_htha_active=True,
+            htha_material='Carbon Steel', htha_h2_partial_pressure_psia=Decimal('500'),
+        )
+        # No active mechanism: the DF stays at 1
+        cls.below = create_component(equipment)
+        # 5 mpy thinning that reaches DF 100 within the horizon
+        cls.thinning = create_component(
+            equipment,
+            commissioning_date=years_before(10),
+            nominal_thickness_in=Decimal('0.5'),
+            smys_yield_psi=Decimal('30000'),
+            allowable_stress_psi=Decimal('20000'),
+            min_required_thickness_in=Decimal('0.3'),
+            mech_thinning_co2_active=True,
+            co2_corrosion_rate_mpy=Decimal('5'),
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_target_crossing(self):
+        components = [self.above, self.below, self.thinning]
+        queryset = Component.objects.filter(pk__in=[c.pk for c in components])
+        batch.recalculate_inspection_dates(queryset, today=TODAY)
+        for component in components:
+            component.refresh_from_db()
+
+        self.assertEqual(self.above.next_inspection_due_date, TODAY)
+        horizon_days = round(inspection_planning.DEFAULT_HORIZON_YEARS * DAYS_PER_YEAR)
+        self.assertEqual(self.below.next_inspection_due_date, TODAY + datetime.timedelta(days=horizon_days))
+
+        # The thinning DF crosses the target within a day of the stored date
+        due = self.thinning.next_inspection_due_date
+        self.assertTrue(TODAY < due < self.below.next_inspection_due_date)
+        inputs = inspection_planning.load_inputs(Component.objects.filter(pk=self.thinning.pk))
+        years = ((due - TODAY).days + np.array([-1.0, 1.0])) / DAYS_PER_YEAR
+        before, after = inspection_planning.projected_total_df(inputs, years[None, :], TODAY)[0]
+        self.assertLess(before, inspection_planning.DEFAULT_TARGET_DF)
+        self.assertGreaterEqual(after, inspection_planning.DEFAULT_TARGET_DF)
@@ -0,0 +1,186 @@
+"""
+Tests for the background job handlers and the worker loop.
+"""
+import datetime
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CustomUser
+
+from .. import jobs, rollups
+from ..calculations import risk
+from ..models import BackgroundJob, Component, Equipment, Facility, RiskRollup, System, Unit
+
+
+class RecalculateFacilityJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email='worker@example.com', password='worker')
+        cls.facility = Facility.objects.create(owner=user, name='Site', location='Coast', facility_type='Refinery')
+        system = System.objects.create(unit=Unit.objects.create(facility=cls.facility, name='Crude'), name='Feed')
+        equipment = Equipment.objects.create(system=system, number='V-101', plant_equipment_type='Drum')
+        for fluid, phase in (('C1-C2', 'Gas'), ('C6-C8', 'Liquid')):
+            Component.objects.create(
+                equipment=equipment,
+                rbix_equipment_type='Drum',
+                rbix_component_type='Drum, Reactor, Column',
+                representative_fluid=fluid,
+                stored_phase=phase,
+                component_diameter=Decimal('48'),
+                operating_pressure_psia=Decimal('300'),
+                gff_value=Decimal('0.00003'),
+            )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_fresh_risk_and_rollups(self):
+        # The rollups are refreshed on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            result = jobs.recalculate_facility(facility=self.facility.pk)
+        self.assertEqual(result['risk'], 2)
+
+        queryset = Component.objects.filter(facility=self.facility).order_by('pk')
+        pks, fresh = risk.evaluate_components(queryset)
+        for i, component in enumerate(queryset):
+            with self.subTest(component=component.pk):
+                self.assertAlmostEqual(float(component.calculated_risk), fresh.risk[i], places=6)
+                self.assertEqual(component.pof_category, int(fresh.pof_category[i]))
+                self.assertEqual(component.cof_category, fresh.cof_category[i])
+
+        cells = RiskRollup.objects.filter(facility=self.facility, unit__isnull=True).exclude(pof=0)
+        self.assertEqual(sum(cell.components for cell in cells), 2)
+
+    def test_failed_job_drops_its_rollup_refreshes(self):
+        def failing():
+            rollups.track(Component.objects.filter(facility=self.facility).values_list('pk', flat=True))
+            raise RuntimeError('rolled back')
+
+        with mock.patch.dict(jobs.JOB_HANDLERS, {'failing': failing}):
+            jobs.enqueue('failing')
+            job = jobs.run(jobs.claim('test-worker'))
+        self.assertEqual(job.status, BackgroundJob.QUEUED)
+        self.assertEqual(rollups._pending.before, {})
+
+
+class HeartbeatTests(TransactionTestCase):
+    def test_running_job_keeps_its_heartbeat_fresh(self):
+        def slow():
+            time.sleep(0.5)
+            return {'beats': BackgroundJob.objects.get(pk=job.pk).locked_at > claimed_at}
+
+        with mock.patch.dict(jobs.JOB_HANDLERS, {'slow': slow}):
+            jobs.enqueue('slow')
+            job = jobs.claim('test-worker')
+            claimed_at = job.locked_at
+            jobs.run(job, heartbeat_interval=datetime.timedelta(seconds=0.05))
+        self.assertEqual(job.status, BackgroundJob.SUCCEEDED)
+        self.assertTrue(job.result['beats'])
+
+    def test_requeues_only_jobs_without_a_heartbeat(self):
+        now = timezone.now()
+        with mock.patch.dict(jobs.JOB_HANDLERS, {'slow': lambda: None}):
+            dead = jobs.enqueue('slow')
+            alive = jobs.enqueue('slow')
+        # Started long ago, but only the dead worker stopped beating
+        BackgroundJob.objects.filter(pk=dead.pk).update(
+            status=BackgroundJob.RUNNING, worker='dead', locked_at=now - jobs.STALE_AFTER * 2,
+        )
+        BackgroundJob.objects.filter(pk=alive.pk).update(
+            status=BackgroundJob.RUNNING, worker='alive', locked_at=now - jobs.HEARTBEAT_INTERVAL,
+        )
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertEqual(BackgroundJob.objects.get(pk=dead.pk).status, BackgroundJob.QUEUED)
+        self.assertEqual(BackgroundJob.objects.get(pk=alive.pk).status, BackgroundJob.RUNNING)
+
+
+class ExportJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='exporter@example.com', password='exporter')
+        cls.facility = Facility.objects.create(owner=cls.user, name='Site', location='Coast', facility_type='Refinery')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_parquet_export_is_queued(self):
+        response = self.client.get(reverse('component_export'), {'format': 'parquet', 'facility': self.facility.pk})
+        self.assertRedirects(response, reverse('jobs_home'), fetch_redirect_response=False)
+
+        job = BackgroundJob.objects.get(kind='export_register')
+        self.assertEqual(job.facility, self.facility)
+        self.assertEqual(job.params['owner'], self.user.pk)
+        self.assertEqual(job.params['facility'], self.facility.pk)
+
+    def test_download_serves_the_job_file(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            path = default_storage.save('exports/register.parquet', ContentFile(b'PAR1'))
+            job = jobs.enqueue('export_register', owner=self.user)
+            BackgroundJob.objects.filter(pk=job.pk).update(status=BackgroundJob.SUCCEEDED, result={'rows': 0, 'file': path})
+
+            status = self.client.get(reverse('api_job_status', args=[job.pk])).json()
+            self.assertEqual(status['download'], reverse('job_download', args=[job.pk]))
+            response = self.client.get(status['download'])
+            self.assertEqual(b''.join(response.streaming_content), b'PAR1')
+            response.close()
+
+    def test_download_needs_a_finished_job(self):
+        job = jobs.enqueue('export_register', owner=self.user)
+        self.assertEqual(self.client.get(reverse('job_download', args=[job.pk])).status_code, 404)
+
+
+class ImportJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='importer@example.com', password='importer')
+        Facility.objects.create(owner=cls.user, name='Site', location='Coast', facility_type='Refinery')
+
+    def setUp(self):
+        rollups.discard()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def run_import(self, content, max_attempts=jobs.DEFAULT_MAX_ATTEMPTS):
+        path = default_storage.save('imports/components.csv', ContentFile(content))
+        jobs.enqueue('import_components', {'path': path, 'owner': self.user.pk}, max_attempts=max_attempts)
+        with self.captureOnCommitCallbacks(execute=True):
+            return jobs.run(jobs.claim('test-worker')), path
+
+    def test_imported_file_is_deleted(self):
+        job, path = self.run_import(
+            b'facility,unit,system,equipment,rbix_equipment_type,rbix_component_type\n'
+            b'Site,Crude,Feed,V-101,Drum,"Drum, Reactor, Column"\n'
+        )
+        self.assertEqual(job.status, BackgroundJob.SUCCEEDED)
+        self.assertEqual(job.result['imported'], 1)
+        self.assertFalse(default_storage.exists(path))
+
+    def test_rejected_file_fails_without_retry(self):
+        job, path = self.run_import(b'unit,system,equipment\nCrude,Feed,V-101\n')
+        self.assertEqual((job.status, job.attempts), (BackgroundJob.FAILED, 1))
+        self.assertEqual(job.result, {'errors': ['Missing columns: facility, rbix_component_type, rbix_equipment_type']})
+        self.assertFalse(default_storage.exists(path))
+
+    def test_upload_is_kept_until_the_last_attempt(self):
+        with mock.patch('dashboard.importer.import_components', side_effect=OSError('database went away')):
+            job, path = self.run_import(b'facility\n', max_attempts=2)
+            self.assertEqual(job.status, BackgroundJob.QUEUED)
+            self.assertTrue(default_storage.exists(path))
+
+            BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            with self.captureOnCommitCallbacks(execute=True):
+                job = jobs.run(jobs.claim('test-worker'))
+        self.assertEqual(job.status, BackgroundJob.FAILED)
+        self.assertFalse(default_storage.exists(path))
@@ -0,0 +1,163 @@
+"""
+Query-plan regression tests for the hot dashboard queries.
+
+Each test EXPLAINs one query the views run against a small seeded
+register and fails unless the plan reads the index designed for that
+access path, or if it reads a dashboard table sequentially. On PostgreSQL
+sequential scans are disabled for the EXPLAIN (the planner still picks
+one when no index applies), so the verdict does not depend on table sizes
+or statistics; naming the index catches the planner settling for another,
+worse one.
+"""
+import re
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+
+from accounts.models import CustomUser
+
+from .. import ranking
+from ..models import (
+    COMPONENT_SECTIONS, Component, Equipment, Facility, InspectionHistory, RiskRollup, System, Unit,
+)
+
+# Plan lines reading a whole dashboard table, by database vendor
+SEQUENTIAL_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (dashboard_\w+)'),
+    'sqlite': re.compile(r'\bSCAN (dashboard_\w+)\b(?!\s+USING)'),
+}
+
+# Plan line reading a named index, by database vendor
+INDEX_SCAN = {
+    'postgresql': r'(Index (Only )?Scan (Backward )?using|Bitmap Index Scan on) {index}\b',
+    'sqlite': r'\bUSING (COVERING )?INDEX {index}\b',
+}
+
+# Index each ranking.METRICS metric is read from
+RISKIEST_INDEXES = {
+    'risk': 'component_owner_risk_idx',
+    'pof': 'component_owner_pof_idx',
+    'cof': 'component_owner_cof_idx',
+}
+
+
+class HotQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(email='planner@example.com', password='planner')
+        for f in range(2):
+            facility = Facility.objects.create(owner=cls.user, name=f'Site {f}', location='Coast', facility_type='Refinery')
+            for u in range(2):
+                unit = Unit.objects.create(facility=facility, name=f'Unit {u}')
+                system = System.objects.create(unit=unit, name='Feed')
+                for e in range(3):
+                    equipment = Equipment.objects.create(system=system, number=f'V-{e:03}', plant_equipment_type='Drum')
+                    for c in range(5):
+                        component = Component.objects.create(
+                            equipment=equipment,
+                            rbix_equipment_type='Drum',
+                            rbix_component_type='Shell' if c % 2 else 'Head',
+                            final_pof=Decimal('0.0001') * (c + 1),
+                            calculated_cof=Decimal(10000 * (e + 1)),
+                            calculated_risk=Decimal('0.5') * (c + 1),
+                            pof_category=c + 1,
+                            cof_category='ABCDE'[e],
+                        )
+                        InspectionHistory.objects.create(
+                            component=component, inspection_type='Internal Visual', date='2024-01-01',
+                            general_condition='Good', crack_finding_capability='Medium',
+                            corrosion_finding_capability='Medium',
+                        )
+        cls.facility = Facility.objects.filter(owner=cls.user).first()
+        cls.unit = Unit.objects.filter(facility=cls.facility).first()
+        cls.system = System.objects.filter(unit=cls.unit).first()
+        cls.component = Component.objects.filter(facility=cls.facility).first()
+
+    def assertUsesIndex(self, queryset, *indexes):
+        """The plan of `queryset` reads one of `indexes` and no dashboard table sequentially."""
+        vendor = connection.vendor
+        if vendor not in SEQUENTIAL_SCAN:
+            self.skipTest(f'No plan check for {vendor}')
+        if vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+        scanned = SEQUENTIAL_SCAN[vendor].findall(plan)
+        self.assertFalse(scanned, f'Sequential scan of {", ".join(scanned)}:\n{plan}')
+        pattern = INDEX_SCAN[vendor].format(index=f'({"|".join(indexes)})')
+        self.assertRegex(plan, pattern, f'{" or ".join(indexes)} not used:\n{plan}')
+
+    def test_unit_report_components(self):
+        self.assertUsesIndex(
+            Component.objects.filter(equipment__system__unit=self.unit)
+            .select_related('equipment').order_by('equipment__number', 'rbix_component_type'),
+            'component_equipment_type_idx',
+        )
+
+    def test_inspection_history_of_component(self):
+        self.assertUsesIndex(
+            InspectionHistory.objects.filter(component=self.component, owner=self.user).order_by('-date'),
+            'inspection_owner_comp_date_idx',
+        )
+
+    def test_components_of_owner_and_facility(self):
+        self.assertUsesIndex(
+            Component.objects.filter(owner=self.user, facility=self.facility), 'component_owner_facility_idx',
+        )
+
+    def test_riskiest_components(self):
+        for metric, field in ranking.METRICS.items():
+            with self.subTest(field=field):
+                self.assertUsesIndex(
+                    Component.objects.filter(owner=self.user, **{f'{field}__isnull': False})
+                    .order_by(f'-{field}', '-id')[:20],
+                    RISKIEST_INDEXES[metric],
+                )
+
+    def test_riskiest_page_after_cursor(self):
+        for metric in ranking.METRICS:
+            with self.subTest(metric=metric):
+                _, cursor = ranking.riskiest(self.user, metric, limit=10)
+                self.assertUsesIndex(ranking.ranked(self.user, metric, after=cursor)[:10], RISKIEST_INDEXES[metric])
+
+    def test_stored_risk_cell(self):
+        self.assertUsesIndex(
+            Component.objects.filter(facility=self.facility, pof_category=5, cof_category='E'),
+            'component_fac_category_idx',
+        )
+
+    def test_active_mechanism_flags(self):
+        for section in COMPONENT_SECTIONS.values():
+            # Each flag's partial index is conditioned on flag=True
+            flag_indexes = {
+                index.condition.children[0][0]: index.name for index in section._meta.indexes if index.condition
+            }
+            for field in section.input_fields():
+                if field.name.startswith('mech') and field.name.endswith('_active'):
+                    with self.subTest(flag=field.name):
+                        self.assertIn(field.name, flag_indexes)
+                        self.assertUsesIndex(
+                            section.objects.filter(**{field.name: True}).values('component'),
+                            flag_indexes[field.name],
+                        )
+
+    def test_hierarchy_children(self):
+        self.assertUsesIndex(
+            Equipment.objects.filter(system=self.system, system__unit__facility__owner=self.user).order_by('pk'),
+            'equipment_system_number_idx',
+        )
+
+    def test_facility_rollups_of_owner(self):
+        self.assertUsesIndex(
+            RiskRollup.objects.filter(facility__owner=self.user, unit__isnull=True),
+            'rollup_facility_unit_idx', 'rollup_facility_cell_uniq',
+        )
+
+    def test_unit_rollups(self):
+        self.assertUsesIndex(RiskRollup.objects.filter(unit=self.unit), 'rollup_unit_cell_uniq')
+
+    def test_facility_risk_report_rollups(self):
+        self.assertUsesIndex(
+            RiskRollup.objects.filter(facility=self.facility).select_related('unit'), 'rollup_facility_unit_idx',
+        )
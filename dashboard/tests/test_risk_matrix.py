@@ -0,0 +1,74 @@
+"""
+The vectorized risk matrix against risk_matrix.js.
+
+Each row was run through dfToPofCategory(), calculateCOFCategory() (or
+calculateCACategory()) and calculateRiskLevel() in
+static/dashboard/js/calculations/risk_matrix.js. The rows all have a Df,
+since the calculator rates a component without one 'low' where the
+engine leaves the cell unknown.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, risk_matrix
+from ..models import Component
+from .fixtures import create_component, create_equipment
+
+# total Df, financial COF $ -> (POF category, COF category, risk level)
+DF_FC_CASES = [
+    (5, 9999.99, (1, 'A', 'low')),
+    (10, 10000, (2, 'B', 'medium')),
+    (99.9, 250000, (2, 'C', 'medium')),
+    (100, 1e6, (3, 'D', 'medium-high')),
+    (1000, 2.5e7, (4, 'E', 'high')),
+    (4500, 0, (4, 'A', 'medium')),
+]
+
+# consequence area ft2 -> COF category
+CA_CASES = [(999, 'A'), (1000, 'B'), (4999.9, 'B'), (5000, 'C'), (14999, 'C'), (39999.5, 'D'), (40000, 'E')]
+
+
+class RiskMatrixEngineTests(SimpleTestCase):
+    def test_df_and_financial_cof(self):
+        df, fc, expected = zip(*DF_FC_CASES)
+        result = risk_matrix.classify(np.array(df, dtype=float), np.array(fc, dtype=float), 'df', 'fc')
+        for i, (pof, cof, level) in enumerate(expected):
+            with self.subTest(case=DF_FC_CASES[i][:2]):
+                self.assertEqual(result.pof_category[i], pof)
+                self.assertEqual(result.cof_category[i], cof)
+                self.assertEqual(result.level[i], level)
+
+    def test_consequence_area(self):
+        area, expected = zip(*CA_CASES)
+        category = risk_matrix.consequence_area_category(np.array(area, dtype=float))
+        self.assertEqual(list(category), list(expected))
+
+
+class RiskMatrixBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        equipment = create_equipment('matrix@example.com')
+        cls.components = [
+            create_component(
+                equipment, calculated_total_damage_factor=Decimal(str(df)), calculated_cof=Decimal(str(fc)),
+            )
+            for df, fc, _ in DF_FC_CASES
+        ]
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stored_and_annotated_cells(self):
+        # The stored POF category is on the Pf basis, which risk_matrix.js does not rate
+        queryset = Component.objects.filter(pk__in=[c.pk for c in self.components])
+        batch.recalculate_stored_risk(queryset)
+
+        cells = {row.pk: row for row in risk_matrix.annotate_risk(queryset, 'df', 'fc')}
+        for component, (df, fc, (pof, cof, level)) in zip(self.components, DF_FC_CASES):
+            with self.subTest(case=(df, fc)):
+                cell = cells[component.pk]
+                self.assertEqual(cell.cof_category, cof)
+                self.assertEqual((cell.risk_pof, cell.risk_cof, cell.risk_level), (pof, cof, level))
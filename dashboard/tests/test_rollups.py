@@ -0,0 +1,168 @@
+"""
+Tests for the incremental risk rollup maintenance.
+
+Every edit is committed (its refreshes run on commit) and the stored rows
+are compared with a full regroup of the register.
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.core.signals import request_finished
+from django.test import TestCase
+
+from accounts.models import CustomUser
+
+from .. import rollups
+from ..calculations.dependencies import save_component
+from ..models import Component, Equipment, Facility, RiskRollup, System, Unit
+
+
+def _key(row):
+    return (
+        row.facility_id, row.unit_id, row.pof, row.cof, row.components,
+        *(None if value is None else round(float(value), 6) for value in (row.max_risk, row.sum_risk, row.sum_cof)),
+        sorted(row.mechanisms.items()),
+    )
+
+
+class RollupDeltaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = CustomUser.objects.create_user(email='rollups@example.com', password='rollups')
+        facility = Facility.objects.create(owner=user, name='Site', location='Coast', facility_type='Refinery')
+        cls.units = [Unit.objects.create(facility=facility, name=f'Unit {u}') for u in range(2)]
+        cls.equipment = []
+        for unit in cls.units:
+            system = System.objects.create(unit=unit, name='Feed')
+            equipment = Equipment.objects.create(system=system, number='V-101', plant_equipment_type='Drum')
+            cls.equipment.append(equipment)
+            for c in range(6):
+                # Two components per POF category 1-3, the first of each pair with the smaller risk
+                Component.objects.create(
+                    equipment=equipment,
+                    rbix_equipment_type='Drum',
+                    rbix_component_type='Drum, Reactor, Column',
+                    final_pof=Decimal('0.00001') * 10 ** (c // 2),
+                    calculated_cof=Decimal(20000 + c),
+                    calculated_risk=Decimal('0.5') * (c + 1),
+                )
+        rollups.refresh_rollups()
+
+    def setUp(self):
+        # The refreshes requested by setUpTestData never ran (its transaction is not committed)
+        rollups.discard()
+
+    def assertRollupsFresh(self):
+        unit_rows = rollups.unit_cells(Component.objects.all())
+        expected = sorted(map(_key, unit_rows + rollups.facility_cells(unit_rows)), key=repr)
+        self.assertEqual(sorted(map(_key, RiskRollup.objects.all()), key=repr), expected)
+
+    def edit(self, change):
+        with mock.patch.object(rollups, 'refresh_rollups', wraps=rollups.refresh_rollups) as regroup:
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+        return regroup
+
+    def component(self, unit=0, index=0):
+        return Component.objects.filter(equipment=self.equipment[unit]).order_by('pk')[index]
+
+    def test_edit_within_cell(self):
+        component = self.component()
+        component.calculated_risk = Decimal('0.25')
+        regroup = self.edit(component.save)
+        regroup.assert_not_called()
+        self.assertRollupsFresh()
+
+    def test_edit_moves_component_to_another_cell(self):
+        component = self.component()
+        component.final_pof = Decimal('0.01')
+        component.calculated_cof = Decimal('5000000')
+        regroup = self.edit(lambda: save_component(component))
+        regroup.assert_not_called()
+        self.assertRollupsFresh()
+
+    def test_edit_only_component_of_cell(self):
+        component = self.component()
+        component.final_pof = Decimal('0.5')
+        self.edit(component.save)
+
+        component.calculated_risk = Decimal('7')
+        component.calculated_cof = Decimal('30000')
+        regroup = self.edit(component.save)
+        regroup.assert_not_called()
+        self.assertRollupsFresh()
+
+    def test_removing_the_cell_max_regroups_the_unit(self):
+        component = self.component(index=1)
+        component.calculated_risk = Decimal('0.1')
+        regroup = self.edit(component.save)
+        regroup.assert_called_once_with({self.units[0].pk}, set())
+        self.assertRollupsFresh()
+
+    def test_create_and_delete(self):
+        regroup = self.edit(lambda: Component.objects.create(
+            equipment=self.equipment[1], rbix_equipment_type='Drum', rbix_component_type='Drum, Reactor, Column',
+            final_pof=Decimal('0.0001'), calculated_cof=Decimal('20000'), calculated_risk=Decimal('9'),
+        ))
+        regroup.assert_not_called()
+        self.assertRollupsFresh()
+
+        regroup = self.edit(self.component(unit=1, index=0).delete)
+        regroup.assert_not_called()
+        self.assertRollupsFresh()
+
+    def test_moved_component_regroups_both_units(self):
+        component = self.component()
+        component.equipment = self.equipment[1]
+        regroup = self.edit(component.save)
+        regroup.assert_called_once()
+        self.assertRollupsFresh()
+
+    def test_batch_writes_regroup(self):
+        def bulk_write():
+            components = Component.objects.filter(equipment=self.equipment[0])
+            components.update(calculated_risk=Decimal('1'))
+            rollups.components_changed(components)
+
+        regroup = self.edit(bulk_write)
+        regroup.assert_called_once_with({self.units[0].pk}, set())
+        self.assertRollupsFresh()
+
+    def assertNothingPending(self):
+        pending = rollups._pending
+        self.assertEqual((pending.units, pending.facilities, pending.before, pending.changed), (set(), set(), {}, set()))
+
+    def test_rolled_back_save_leaves_nothing_pending(self):
+        component = self.component()
+        component.calculated_risk = Decimal('7')
+        with mock.patch.object(component, 'reset_dirty_fields', side_effect=RuntimeError('rolled back')):
+            with self.assertRaises(RuntimeError), self.captureOnCommitCallbacks(execute=True) as callbacks:
+                save_component(component)
+        self.assertEqual(callbacks, [])
+        self.assertNothingPending()
+
+        # The next committed edit is not mixed with the rolled back one
+        other = self.component(unit=1)
+        other.calculated_risk = Decimal('0.25')
+        regroup = self.edit(lambda: save_component(other))
+        regroup.assert_not_called()
+        self.assertRollupsFresh()
+
+    def test_rollback_keeps_refreshes_requested_before_the_block(self):
+        rollups.units_changed([self.units[1].pk])
+        component = self.component()
+        component.calculated_risk = Decimal('7')
+        with self.assertRaises(RuntimeError), rollups.deferred_atomic():
+            rollups.track([component.pk])
+            component.save()
+            raise RuntimeError('rolled back')
+        self.assertEqual(rollups._pending.units, {self.units[1].pk})
+        self.assertEqual(rollups._pending.before, {})
+
+    def test_outer_rollback_is_dropped_when_the_request_ends(self):
+        component = self.component()
+        component.calculated_risk = Decimal('7')
+        save_component(component)
+        self.assertIn(component.pk, rollups._pending.changed)
+        request_finished.send(sender=self.__class__)
+        self.assertNothingPending()
@@ -0,0 +1,108 @@
+"""
+The vectorized SCC engine against formula_app_adapter.js.
+
+Each row was run through the adapter's susceptibility function, getSVI(),
+calculateInspectionEffectiveness(), getBaseDamageFactor() and
+calculateFinalDamageFactor(). The adapter returns a null base DF when the
+table holds 0; those rows are listed as 0.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch, scc
+from ..models import Component, DamageFactorResult
+from .fixtures import TODAY, create_component, create_equipment, years_before
+
+NO_INSPECTIONS = (0, 0, 0, 0)
+
+# NaOH %, temp F, heat traced, stress relieved, cracks observed, cracks removed, A/B/C/D, age -> (code, SVI, final DF)
+CAUSTIC_CASES = [
+    (10, 200, False, False, False, False, NO_INSPECTIONS, 12, (scc.HIGH, 5000, 5000)),
+    (3, 200, False, False, False, False, (0, 1, 0, 0), 8, (scc.MEDIUM, 500, 492.5)),
+    (10, 200, True, True, False, False, NO_INSPECTIONS, 8, (scc.NONE, 0, 0)),
+    (10, 200, False, False, True, False, (1, 0, 0, 0), 8, (scc.FFS, 0, 0)),
+    (10, 200, False, False, True, True, (0, 0, 3, 1), 20, (scc.HIGH, 5000, 5000)),
+]
+
+# solution, temp F, heat traced, steamed out, A/B/C/D, age -> (code, SVI, final DF)
+AMINE_CASES = [
+    ('MEA_DIPA', 200, False, False, NO_INSPECTIONS, 5, (scc.HIGH, 5000, 5000)),
+    ('MEA_DIPA', 150, True, False, (0, 0, 2, 0), 5, (scc.MEDIUM, 500, 293.7)),
+    ('DEA_OTHER', 150, False, False, NO_INSPECTIONS, 5, (scc.NONE, 0, 0)),
+    ('DEA_OTHER', 120, False, True, (0, 0, 0, 5), 0.5, (scc.MEDIUM, 500, 50)),
+    ('MEA_DIPA', 90, False, False, (2, 0, 0, 0), 30, (scc.LOW, 50, 42.2)),
+]
+
+# sensitized, sulfur exposure, downtime protected, age -> (code, SVI, final DF)
+PASCC_CASES = [
+    (True, True, False, 10, (scc.HIGH, 5000, 5000)),
+    (True, True, True, 10, (scc.LOW, 50, 629.5)),
+    (False, True, False, 10, (scc.NONE, 0, 0)),
+]
+
+
+def _flags(values):
+    return np.array(values, dtype=bool)
+
+
+class SCCEngineTests(SimpleTestCase):
+    def assertDamageFactors(self, susceptibility, counts, age, expected):
+        svi, base_df, final_df = scc.scc_damage_factor(susceptibility, counts, np.array(age, dtype=float))
+        for i, (code, expected_svi, expected_df) in enumerate(expected):
+            with self.subTest(case=i):
+                self.assertEqual(susceptibility[i], code)
+                self.assertEqual(svi[i], expected_svi)
+                self.assertAlmostEqual(final_df[i], expected_df, places=1)
+
+    def test_caustic(self):
+        naoh, temp, traced, relieved, observed, removed, counts, age, expected = zip(*CAUSTIC_CASES)
+        susceptibility = scc.caustic_susceptibility(
+            np.array(naoh, dtype=float), np.array(temp, dtype=float), _flags(traced),
+            _flags([False] * len(naoh)), _flags(relieved), _flags(observed), _flags(removed),
+        )
+        self.assertDamageFactors(susceptibility, counts, age, expected)
+
+    def test_amine(self):
+        solution, temp, traced, steamed, counts, age, expected = zip(*AMINE_CASES)
+        unset = _flags([False] * len(solution))
+        susceptibility = scc.amine_susceptibility(
+            np.array(solution, dtype=object), np.array(temp, dtype=float), _flags(traced), _flags(steamed),
+            ~unset, unset, unset, unset,
+        )
+        self.assertDamageFactors(susceptibility, counts, age, expected)
+
+    def test_pascc(self):
+        sensitized, sulfur, protected, age, expected = zip(*PASCC_CASES)
+        unset = _flags([False] * len(age))
+        susceptibility = scc.pascc_susceptibility(_flags(sensitized), _flags(sulfur), _flags(protected), unset, unset)
+        self.assertDamageFactors(susceptibility, [NO_INSPECTIONS] * len(age), age, expected)
+
+
+
+class SCCBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # The second caustic case, saved on a component in service for 8 years
+        cls.component = create_component(
+            create_equipment('scc@example.com'),
+            commissioning_date=years_before(8),
+            operating_temp_f=Decimal('200'),
+            mechanism_scc_caustic_active=True,
+            scc_caustic_naoh_conc_percent=Decimal('3'),
+            scc_caustic_inspection_count_b=1,
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_adapter_df(self):
+        batch.recalculate_damage_factors(Component.objects.filter(pk=self.component.pk), today=TODAY)
+
+        result = DamageFactorResult.objects.get(component=self.component, mechanism='scc_caustic')
+        self.assertEqual(result.base_df, Decimal('50'))
+        self.assertAlmostEqual(float(result.final_df), 492.5, places=1)
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.calculated_total_damage_factor, result.final_df)
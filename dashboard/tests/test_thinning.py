@@ -0,0 +1,83 @@
+"""
+The vectorized thinning engine against the formula_app thinning wizard.
+
+Each row was run through static/formula_app/components/step5..13_calcs.js.
+The wizard takes the corrosion rate in in/yr, and the engine takes it in mpy.
+The wizard's normal CDF uses the Abramowitz-Stegun erf approximation
+(absolute error 1.5e-7), so results are compared to a relative 1e-3.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from .. import rollups
+from ..calculations import batch
+from ..calculations.thinning import compute_thinning_df
+from ..models import Component, DamageFactorResult, InspectionHistory
+from .fixtures import TODAY, create_component, create_equipment, years_before
+
+# rate (mpy), age_tk, t_rdi, YS, TS, E, S, t_min, A/B/C/D inspections, confidence -> (Art, SR, final DF)
+CASES = [
+    (10, 10, 0.5, 30000, 60000, 1.0, 20000, 0.3, (0, 0, 0, 0), 'Low', (0.2, 0.242424, 784.98)),
+    (5, 20, 0.375, 35000, 60000, 0.85, 17500, 0.25, (1, 0, 0, 0), 'Medium', (0.266667, 0.223285, 20.205)),
+    (20, 15, 0.75, 36000, 70000, 100, 20000, 0.4, (0, 2, 1, 0), 'High', (0.4, 0.182962, 42.353)),
+    (2, 5, 0.5, 30000, 60000, 1.0, 20000, 0.2, (0, 0, 0, 1), 'Low', (0.02, 0.161616, 0.10495)),
+    (1, 5, 0.5, 30000, 60000, 1.0, 20000, 0.1, (0, 0, 0, 0), 'Low', (0.01, 0.080808, 0.1)),
+]
+
+
+class ThinningEngineTests(SimpleTestCase):
+    def test_matches_the_wizard(self):
+        rate, age, t_rdi, ys, ts, efficiency, stress, t_min, counts, confidence, expected = zip(*CASES)
+        result = compute_thinning_df(
+            corrosion_rate_mpy=np.array(rate, dtype=float),
+            age_tk=age,
+            t_rdi=t_rdi,
+            yield_strength=ys,
+            tensile_strength=ts,
+            allowable_stress=stress,
+            joint_efficiency=efficiency,
+            t_min=t_min,
+            inspection_counts=counts,
+            confidence=np.array(confidence, dtype=object),
+        )
+        for i, (art, strength_ratio, final_df) in enumerate(expected):
+            with self.subTest(case=i):
+                self.assertAlmostEqual(result.art[i, 0], art, places=6)
+                self.assertAlmostEqual(result.strength_ratio[i], strength_ratio, places=6)
+                self.assertLess(abs(result.final_df[i, 0] / final_df - 1), 1e-3)
+
+
+class ThinningBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # The wizard with rate 5 mpy, age 20, t_rdi 0.5, YS = TS = 30000 (no tensile strength
+        # is stored), E 1.0, S 20000, t_min 0.3, one B inspection, Low confidence: DF 318.616
+        cls.component = create_component(
+            create_equipment('thinning@example.com'),
+            commissioning_date=years_before(20),
+            nominal_thickness_in=Decimal('0.5'),
+            smys_yield_psi=Decimal('30000'),
+            allowable_stress_psi=Decimal('20000'),
+            joint_efficiency=Decimal('1.0'),
+            min_required_thickness_in=Decimal('0.3'),
+            mech_thinning_co2_active=True,
+            co2_corrosion_rate_mpy=Decimal('5'),
+        )
+        InspectionHistory.objects.create(
+            component=cls.component, inspection_type='Internal Visual', date=years_before(5),
+            general_condition='Good', crack_finding_capability='Low', corrosion_finding_capability='Medium-High',
+        )
+
+    def setUp(self):
+        rollups.discard()
+
+    def test_stores_the_wizard_df(self):
+        batch.recalculate_damage_factors(Component.objects.filter(pk=self.component.pk), today=TODAY)
+
+        result = DamageFactorResult.objects.get(component=self.component, mechanism='thinning_co2')
+        self.assertAlmostEqual(float(result.final_df), 318.616, delta=0.01)
+        self.assertTrue(result.governing)
+        self.component.refresh_from_db()
+        self.assertEqual(self.component.calculated_total_damage_factor, result.final_df)
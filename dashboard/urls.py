@@ -11,10 +11,19 @@ urlpatterns = [
     path('equipment/<int:pk>/delete/', views.equipment_delete, name='equipment_delete'),
     path('components', views.components, name='components_home'),
     path('components/create/', views.component_create, name='component_create'),
+    path('components/import/', views.component_import, name='component_import'),
+    path('components/export/', views.component_export, name='component_export'),
     path('components/<int:pk>/edit/', views.component_edit, name='component_edit'),
     path('components/<int:pk>/delete/', views.component_delete, name='component_delete'),
     path('components/<int:pk>/report/', views.component_report, name='component_report'),
     path('facility/<int:pk>/edit/', views.facility_edit, name='facility_edit'),
+    path('facility/<int:pk>/fms/', views.facility_fms, name='facility_fms'),
+    path('facility/<int:pk>/recalculate/', views.facility_recalculate, name='facility_recalculate'),
+    path('facility/<int:pk>/report/', views.facility_report, name='facility_report'),
+    path('portfolio/', views.portfolio_report, name='portfolio_report'),
+    path('riskiest/', views.riskiest_components, name='riskiest_components'),
+    path('jobs/', views.jobs, name='jobs_home'),
+    path('jobs/<int:pk>/download/', views.job_download, name='job_download'),
     path('unit/<int:pk>/edit/', views.unit_edit, name='unit_edit'),
     path('units/<int:pk>/report/', views.unit_report, name='unit_report'),
     path('system/<int:pk>/edit/', views.system_edit, name='system_edit'),
@@ -30,4 +39,7 @@ urlpatterns = [
     # GFF API
     path('api/get_gff/', views.api_get_gff, name='api_get_gff'),
     path('api/get_component_types/', views.api_get_component_types, name='api_get_component_types'),
+    path('api/jobs/<int:pk>/', views.api_job_status, name='api_job_status'),
+    path('api/hierarchy/', views.api_hierarchy, name='api_hierarchy'),
+    path('api/riskiest/', views.api_riskiest, name='api_riskiest'),
 ]
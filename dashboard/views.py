@@ -4,29 +4,27 @@ from .forms import FacilityForm
 from django.contrib import messages
 from django.shortcuts import render, redirect
 from .models import Facility, Unit, System, Equipment, Component
+from .calculations import htha, risk_matrix
+from . import rollups
 
 @login_required
 def dashboard(request):
-    facilities_list = Facility.objects.filter(owner=request.user)
-    facilities_count = facilities_list.count()
-
-    units_list = Unit.objects.filter(facility__owner=request.user)
-    units_count = units_list.count()
+    from .counters import owner_counts
+    from .models import RiskRollup
+    from .rollups import summarize
 
-    systems_list = System.objects.filter(unit__facility__owner=request.user)
-    systems_count = systems_list.count()
+    # One maintained row instead of a COUNT(*) per hierarchy level
+    counts = owner_counts(request.user)
 
-    equipment_list = Equipment.objects.filter(system__unit__facility__owner=request.user)
-    equipment_count = equipment_list.count()
-
-    components_list = Component.objects.filter(equipment__system__unit__facility__owner=request.user)
-    components_count = components_list.count()
+    # Risk level distribution from the facility risk rollups
+    risk = summarize(RiskRollup.objects.filter(facility__owner=request.user, unit__isnull=True))
     return render(request, 'dashboard/dashboard.html', {
-        'facilities_count': facilities_count,
-        'units_count': units_count,
-        'systems_count': systems_count,
-        'equipment_count': equipment_count,
-        'components_count': components_count
+        'facilities_count': counts.facilities,
+        'units_count': counts.units,
+        'systems_count': counts.systems,
+        'equipment_count': counts.equipment,
+        'components_count': counts.components,
+        'risk_counts': risk['levels'],
     })
 
 @login_required
@@ -64,18 +62,14 @@ def units(request):
     else:
         form = UnitForm(request.user)
 
-    # Filter facilities owned by the user and prefetch their units
-    from .models import Facility
-    facilities = Facility.objects.filter(owner=request.user).prefetch_related('unit_set')
-    
+    # The hierarchy is loaded node by node from api_hierarchy
     return render(request, 'dashboard/units.html', {
-        'facilities': facilities,
         'form': form
     })
 
 @login_required
 def equipment(request):
-    from .models import Facility, Equipment
+    from .models import Equipment
     from .forms import EquipmentForm
 
     if request.method == 'POST':
@@ -89,36 +83,26 @@ def equipment(request):
     else:
         form = EquipmentForm(request.user)
 
-    # Filter facilities owned by the user and prefetch units -> systems -> equipment
-    facilities = Facility.objects.filter(owner=request.user).prefetch_related('unit_set__system_set__equipment_set')
-    
+    # The hierarchy is loaded node by node from api_hierarchy
     return render(request, 'dashboard/equipment.html', {
-        'facilities': facilities,
         'form': form
     })
 
 @login_required
 def components(request):
-    from .models import Facility
-    
-    # 5-level prefetching: Facility -> Unit -> System -> Equipment -> Component
-    facilities = Facility.objects.filter(owner=request.user).prefetch_related(
-        'unit_set__system_set__equipment_set__component_set'
-    )
-    
-    return render(request, 'dashboard/components.html', {
-        'facilities': facilities
-    })
+    # The hierarchy is loaded node by node from api_hierarchy
+    return render(request, 'dashboard/components.html')
 
 @login_required
 def component_create(request):
     from .models import Component
     from .forms import ComponentForm
+    from .calculations.dependencies import save_component
     
     if request.method == 'POST':
         form = ComponentForm(request.user, request.POST)
         if form.is_valid():
-            form.save()
+            save_component(form.save(commit=False))
             messages.success(request, 'Component created successfully!')
             return redirect('components_home')
         else:
@@ -128,21 +112,85 @@ def component_create(request):
     
     return render(request, 'dashboard/component_form.html', {
         'form': form,
-        'is_edit': False
+        'is_edit': False,
+        'htha_tables': htha.browser_tables(),
     })
 
+@login_required
+def component_import(request):
+    """Upload a CSV or Parquet component file; a background job imports it."""
+    from django.core.files.storage import default_storage
+    from .forms import ComponentImportForm
+    from .jobs import enqueue
+
+    if request.method == 'POST':
+        form = ComponentImportForm(request.user, request.POST, request.FILES)
+        if form.is_valid():
+            upload, facility = form.cleaned_data['file'], form.cleaned_data['facility']
+            path = default_storage.save(f'imports/{request.user.pk}/{upload.name}', upload)
+            job = enqueue('import_components', {
+                'path': path, 'owner': request.user.pk, 'facility': facility.pk if facility else None,
+            }, owner=request.user, facility=facility)
+            messages.success(request, f'Import of {upload.name} queued as job #{job.pk}.')
+            return redirect('jobs_home')
+    else:
+        form = ComponentImportForm(request.user)
+
+    return render(request, 'dashboard/component_import.html', {
+        'form': form,
+    })
+
+@login_required
+def component_export(request):
+    """
+    The user's risk register, streamed as CSV or exported as Parquet by a
+    background job: ?format=csv|parquet[&columns=id,facility,...][&facility=<id>].
+    """
+    from django.http import JsonResponse, StreamingHttpResponse
+    from django.utils import timezone
+    from .exporter import csv_chunks, resolve_columns
+    from .jobs import enqueue
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in ('csv', 'parquet'):
+        return JsonResponse({'error': f'Unknown format: {export_format}'}, status=400)
+    try:
+        columns = resolve_columns([name.strip() for name in request.GET.get('columns', '').split(',') if name.strip()])
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    facility = request.GET.get('facility', '')
+    if facility and not facility.isdigit():
+        return JsonResponse({'error': 'facility must be an integer'}, status=400)
+
+    if export_format == 'parquet':
+        # Parquet writes its footer last, so the file is built by a worker and downloaded from the jobs page
+        site = Facility.objects.filter(owner=request.user, pk=int(facility)).first() if facility else None
+        job = enqueue('export_register', {
+            'owner': request.user.pk, 'facility': int(facility) if facility else None, 'columns': list(columns),
+        }, owner=request.user, facility=site)
+        messages.success(request, f'Parquet export queued as job #{job.pk}.')
+        return redirect('jobs_home')
+
+    components = Component.objects.filter(owner=request.user)
+    if facility:
+        components = components.filter(facility_id=int(facility))
+    response = StreamingHttpResponse(csv_chunks(components, columns), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="risk-register-{timezone.localdate():%Y-%m-%d}.csv"'
+    return response
+
 @login_required
 def component_edit(request, pk):
-    from .models import Component
+    from .models import Component, COMPONENT_SECTIONS
     from .forms import ComponentForm
+    from .calculations.dependencies import save_component
     from django.shortcuts import get_object_or_404
     
-    component = get_object_or_404(Component, pk=pk, equipment__system__unit__facility__owner=request.user)
+    component = get_object_or_404(Component.objects.select_related(*COMPONENT_SECTIONS), pk=pk, owner=request.user)
     
     if request.method == 'POST':
         form = ComponentForm(request.user, request.POST, instance=component)
         if form.is_valid():
-            form.save()
+            save_component(form.save(commit=False))
             messages.success(request, 'Component updated successfully!')
             return redirect('components_home')
         else:
@@ -153,21 +201,23 @@ def component_edit(request, pk):
     return render(request, 'dashboard/component_form.html', {
         'form': form,
         'component': component,
-        'is_edit': True
+        'is_edit': True,
+        'htha_tables': htha.browser_tables(),
     })
 
 @login_required
 def component_report(request, pk):
-    from .models import Component
+    from .models import Component, COMPONENT_SECTIONS
     from .forms import ComponentForm
+    from .calculations.dependencies import save_component
     from django.shortcuts import get_object_or_404
     
-    component = get_object_or_404(Component, pk=pk, equipment__system__unit__facility__owner=request.user)
+    component = get_object_or_404(Component.objects.select_related(*COMPONENT_SECTIONS), pk=pk, owner=request.user)
     
     if request.method == 'POST':
         form = ComponentForm(request.user, request.POST, instance=component)
         if form.is_valid():
-            form.save()
+            save_component(form.save(commit=False))
             messages.success(request, 'Component updated successfully!')
             return redirect('components_home')
         else:
@@ -178,7 +228,8 @@ def component_report(request, pk):
     return render(request, 'dashboard/component_report.html', {
         'form': form,
         'component': component,
-        'is_edit': True
+        'is_edit': True,
+        'htha_tables': htha.browser_tables(),
     })
 
 @login_required
@@ -190,21 +241,82 @@ def unit_report(request, pk):
     unit = get_object_or_404(Unit, pk=pk, facility__owner=request.user)
     
     # Get all components for this unit through the hierarchy: Unit -> System -> Equipment -> Component
-    components = Component.objects.filter(
-        equipment__system__unit=unit
-    ).select_related(
-        'equipment', 'equipment__system'
+    unit_components = Component.objects.filter(equipment__system__unit=unit)
+    components = risk_matrix.annotate_risk(unit_components).select_related('equipment').only(
+        'equipment__number', 'rbix_component_type', 'material_construction', 'calculated_total_damage_factor',
+        'calculated_consequence_area', 'calculated_risk', 'calculated_cof', 'next_inspection_due_date',
     ).order_by('equipment__number', 'rbix_component_type')
-    
+
+    # Optional risk cell / risk level filter (clicked matrix cell)
+    risk_filter = {}
+    if request.GET.get('pof', '').isdigit() and request.GET.get('cof') in risk_matrix.COF_CATEGORIES:
+        risk_filter = {'risk_pof': int(request.GET['pof']), 'risk_cof': request.GET['cof']}
+    elif request.GET.get('risk') in risk_matrix.RISK_LEVELS:
+        risk_filter = {'risk_level': request.GET['risk']}
+    if risk_filter:
+        components = components.filter(**risk_filter)
+
+    # Matrix and totals from the unit's risk rollup, one row per cell
+    summary = rollups.summarize(unit.risk_rollups.all())
+
     return render(request, 'dashboard/unit_report.html', {
         'unit': unit,
-        'components': components
+        'components': components,
+        'total_components': summary['components'],
+        'risk_cells': summary['cells'],
+        'risk_filter': risk_filter,
+    })
+
+
+@login_required
+def facility_report(request, pk):
+    from .models import Facility
+    from django.shortcuts import get_object_or_404
+    from django.urls import reverse
+
+    facility = get_object_or_404(Facility, pk=pk, owner=request.user)
+    rows = list(facility.risk_rollups.select_related('unit'))
+    units = rollups.summarize_by([row for row in rows if row.unit_id], key=lambda row: row.unit)
+
+    return render(request, 'dashboard/risk_summary.html', {
+        'title': 'Facility Risk Report',
+        'subtitle': facility.name,
+        'back_url': reverse('facilities_home'),
+        'back_label': 'Back to Facilities',
+        'child_label': 'Unit',
+        'summary': rollups.summarize([row for row in rows if not row.unit_id]),
+        'children': [
+            {'name': unit.name, 'url': reverse('unit_report', args=[unit.pk]), **summary}
+            for unit, summary in sorted(units.items(), key=lambda item: item[0].name)
+        ],
+    })
+
+
+@login_required
+def portfolio_report(request):
+    """Risk matrix of every facility the user owns, from the facility rollup rows."""
+    from .models import RiskRollup
+    from django.urls import reverse
+
+    rows = list(RiskRollup.objects.filter(facility__owner=request.user, unit__isnull=True).select_related('facility'))
+    facilities = rollups.summarize_by(rows, key=lambda row: row.facility)
+
+    return render(request, 'dashboard/risk_summary.html', {
+        'title': 'Portfolio Risk',
+        'subtitle': 'All facilities',
+        'back_url': reverse('dashboard_home'),
+        'back_label': 'Back to Dashboard',
+        'child_label': 'Facility',
+        'summary': rollups.summarize(rows),
+        'children': [
+            {'name': facility.name, 'url': reverse('facility_report', args=[facility.pk]), **summary}
+            for facility, summary in sorted(facilities.items(), key=lambda item: item[0].name)
+        ],
     })
 
 
 @login_required
 def systems(request):
-    from .models import Facility, System
     from .forms import SystemForm
 
     if request.method == 'POST':
@@ -218,11 +330,8 @@ def systems(request):
     else:
         form = SystemForm(request.user)
 
-    # Filter facilities owned by the user and prefetch units and systems
-    facilities = Facility.objects.filter(owner=request.user).prefetch_related('unit_set__system_set')
-    
+    # The hierarchy is loaded node by node from api_hierarchy
     return render(request, 'dashboard/systems.html', {
-        'facilities': facilities,
         'form': form
     })
 
@@ -232,7 +341,7 @@ def component_delete(request, pk):
     from django.urls import reverse
     from django.shortcuts import get_object_or_404
     
-    component = get_object_or_404(Component, pk=pk, equipment__system__unit__facility__owner=request.user)
+    component = get_object_or_404(Component, pk=pk, owner=request.user)
     
     if request.method == 'POST':
         component.delete()
@@ -345,6 +454,194 @@ def facility_edit(request, pk):
     
     return redirect('facilities_home')
 
+@login_required
+def facility_fms(request, pk):
+    from .models import Facility
+    from .calculations import fms
+    from .jobs import enqueue
+    from django.shortcuts import get_object_or_404
+
+    facility = get_object_or_404(Facility, pk=pk, owner=request.user)
+    questionnaire = fms.questionnaire()
+
+    if request.method == 'POST':
+        scores = {}
+        for section, question in questionnaire.keys:
+            value = request.POST.get(f'q-{section}-{question}', '').strip() or '0'
+            try:
+                scores[(section, question)] = float(value)
+            except ValueError:
+                messages.error(request, f'Invalid score for {section} item {question}.')
+                return redirect('facility_fms', pk=facility.pk)
+        fms.save_answers(facility.pk, scores)
+        # FMS is site-wide: re-apply it to every component of the facility in the background
+        job = enqueue('recalculate_fms', {'facility': facility.pk}, owner=request.user, facility=facility)
+        messages.success(request, f'FMS audit saved. Component update queued as job #{job.pk}.')
+        return redirect('facility_fms', pk=facility.pk)
+
+    stored = {(a.section, a.question): a.score for a in facility.fms_answers.all()}
+    score, factor, answered = fms.facility_scores([facility.pk])
+
+    sections = []
+    offset = 0
+    for s, section_id in enumerate(questionnaire.sections):
+        size = int(questionnaire.membership[s].sum())
+        questions = []
+        for key, item in zip(questionnaire.keys[offset:offset + size], questionnaire.questions[offset:offset + size]):
+            questions.append({
+                'id': key[1],
+                'field': f'q-{key[0]}-{key[1]}',
+                'question': item['question'],
+                'guidance': item.get('guidance') or '',
+                'possible_score': item['possible_score'],
+                'score': stored.get(key),
+            })
+        offset += size
+        sections.append({
+            'id': section_id,
+            'title': questionnaire.titles[s],
+            'weight': round(questionnaire.weights[s] * 100),
+            'questions': questions,
+        })
+
+    return render(request, 'dashboard/facility_fms.html', {
+        'facility': facility,
+        'sections': sections,
+        'answered': bool(answered[0]),
+        'pscore': float(score[0]),
+        'fms_factor': float(factor[0]),
+    })
+
+@login_required
+def facility_recalculate(request, pk):
+    from .models import Facility
+    from .jobs import enqueue
+    from django.shortcuts import get_object_or_404
+
+    facility = get_object_or_404(Facility, pk=pk, owner=request.user)
+    if request.method == 'POST':
+        job = enqueue('recalculate_facility', {'facility': facility.pk}, owner=request.user, facility=facility)
+        messages.success(request, f'Recalculation of {facility.name} queued as job #{job.pk}.')
+    return redirect('jobs_home')
+
+@login_required
+def jobs(request):
+    from .models import BackgroundJob
+
+    recent = BackgroundJob.objects.filter(owner=request.user).select_related('facility')[:50]
+    return render(request, 'dashboard/jobs.html', {
+        'jobs': recent,
+    })
+
+@login_required
+def api_job_status(request, pk):
+    """Status of one of the user's background jobs, for polling."""
+    from .models import BackgroundJob
+    from django.http import JsonResponse
+    from django.shortcuts import get_object_or_404
+    from django.urls import reverse
+
+    job = get_object_or_404(BackgroundJob, pk=pk, owner=request.user)
+    return JsonResponse({
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+        'result': job.result,
+        'download': reverse('job_download', args=[job.pk]) if job.result and job.result.get('file') else None,
+        'error': job.error.strip().splitlines()[-1] if job.error else '',
+    })
+
+@login_required
+def job_download(request, pk):
+    """The file written by one of the user's finished jobs (e.g. a Parquet export)."""
+    import os
+    from .models import BackgroundJob
+    from django.core.files.storage import default_storage
+    from django.http import FileResponse, Http404
+    from django.shortcuts import get_object_or_404
+
+    job = get_object_or_404(BackgroundJob, pk=pk, owner=request.user, status=BackgroundJob.SUCCEEDED)
+    path = (job.result or {}).get('file')
+    if not path or not default_storage.exists(path):
+        raise Http404('This job has no file to download.')
+    return FileResponse(default_storage.open(path), as_attachment=True, filename=os.path.basename(path))
+
+@login_required
+def api_hierarchy(request):
+    """
+    Children of one hierarchy node, a keyset page at a time:
+    ?level=unit&parent=<facility id>[&after=<last id>][&limit=N].
+    Facilities are listed without a parent.
+    """
+    from django.http import JsonResponse
+    from .hierarchy import LEVELS, MAX_PAGE_SIZE, PAGE_SIZE, children
+
+    level = request.GET.get('level', 'facility')
+    if level not in LEVELS:
+        return JsonResponse({'error': f'Unknown level: {level}'}, status=400)
+    try:
+        parent = int(request.GET['parent']) if LEVELS[level].parent else None
+        after = int(request.GET['after']) if request.GET.get('after') else None
+        limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'parent, after and limit must be integers; parent is required below facilities'}, status=400)
+
+    items, next_after = children(request.user, level, parent=parent, after=after, limit=limit)
+    return JsonResponse({
+        'level': level,
+        'child_level': LEVELS[level].child,
+        'items': items,
+        'next': next_after,
+    })
+
+@login_required
+def riskiest_components(request):
+    """Top-N components by risk, POF or COF across the user's facilities; rows come from api_riskiest."""
+    from .models import Facility, RiskRollup
+    from .ranking import METRICS
+
+    mechanisms = rollups.summarize(RiskRollup.objects.filter(facility__owner=request.user, unit__isnull=True))['mechanisms']
+    return render(request, 'dashboard/riskiest.html', {
+        'facilities': Facility.objects.filter(owner=request.user).order_by('name').values('id', 'name'),
+        'metrics': METRICS,
+        'mechanisms': [mechanism for mechanism, count in mechanisms],
+    })
+
+@login_required
+def api_riskiest(request):
+    """
+    One keyset page of the user's riskiest components:
+    ?metric=risk|pof|cof[&facility=<id>][&unit=<id>][&mechanism=<key>][&after=<cursor>][&limit=N].
+    """
+    from django.http import JsonResponse
+    from .ranking import MAX_PAGE_SIZE, METRICS, PAGE_SIZE, parse_cursor, riskiest
+
+    metric = request.GET.get('metric', 'risk')
+    if metric not in METRICS:
+        return JsonResponse({'error': f'Unknown metric: {metric}'}, status=400)
+    try:
+        facility = int(request.GET['facility']) if request.GET.get('facility') else None
+        unit = int(request.GET['unit']) if request.GET.get('unit') else None
+        after = request.GET.get('after') or None
+        if after is not None:
+            parse_cursor(after)
+        limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': 'facility, unit and limit must be integers; after must be a cursor from a previous page'}, status=400)
+
+    items, next_after = riskiest(
+        request.user, metric, facility=facility, unit=unit, mechanism=request.GET.get('mechanism') or None,
+        after=after, limit=limit,
+    )
+    return JsonResponse({
+        'metric': metric,
+        'items': items,
+        'next': next_after,
+    })
+
 @login_required
 def unit_edit(request, pk):
     from .models import Unit
@@ -418,6 +715,7 @@ def equipment_edit(request, pk):
 @login_required
 def add_inspection_history(request):
     from .models import Component, InspectionHistory
+    from .calculations.dependencies import INSPECTION_HISTORY, refresh_component
     from django.http import JsonResponse
     import json
     
@@ -429,7 +727,7 @@ def add_inspection_history(request):
             if not component_id:
                  return JsonResponse({'success': False, 'error': 'Component ID required. Please save component first.'}, status=400)
 
-            component = get_object_or_404(Component, pk=component_id, equipment__system__unit__facility__owner=request.user)
+            component = get_object_or_404(Component, pk=component_id, owner=request.user)
             
             history = InspectionHistory.objects.create(
                 component=component,
@@ -441,6 +739,7 @@ def add_inspection_history(request):
                 corrosion_finding_capability=data.get('corrosion_finding_capability'),
                 comments=data.get('comments')
             )
+            refresh_component(component, [INSPECTION_HISTORY])
             
             return JsonResponse({
                 'success': True,
@@ -456,11 +755,14 @@ def add_inspection_history(request):
 @login_required
 def delete_inspection_history(request, pk):
     from .models import InspectionHistory
+    from .calculations.dependencies import INSPECTION_HISTORY, refresh_component
     from django.http import JsonResponse
-    
+    from django.shortcuts import get_object_or_404
+
     if request.method == 'POST':
-        history = get_object_or_404(InspectionHistory, pk=pk, component__equipment__system__unit__facility__owner=request.user)
+        history = get_object_or_404(InspectionHistory, pk=pk, owner=request.user)
         history.delete()
+        refresh_component(history.component, [INSPECTION_HISTORY])
         return JsonResponse({'success': True})
     
     return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
@@ -473,7 +775,7 @@ def get_inspection_history(request, component_id):
     try:
         histories = InspectionHistory.objects.filter(
             component_id=component_id,
-            component__equipment__system__unit__facility__owner=request.user
+            owner=request.user
         ).order_by('-date')
         
         data = []
@@ -0,0 +1,272 @@
+/*
+ * Facility -> Unit -> System -> Equipment -> Component tree for the hierarchy
+ * pages. Only the facilities are fetched on load; the children of a node are
+ * fetched from the hierarchy API the first time it is expanded, one keyset
+ * page at a time ("Load more" fetches the next page), so the page holds just
+ * the branches the user has opened.
+ *
+ *   new HierarchyTree(tbody, {
+ *       url: '/dashboard/api/hierarchy/',
+ *       leaf: 'component',               // deepest level shown
+ *       columns: 5,                      // table column count
+ *       renderLeaf: item => [td, ...],   // cells of a leaf row
+ *   });
+ */
+const HIERARCHY_CHILD = { facility: 'unit', unit: 'system', system: 'equipment', equipment: 'component' };
+const HIERARCHY_INDENT = { facility: 0, unit: 2, system: 4, equipment: 6, component: 7 };
+
+const HIERARCHY_NODE_STYLE = {
+    facility: {
+        row: 'bg-blue-900 hover:bg-blue-800 cursor-pointer transition-colors',
+        cell: 'font-bold text-white py-2 px-4',
+        edit: 'btn btn-ghost btn-xs text-white hover:bg-blue-700 ml-2 tooltip tooltip-right',
+    },
+    unit: {
+        row: 'bg-blue-50 hover:bg-blue-100 cursor-pointer border-b border-blue-100',
+        cell: 'font-semibold text-blue-950 py-2',
+        edit: 'btn btn-ghost btn-xs text-white hover:bg-blue-700 ml-2 tooltip tooltip-right',
+    },
+    system: {
+        row: 'bg-gray-50 hover:bg-gray-100 cursor-pointer border-b border-gray-50',
+        cell: 'font-medium text-gray-800 py-2',
+        edit: 'btn btn-ghost btn-xs text-blue-900 hover:bg-blue-100 ml-2 tooltip tooltip-right',
+    },
+    equipment: {
+        row: 'bg-amber-50 hover:bg-amber-100 cursor-pointer border-b border-amber-100',
+        cell: 'font-medium text-gray-700 py-2',
+        edit: null,
+    },
+};
+
+// Node label and edit-modal call of each expandable level
+const HIERARCHY_NODES = {
+    facility: {
+        label: item => `Facility: ${item.name}`,
+        edit: item => openEditFacilityModal(String(item.id), item.name, item.location, item.facility_type, item.company || ''),
+    },
+    unit: {
+        label: item => `Unit: ${item.name}`,
+        edit: item => openEditUnitModal(String(item.id), String(item.facility_id), item.name, item.description || '', String(item.people_density ?? 0.0)),
+    },
+    system: {
+        label: item => `System: ${item.name}`,
+        edit: item => openEditSystemModal(String(item.id), String(item.unit_id), item.name, item.description || ''),
+    },
+    equipment: {
+        label: item => `Equipment: ${item.number}`,
+        edit: null,
+    },
+};
+
+const HIERARCHY_EMPTY = {
+    facility: 'No facilities found. Create a facility first.',
+    unit: 'No units in this facility',
+    system: 'No systems in this unit',
+    equipment: 'No equipment in this system',
+    component: 'No components in this equipment',
+};
+
+const HIERARCHY_CHEVRON = '<svg xmlns="http://www.w3.org/2000/svg" class="h-4 w-4 transform transition-transform duration-200" '
+    + 'fill="none" viewBox="0 0 24 24" stroke="currentColor" style="transform: rotate(-90deg)">'
+    + '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M19 9l-7 7-7-7" /></svg>';
+const HIERARCHY_PENCIL = '<svg xmlns="http://www.w3.org/2000/svg" class="h-4 w-4" fill="none" viewBox="0 0 24 24" stroke="currentColor">'
+    + '<path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" '
+    + 'd="M15.232 5.232l3.536 3.536m-2.036-5.036a2.5 2.5 0 113.536 3.536L6.5 21.036H3v-3.572L16.732 3.732z" /></svg>';
+
+class HierarchyTree {
+    constructor(tbody, options) {
+        this.tbody = tbody;
+        this.url = options.url;
+        this.leaf = options.leaf;
+        this.columns = options.columns;
+        this.renderLeaf = options.renderLeaf;
+        this.expanded = new Set();
+        this.loaded = new Set();
+        this.load('facility', null, null, null);
+    }
+
+    // Cell helpers for renderLeaf()
+    static cell(text, className) {
+        const td = document.createElement('td');
+        td.className = className || 'text-gray-600';
+        td.textContent = text ?? '';
+        return td;
+    }
+
+    static leafCell(level, text) {
+        const td = document.createElement('td');
+        td.className = 'font-medium text-gray-700 flex items-center gap-2';
+        td.style.paddingLeft = `${HIERARCHY_INDENT[level]}rem`;
+        const branch = document.createElement('span');
+        branch.className = 'text-gray-300';
+        branch.textContent = '└';
+        td.append(branch, document.createTextNode(` ${text ?? ''}`));
+        return td;
+    }
+
+    static actions(...buttons) {
+        const td = document.createElement('td');
+        td.className = 'text-right pr-8';
+        const div = document.createElement('div');
+        div.className = 'flex justify-end gap-2';
+        div.append(...buttons);
+        td.append(div);
+        return td;
+    }
+
+    static link(label, href, className) {
+        const a = document.createElement('a');
+        a.href = href;
+        a.className = `btn btn-ghost btn-xs ${className}`;
+        a.textContent = label;
+        return a;
+    }
+
+    static button(label, className, onclick) {
+        const button = document.createElement('button');
+        button.className = `btn btn-ghost btn-xs ${className}`;
+        button.textContent = label;
+        if (onclick) button.addEventListener('click', onclick);
+        return button;
+    }
+
+    // Like the truncatewords template filter
+    static truncateWords(text, count) {
+        const words = (text || '').split(/\s+/).filter(Boolean);
+        return words.length > count ? `${words.slice(0, count).join(' ')} …` : words.join(' ');
+    }
+
+    // `urlTemplate` is a reversed URL for pk 0, e.g. "{% url 'component_edit' 0 %}"
+    static urlFor(urlTemplate, pk) {
+        return urlTemplate.replace('/0/', `/${pk}/`);
+    }
+
+    async load(level, parent, after, anchor) {
+        const params = new URLSearchParams({ level });
+        if (parent !== null) params.set('parent', parent);
+        if (after !== null) params.set('after', after);
+
+        const ancestors = anchor ? this.ancestorsOf(anchor) : [];
+        let rows;
+        try {
+            const response = await fetch(`${this.url}?${params}`, { headers: { 'Accept': 'application/json' } });
+            if (!response.ok) throw new Error(response.statusText);
+            const page = await response.json();
+            rows = page.items.map(item => level === this.leaf ? this.leafRow(level, item) : this.nodeRow(level, item));
+            if (!rows.length && after === null) rows.push(this.messageRow(level, HIERARCHY_EMPTY[level]));
+            if (page.next !== null) rows.push(this.moreRow(level, parent, page.next));
+        } catch (error) {
+            rows = [this.messageRow(level, `Could not load: ${error.message}`)];
+        }
+
+        for (const row of rows) row.dataset.ancestors = ancestors.join(' ');
+        if (anchor && anchor.dataset.more) {
+            anchor.replaceWith(...rows);
+        } else if (anchor) {
+            anchor.after(...rows);
+        } else {
+            this.tbody.append(...rows);
+        }
+    }
+
+    // Keys of the expanded nodes above the rows loaded at `anchor`
+    ancestorsOf(anchor) {
+        const above = anchor.dataset.ancestors ? anchor.dataset.ancestors.split(' ') : [];
+        return anchor.dataset.more ? above : [...above, anchor.dataset.key];
+    }
+
+    nodeRow(level, item) {
+        const node = HIERARCHY_NODES[level];
+        const style = HIERARCHY_NODE_STYLE[level];
+        const row = document.createElement('tr');
+        row.className = style.row;
+        row.dataset.key = `${level}-${item.id}`;
+
+        const td = document.createElement('td');
+        td.colSpan = this.columns;
+        td.className = style.cell;
+        if (HIERARCHY_INDENT[level]) td.style.paddingLeft = `${HIERARCHY_INDENT[level]}rem`;
+        const div = document.createElement('div');
+        div.className = 'flex items-center gap-2';
+        div.insertAdjacentHTML('beforeend', HIERARCHY_CHEVRON);
+        div.append(document.createTextNode(node.label(item)));
+        if (node.edit && style.edit) {
+            const edit = document.createElement('button');
+            edit.className = style.edit;
+            edit.dataset.tip = `Edit ${level[0].toUpperCase()}${level.slice(1)}`;
+            edit.innerHTML = HIERARCHY_PENCIL;
+            edit.addEventListener('click', event => {
+                event.stopPropagation();
+                node.edit(item);
+            });
+            div.append(edit);
+        }
+        td.append(div);
+        row.append(td);
+        row.addEventListener('click', () => this.toggle(row, level, item));
+        return row;
+    }
+
+    leafRow(level, item) {
+        const row = document.createElement('tr');
+        row.className = 'hover:bg-gray-50 transition-colors border-b border-gray-100';
+        row.append(...this.renderLeaf(item));
+        return row;
+    }
+
+    messageRow(level, text) {
+        const row = document.createElement('tr');
+        row.className = 'bg-gray-50';
+        const td = document.createElement('td');
+        td.colSpan = this.columns;
+        td.className = level === 'facility' ? 'text-center py-8 text-gray-500' : 'text-sm text-gray-400 italic py-2';
+        if (level !== 'facility') td.style.paddingLeft = `${HIERARCHY_INDENT[level] + 1}rem`;
+        td.textContent = text;
+        row.append(td);
+        return row;
+    }
+
+    moreRow(level, parent, after) {
+        const row = document.createElement('tr');
+        row.dataset.more = 'true';
+        const td = document.createElement('td');
+        td.colSpan = this.columns;
+        td.style.paddingLeft = `${HIERARCHY_INDENT[level] + 1}rem`;
+        td.append(HierarchyTree.button('Load more', 'text-blue-950 hover:bg-blue-100', () => {
+            td.textContent = 'Loading…';
+            this.load(level, parent, after, row);
+        }));
+        row.append(td);
+        return row;
+    }
+
+    toggle(row, level, item) {
+        const key = row.dataset.key;
+        const icon = row.querySelector('svg');
+        if (this.expanded.has(key)) {
+            this.expanded.delete(key);
+            this.tbody.querySelectorAll(`tr[data-ancestors~="${key}"]`).forEach(child => child.classList.add('hidden'));
+            icon.style.transform = 'rotate(-90deg)';
+            return;
+        }
+        this.expanded.add(key);
+        icon.style.transform = 'rotate(0deg)';
+        if (!this.loaded.has(key)) {
+            this.loaded.add(key);
+            if (item.has_children) {
+                this.load(HIERARCHY_CHILD[level], item.id, null, row);
+            } else {
+                const empty = this.messageRow(HIERARCHY_CHILD[level], HIERARCHY_EMPTY[HIERARCHY_CHILD[level]]);
+                empty.dataset.ancestors = this.ancestorsOf(row).join(' ');
+                row.after(empty);
+            }
+            return;
+        }
+        // Show the rows below whose every ancestor is expanded again
+        this.tbody.querySelectorAll(`tr[data-ancestors~="${key}"]`).forEach(child => {
+            if (child.dataset.ancestors.split(' ').every(ancestor => this.expanded.has(ancestor))) {
+                child.classList.remove('hidden');
+            }
+        });
+    }
+}